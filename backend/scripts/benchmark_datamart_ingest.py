@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""Benchmark the cold-tier DataMart ingester against local archives.
+
+Archives come from a local DataMart mirror (``{STATE}_{TABLE}.zip`` and
+``FIADB_REFERENCE.zip``) or are generated synthetically, so the benchmark
+never touches the network. The baseline extracts the CSVs and converts
+them with pyFIA's own converter.
+
+Usage:
+    # Synthetic state with 20,000 plots
+    uv run python scripts/benchmark_datamart_ingest.py --plots 20000
+
+    # Archives mirrored from DataMart
+    uv run python scripts/benchmark_datamart_ingest.py --archives ./datamart --state NC
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from askfia_api.services.datamart_ingest import ArchiveSource, ingest_state
+
+console = Console()
+
+TABLES = ["PLOT", "COND", "TREE", "POP_EVAL"]
+TREES_PER_PLOT = 25
+
+
+def write_synthetic_archives(directory: Path, state: str, plots: int) -> None:
+    """Write DataMart-shaped archives for a synthetic state."""
+    rng = random.Random(0)
+    order = list(range(plots))
+    rng.shuffle(order)
+
+    def archive(name: str, header: str, rows) -> None:
+        with zipfile.ZipFile(directory / f"{name}.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+            with zf.open(f"{name}.csv", "w") as f:
+                f.write((header + "\n").encode())
+                for row in rows:
+                    f.write((row + "\n").encode())
+
+    archive(
+        f"{state}_PLOT",
+        "CN,STATECD,INVYR,LAT,LON,CREATED_DATE",
+        (
+            f"P{p},37,{2015 + p % 8}.0,{35 + rng.random():.5f},{-80 + rng.random():.5f},"
+            "2021-06-01 10:00:00"
+            for p in order
+        ),
+    )
+    archive(
+        f"{state}_COND",
+        "CN,PLT_CN,CONDID,COND_STATUS_CD,CONDPROP_UNADJ,FORTYPCD,OWNGRPCD",
+        (f"C{p},P{p},1,1,1.0,{161 + p % 20},{10 * (1 + p % 4)}" for p in order),
+    )
+    archive(
+        f"{state}_TREE",
+        "CN,PLT_CN,CONDID,STATUSCD,SPCD,DIA,TPA_UNADJ,VOLCFNET,DRYBIO_AG",
+        (
+            f"T{p}_{t},P{p},1,1,{rng.choice((110, 131, 316, 802))},"
+            f"{rng.uniform(1, 30):.1f},6.018046,{rng.uniform(0, 80):.3f},"
+            f"{rng.uniform(0, 2000):.2f}"
+            for p in order
+            for t in range(TREES_PER_PLOT)
+        ),
+    )
+    archive(f"{state}_POP_EVAL", "CN,EVALID,STATECD", [f"E1,{37_21_01},37"])
+    with zipfile.ZipFile(directory / "FIADB_REFERENCE.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("REF_SPECIES.csv", "SPCD,COMMON_NAME\n110,shortleaf pine\n131,loblolly pine\n")
+
+
+def run_baseline(archives: Path, state: str, work: Path) -> float:
+    """Extract every CSV and convert with pyFIA's converter."""
+    from pyfia.downloader import _convert_csvs_to_duckdb, get_state_fips
+
+    started = time.perf_counter()
+    csv_dir = work / "csv"
+    csv_dir.mkdir()
+    for path in archives.glob("*.zip"):
+        with zipfile.ZipFile(path) as zf:
+            zf.extractall(csv_dir)
+    _convert_csvs_to_duckdb(
+        csv_dir,
+        work / "baseline.duckdb",
+        state_code=get_state_fips(state),
+        state=state,
+        show_progress=False,
+    )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DataMart ingestion")
+    parser.add_argument("--archives", type=Path, help="Directory of DataMart archives")
+    parser.add_argument("--state", default="NC", help="State to ingest")
+    parser.add_argument("--plots", type=int, default=5000, help="Synthetic plots")
+    parser.add_argument("--parallel", type=int, default=4, help="Archives ingested at once")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the pyFIA baseline")
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="ingest-bench-"))
+    try:
+        archives = args.archives
+        if archives is None:
+            archives = work / "archives"
+            archives.mkdir()
+            console.print(f"Generating {args.plots:,} synthetic plots...")
+            write_synthetic_archives(archives, args.state, args.plots)
+        elif not archives.is_dir():
+            console.print(f"[red]Error: {archives} is not a directory[/red]")
+            sys.exit(1)
+
+        source = ArchiveSource(archives)
+        archive_mb = sum(p.stat().st_size for p in archives.glob("*.zip")) / 1e6
+        table = Table(title=f"{args.state}: {archive_mb:.1f} MB of archives")
+        table.add_column("Method")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Output MB", justify="right")
+
+        for layout in ("duckdb", "parquet"):
+            dest = work / ("out.duckdb" if layout == "duckdb" else "out-parquet")
+            result = ingest_state(
+                args.state,
+                dest,
+                source,
+                tables=TABLES,
+                layout=layout,
+                max_parallel=args.parallel,
+            )
+            size = (
+                dest.stat().st_size
+                if dest.is_file()
+                else sum(p.stat().st_size for p in dest.iterdir())
+            )
+            table.add_row(f"ingest ({layout})", f"{result.seconds:.2f}", f"{size / 1e6:.1f}")
+
+        if not args.no_baseline:
+            seconds = run_baseline(archives, args.state, work)
+            size = (work / "baseline.duckdb").stat().st_size
+            table.add_row("pyFIA extract + convert", f"{seconds:.2f}", f"{size / 1e6:.1f}")
+
+        console.print(table)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
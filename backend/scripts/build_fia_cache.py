@@ -13,17 +13,42 @@ Usage:
 
     # Dry run (don't upload)
     uv run python scripts/build_fia_cache.py --states GA --dry-run
+
+    # Also publish per-table Parquet objects (FIA_TABLE_STORAGE=true)
+    uv run python scripts/build_fia_cache.py --states GA --tables
+
+    # Publish column-pruned slim databases, checked against the full ones
+    uv run python scripts/build_fia_cache.py --states GA --slim
+
+    # Also export into a national Parquet lake (FIA_LAKE_DIR) for
+    # cross-state queries
+    uv run python scripts/build_fia_cache.py --all --lake ./data/lake
+
+    # Four builds in parallel; rerunning resumes from the journal and skips
+    # states whose DataMart source is unchanged (--force rebuilds them)
+    uv run python scripts/build_fia_cache.py --all --jobs 4
 """
 
 import argparse
 import logging
 import os
 import sys
+import time
+from functools import partial
 from pathlib import Path
 
 from dotenv import load_dotenv
 from rich.console import Console
 
+from askfia_api.services.build_pipeline import (
+    JOURNAL_FILE,
+    BuildJournal,
+    BuildResult,
+    build_state,
+    run_pipeline,
+)
+from askfia_api.services.resource_profiles import build_profile
+
 # Load environment variables from .env
 load_dotenv()
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
@@ -31,6 +56,16 @@ from rich.table import Table
 
 console = Console()
 
+# Console style and mark per pipeline event
+EVENT_STYLES = {
+    "built": ("green", "✓"),
+    "uploaded": ("green", "✓"),
+    "resumed": ("blue", "↻"),
+    "unchanged": ("dim", "="),
+    "skipped": ("yellow", "-"),
+    "failed": ("red", "✗"),
+}
+
 # All US states with FIA data
 ALL_STATES = [
     "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
@@ -60,35 +95,108 @@ def get_s3_client():
     )
 
 
-def download_state(state: str, output_dir: Path) -> Path | None:
-    """Download FIA data for a state and return the DB path."""
-    from pyfia import download
-
-    try:
-        db_path = download(state, dir=str(output_dir))
-        return Path(db_path)
-    except Exception as e:
-        logger.error(f"Failed to download {state}: {e}")
-        return None
-
-
 def upload_to_s3(
     s3_client,
     local_path: Path,
     bucket: str,
     prefix: str,
     state: str,
+    version: str | None = None,
+    evalids: list[int] | None = None,
 ) -> bool:
-    """Upload a file to S3."""
+    """Upload a state database to S3 and publish its version.
+
+    The file's SHA-256 is stored as object metadata (checked by the
+    downloader) and recorded as the state's version in the published
+    manifest, which tells running servers to replace their cached copy.
+    """
+    from askfia_api.services.s3_download import file_sha256
+    from askfia_api.services.state_versions import (
+        state_evalids,
+        update_published_manifest,
+    )
+
     s3_key = f"{prefix}/{state}.duckdb"
     try:
-        s3_client.upload_file(str(local_path), bucket, s3_key)
+        version = version or file_sha256(local_path)
+        s3_client.upload_file(
+            str(local_path), bucket, s3_key, ExtraArgs={"Metadata": {"sha256": version}}
+        )
+        update_published_manifest(
+            s3_client,
+            bucket,
+            prefix,
+            {
+                state: {
+                    "version": version,
+                    "size": local_path.stat().st_size,
+                    "evalids": evalids if evalids is not None else state_evalids(local_path),
+                    "published_at": time.time(),
+                }
+            },
+        )
         return True
     except Exception as e:
         logger.error(f"Failed to upload {state}: {e}")
         return False
 
 
+def cleanup_build(result, output_dir: Path) -> None:
+    """Remove a published state's local files to save disk space."""
+    import shutil
+
+    db_path, full_path = Path(result.db_path), Path(result.full_path)
+    try:
+        # Remove the duckdb file (and the full one if slim)
+        db_path.unlink(missing_ok=True)
+        full_path.unlink(missing_ok=True)
+        # Remove the state directory if it is not the output directory
+        if full_path.parent != output_dir:
+            shutil.rmtree(full_path.parent, ignore_errors=True)
+        console.print(f"  [dim]Cleaned up local files for {result.state}[/dim]")
+    except Exception as e:
+        console.print(f"  [yellow]Warning: Cleanup failed: {e}[/yellow]")
+
+
+def publish_tables(
+    s3_client,
+    db_path: Path,
+    output_dir: Path,
+    bucket: str | None,
+    prefix: str,
+    state: str,
+) -> dict | None:
+    """Export a state's tables as Parquet and upload them with their manifest.
+
+    The manifest is uploaded last so readers never see a manifest that
+    lists tables not yet uploaded.
+    """
+    from askfia_api.services.table_store import (
+        MANIFEST_FILE,
+        TABLES_PREFIX,
+        export_state_tables,
+    )
+
+    table_dir = output_dir / TABLES_PREFIX / state
+    try:
+        manifest = export_state_tables(db_path, table_dir, state)
+        if s3_client:
+            key_prefix = f"{prefix}/{TABLES_PREFIX}/{state}"
+            for name in manifest["tables"]:
+                s3_client.upload_file(
+                    str(table_dir / f"{name}.parquet"),
+                    bucket,
+                    f"{key_prefix}/{name}.parquet",
+                )
+            s3_client.upload_file(
+                str(table_dir / MANIFEST_FILE), bucket, f"{key_prefix}/{MANIFEST_FILE}"
+            )
+        return manifest
+    except Exception as e:
+        logger.error(f"Failed to publish tables for {state}: {e}")
+        return None
+
+
 def main():
     parser = argparse.ArgumentParser(description="Build and upload FIA cache")
     parser.add_argument(
@@ -127,6 +235,60 @@ def main():
         action="store_true",
         help="Skip states that already exist in S3",
     )
+    parser.add_argument(
+        "--slim",
+        action="store_true",
+        help="Publish a column-pruned database with only what the estimators read",
+    )
+    parser.add_argument(
+        "--validate",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="With --slim, compare slim and full estimates before publishing "
+        "(default; --no-validate skips the check)",
+    )
+    parser.add_argument(
+        "--tables",
+        action="store_true",
+        help="Also publish per-table Parquet objects for lazy table fetches",
+    )
+    parser.add_argument(
+        "--lake",
+        type=Path,
+        help="Also export states into this STATECD-partitioned Parquet lake",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        help="States downloaded and converted in parallel (processes)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=0,
+        help="DuckDB threads per build (default: cores divided among --jobs)",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        help="DuckDB memory limit per build, e.g. 4GB (default: DuckDB's)",
+    )
+    parser.add_argument(
+        "--upload-jobs",
+        type=int,
+        default=4,
+        help="Concurrent uploads",
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        help="Build journal for resuming (default: <output-dir>/build_journal.json)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild and upload states even if their source is unchanged",
+    )
     parser.add_argument(
         "--cleanup",
         action="store_true",
@@ -144,7 +306,7 @@ def main():
 
     # Determine states to process
     if args.all:
-        states = ALL_STATES
+        states = list(ALL_STATES)
     elif args.states:
         states = [s.upper() for s in args.states]
     else:
@@ -174,8 +336,63 @@ def main():
         console.print(f"Bucket: {args.bucket}/{args.prefix}")
     console.print()
 
-    # Track results
-    results = {"downloaded": [], "uploaded": [], "failed": [], "skipped": []}
+    journal = BuildJournal(None if args.dry_run else args.journal or args.output_dir / JOURNAL_FILE)
+
+    # Check if already exists in S3
+    skipped = []
+    if args.skip_existing and s3_client:
+        for state in list(states):
+            try:
+                s3_client.head_object(Bucket=args.bucket, Key=f"{args.prefix}/{state}.duckdb")
+            except Exception:
+                continue  # File doesn't exist, proceed
+            states.remove(state)
+            skipped.append(state)
+
+    def upload(result: BuildResult) -> bool:
+        db_path = Path(result.db_path)
+
+        # Per-table Parquet (before cleanup removes the database)
+        if args.tables:
+            manifest = publish_tables(
+                s3_client, db_path, args.output_dir, args.bucket, args.prefix, result.state
+            )
+            if manifest is None:
+                return False
+            console.print(
+                f"  [green]✓[/green] {result.state}: {len(manifest['tables'])} tables exported"
+            )
+
+        # National lake (also before cleanup)
+        if args.lake:
+            from askfia_api.services.parquet_lake import export_state_to_lake
+
+            try:
+                entry = export_state_to_lake(db_path, args.lake, result.state)
+            except Exception as e:
+                logger.error(f"Failed to export {result.state} to lake: {e}")
+                return False
+            console.print(
+                f"  [green]✓[/green] {result.state}: {len(entry['rows'])} tables "
+                f"exported to lake"
+            )
+
+        if args.dry_run:
+            return True
+
+        if not upload_to_s3(
+            s3_client,
+            db_path,
+            args.bucket,
+            args.prefix,
+            result.state,
+            version=result.version,
+            evalids=result.evalids,
+        ):
+            return False
+        if args.cleanup:
+            cleanup_build(result, args.output_dir)
+        return True
 
     with Progress(
         SpinnerColumn(),
@@ -186,55 +403,34 @@ def main():
     ) as progress:
         task = progress.add_task("Processing states...", total=len(states))
 
-        for state in states:
-            progress.update(task, description=f"Processing {state}...")
-
-            # Check if already exists in S3
-            if args.skip_existing and s3_client:
-                try:
-                    s3_key = f"{args.prefix}/{state}.duckdb"
-                    s3_client.head_object(Bucket=args.bucket, Key=s3_key)
-                    results["skipped"].append(state)
-                    progress.advance(task)
-                    continue
-                except Exception:
-                    pass  # File doesn't exist, proceed
-
-            # Download
-            db_path = download_state(state, args.output_dir)
-            if db_path:
-                results["downloaded"].append(state)
-                size_mb = db_path.stat().st_size / 1e6
-
-                # Upload
-                if not args.dry_run and s3_client:
-                    if upload_to_s3(s3_client, db_path, args.bucket, args.prefix, state):
-                        results["uploaded"].append(state)
-                        console.print(f"  [green]✓[/green] {state}: {size_mb:.1f} MB uploaded")
-
-                        # Cleanup local files to save disk space
-                        if args.cleanup:
-                            try:
-                                # Remove the duckdb file
-                                db_path.unlink()
-                                # Remove the state directory if it exists and is empty
-                                state_dir = db_path.parent
-                                if state_dir != args.output_dir:
-                                    import shutil
-                                    shutil.rmtree(state_dir, ignore_errors=True)
-                                console.print(f"  [dim]Cleaned up local files for {state}[/dim]")
-                            except Exception as e:
-                                console.print(f"  [yellow]Warning: Cleanup failed: {e}[/yellow]")
-                    else:
-                        results["failed"].append(state)
-                        console.print(f"  [red]✗[/red] {state}: upload failed")
-                else:
-                    console.print(f"  [green]✓[/green] {state}: {size_mb:.1f} MB downloaded")
-            else:
-                results["failed"].append(state)
-                console.print(f"  [red]✗[/red] {state}: download failed")
-
-            progress.advance(task)
+        def on_event(state: str, event: str, detail: str) -> None:
+            style, mark = EVENT_STYLES.get(event, ("dim", "·"))
+            console.print(f"  [{style}]{mark}[/{style}] {state}: {event} {detail}")
+            if event in ("uploaded", "unchanged", "skipped", "failed"):
+                progress.advance(task)
+
+        results = run_pipeline(
+            states,
+            build=partial(
+                build_state,
+                output_dir=args.output_dir,
+                slim=args.slim,
+                validate=args.validate,
+                profile=build_profile(
+                    args.jobs,
+                    threads=args.threads,
+                    memory_limit=args.memory_limit,
+                    temp_directory=str(args.output_dir / "duckdb_tmp"),
+                ),
+            ),
+            upload=upload,
+            journal=journal,
+            build_workers=args.jobs,
+            upload_workers=args.upload_jobs,
+            force=args.force,
+            on_event=on_event,
+        )
+    results["skipped"].extend(skipped)
 
     # Summary table
     console.print("\n[bold]Summary[/bold]")
@@ -243,18 +439,18 @@ def main():
     table.add_column("Count")
     table.add_column("States")
 
-    if results["downloaded"]:
-        table.add_row(
-            "[green]Downloaded[/green]",
-            str(len(results["downloaded"])),
-            ", ".join(results["downloaded"][:10]) + ("..." if len(results["downloaded"]) > 10 else ""),
-        )
     if results["uploaded"]:
         table.add_row(
-            "[blue]Uploaded[/blue]",
+            "[green]Built[/green]" if args.dry_run else "[blue]Uploaded[/blue]",
             str(len(results["uploaded"])),
             ", ".join(results["uploaded"][:10]) + ("..." if len(results["uploaded"]) > 10 else ""),
         )
+    if results["unchanged"]:
+        table.add_row(
+            "[dim]Unchanged[/dim]",
+            str(len(results["unchanged"])),
+            ", ".join(results["unchanged"][:10]) + ("..." if len(results["unchanged"]) > 10 else ""),
+        )
     if results["skipped"]:
         table.add_row(
             "[yellow]Skipped[/yellow]",
@@ -1,16 +1,24 @@
 """Load remaining southern states to MotherDuck.
 
 Downloads each state using pyfia, uploads to MotherDuck, then cleans up local files.
+States are built in parallel and uploaded as soon as they are ready; a journal
+lets an interrupted run resume, and states whose DataMart source is unchanged
+since their last upload are skipped.
 """
 
 import os
 import sys
+from functools import partial
 from pathlib import Path
 
 from rich.console import Console
 
+from askfia_api.services.build_pipeline import BuildJournal, build_state, run_pipeline
+
 console = Console()
 
+JOURNAL_FILE = "motherduck_journal.json"
+
 # States to load - update this list as needed
 # Already loaded: GA, SC, NC, FL, AL, MS, TN, VA, KY, LA, AR, WV (southern states)
 # Already loaded: ME, NH, VT, MA, RI, CT, NY, NJ, PA, DE, MD (northeast states)
@@ -20,22 +28,6 @@ console = Console()
 STATES_TO_LOAD = ["AK", "HI", "OK", "TX"]
 
 
-def download_state(state: str, data_dir: Path) -> Path:
-    """Download a state's FIA data using pyfia."""
-    from pyfia import download
-
-    console.print(f"\n[bold blue]Downloading {state}...[/bold blue]")
-
-    # Download using pyfia's download function
-    # This downloads from FIA DataMart and converts to DuckDB
-    db_path = download(state, dir=data_dir, common=True, force=True)
-
-    size_mb = db_path.stat().st_size / 1e6
-    console.print(f"  [green]File size: {size_mb:.1f} MB[/green]")
-
-    return db_path
-
-
 def upload_state(db_path: Path, state: str, motherduck_token: str) -> str:
     """Upload a state to MotherDuck."""
     from upload_to_motherduck import upload_state as do_upload
@@ -79,31 +71,33 @@ def main():
     data_dir = Path(__file__).parent.parent / "data" / "fia"
     data_dir.mkdir(parents=True, exist_ok=True)
 
-    uploaded_dbs = []
-    failed_states = []
-
     console.print(f"[bold]Loading {len(STATES_TO_LOAD)} states to MotherDuck[/bold]")
     console.print(f"States: {', '.join(STATES_TO_LOAD)}")
 
-    for state in STATES_TO_LOAD:
-        try:
-            # Download
-            db_path = download_state(state, data_dir)
-
-            # Upload
-            db_name = upload_state(db_path, state, motherduck_token)
-            uploaded_dbs.append(db_name)
-
-            # Cleanup
-            cleanup(db_path, state)
+    uploaded_dbs = []
 
-        except Exception as e:
-            console.print(f"[red]Error processing {state}: {e}[/red]")
-            failed_states.append((state, str(e)))
+    def upload(result) -> bool:
+        db_path = Path(result.full_path)
+        try:
+            uploaded_dbs.append(upload_state(db_path, result.state, motherduck_token))
+            return True
+        finally:
             # Clean up on error too
-            db_path = data_dir / f"{state}.duckdb"
-            if db_path.exists():
-                db_path.unlink()
+            cleanup(db_path, result.state)
+
+    def on_event(state: str, event: str, detail: str) -> None:
+        console.print(f"  {state}: {event} {detail}")
+
+    journal = BuildJournal(data_dir / JOURNAL_FILE)
+    results = run_pipeline(
+        STATES_TO_LOAD,
+        build=partial(build_state, output_dir=data_dir),
+        upload=upload,
+        journal=journal,
+        upload_workers=2,
+        on_event=on_event,
+    )
+    failed_states = [(state, journal.get(state).error) for state in results["failed"]]
 
     # Summary
     console.print("\n" + "=" * 50)
@@ -2,6 +2,7 @@
 
 This script copies tables from local DuckDB files to MotherDuck,
 creating a separate database for each state with evaluation year in the name.
+Re-uploads only copy tables whose content changed, and swap them in atomically.
 
 Database naming convention: fia_{state}_eval{year}
 Example: fia_ga_eval2023
@@ -16,7 +17,10 @@ from typing import Optional
 
 import duckdb
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+
+from askfia_api.services.backend_router import eval_year as latest_eval_year
+from askfia_api.services.backend_router import evalid_year
+from askfia_api.services.motherduck_upload import sync_database
 
 console = Console()
 
@@ -24,64 +28,32 @@ console = Console()
 def get_eval_year(local_path: Path) -> Optional[int]:
     """Extract the most recent evaluation year from the FIA database.
 
-    The evaluation year is extracted from the POP_EVAL table's EVALID field.
-    EVALID format: {state_code}{eval_year}{eval_type}
-    - state_code: 1-2 digit state FIPS code
-    - eval_year: 2-digit year (e.g., 23 = 2023)
-    - eval_type: 2-digit evaluation type (01 = Area/Volume, 03 = Growth, etc.)
-
-    We look for eval_type 01 (EXPALL - current area/volume evaluations).
-    Excludes legacy periodic inventory EVALIDs (year codes >= 50 which are 1900s data).
+    The evaluation year is extracted from the POP_EVAL table's EVALID field
+    with the same rule the API uses to compare backends (see
+    backend_router.evalid_year): only type 01 (EXPALL) evaluations of the
+    annual inventory count, not legacy periodic inventories.
     """
     try:
         conn = duckdb.connect(str(local_path), read_only=True)
-
-        # Get all EVALIDs ending in 01 (current area/volume evaluation)
-        # from the POP_EVAL table
         result = conn.execute("""
             SELECT EVALID, EVAL_DESCR
             FROM POP_EVAL
             WHERE EVALID IS NOT NULL
-              AND CAST(EVALID AS VARCHAR) LIKE '%01'
             ORDER BY EVALID DESC
         """).fetchall()
-
         conn.close()
 
-        # Find the most recent modern evaluation (year code 00-49 = 2000-2049)
-        # Skip legacy periodic inventories (year code 50-99 = 1950-1999)
-        for evalid_val, eval_descr in result:
-            evalid = str(int(evalid_val))
-
-            if len(evalid) >= 4:
-                year_part = evalid[-4:-2]
-                year = int(year_part)
-
-                # Skip legacy periodic inventories (1950s-1990s)
-                if year >= 50:
-                    continue
-
-                # This is a modern annual inventory (2000+)
-                full_year = 2000 + year
-                console.print(f"  [dim]EVALID {evalid}: {eval_descr}[/dim]")
-                return full_year
-
-        return None
+        year = latest_eval_year(evalid for evalid, _ in result)
+        for evalid, eval_descr in result:
+            if evalid_year(evalid) == year:
+                console.print(f"  [dim]EVALID {int(evalid)}: {eval_descr}[/dim]")
+                break
+        return year
     except Exception as e:
         console.print(f"  [yellow]Warning: Could not extract eval year: {e}[/yellow]")
         return None
 
 
-def get_tables_from_local(local_path: Path) -> list[str]:
-    """Get list of tables from a local DuckDB file."""
-    local_conn = duckdb.connect(str(local_path), read_only=True)
-    result = local_conn.execute(
-        "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
-    ).fetchall()
-    local_conn.close()
-    return [row[0] for row in result]
-
-
 def download_from_r2(state: str, local_path: Path) -> bool:
     """Download a state's DuckDB file from R2."""
     try:
@@ -157,9 +129,6 @@ def upload_state(
         console.print(f"\n[bold blue]Uploading {state} (unknown eval year)...[/bold blue]")
         console.print("  [yellow]Warning: Could not determine evaluation year[/yellow]")
 
-    # First, get tables from the local database
-    tables = get_tables_from_local(local_path)
-    console.print(f"  Found {len(tables)} tables to upload")
     console.print(f"  Target database: [cyan]md:{md_db_name}[/cyan]")
 
     # Connect to MotherDuck default database first
@@ -169,33 +138,22 @@ def upload_state(
     md_conn.execute(f"CREATE DATABASE IF NOT EXISTS {md_db_name}")
     md_conn.execute(f"USE {md_db_name}")
 
-    # Attach local database
-    md_conn.execute(f"ATTACH '{local_path}' AS local_db (READ_ONLY)")
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        for table in tables:
-            task = progress.add_task(f"  Copying {table}...", total=None)
-
-            # Drop table if exists (for re-runs)
-            md_conn.execute(f"DROP TABLE IF EXISTS {table}")
-
-            # Copy table from local to MotherDuck
-            md_conn.execute(f"CREATE TABLE {table} AS SELECT * FROM local_db.{table}")
-
-            # Get row count
-            count = md_conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
-            progress.update(task, description=f"  [green]✓[/green] {table} ({count:,} rows)")
-            progress.remove_task(task)
-            console.print(f"  [green]✓[/green] {table} ({count:,} rows)")
-
-    # Detach local database
-    md_conn.execute("DETACH local_db")
-    md_conn.close()
-
+    # Only changed tables are uploaded; all of them are swapped in at once
+    try:
+        result = sync_database(
+            local_path,
+            md_conn,
+            on_table=lambda table, rows: console.print(
+                f"  [green]✓[/green] {table} ({rows:,} rows)"
+            ),
+        )
+    finally:
+        md_conn.close()
+
+    console.print(
+        f"  {len(result.uploaded)} tables uploaded, {len(result.unchanged)} unchanged"
+        + (f", {len(result.removed)} removed" if result.removed else "")
+    )
     console.print(f"[bold green]✓ {state} uploaded to md:{md_db_name}[/bold green]")
     return md_db_name
 
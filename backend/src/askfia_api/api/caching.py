@@ -0,0 +1,79 @@
+"""HTTP caching for query endpoints.
+
+A query result is fully determined by its normalized spec and the data
+it was computed from (FIAService.data_version), so both make an ETag
+that is known before the query runs:
+
+- A request whose If-None-Match matches gets a 304 without running the
+  estimator.
+- Each query has a canonical GET URL (parameters sorted, defaults
+  omitted), so browsers and CDNs cache one copy per query.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+from urllib.parse import urlencode
+
+from pydantic import BaseModel
+
+from ..config import settings
+
+
+def spec_digest(query_type: str, query: BaseModel, data_version: str) -> str:
+    """Hex digest of a query spec and the data version it runs against."""
+    payload = json.dumps(
+        [query_type, query.model_dump(), data_version], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def make_etag(digest: str, format: str, limit: int | None) -> str:
+    """Strong ETag for one representation (format, page size) of a result."""
+    representation = hashlib.sha256(f"{digest}:{format}:{limit}".encode())
+    return f'"{representation.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """Validator and freshness headers for a query response.
+
+    With authentication enabled responses are private to the browser;
+    otherwise shared caches (CDNs) may store them too.
+    """
+    scope = "private" if settings.auth_enabled else "public"
+    return {
+        "ETag": etag,
+        "Cache-Control": f"{scope}, max-age={settings.query_cache_max_age}",
+        "Vary": "Accept",
+    }
+
+
+def canonical_query_string(query: BaseModel, **extra: Any) -> str:
+    """The canonical query string of a query's GET URL.
+
+    Parameters are sorted and those left at their defaults omitted; lists
+    (states) are comma-separated and booleans lowercase.
+    """
+    params = query.model_dump(exclude_defaults=True)
+    params.update({name: value for name, value in extra.items() if value is not None})
+    items = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, list):
+            value = ",".join(str(v) for v in value)
+        elif isinstance(value, bool):
+            value = str(value).lower()
+        items.append((name, str(value)))
+    return urlencode(items, safe=",")
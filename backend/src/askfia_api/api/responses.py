@@ -0,0 +1,208 @@
+"""Response formats for query endpoints.
+
+Query endpoints answer in JSON by default. Programmatic clients pulling
+large breakdowns (e.g. volume by species across many states) can ask for
+a format that avoids building and parsing a large JSON document, either
+with ``?format=`` or an Accept header:
+
+- ``arrow`` (application/vnd.apache.arrow.stream): Arrow IPC stream
+- ``parquet`` (application/vnd.apache.parquet): Parquet file
+- ``ndjson`` (application/x-ndjson): one JSON object per line, streamed
+
+Arrow and Parquet bodies hold the breakdown rows as the table, with the
+rest of the response (totals, SE, states) as JSON in the schema metadata
+under ``askfia``. NDJSON bodies start with that summary line, then one
+line per row.
+
+JSON responses can be paginated with ``?limit=``: the full breakdown is
+kept in the result store and later pages are read back from it by
+cursor, without re-running the query.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import secrets
+from collections.abc import Iterator
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+
+from ..services.query_types import QueryType
+from ..services.result_store import ResultStore
+
+JSON = "json"
+ARROW = "arrow"
+PARQUET = "parquet"
+NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    ARROW: "application/vnd.apache.arrow.stream",
+    PARQUET: "application/vnd.apache.parquet",
+    NDJSON: "application/x-ndjson",
+}
+
+# Schema metadata key holding the response summary in Arrow/Parquet bodies
+SUMMARY_KEY = b"askfia"
+
+# Rows per NDJSON chunk
+STREAM_BATCH_ROWS = 1000
+
+_CURSOR = re.compile(r"^([0-9a-f]{64})\.(\d+)\.(\d+)$")
+
+
+def negotiate(format: str | None, accept: str | None) -> str:
+    """Pick a response format from ?format= or, failing that, Accept.
+
+    Raises:
+        HTTPException: 406 for an unknown ?format= value.
+    """
+    if format:
+        format = format.lower()
+        if format not in MEDIA_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail=f"Unknown format '{format}'; use {', '.join(MEDIA_TYPES)}",
+            )
+        return format
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        for name, candidate in MEDIA_TYPES.items():
+            if media_type == candidate:
+                return name
+    return JSON
+
+
+def split_result(
+    query_type: QueryType, result: dict[str, Any]
+) -> tuple[dict[str, Any], pa.Table | None]:
+    """Split a tabular query result into its response summary and table."""
+    field = query_type.table_field
+    rows = result.get(field)
+    summary = query_type.response(**{**result, field: []}).model_dump(exclude={field})
+    if rows is None:
+        return summary, None
+    if not isinstance(rows, pa.Table):
+        rows = pa.Table.from_pylist(rows)
+    return summary, rows
+
+
+def _with_summary(table: pa.Table | None, summary: dict[str, Any]) -> pa.Table:
+    if table is None:
+        table = pa.table({})
+    metadata = dict(table.schema.metadata or {})
+    metadata[SUMMARY_KEY] = json.dumps(summary, default=str).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def _ndjson_lines(summary: dict[str, Any], table: pa.Table | None) -> Iterator[bytes]:
+    yield (json.dumps(summary, default=str) + "\n").encode()
+    if table is None:
+        return
+    for batch in table.to_batches(max_chunksize=STREAM_BATCH_ROWS):
+        yield "".join(
+            json.dumps(row, default=str) + "\n" for row in batch.to_pylist()
+        ).encode()
+
+
+def tabular_response(
+    format: str, summary: dict[str, Any], table: pa.Table | None
+) -> Response:
+    """An Arrow, Parquet or NDJSON response for a query result."""
+    media_type = MEDIA_TYPES[format]
+    if format == NDJSON:
+        return StreamingResponse(_ndjson_lines(summary, table), media_type=media_type)
+
+    table = _with_summary(table, summary)
+    sink = pa.BufferOutputStream()
+    if format == ARROW:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, sink)
+    return Response(content=sink.getvalue().to_pybytes(), media_type=media_type)
+
+
+def make_cursor(key: str, offset: int, limit: int) -> str:
+    return f"{key}.{offset}.{limit}"
+
+
+def parse_cursor(cursor: str) -> tuple[str, int, int]:
+    """Split a cursor into its result key, offset and page size.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor.
+    """
+    match = _CURSOR.match(cursor)
+    if match is None or int(match.group(3)) < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def first_page(
+    summary: dict[str, Any],
+    field: str,
+    table: pa.Table | None,
+    limit: int,
+    store: ResultStore,
+    key: str | None = None,
+) -> dict[str, Any]:
+    """A JSON result holding the first ``limit`` rows of its breakdown.
+
+    The full table is kept in the result store and the response carries a
+    cursor to the next page. With the store disabled, all rows are
+    returned and there is no cursor.
+
+    Args:
+        key: Result store key (64 hex digits) for the table; random if
+             None. A key derived from the query and its data version gives
+             repeat queries the same cursors.
+    """
+    if table is None:
+        return {**summary, field: None}
+    if table.num_rows <= limit or not store.enabled:
+        return {**summary, field: table.to_pylist(), "total_rows": table.num_rows}
+
+    key = key or secrets.token_hex(32)
+    store.put(key, table)
+    return {
+        **summary,
+        field: table.slice(0, limit).to_pylist(),
+        "total_rows": table.num_rows,
+        "next_cursor": make_cursor(key, limit, limit),
+    }
+
+
+def read_page(
+    cursor: str, store: ResultStore, limit: int | None = None
+) -> dict[str, Any]:
+    """Rows of a stored breakdown from a cursor.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor, 410 once the stored
+            result has been evicted (re-run the query).
+    """
+    key, offset, page_size = parse_cursor(cursor)
+    page_size = limit or page_size
+    table = store.get(key)
+    if table is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Result expired; run the query again",
+        )
+    end = offset + page_size
+    return {
+        "rows": table.slice(offset, page_size).to_pylist(),
+        "offset": offset,
+        "total_rows": table.num_rows,
+        "next_cursor": (
+            make_cursor(key, end, page_size) if end < table.num_rows else None
+        ),
+    }
@@ -1,112 +1,106 @@
 """Data download endpoints."""
 
-import os
-import uuid
 import logging
-from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import FileResponse
 
 from ...auth import require_auth
 from ...models.schemas import DownloadRequest, DownloadResponse
-from ...config import settings
+from ...services.exports import ExportJob, export_manager
 
 logger = logging.getLogger(__name__)
 
 # All download endpoints require authentication
 router = APIRouter(dependencies=[require_auth])
 
-# In-memory download registry (use Redis in production)
-_downloads: dict[str, dict] = {}
+_MEDIA_TYPES = {
+    ".zip": "application/zip",
+    ".parquet": "application/vnd.apache.parquet",
+    ".csv": "text/csv",
+}
 
 
-@router.post("/prepare", response_model=DownloadResponse)
+def _response(export: ExportJob, deduplicated: bool = False) -> DownloadResponse:
+    return DownloadResponse(
+        download_id=export.id,
+        states=export.states,
+        tables=export.tables,
+        format=export.format,
+        status=export.status,
+        progress=export.progress,
+        size_mb=export.size_bytes / 1e6 if export.size_bytes is not None else None,
+        missing_tables=export.missing_tables,
+        error=export.error,
+        download_url=f"/api/v1/downloads/{export.id}",
+        expires_in_hours=export_manager.store.ttl / 3600,
+        deduplicated=deduplicated,
+    )
+
+
+def _get_export(download_id: str) -> ExportJob:
+    export = export_manager.store.get(download_id)
+    if export is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Download not found or expired",
+        )
+    return export
+
+
+@router.post(
+    "/prepare", response_model=DownloadResponse, status_code=status.HTTP_202_ACCEPTED
+)
 async def prepare_download(request: DownloadRequest):
     """
-    Prepare FIA data for download.
-    
-    This downloads the data using pyFIA and stages it for the user.
+    Start exporting FIA tables for download.
+
+    Copies only the requested tables of the requested states, from the
+    cached state databases, to Parquet, CSV or a DuckDB file. Returns at
+    once; poll /{download_id}/info until the status is "succeeded", then
+    fetch download_url. An identical request joins the running or
+    finished export.
     """
-    from pyfia import download
-    
-    download_id = str(uuid.uuid4())[:8]
-    
     try:
-        # Download data
-        if len(request.states) == 1:
-            db_path = download(request.states[0], dir=settings.data_dir)
-        else:
-            db_path = download(request.states, dir=settings.data_dir)
-        
-        # Get file size
-        file_size_mb = os.path.getsize(db_path) / 1e6
-        
-        # Register download
-        _downloads[download_id] = {
-            "path": db_path,
-            "states": request.states,
-            "tables": request.tables,
-            "format": request.format,
-        }
-        
-        return DownloadResponse(
-            download_id=download_id,
-            states=request.states,
-            tables=request.tables,
-            format=request.format,
-            estimated_size_mb=file_size_mb,
-            download_url=f"/api/v1/downloads/{download_id}",
-            expires_in_hours=24,
+        export, deduplicated = export_manager.submit(
+            request.states, request.tables, request.format
         )
-        
-    except Exception as e:
-        logger.exception("Error preparing download")
-        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _response(export, deduplicated)
 
 
 @router.get("/{download_id}")
 async def get_download(download_id: str):
-    """Download prepared FIA data."""
-    
-    if download_id not in _downloads:
-        raise HTTPException(status_code=404, detail="Download not found or expired")
-    
-    download_info = _downloads[download_id]
-    file_path = download_info["path"]
-    
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Determine filename
-    states = download_info["states"]
-    if len(states) == 1:
-        filename = f"FIA_{states[0]}.duckdb"
-    else:
-        filename = f"FIA_{'_'.join(states)}.duckdb"
-    
+    """Download a finished export.
+
+    Supports HTTP range requests, so interrupted downloads can resume.
+    """
+    export = _get_export(download_id)
+    if not export.finished:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Download {download_id} is {export.status}",
+        )
+    if export.error:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=export.error
+        )
+
+    path = export_manager.store.file_path(export)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+
     return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type="application/octet-stream",
+        path=path,
+        filename=export.filename,
+        media_type=_MEDIA_TYPES.get(path.suffix, "application/octet-stream"),
     )
 
 
-@router.get("/{download_id}/info")
+@router.get("/{download_id}/info", response_model=DownloadResponse)
 async def get_download_info(download_id: str):
-    """Get information about a prepared download."""
-    
-    if download_id not in _downloads:
-        raise HTTPException(status_code=404, detail="Download not found or expired")
-    
-    download_info = _downloads[download_id]
-    file_path = download_info["path"]
-    
-    return {
-        "download_id": download_id,
-        "states": download_info["states"],
-        "tables": download_info["tables"],
-        "format": download_info["format"],
-        "file_size_mb": os.path.getsize(file_path) / 1e6 if os.path.exists(file_path) else 0,
-        "available": os.path.exists(file_path),
-    }
+    """Status and progress of an export."""
+    return _response(_get_export(download_id))
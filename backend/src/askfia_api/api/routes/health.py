@@ -47,9 +47,14 @@ async def readiness_check():
 
     all_ready = all(checks.values())
 
+    # Per-state availability of local databases (preloads run in the background)
+    from ...services.storage import storage
+
     return {
         "status": "ready" if all_ready else "not_ready",
         "checks": checks,
+        "preloading": storage.preloading,
+        "states": storage.readiness(),
     }
 
 
@@ -209,7 +214,14 @@ async def debug_storage():
         )
 
     from ...config import settings
+    from ...services.backend_router import backend_router
+    from ...services.exports import export_manager
+    from ...services.fia_service import fia_service
+    from ...services.jobs import job_manager
+    from ...services.motherduck_catalog import motherduck_catalog
+    from ...services.parquet_lake import parquet_lake
     from ...services.storage import storage
+    from ...services.warmup import cache_warmer
 
     # Test S3 connection (legacy)
     s3_status = "not configured"
@@ -252,6 +264,12 @@ async def debug_storage():
         "motherduck_token_set": bool(settings.motherduck_token),
         "motherduck_status": md_status,
         "motherduck_databases": md_databases,
+        "motherduck_catalog": motherduck_catalog.stats(),
+        "backend_routing": backend_router.stats(),
+        "duckdb_resources": fia_service.resources.stats(),
+        "cache_warmup": cache_warmer.stats(),
+        "query_jobs": job_manager.stats(),
+        "download_exports": export_manager.stats(),
         "s3_bucket": storage.s3_bucket,
         "s3_prefix": storage.s3_prefix,
         "s3_endpoint": settings.s3_endpoint_url,
@@ -262,4 +280,7 @@ async def debug_storage():
         "s3_objects": s3_objects,
         "local_dir": str(storage.local_dir),
         "cached_states": storage.list_cached_states(),
+        "cache": storage.manifest.stats(),
+        "downloads": storage.download_status(),
+        "lake": parquet_lake.stats() if parquet_lake else None,
     }
@@ -0,0 +1,93 @@
+"""Internal endpoints for worker-to-worker traffic.
+
+These endpoints are only active when state-affinity routing is configured
+and are authenticated with the shared STATE_ROUTER_TOKEN rather than user
+sessions.
+"""
+
+import logging
+from typing import Any
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from ...security import validate_domain_expression
+from ...services.fia_service import fia_service
+from ...services.state_router import (
+    ARROW_STREAM_MEDIA_TYPE,
+    DATA_VERSION_HEADER,
+    ESTIMATOR_METHODS,
+    serialize_frame,
+    state_router,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/internal", include_in_schema=False)
+
+
+class EstimateRequest(BaseModel):
+    """Per-state estimator call forwarded by another worker."""
+
+    state: str = Field(..., min_length=2, max_length=2)
+    method: str
+    params: dict[str, Any] = Field(default_factory=dict)
+    approximate: bool = False
+
+
+def _check_token(token: str | None) -> None:
+    if not state_router.enabled:
+        raise HTTPException(status_code=404, detail="State routing is disabled")
+    if not state_router.verify_token(token):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
+
+
+def _validate_params(params: dict[str, Any]) -> None:
+    """Apply the public query schemas' domain checks to forwarded params."""
+    for name, value in params.items():
+        if name.endswith("_domain"):
+            validate_domain_expression(value, name)
+
+
+@router.post("/estimate")
+async def estimate(
+    request: EstimateRequest,
+    x_internal_token: str | None = Header(default=None),
+):
+    """Run an estimator for a state this worker owns and return Arrow IPC.
+
+    The state's data version is returned in the X-Data-Version header.
+    """
+    _check_token(x_internal_token)
+
+    if request.method not in ESTIMATOR_METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown estimator: {request.method}")
+
+    try:
+        _validate_params(request.params)
+        df = await run_in_threadpool(
+            fia_service.estimate_local,
+            request.state,
+            request.method,
+            request.params,
+            request.approximate,
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Forwarded {request.method} for {request.state} failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    version = await run_in_threadpool(fia_service.data_version, [request.state])
+    headers = {DATA_VERSION_HEADER: version} if version else None
+    return Response(
+        content=serialize_frame(df), media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers
+    )
+
+
+@router.get("/routing")
+async def routing(x_internal_token: str | None = Header(default=None)):
+    """Routing table and peer health as seen by this worker."""
+    _check_token(x_internal_token)
+    return state_router.stats()
@@ -0,0 +1,132 @@
+"""Background job endpoints for long-running FIA queries."""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncGenerator
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ...auth import require_auth
+from ...models.schemas import JobRequest, JobResponse
+from ...services.jobs import Job, job_manager
+from ...services.query_types import QUERY_TYPES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(dependencies=[require_auth])
+
+
+def _response(job: Job, deduplicated: bool = False) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        type=job.query_type,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        progress=job.progress,
+        partial=job.partial,
+        result=job.result,
+        error=job.error,
+        deduplicated=deduplicated,
+    )
+
+
+def _get_job(job_id: str) -> Job:
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found or expired: {job_id}",
+        )
+    return job
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: JobRequest):
+    """Run a query in the background and return its job ID at once.
+
+    Submitting the same query as a queued, running or recently finished
+    job returns that job.
+    """
+    try:
+        query = QUERY_TYPES[request.type].request(**request.params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=json.loads(e.json()),
+        )
+    job, deduplicated = job_manager.submit(request.type, query.model_dump())
+    return _response(job, deduplicated)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Job status, with partial results so far and the final result."""
+    return _response(_get_job(job_id))
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """The final result of a finished job (409 while it is still running)."""
+    job = _get_job(job_id)
+    if not job.finished:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} is {job.status}",
+        )
+    if job.error:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=job.error
+        )
+    return job.result
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str):
+    """Stream job progress as server-sent events.
+
+    Events:
+    - status: {status, progress} whenever either changes
+    - partial: {state, result} for each state's result
+    - result / error: the final result or failure; the stream then ends
+    """
+    job = _get_job(job_id)
+
+    async def generate() -> AsyncGenerator[str, None]:
+        sent_partial = 0
+        last = None
+        current: Job | None = job
+        while current is not None:
+            for partial in current.partial[sent_partial:]:
+                yield f"event: partial\ndata: {json.dumps(partial, default=str)}\n\n"
+            sent_partial = len(current.partial)
+
+            state = {"status": current.status, "progress": current.progress}
+            if state != last:
+                yield f"event: status\ndata: {json.dumps(state)}\n\n"
+                last = state
+
+            if current.finished:
+                if current.error:
+                    yield f"event: error\ndata: {json.dumps(current.error)}\n\n"
+                else:
+                    data = json.dumps(current.result, default=str)
+                    yield f"event: result\ndata: {data}\n\n"
+                return
+
+            await asyncio.sleep(job_manager.poll_interval)
+            current = job_manager.store.get(job_id)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
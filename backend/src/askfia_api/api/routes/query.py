@@ -1,11 +1,29 @@
 """Direct query endpoints for FIA data."""
 
-from fastapi import APIRouter, Depends
+import json
+import logging
+from typing import Annotated, Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import RedirectResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from ...auth import require_auth
 from ...models.schemas import (
     AreaQuery,
     AreaResponse,
+    BatchItemResult,
+    BatchQuery,
+    BatchResponse,
     VolumeQuery,
     VolumeResponse,
     BiomassQuery,
@@ -14,83 +32,269 @@ from ...models.schemas import (
     TPAResponse,
     CompareQuery,
     CompareResponse,
+    ResultPage,
 )
+from ...services.batch_query import SharedScope, plan_batch, spec_key
 from ...services.container import get_fia_service
 from ...services.fia_service import FIAService
-from ..exceptions import with_error_handling
+from ...services.query_types import QUERY_TYPES
+from ..caching import (
+    cache_headers,
+    canonical_query_string,
+    etag_matches,
+    make_etag,
+    spec_digest,
+)
+from ..exceptions import FIAServiceError, service_error_to_http, with_error_handling
+from ..responses import (
+    JSON,
+    MEDIA_TYPES,
+    first_page,
+    negotiate,
+    read_page,
+    split_result,
+    tabular_response,
+)
+
+logger = logging.getLogger(__name__)
 
 # All query endpoints require authentication
 router = APIRouter(dependencies=[require_auth])
 
 
-@router.post("/area", response_model=AreaResponse)
+# Response format, pagination and validators, shared by the query endpoints
+Format = Annotated[
+    str | None,
+    Query(description=f"Response format: {', '.join(MEDIA_TYPES)} (overrides Accept)"),
+]
+Limit = Annotated[
+    int | None,
+    Query(ge=1, le=100_000, description="Breakdown rows per page (JSON only)"),
+]
+Accept = Annotated[str | None, Header()]
+IfNoneMatch = Annotated[str | None, Header()]
+
+# Formats other than JSON, for the OpenAPI docs
+_TABULAR_RESPONSES = {
+    200: {"content": {MEDIA_TYPES[f]: {} for f in MEDIA_TYPES if f != JSON}}
+}
+
+
+async def _respond(
+    query_type: str,
+    query: BaseModel,
+    fia_service: FIAService,
+    response: Response,
+    format: str | None,
+    limit: int | None,
+    accept: str | None,
+    if_none_match: str | None,
+):
+    """Run a query and answer in the negotiated format, with an ETag.
+
+    The ETag comes from the query and the data version, so a matching
+    If-None-Match is answered with 304 before anything runs. For states
+    not yet cached (unknown version), the ETag is set after the run.
+    """
+    spec = QUERY_TYPES[query_type]
+    chosen = negotiate(format, accept)
+    if "next_cursor" not in spec.response.model_fields:
+        limit = None
+
+    def headers() -> dict[str, str]:
+        version = fia_service.data_version(query.states)
+        if version is None:
+            return {}
+        digest = spec_digest(query_type, query, version)
+        return cache_headers(make_etag(digest, chosen, limit))
+
+    cached = headers()
+    if cached and etag_matches(if_none_match, cached["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cached)
+
+    if chosen == JSON and limit is None:
+        result = await spec.run(fia_service, query)
+    else:
+        # Keep breakdowns as Arrow tables: no row dicts for columnar bodies,
+        # and one table to store for pagination
+        raw = await spec.execute(fia_service, query, True)
+        summary, table = split_result(spec, raw)
+        if chosen != JSON:
+            result = tabular_response(chosen, summary, table)
+        else:
+            # Repeat queries on the same data get the same cursors
+            version = fia_service.data_version(query.states)
+            key = spec_digest(query_type, query, version) if version else None
+            result = first_page(
+                summary, spec.table_field, table, limit, fia_service.result_store, key
+            )
+
+    target = result if isinstance(result, Response) else response
+    target.headers.update(cached or headers())
+    return result
+
+
+@router.post("/area", response_model=AreaResponse, responses=_TABULAR_RESPONSES)
 @with_error_handling
 async def query_area(
-    query: AreaQuery, fia_service: FIAService = Depends(get_fia_service)
+    query: AreaQuery,
+    response: Response,
+    fia_service: FIAService = Depends(get_fia_service),
+    format: Format = None,
+    limit: Limit = None,
+    accept: Accept = None,
+    if_none_match: IfNoneMatch = None,
 ):
     """Query forest land area for specified states."""
-    result = await fia_service.query_area(
-        states=query.states,
-        land_type=query.land_type,
-        grp_by=query.grp_by,
+    return await _respond(
+        "area", query, fia_service, response, format, limit, accept, if_none_match
     )
-    return AreaResponse(**result)
 
 
-@router.post("/volume", response_model=VolumeResponse)
+@router.post("/volume", response_model=VolumeResponse, responses=_TABULAR_RESPONSES)
 @with_error_handling
 async def query_volume(
-    query: VolumeQuery, fia_service: FIAService = Depends(get_fia_service)
+    query: VolumeQuery,
+    response: Response,
+    fia_service: FIAService = Depends(get_fia_service),
+    format: Format = None,
+    limit: Limit = None,
+    accept: Accept = None,
+    if_none_match: IfNoneMatch = None,
 ):
     """Query timber volume for specified states."""
-    result = await fia_service.query_volume(
-        states=query.states,
-        by_species=query.by_species,
-        tree_domain=query.tree_domain,
+    return await _respond(
+        "volume", query, fia_service, response, format, limit, accept, if_none_match
     )
-    return VolumeResponse(**result)
 
 
-@router.post("/biomass", response_model=BiomassResponse)
+@router.post("/biomass", response_model=BiomassResponse, responses=_TABULAR_RESPONSES)
 @with_error_handling
 async def query_biomass(
-    query: BiomassQuery, fia_service: FIAService = Depends(get_fia_service)
+    query: BiomassQuery,
+    response: Response,
+    fia_service: FIAService = Depends(get_fia_service),
+    format: Format = None,
+    limit: Limit = None,
+    accept: Accept = None,
+    if_none_match: IfNoneMatch = None,
 ):
     """Query biomass and carbon for specified states."""
-    result = await fia_service.query_biomass(
-        states=query.states,
-        land_type=query.land_type,
-        by_species=query.by_species,
+    return await _respond(
+        "biomass", query, fia_service, response, format, limit, accept, if_none_match
     )
-    return BiomassResponse(**result)
 
 
-@router.post("/tpa", response_model=TPAResponse)
+@router.post("/tpa", response_model=TPAResponse, responses=_TABULAR_RESPONSES)
 @with_error_handling
 async def query_tpa(
-    query: TPAQuery, fia_service: FIAService = Depends(get_fia_service)
+    query: TPAQuery,
+    response: Response,
+    fia_service: FIAService = Depends(get_fia_service),
+    format: Format = None,
+    limit: Limit = None,
+    accept: Accept = None,
+    if_none_match: IfNoneMatch = None,
 ):
     """Query trees per acre for specified states."""
-    result = await fia_service.query_tpa(
-        states=query.states,
-        tree_domain=query.tree_domain,
-        by_species=query.by_species,
+    return await _respond(
+        "tpa", query, fia_service, response, format, limit, accept, if_none_match
     )
-    return TPAResponse(**result)
 
 
-@router.post("/compare", response_model=CompareResponse)
+@router.post("/compare", response_model=CompareResponse, responses=_TABULAR_RESPONSES)
 @with_error_handling
 async def compare_states(
-    query: CompareQuery, fia_service: FIAService = Depends(get_fia_service)
+    query: CompareQuery,
+    response: Response,
+    fia_service: FIAService = Depends(get_fia_service),
+    format: Format = None,
+    accept: Accept = None,
+    if_none_match: IfNoneMatch = None,
 ):
     """Compare a metric across multiple states."""
-    result = await fia_service.compare_states(
-        states=query.states,
-        metric=query.metric,
-        land_type=query.land_type,
+    return await _respond(
+        "compare", query, fia_service, response, format, None, accept, if_none_match
+    )
+
+
+@router.get("/pages/{cursor}", response_model=ResultPage)
+async def query_page(
+    cursor: str,
+    fia_service: FIAService = Depends(get_fia_service),
+    limit: Limit = None,
+):
+    """Next page of a breakdown paginated with ?limit=.
+
+    Pages are read from the stored result, so the query is not re-run.
+    Returns 410 once the stored result has been evicted.
+    """
+    return ResultPage(**read_page(cursor, fia_service.result_store, limit))
+
+
+@router.post("/batch", response_model=BatchResponse)
+@with_error_handling
+async def query_batch(
+    batch: BatchQuery, fia_service: FIAService = Depends(get_fia_service)
+):
+    """Run several queries in one request.
+
+    Identical queries run once, queries over the same states share one
+    connection per state, and queries needing the same estimate share it.
+    Each query gets its own result or error, in request order; one failing
+    query does not fail the batch.
+    """
+    outcomes: list[BatchItemResult | None] = [None] * len(batch.queries)
+    specs: list[dict] = []
+    queries: dict[str, BaseModel] = {}
+    spec_items: list[int] = []
+    for i, item in enumerate(batch.queries):
+        try:
+            query = QUERY_TYPES[item.type].request(**item.params)
+        except ValidationError as e:
+            outcomes[i] = BatchItemResult(
+                id=item.id, type=item.type, status_code=422, error=str(e)
+            )
+            continue
+        spec = {"type": item.type, **query.model_dump()}
+        queries[spec_key(spec)] = query
+        specs.append(spec)
+        spec_items.append(i)
+
+    plan = plan_batch(specs)
+    results: list[tuple[int, dict | None, str | None]] = []
+    with SharedScope() as scope:
+        for index, spec in enumerate(plan.specs):
+            try:
+                query_type = QUERY_TYPES[spec["type"]]
+                response = await query_type.run(fia_service, queries[spec_key(spec)])
+                results.append((200, response.model_dump(), None))
+            except FIAServiceError as e:
+                logger.warning(f"Batch {spec['type']} query failed: {e}")
+                http_error = service_error_to_http(e)
+                results.append((http_error.status_code, None, str(http_error.detail)))
+            except Exception as e:
+                logger.exception(f"Unexpected error in batch {spec['type']} query")
+                results.append((500, None, str(e)))
+            scope.release(plan.release_after.get(index, ()))
+
+    for i, position in zip(spec_items, plan.positions):
+        item = batch.queries[i]
+        status_code, result, error = results[position]
+        outcomes[i] = BatchItemResult(
+            id=item.id,
+            type=item.type,
+            status_code=status_code,
+            result=result,
+            error=error,
+        )
+
+    return BatchResponse(
+        results=outcomes,
+        executed=len(plan.specs),
+        deduplicated=plan.deduplicated,
+        **scope.stats(),
     )
-    return CompareResponse(**result)
 
 
 @router.get("/states")
@@ -188,3 +392,48 @@ async def list_metrics():
             },
         ]
     }
+
+
+@router.get("/{query_type}", responses=_TABULAR_RESPONSES)
+@with_error_handling
+async def query_get(
+    query_type: Literal["area", "volume", "biomass", "tpa", "compare"],
+    request: Request,
+    response: Response,
+    fia_service: FIAService = Depends(get_fia_service),
+    accept: Accept = None,
+    if_none_match: IfNoneMatch = None,
+):
+    """Run a query from its canonical URL, so browsers and CDNs can cache it.
+
+    Takes the POST endpoint's body fields as query parameters, with states
+    comma-separated (e.g. /volume?by_species=true&states=GA,NC), plus
+    format and limit. Other spellings of the same query (unsorted
+    parameters, defaults given, lowercase states) redirect to the
+    canonical URL.
+    """
+    params = dict(request.query_params)
+    format = params.pop("format", None)
+    limit = params.pop("limit", None)
+    if "states" in params:
+        params["states"] = [s for s in params["states"].split(",") if s]
+    try:
+        query = QUERY_TYPES[query_type].request(**params)
+        limit = TypeAdapter(Limit).validate_python(limit)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=json.loads(e.json()),
+        )
+
+    canonical = canonical_query_string(
+        query, format=format.lower() if format else None, limit=limit
+    )
+    if request.url.query != canonical:
+        return RedirectResponse(
+            f"{request.url.path}?{canonical}",
+            status_code=status.HTTP_308_PERMANENT_REDIRECT,
+        )
+    return await _respond(
+        query_type, query, fia_service, response, format, limit, accept, if_none_match
+    )
@@ -53,19 +53,77 @@ class Settings(BaseSettings):
     data_dir: str = "./data"
     downloads_dir: str = "./downloads"
     preload_states: str = ""  # Comma-separated list
+    preload_parallelism: int = 2  # Concurrent background state downloads
 
     # FIA Storage (tiered caching - legacy, kept for migration)
     fia_local_dir: str = "./data/fia"
     fia_local_cache_gb: float = 5.0
+    fia_cache_policy: str = "lru"  # Eviction order: lru or lfu
+    fia_cache_pinned_states: str = ""  # Comma-separated; defaults to preload_states
+    fia_table_storage: bool = False  # Fetch per-table Parquet instead of whole databases
+    fia_version_check_ttl: float = 300.0  # Seconds between published-version checks; 0 = off
+    fia_datamart_fallback: bool = False  # Build states missing from R2 from DataMart CSVs
+    fia_datamart_source: str = ""  # DataMart CSV URL or local archive directory; "" = DataMart
+    fia_lake_dir: str = ""  # National STATECD-partitioned Parquet lake for multi-state queries
+    fia_lake_max_views: int = 64  # Lake view files kept, least recently used deleted
     fia_s3_bucket: str | None = Field(default=None, alias="FIA_S3_BUCKET")
     fia_s3_prefix: str = "fia-duckdb"
     s3_endpoint_url: str | None = None
     s3_access_key: str | None = None
     s3_secret_key: str | None = None
     s3_region: str = "auto"
+    s3_download_chunk_mb: int = 64  # Ranged GET size for parallel downloads
+    s3_download_workers: int = 8
 
     # MotherDuck (serverless DuckDB - primary storage)
     motherduck_token: str | None = Field(default=None, alias="MOTHERDUCK_TOKEN")
+    motherduck_catalog_ttl: float = 300.0  # Seconds a database listing is served as fresh
+    motherduck_catalog_stale_ttl: float = 3600.0  # Served stale while refreshing in background
+    motherduck_catalog_negative_ttl: float = 30.0  # Retry after failures or missing states
+    backend_hedging: bool = True  # Retry slow estimates on the other backend (local/MotherDuck)
+    backend_hedge_percentile: float = 0.95  # Latency quantile after which to hedge
+    backend_hedge_min_samples: int = 20  # Latencies measured before hedging a backend
+
+    # Query caching
+    strat_cache_max_entries: int = 64  # (database, EVALID) pairs; 0 = disabled
+    hot_states: str = ""  # Comma-separated; defaults to preload_states
+    hot_tier_memory_mb: float = 0.0  # Budget for in-memory hot states; 0 = disabled
+    hot_tier_learned_states: int = 0  # Most-queried states added to the hot set
+    result_store_dir: str = "./data/results"  # Shared by all workers on the host
+    result_store_max_gb: float = 2.0  # 0 = disabled
+    approximate_sample_fraction: float = 0.2  # Plots kept per stratum in approximate mode
+    warmup_top_n: int = 20  # Popular tool calls replayed to warm caches; 0 = disabled
+    warmup_min_count: int = 2  # Calls a tool call needs in the history to be replayed
+    warmup_history_days: int = 7
+    warmup_time_budget: float = 300.0  # Seconds per warm-up run
+    query_cache_max_age: int = 60  # Seconds clients/CDNs reuse a query response
+
+    # DuckDB resources per workload (interactive queries, batch scans, builds)
+    duckdb_total_threads: int = 0  # Shared by concurrent queries; 0 = CPU count
+    duckdb_interactive_threads: int = 2
+    duckdb_interactive_memory_limit: str = "2GB"
+    duckdb_batch_threads: int = 0  # 0 = free threads, less an interactive share
+    duckdb_batch_memory_limit: str = "8GB"
+    duckdb_build_threads: int = 0  # 0 = CPU count / parallel builds
+    duckdb_build_memory_limit: str = "4GB"
+    duckdb_temp_dir: str = "./data/duckdb_tmp"  # Spill directory; "" = DuckDB default
+    duckdb_object_cache: bool = True
+
+    # Async query jobs
+    job_store_dir: str = "./data/jobs"  # Shared by all workers on the host
+    job_max_concurrency: int = 2  # Jobs running at once per process
+    job_result_ttl: float = 3600.0  # Seconds finished jobs are kept
+    job_agent_wait: float = 20.0  # Seconds agent job tools wait for a result
+
+    # Download exports (stored under downloads_dir)
+    export_max_concurrency: int = 1  # Exports running at once per process
+    export_ttl_hours: float = 24.0  # Hours finished exports are kept
+
+    # State-affinity routing across API processes (needs peers and a token)
+    state_router_self_url: str | None = None  # URL peers use to reach this process
+    state_router_peers: str = ""  # Comma-separated base URLs of all processes
+    state_router_token: str | None = None  # Shared secret; required for routing
+    state_router_timeout: float = 300.0
 
     # User management (MotherDuck-backed in production, local file for dev)
     user_db_path: str = Field(
@@ -96,6 +154,24 @@ class Settings(BaseSettings):
             return []
         return [state.strip().upper() for state in self.preload_states.split(",")]
 
+    @property
+    def state_router_peers_list(self) -> list[str]:
+        if not self.state_router_peers:
+            return []
+        return [peer.strip() for peer in self.state_router_peers.split(",") if peer.strip()]
+
+    @property
+    def fia_cache_pinned_states_list(self) -> list[str]:
+        if not self.fia_cache_pinned_states:
+            return self.preload_states_list
+        return [state.strip().upper() for state in self.fia_cache_pinned_states.split(",")]
+
+    @property
+    def hot_states_list(self) -> list[str]:
+        if not self.hot_states:
+            return self.preload_states_list
+        return [state.strip().upper() for state in self.hot_states.split(",")]
+
 
 def get_settings() -> Settings:
     """Get settings instance."""
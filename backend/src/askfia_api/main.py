@@ -1,5 +1,6 @@
 """FastAPI application for pyFIA agent."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -7,7 +8,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .api.routes import auth, chat, query, downloads, health, usage
+from .api.routes import auth, chat, query, downloads, health, internal, jobs, usage
 from .services.rate_limiter import RateLimitMiddleware
 
 # Configure logging
@@ -24,17 +25,62 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting pyFIA API...")
 
-    # Pre-download common states for faster queries using tiered storage
+    background: list[asyncio.Task] = []
+
+    # Pre-download common states in the background; queries for a state
+    # still downloading wait on its in-flight fetch
+    preload = None
     if settings.preload_states_list:
         logger.info(f"Preloading states: {settings.preload_states_list}")
         from .services.storage import storage
-        storage.preload(settings.preload_states_list)
+        preload = storage.start_preload(
+            settings.preload_states_list, settings.preload_parallelism
+        )
+        background.append(preload)
+
+    # Load hot states into memory once their files are available
+    if settings.hot_tier_memory_mb > 0 and settings.hot_states_list:
+        from .services.fia_service import fia_service
+
+        async def warm_hot_tier():
+            if preload is not None:
+                await preload
+            loaded = await asyncio.to_thread(fia_service.warm_hot_tier)
+            logger.info(f"Hot tier loaded: {loaded}")
+
+        background.append(asyncio.create_task(warm_hot_tier()))
+
+    # Replay popular historical queries to warm the result caches; also
+    # re-run for a state whenever a new evaluation of it replaces its file
+    if settings.warmup_top_n > 0:
+        from .services.warmup import cache_warmer
+
+        loading = list(background)
+
+        async def warm_caches():
+            # After preloading, so replays do not download states on demand
+            await asyncio.gather(*loading, return_exceptions=True)
+            cache_warmer.trigger("startup")
+
+        background.append(asyncio.create_task(warm_caches()))
+
+    # Resume query jobs interrupted by a restart
+    from .services.jobs import job_manager
+
+    job_manager.recover()
+
+    # Resume download exports interrupted by a restart
+    from .services.exports import export_manager
+
+    export_manager.recover()
 
     logger.info("pyFIA API ready!")
     yield
 
     # Shutdown
     logger.info("Shutting down pyFIA API...")
+    for task in background:
+        task.cancel()
 
 
 app = FastAPI(
@@ -68,8 +114,10 @@ app.include_router(health.router, tags=["Health"])
 app.include_router(auth.router, prefix="/api/v1", tags=["Authentication"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
 app.include_router(query.router, prefix="/api/v1/query", tags=["Query"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
 app.include_router(downloads.router, prefix="/api/v1/downloads", tags=["Downloads"])
 app.include_router(usage.router, prefix="/api/v1", tags=["Usage"])
+app.include_router(internal.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -1,7 +1,7 @@
 """Pydantic schemas for API requests and responses."""
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Literal
+from typing import Annotated, Literal
 
 # Import validation functions from centralized security module
 from ..security import validate_domain_expression, validate_state_codes, VALID_STATE_CODES
@@ -9,6 +9,12 @@ from ..security import validate_domain_expression, validate_state_codes, VALID_S
 # Import base classes for schema inheritance
 from .base import DomainValidatedModel, StateValidatedModel
 
+# Opt-in subsampled estimation, shared by the estimator query models
+Approximate = Annotated[
+    bool,
+    Field(description="Estimate from a stratified subsample of plots (faster, larger SE)"),
+]
+
 
 # ============================================================================
 # Chat Models
@@ -47,6 +53,7 @@ class AreaQuery(StateValidatedModel):
         default=None,
         description="Condition-level filter expression (e.g., 'FORTYPCD == 141')",
     )
+    approximate: Approximate = False
 
     @field_validator("cond_domain", mode="before")
     @classmethod
@@ -59,6 +66,7 @@ class VolumeQuery(DomainValidatedModel):
     """Request for timber volume query."""
 
     by_species: bool = Field(default=False, description="Group results by species")
+    approximate: Approximate = False
 
 
 class BiomassQuery(StateValidatedModel):
@@ -68,6 +76,7 @@ class BiomassQuery(StateValidatedModel):
         default="forest", description="Land classification"
     )
     by_species: bool = Field(default=False, description="Group by species")
+    approximate: Approximate = False
 
 
 class TPAQuery(StateValidatedModel):
@@ -77,6 +86,7 @@ class TPAQuery(StateValidatedModel):
         default="STATUSCD == 1", description="Tree filter (1=live, 2=dead)"
     )
     by_species: bool = Field(default=False, description="Group by species")
+    approximate: Approximate = False
 
     @field_validator("tree_domain", mode="before")
     @classmethod
@@ -102,6 +112,33 @@ class CompareQuery(StateValidatedModel):
     )
 
 
+class BatchQueryItem(BaseModel):
+    """One query in a batch; params are those of the query type's endpoint."""
+
+    id: str | None = Field(
+        default=None, description="Client label echoed back with the result"
+    )
+    type: Literal["area", "volume", "biomass", "tpa", "compare"] = Field(
+        ..., description="Query type (the /api/v1/query endpoint it mirrors)"
+    )
+    params: dict = Field(default_factory=dict, description="Query parameters")
+
+
+class BatchQuery(BaseModel):
+    """Request for several queries executed together."""
+
+    queries: list[BatchQueryItem] = Field(..., min_length=1, max_length=50)
+
+
+class JobRequest(BaseModel):
+    """Request to run a query as a background job."""
+
+    type: Literal["area", "volume", "biomass", "tpa", "compare"] = Field(
+        ..., description="Query type (the /api/v1/query endpoint it mirrors)"
+    )
+    params: dict = Field(default_factory=dict, description="Query parameters")
+
+
 # ============================================================================
 # Response Models
 # ============================================================================
@@ -111,7 +148,11 @@ class QueryResponse(BaseModel):
     """Generic query response."""
 
     states: list[str]
+    approximate: bool = False
+    sample_fraction: float | None = None
     source: str = "USDA Forest Service FIA (pyFIA validated)"
+    total_rows: int | None = None  # Breakdown rows, when paginated with ?limit=
+    next_cursor: str | None = None  # Cursor to the breakdown's next page
 
 
 class AreaResponse(QueryResponse):
@@ -168,6 +209,52 @@ class CompareResponse(BaseModel):
     source: str = "USDA Forest Service FIA (pyFIA validated)"
 
 
+class ResultPage(BaseModel):
+    """A page of a paginated breakdown."""
+
+    rows: list[dict]
+    offset: int
+    total_rows: int
+    next_cursor: str | None = None
+
+
+class BatchItemResult(BaseModel):
+    """Result or error of one query in a batch."""
+
+    id: str | None = None
+    type: str
+    status_code: int = 200
+    result: dict | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    """Response for a batch of queries, in request order."""
+
+    results: list[BatchItemResult]
+    executed: int  # Distinct queries run
+    deduplicated: int  # Queries answered by an identical one
+    connections_opened: int
+    connections_reused: int
+    estimates_shared: int
+
+
+class JobResponse(BaseModel):
+    """Status of a background query job."""
+
+    id: str
+    type: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    progress: dict[str, int]
+    partial: list[dict] = []  # Per-state results published so far
+    result: dict | None = None
+    error: str | None = None
+    deduplicated: bool = False  # Submission joined an identical job
+
+
 # ============================================================================
 # Download Models
 # ============================================================================
@@ -185,12 +272,17 @@ class DownloadRequest(StateValidatedModel):
 
 
 class DownloadResponse(BaseModel):
-    """Response with download information."""
+    """Status of a download export; poll until it has succeeded."""
 
     download_id: str
     states: list[str]
     tables: list[str]
     format: str
-    estimated_size_mb: float
+    status: Literal["queued", "running", "succeeded", "failed"]
+    progress: dict[str, int]  # Tables exported and total
+    size_mb: float | None = None  # Size of the finished download
+    missing_tables: list[str] = []  # "STATE.TABLE" entries not in the data
+    error: str | None = None
     download_url: str
-    expires_in_hours: int = 24
+    expires_in_hours: float
+    deduplicated: bool = False  # Request joined an identical export
@@ -1,8 +1,10 @@
 """LangChain agent for FIA queries."""
 
+import json
 import logging
 import time
 from collections.abc import AsyncGenerator
+from typing import Annotated, Literal
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -14,7 +16,10 @@ from ..security import validate_domain_expression
 from .fia_service import fia_service
 from .forest_types import get_forest_type_name
 from .gridfia_service import GRIDFIA_AVAILABLE
+from .jobs import job_manager
+from .query_types import QUERY_TYPES
 from .usage_tracker import usage_tracker
+from .warmup import normalize_tool_call
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +53,30 @@ STAND_SIZE_CLASSES = {
 }
 
 
+def _approximation_note(result: dict) -> str:
+    """Flag approximate estimates in tool output."""
+    if not result.get("approximate"):
+        return ""
+    fraction = result.get("sample_fraction") or 0
+    return (
+        f"Approximate: estimated from a {fraction:.0%} stratified plot subsample "
+        "(SE reflects the smaller sample)\n"
+    )
+
+
+# Tool argument for subsampled estimation, worded for the model choosing it
+ApproximateArg = Annotated[
+    bool,
+    Field(
+        description=(
+            "Set True for rough, exploratory questions ('roughly', 'about', 'ballpark'). "
+            "Uses a stratified subsample of plots: much faster, larger SE. "
+            "Leave False when the user needs official or precise numbers."
+        ),
+    ),
+]
+
+
 class ForestAreaInput(BaseModel):
     """Input for forest area query."""
 
@@ -74,6 +103,7 @@ class ForestAreaInput(BaseModel):
             "Combine with grp_by to get filtered breakdowns like 'loblolly pine area by ownership'."
         ),
     )
+    approximate: ApproximateArg = False
 
     @field_validator("cond_domain")
     @classmethod
@@ -87,6 +117,7 @@ async def query_forest_area(
     land_type: str = "forest",
     grp_by: list[str] | str | None = None,
     cond_domain: str | None = None,
+    approximate: bool = False,
 ) -> str:
     """
     Query forest land area from FIA database.
@@ -100,7 +131,9 @@ async def query_forest_area(
     - Crosstabulated results (use grp_by=['OWNGRPCD', 'FORTYPCD'] for area by ownership AND forest type)
     - Filtered breakdowns (use cond_domain='FORTYPCD == 141' with grp_by='OWNGRPCD' for loblolly pine by ownership)
     """
-    result = await fia_service.query_area(states, land_type, grp_by, cond_domain)
+    result = await fia_service.query_area(
+        states, land_type, grp_by, cond_domain, approximate=approximate
+    )
 
     response = f"**Forest Area ({land_type})**\n"
     response += f"States: {', '.join(states)}\n"
@@ -108,6 +141,7 @@ async def query_forest_area(
         response += f"Filter: {cond_domain}\n"
     response += f"Total: {result['total_area_acres']:,.0f} acres\n"
     response += f"SE: {result['se_percent']:.1f}%\n"
+    response += _approximation_note(result)
 
     if result.get("breakdown") and grp_by:
         # Normalize grp_by to list for consistent handling
@@ -153,6 +187,7 @@ class TimberVolumeInput(BaseModel):
     tree_domain: str | None = Field(
         default=None, description="Filter (e.g., 'DIA >= 10.0')"
     )
+    approximate: ApproximateArg = False
 
     @field_validator("tree_domain")
     @classmethod
@@ -162,7 +197,10 @@ class TimberVolumeInput(BaseModel):
 
 @tool(args_schema=TimberVolumeInput)
 async def query_timber_volume(
-    states: list[str], by_species: bool = False, tree_domain: str | None = None
+    states: list[str],
+    by_species: bool = False,
+    tree_domain: str | None = None,
+    approximate: bool = False,
 ) -> str:
     """
     Query timber volume from FIA database.
@@ -172,13 +210,16 @@ async def query_timber_volume(
     - Volume by species
     - Sawtimber volume (use tree_domain='DIA >= 10.0')
     """
-    result = await fia_service.query_volume(states, by_species, tree_domain)
+    result = await fia_service.query_volume(
+        states, by_species, tree_domain, approximate=approximate
+    )
 
     response = "**Timber Volume**\n"
     response += f"States: {', '.join(states)}\n"
     response += f"Total: {result['total_volume_cuft']:,.0f} cubic feet\n"
     response += f"  ({result['total_volume_billion_cuft']:.2f} billion cu ft)\n"
     response += f"SE: {result['se_percent']:.1f}%\n"
+    response += _approximation_note(result)
 
     if result.get("by_species"):
         response += "\nTop species:\n"
@@ -199,11 +240,15 @@ class BiomassInput(BaseModel):
     states: list[str] = Field(description="Two-letter state codes")
     land_type: str = Field(default="forest", description="forest or timber")
     by_species: bool = Field(default=False, description="Group by species")
+    approximate: ApproximateArg = False
 
 
 @tool(args_schema=BiomassInput)
 async def query_biomass_carbon(
-    states: list[str], land_type: str = "forest", by_species: bool = False
+    states: list[str],
+    land_type: str = "forest",
+    by_species: bool = False,
+    approximate: bool = False,
 ) -> str:
     """
     Query biomass and carbon stocks from FIA database.
@@ -213,13 +258,16 @@ async def query_biomass_carbon(
     - Biomass by state or region
     - Carbon sequestration
     """
-    result = await fia_service.query_biomass(states, land_type, by_species)
+    result = await fia_service.query_biomass(
+        states, land_type, by_species, approximate=approximate
+    )
 
     response = f"**Biomass & Carbon ({land_type})**\n"
     response += f"States: {', '.join(states)}\n"
     response += f"Biomass: {result['total_biomass_tons']:,.0f} short tons\n"
     response += f"Carbon: {result['carbon_mmt']:.2f} million metric tons\n"
     response += f"SE: {result['se_percent']:.1f}%\n"
+    response += _approximation_note(result)
 
     if result.get("by_species"):
         response += "\nTop species:\n"
@@ -517,6 +565,7 @@ class TPAInput(BaseModel):
     tree_type: str = Field(
         default="live", description="live, dead, gs (growing stock), or all"
     )
+    approximate: ApproximateArg = False
 
     @field_validator("tree_domain")
     @classmethod
@@ -559,6 +608,7 @@ async def query_tpa(
     tree_domain: str | None = None,
     land_type: str = "forest",
     tree_type: str = "live",
+    approximate: bool = False,
 ) -> str:
     """
     Query trees per acre (TPA) and basal area from FIA database.
@@ -578,12 +628,14 @@ async def query_tpa(
         tree_domain,
         land_type,
         tree_type,
+        approximate=approximate,
     )
 
     response = f"**Trees Per Acre ({land_type}, {tree_type} trees)**\n"
     response += f"States: {', '.join(states)}\n"
     response += f"Total TPA: {result['total_tpa']:.1f} trees/acre\n"
     response += f"SE: {result['se_percent']:.1f}%\n"
+    response += _approximation_note(result)
 
     if tree_domain:
         response += f"Tree filter: {tree_domain}\n"
@@ -1253,6 +1305,94 @@ async def lookup_forest_type(
     return "Please provide fortypcd (code), name (search term), or list_all=True."
 
 
+class QueryJobInput(BaseModel):
+    """Input for running an expensive query as a background job."""
+
+    query_type: Literal["area", "volume", "biomass", "tpa", "compare"] = Field(
+        description="Query to run: area, volume, biomass, tpa, or compare"
+    )
+    states: list[str] = Field(description="Two-letter state codes (e.g., ['NC', 'GA'])")
+    by_species: bool = Field(
+        default=False, description="Break down volume, biomass or TPA by species"
+    )
+    land_type: str = Field(default="forest", description="forest or timber")
+    metric: str = Field(
+        default="area", description="Metric to compare (compare queries only)"
+    )
+
+
+class QueryJobStatusInput(BaseModel):
+    """Input for checking a background query job."""
+
+    job_id: str = Field(description="Job ID returned by run_query_job")
+
+
+def _format_job(job) -> str:
+    """Summarize a query job for the agent."""
+    if job is None:
+        return "Job not found (it may have expired). Run the query again."
+    if job.status == "failed":
+        return f"Job {job.id} failed: {job.error}"
+    if job.status != "succeeded":
+        done, total = job.progress["done"], job.progress["total"]
+        return (
+            f"Job {job.id} is {job.status} ({done}/{total} states done). "
+            f"Tell the user it is still running, and call check_query_job "
+            f"with job_id='{job.id}' to get the result."
+        )
+
+    result = dict(job.result or {})
+    response = f"**{job.query_type.title()} result** (job {job.id})\n"
+    for key, value in result.items():
+        if isinstance(value, list):
+            response += f"{key}: {len(value)} rows"
+            if value:
+                response += f", first rows: {json.dumps(value[:15], default=str)}"
+            response += "\n"
+        elif value is not None:
+            response += f"{key}: {value}\n"
+    return response
+
+
+@tool(args_schema=QueryJobInput)
+async def run_query_job(
+    query_type: str,
+    states: list[str],
+    by_species: bool = False,
+    land_type: str = "forest",
+    metric: str = "area",
+) -> str:
+    """
+    Run an expensive query as a background job.
+
+    Use instead of the direct query tools for queries over many states
+    (10 or more) or by-species breakdowns across several states, which can
+    take minutes. Returns the result if the job finishes within a short
+    wait; otherwise returns a job ID to check later with check_query_job.
+    """
+    params: dict = {"states": states}
+    if query_type in ("area", "biomass", "compare"):
+        params["land_type"] = land_type
+    if query_type in ("volume", "biomass", "tpa"):
+        params["by_species"] = by_species
+    if query_type == "compare":
+        params["metric"] = metric
+
+    query = QUERY_TYPES[query_type].request(**params)
+    job, _ = job_manager.submit(query_type, query.model_dump())
+    return _format_job(await job_manager.wait(job.id, settings.job_agent_wait))
+
+
+@tool(args_schema=QueryJobStatusInput)
+async def check_query_job(job_id: str) -> str:
+    """
+    Check a background query job started with run_query_job.
+
+    Returns the result once the job has finished, or its progress.
+    """
+    return _format_job(await job_manager.wait(job_id, settings.job_agent_wait))
+
+
 # All available tools - PyFIA core tools
 PYFIA_TOOLS = [
     query_forest_area,
@@ -1270,6 +1410,8 @@ PYFIA_TOOLS = [
     query_by_county,
     lookup_species,
     lookup_forest_type,
+    run_query_job,
+    check_query_job,
 ]
 
 # Combine PyFIA and GridFIA tools (GridFIA tools only included if available)
@@ -1305,6 +1447,15 @@ You can query validated forest inventory data including:
 
 5. **Be helpful**: Suggest related queries that might interest the user.
 
+6. **Approximate Mode**: For rough or exploratory questions ("roughly", "about how much"),
+   pass approximate=True to the area, volume, biomass, and TPA tools. Results come from a
+   stratified plot subsample and return faster with a larger SE. Say the estimate is
+   approximate when reporting it, and use exact mode for anything the user will cite.
+
+7. **Long Queries**: For queries over many states (10 or more) or by-species breakdowns
+   across several states, use run_query_job. If it returns a job ID instead of a result,
+   tell the user the query is still running and use check_query_job when they follow up.
+
 ## Crosstabulation Support
 
 You can break down results by multiple dimensions simultaneously using the grp_by parameter
@@ -1425,6 +1576,7 @@ class FIAAgent:
         total_output_tokens = 0
         tool_calls_count = 0
         query_type = None
+        tool_specs: list[dict] = []
 
         # Convert to LangChain message format
         lc_messages = [SystemMessage(content=SYSTEM_PROMPT)]
@@ -1489,6 +1641,7 @@ class FIAAgent:
                 # Track query type from first tool call
                 if query_type is None:
                     query_type = tool_call["name"]
+                tool_specs.append(normalize_tool_call(tool_call["name"], tool_call["args"]))
 
                 yield {
                     "type": "tool_call",
@@ -1552,6 +1705,7 @@ class FIAAgent:
                 tool_calls=tool_calls_count,
                 latency_ms=latency_ms,
                 query_type=query_type,
+                tool_specs=tool_specs,
             )
         except Exception as e:
             logger.warning(f"Failed to record usage: {e}")
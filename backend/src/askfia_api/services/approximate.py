@@ -0,0 +1,179 @@
+"""Stratified plot subsampling for fast approximate estimates.
+
+Exploratory questions ("roughly how much forest does Texas have") do not
+need every plot. Approximate mode keeps a fixed fraction of the phase 2
+plots in every stratum and rewrites the population tables of a clipped
+pyFIA connection so the usual design-based estimators run on the subsample:
+
+- POP_PLOT_STRATUM_ASSGN keeps only the sampled plots, and pyFIA's EVALID
+  plot list is narrowed so COND/TREE reads skip the other plots.
+- POP_STRATUM.EXPNS is scaled by n_h / m_h (plots in stratum / plots kept)
+  so totals stay unbiased, and P2POINTCNT is set to m_h.
+
+pyFIA's post-stratified variance is computed from the plots actually
+present, so the reported SE grows with the smaller sample (roughly by
+1 / sqrt(fraction)) without further adjustment. The sample is a
+deterministic hash of PLT_CN, so repeated approximate queries agree and
+can be cached.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+# Fewer than two plots per stratum leaves the stratum variance undefined
+MIN_PLOTS_PER_STRATUM = 2
+
+# Fixed seed so every worker draws the same sample
+SAMPLE_SEED = 20240101
+
+
+@dataclass
+class SubsampleInfo:
+    """Summary of the subsample applied to a connection.
+
+    Attributes:
+        fraction: Requested fraction of plots per stratum
+        plots_sampled: Plots kept across all strata
+        plots_total: Plots in the full evaluation
+    """
+
+    fraction: float
+    plots_sampled: int
+    plots_total: int
+
+
+def _population_table(db: Any, table_name: str) -> pl.DataFrame:
+    """Get a population table for the connection's EVALIDs."""
+    if table_name in db.tables:
+        df = db.tables[table_name]
+        df = df.collect() if isinstance(df, pl.LazyFrame) else df
+    else:
+        evalid_str = ", ".join(str(e) for e in db.evalid)
+        df = db._reader.read_table(
+            table_name, where=f"EVALID IN ({evalid_str})", lazy=False
+        )
+    return df.filter(pl.col("EVALID").is_in(list(db.evalid)))
+
+
+def apply_stratified_subsample(
+    db: Any,
+    fraction: float,
+    min_plots_per_stratum: int = MIN_PLOTS_PER_STRATUM,
+) -> SubsampleInfo | None:
+    """Restrict a clipped connection to a stratified subsample of plots.
+
+    Args:
+        db: pyFIA connection after clip_most_recent().
+        fraction: Fraction of plots to keep in each stratum (0 < fraction < 1).
+        min_plots_per_stratum: Minimum plots kept per stratum.
+
+    Returns:
+        SubsampleInfo, or None if the connection is unclipped or fraction
+        keeps every plot.
+    """
+    if not getattr(db, "evalid", None) or not 0 < fraction < 1:
+        return None
+
+    if getattr(db, "_askfia_full_sample", None) is not None:
+        # Already subsampled
+        return db._askfia_subsample
+
+    ppsa = _population_table(db, "POP_PLOT_STRATUM_ASSGN")
+    stratum = _population_table(db, "POP_STRATUM")
+
+    # Deduplicate first (some states repeat plot-stratum rows)
+    assignments = ppsa.unique(subset=["PLT_CN", "STRATUM_CN"]).select(
+        ["PLT_CN", "STRATUM_CN"]
+    )
+    ranked = assignments.with_columns(
+        pl.col("PLT_CN")
+        .hash(SAMPLE_SEED)
+        .rank("ordinal")
+        .over("STRATUM_CN")
+        .alias("_rank"),
+        pl.len().over("STRATUM_CN").alias("_n_h"),
+    )
+    target = pl.max_horizontal(
+        pl.lit(min_plots_per_stratum),
+        (pl.col("_n_h") * fraction).ceil().cast(pl.Int64),
+    )
+    sampled = ranked.filter(pl.col("_rank") <= target)
+
+    counts = sampled.group_by("STRATUM_CN").agg(
+        pl.len().alias("_m_h"),
+        pl.first("_n_h").alias("_n_h"),
+    )
+
+    new_stratum = (
+        stratum.join(counts, left_on="CN", right_on="STRATUM_CN", how="left")
+        .with_columns(
+            pl.when(pl.col("_m_h").is_not_null())
+            .then(pl.col("EXPNS") * pl.col("_n_h") / pl.col("_m_h"))
+            .otherwise(pl.col("EXPNS"))
+            .alias("EXPNS"),
+            pl.when(pl.col("_m_h").is_not_null())
+            .then(pl.col("_m_h").cast(stratum.schema["P2POINTCNT"]))
+            .otherwise(pl.col("P2POINTCNT"))
+            .alias("P2POINTCNT"),
+        )
+        .drop(["_m_h", "_n_h"])
+    )
+    new_ppsa = ppsa.join(
+        sampled.select(["PLT_CN", "STRATUM_CN"]),
+        on=["PLT_CN", "STRATUM_CN"],
+        how="semi",
+    )
+
+    # Keep the full-sample state so the connection can be restored
+    db._askfia_full_sample = {
+        "tables": {
+            name: db.tables.get(name)
+            for name in ("POP_PLOT_STRATUM_ASSGN", "POP_STRATUM")
+        },
+        "valid_plot_cns": getattr(db, "_valid_plot_cns", None),
+        "loaded": set(db.tables),
+    }
+
+    db.tables["POP_PLOT_STRATUM_ASSGN"] = new_ppsa.lazy()
+    db.tables["POP_STRATUM"] = new_stratum.lazy()
+    plot_cns = sampled["PLT_CN"].unique().to_list()
+    db._valid_plot_cns = plot_cns
+
+    info = SubsampleInfo(
+        fraction=fraction,
+        plots_sampled=len(plot_cns),
+        plots_total=assignments["PLT_CN"].n_unique(),
+    )
+    db._askfia_subsample = info
+    logger.debug(
+        f"Approximate mode: {info.plots_sampled}/{info.plots_total} plots "
+        f"(fraction {fraction})"
+    )
+    return info
+
+
+def restore_full_sample(db: Any) -> None:
+    """Undo apply_stratified_subsample() on a connection."""
+    saved = getattr(db, "_askfia_full_sample", None)
+    if saved is None:
+        return
+
+    # Tables read while subsampled only hold the sampled plots
+    for name in set(db.tables) - saved["loaded"]:
+        del db.tables[name]
+
+    for name, table in saved["tables"].items():
+        if table is None:
+            db.tables.pop(name, None)
+        else:
+            db.tables[name] = table
+    db._valid_plot_cns = saved["valid_plot_cns"]
+    db._askfia_full_sample = None
+    db._askfia_subsample = None
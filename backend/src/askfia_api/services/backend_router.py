@@ -0,0 +1,338 @@
+"""Per-state choice between local DuckDB files and MotherDuck.
+
+With a MotherDuck token set, every query used to go to MotherDuck, even
+for states with an up-to-date file already in the local cache, and local
+storage was only a fallback for states MotherDuck lacked. BackendRouter
+picks the backend for each query:
+
+1. Version parity: only backends holding the newest evaluation of the
+   state are eligible. A local file counts only if it is already cached,
+   so routing never triggers a download MotherDuck could have avoided.
+2. Measured latency and load: eligible backends are ranked by the median
+   of their recent estimate latencies, scaled by the estimates currently
+   running on them. A backend with no measurements yet ranks first so it
+   gets measured.
+3. Hedging: if the first backend has not answered within a percentile
+   (p95 by default) of its recent latencies, the same estimate starts on
+   the next backend and the first answer wins. A backend that fails is
+   also retried on the next one.
+"""
+
+from __future__ import annotations
+
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+LOCAL = "local"
+MOTHERDUCK = "motherduck"
+
+T = TypeVar("T")
+
+
+def evalid_year(evalid: int) -> int | None:
+    """Inventory year of an annual area/volume EVALID.
+
+    EVALIDs are {state code}{2-digit year}{2-digit eval type}. Only type 01
+    (EXPALL) evaluations of the annual inventory count; periodic
+    inventories use year codes 50-99 (1950-1999).
+
+    Returns:
+        The year, or None for other evaluation types and periodic
+        inventories.
+    """
+    evalid = int(evalid)
+    year = (evalid // 100) % 100
+    if evalid % 100 != 1 or year >= 50:
+        return None
+    return 2000 + year
+
+
+def eval_year(evalids: Iterable[int]) -> int | None:
+    """Most recent annual inventory year among EVALIDs (see evalid_year)."""
+    years = [year for year in map(evalid_year, evalids) if year is not None]
+    return max(years, default=None)
+
+
+class LatencyWindow:
+    """Recent latencies of one backend."""
+
+    def __init__(self, size: int):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def median(self) -> float | None:
+        return statistics.median(self._samples) if self._samples else None
+
+    def percentile(self, q: float) -> float | None:
+        """The q-quantile (0-1) of the recent latencies."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BackendRouter:
+    """Ranks backends for a state and hedges slow estimates.
+
+    Example:
+        >>> router = BackendRouter()
+        >>> backends = router.eligible({"local": 2023, "motherduck": 2023})
+        >>> router.run({b: partial(estimate_on, b) for b in backends})
+    """
+
+    def __init__(
+        self,
+        hedging: bool = True,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 8,
+    ):
+        """
+        Args:
+            hedging: Start a second attempt when the first is slow.
+            hedge_percentile: Latency quantile (0-1) after which to hedge.
+            hedge_min_samples: Latencies a backend needs before it is hedged.
+            window: Recent latencies kept per backend.
+            max_workers: Threads running attempts when hedging.
+        """
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._window = window
+        self._latencies: dict[str, LatencyWindow] = {}
+        self._inflight: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @staticmethod
+    def eligible(versions: dict[str, int | None]) -> list[str]:
+        """Backends holding the newest evaluation of a state.
+
+        Args:
+            versions: Eval year per backend in preference order; None if the
+                      backend does not have the state, 0 if its version is
+                      unknown.
+
+        Returns:
+            Eligible backends, in the given order. A backend of unknown
+            version is only eligible if no backend's version is known.
+        """
+        present = {backend: year for backend, year in versions.items() if year is not None}
+        if not present:
+            return []
+        newest = max(present.values())
+        return [backend for backend, year in present.items() if year == newest]
+
+    def _score(self, backend: str) -> float:
+        window = self._latencies.get(backend)
+        median = window.median() if window is not None else None
+        if median is None:
+            return 0.0
+        return median * (1 + self._inflight.get(backend, 0))
+
+    def rank(self, backends: list[str]) -> list[str]:
+        """Backends ordered best first (ties keep the given order)."""
+        with self._lock:
+            return sorted(backends, key=self._score)
+
+    def hedge_delay(self, backend: str) -> float | None:
+        """Seconds to wait on a backend before hedging, or None to not hedge."""
+        with self._lock:
+            window = self._latencies.get(backend)
+            if not self.hedging or window is None or len(window) < self.hedge_min_samples:
+                return None
+            return window.percentile(self.hedge_percentile)
+
+    def _timed(self, backend: str, attempt: Callable[[], T]) -> T:
+        """Run an attempt, tracking load and recording its latency."""
+        with self._lock:
+            self._inflight[backend] = self._inflight.get(backend, 0) + 1
+        started = time.perf_counter()
+        try:
+            result = attempt()
+        except Exception:
+            with self._lock:
+                self._errors[backend] = self._errors.get(backend, 0) + 1
+            raise
+        else:
+            with self._lock:
+                self._latencies.setdefault(backend, LatencyWindow(self._window)).record(
+                    time.perf_counter() - started
+                )
+            return result
+        finally:
+            with self._lock:
+                self._inflight[backend] -= 1
+
+    def run(self, attempts: dict[str, Callable[[], T]]) -> T:
+        """Run an estimate on the best backend, hedging or failing over.
+
+        Args:
+            attempts: A callable per eligible backend; each opens its own
+                      connection so a losing attempt can finish on its own.
+
+        Returns:
+            The first successful attempt's result.
+
+        Raises:
+            The first backend's error if every attempt fails.
+        """
+        order = self.rank(list(attempts))
+        if len(order) == 1:
+            return self._timed(order[0], attempts[order[0]])
+
+        futures: dict[Future, str] = {}
+        errors: dict[str, BaseException] = {}
+
+        def start(backend: str) -> Future:
+            future = self._pool.submit(self._timed, backend, attempts[backend])
+            futures[future] = backend
+            return future
+
+        pending = {start(order[0])}
+        delay = self.hedge_delay(order[0])
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=delay if len(futures) == 1 else None,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                backend = futures[future]
+                if future.exception() is None:
+                    if backend != order[0] and not errors:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                errors[backend] = future.exception()
+                logger.warning(f"Estimate failed on {backend}: {errors[backend]}")
+
+            if len(futures) < len(order) and (errors or not done):
+                with self._lock:
+                    if errors:
+                        self.failovers += 1
+                    else:
+                        self.hedges += 1
+                if not errors:
+                    logger.info(
+                        f"Hedging on {order[len(futures)]} after {delay:.2f}s on {order[0]}"
+                    )
+                pending.add(start(order[len(futures)]))
+
+        raise errors.get(order[0]) or next(iter(errors.values()))
+
+    def stats(self) -> dict:
+        """Latency, load and hedging counters per backend."""
+        with self._lock:
+            backends = {
+                backend: {
+                    "samples": len(window),
+                    "p50_seconds": window.median(),
+                    "hedge_after_seconds": window.percentile(self.hedge_percentile),
+                    "inflight": self._inflight.get(backend, 0),
+                    "errors": self._errors.get(backend, 0),
+                }
+                for backend, window in self._latencies.items()
+            }
+        return {
+            "hedging": self.hedging,
+            "backends": backends,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
+
+
+class HedgedConnection:
+    """Stand-in for a pyFIA connection to a state on several backends.
+
+    Estimator calls go through the router, each attempt on its own
+    connection. Any other attribute opens a connection on the best-ranked
+    backend, kept until the stand-in is closed, so code written against a
+    pyFIA connection works unchanged.
+    """
+
+    def __init__(
+        self,
+        router: BackendRouter,
+        state: str,
+        backends: list[str],
+        estimate_on: Callable[[str, str, dict[str, Any], bool], Any],
+        connect: Callable[[str], Any],
+    ):
+        """
+        Args:
+            router: Router ranking the backends.
+            state: State code.
+            backends: Eligible backends.
+            estimate_on: Runs (backend, method, params, approximate) on a
+                         fresh connection to the backend.
+            connect: Context manager opening a connection to a backend.
+        """
+        self.router = router
+        self.state = state
+        self.backends = backends
+        self._estimate_on = estimate_on
+        self._connect = connect
+        self._stack = ExitStack()
+        self._connection = None
+
+    def estimate(self, method: str, params: dict[str, Any], approximate: bool = False):
+        """Run an estimator on the best backend, hedged on the others."""
+        return self.router.run(
+            {
+                backend: (
+                    lambda backend=backend: self._estimate_on(
+                        backend, method, params, approximate
+                    )
+                )
+                for backend in self.backends
+            }
+        )
+
+    @property
+    def connection(self):
+        """A pyFIA connection on the best-ranked backend, opened on first use."""
+        if self._connection is None:
+            backend = self.router.rank(self.backends)[0]
+            self._connection = self._stack.enter_context(self._connect(backend))
+        return self._connection
+
+    def close(self) -> None:
+        self._stack.close()
+
+    def __getattr__(self, name: str):
+        return getattr(self.connection, name)
+
+
+def get_backend_router() -> BackendRouter:
+    """Get the configured BackendRouter instance."""
+    from ..config import settings
+
+    return BackendRouter(
+        hedging=settings.backend_hedging,
+        hedge_percentile=settings.backend_hedge_percentile,
+        hedge_min_samples=settings.backend_hedge_min_samples,
+    )
+
+
+backend_router = get_backend_router()
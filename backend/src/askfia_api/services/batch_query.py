@@ -0,0 +1,228 @@
+"""Shared execution for batches of queries.
+
+A dashboard asking for area, volume, biomass and TPA of the same states
+used to make four requests, each opening (and clipping, and injecting
+cached tables into) its own connection per state. A batch runs all its
+queries inside one SharedScope:
+
+- identical queries are executed once (``plan_batch``);
+- the remaining queries are ordered so queries over the same states run
+  back to back, and each state's connection is opened once, kept while
+  queries still need it, and closed after the last one;
+- estimator calls are memoized for the scope, so queries that need the
+  same pyFIA pass (e.g. an area query and an area comparison over the
+  same state) share it even with the result store disabled.
+
+FIAService looks the scope up through ``current_scope``, so query methods
+need no batch-specific arguments.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager, ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+current_scope: ContextVar[SharedScope | None] = ContextVar(
+    "batch_shared_scope", default=None
+)
+
+
+def _copy(result: Any) -> Any:
+    """A copy of an estimate, so callers can modify what they get."""
+    if hasattr(result, "clone"):
+        return result.clone()
+    if hasattr(result, "copy"):
+        return result.copy()
+    return result
+
+
+class SharedScope:
+    """Connections and estimates shared by the queries of one batch.
+
+    Example:
+        >>> with SharedScope() as scope:
+        ...     await fia_service.query_area(["NC"])
+        ...     await fia_service.query_volume(["NC"])  # Reuses NC's connection
+        ...     scope.release(["NC"])
+    """
+
+    def __init__(self, use_lake: bool = True):
+        """
+        Args:
+            use_lake: Let multi-state queries scan the Parquet lake. Off
+                      when the scope's per-state estimates should be
+                      combined instead.
+        """
+        self.use_lake = use_lake
+        self._connections: dict[tuple, Any] = {}
+        self._stacks: dict[tuple, ExitStack] = {}
+        self._estimates: dict[str, Any] = {}
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.estimates_shared = 0
+
+    def __enter__(self) -> SharedScope:
+        self._token = current_scope.set(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        current_scope.reset(self._token)
+        self.close()
+
+    def connection(
+        self,
+        key: tuple[str, tuple[str, ...]],
+        open_connection: Callable[[], AbstractContextManager],
+    ) -> Any:
+        """The scope's connection for a key, opened on first use.
+
+        Keys are (kind, states), e.g. ("state", ("NC",)) or
+        ("lake", ("NC", "SC")). A connection that fails to open is not
+        kept, so a later query retries it.
+        """
+        if key in self._connections:
+            self.connections_reused += 1
+            return self._connections[key]
+        stack = ExitStack()
+        try:
+            connection = stack.enter_context(open_connection())
+        except BaseException:
+            stack.close()
+            raise
+        self._connections[key] = connection
+        self._stacks[key] = stack
+        self.connections_opened += 1
+        return connection
+
+    def estimate(
+        self,
+        state: str,
+        method: str,
+        approximate: bool,
+        params: dict[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        """An estimate computed once per scope.
+
+        Parameters set to None count as absent, as they do for pyFIA.
+        """
+        key = self._estimate_key(state, method, approximate, params)
+        if key in self._estimates:
+            self.estimates_shared += 1
+            return _copy(self._estimates[key])
+        result = compute()
+        self._estimates[key] = result
+        return _copy(result)
+
+    def shared_estimate(
+        self, state: str, method: str, approximate: bool, params: dict[str, Any]
+    ) -> Any | None:
+        """An estimate the scope already holds, or None (never computes one)."""
+        key = self._estimate_key(state, method, approximate, params)
+        if key not in self._estimates:
+            return None
+        self.estimates_shared += 1
+        return _copy(self._estimates[key])
+
+    @staticmethod
+    def _estimate_key(
+        state: str, method: str, approximate: bool, params: dict[str, Any]
+    ) -> str:
+        return json.dumps(
+            [state, method, approximate, {k: v for k, v in params.items() if v is not None}],
+            sort_keys=True,
+            default=str,
+        )
+
+    def release(self, states: Iterable[str]) -> None:
+        """Close the connections over any of these states."""
+        states = set(states)
+        for key in [k for k in self._stacks if states & set(k[1])]:
+            self._connections.pop(key, None)
+            try:
+                self._stacks.pop(key).close()
+            except Exception as e:
+                logger.warning(f"Failed to close shared connection {key}: {e}")
+
+    def close(self) -> None:
+        self.release({state for key in self._stacks for state in key[1]})
+        self._estimates.clear()
+
+    def stats(self) -> dict:
+        return {
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "estimates_shared": self.estimates_shared,
+        }
+
+
+@dataclass
+class BatchPlan:
+    """Execution order for a batch.
+
+    Attributes:
+        specs: Distinct query specs, in execution order.
+        positions: For each requested query, its index in ``specs``.
+        release_after: For each spec index, the states whose connections
+                       can be closed once it has run.
+    """
+
+    specs: list[dict[str, Any]] = field(default_factory=list)
+    positions: list[int] = field(default_factory=list)
+    release_after: dict[int, set[str]] = field(default_factory=dict)
+
+    @property
+    def deduplicated(self) -> int:
+        return len(self.positions) - len(self.specs)
+
+
+def spec_key(spec: dict[str, Any]) -> str:
+    return json.dumps(spec, sort_keys=True, default=str)
+
+
+def plan_batch(specs: list[dict[str, Any]]) -> BatchPlan:
+    """Deduplicate query specs and group them by state.
+
+    Args:
+        specs: Query specs, each with a ``states`` list (already
+               normalized) and any other parameters.
+
+    Returns:
+        A plan running specs over the same set of states back to back
+        (groups ordered by first appearance), with each state's
+        connection released after the last spec that uses it.
+    """
+    distinct: dict[str, int] = {}
+    unique: list[dict[str, Any]] = []
+    requested: list[int] = []
+    for spec in specs:
+        key = spec_key(spec)
+        if key not in distinct:
+            distinct[key] = len(unique)
+            unique.append(spec)
+        requested.append(distinct[key])
+
+    groups: dict[tuple[str, ...], list[int]] = {}
+    for i, spec in enumerate(unique):
+        groups.setdefault(tuple(sorted(spec.get("states") or [])), []).append(i)
+    order = [i for members in groups.values() for i in members]
+    new_index = {old: new for new, old in enumerate(order)}
+
+    plan = BatchPlan(
+        specs=[unique[i] for i in order],
+        positions=[new_index[i] for i in requested],
+    )
+    last_use: dict[str, int] = {}
+    for i, spec in enumerate(plan.specs):
+        for state in spec.get("states") or []:
+            last_use[state] = i
+    for state, i in last_use.items():
+        plan.release_after.setdefault(i, set()).add(state)
+    return plan
@@ -0,0 +1,380 @@
+"""Parallel, resumable build pipeline for state databases.
+
+The cache build used to download, convert, upload and clean up one state
+at a time. The pipeline overlaps the stages instead:
+
+- downloads and DuckDB conversion (CPU and network bound, and not
+  thread-safe inside pyFIA) run in a process pool;
+- uploads run in a thread pool in the parent process, starting as soon
+  as each state's build finishes;
+- a JSON journal records each state's progress after every step, so a
+  crashed run resumes where it stopped: built-but-not-uploaded states are
+  only uploaded, finished states are skipped.
+
+A state is also skipped when its DataMart source archives are unchanged
+since its last successful publish (same ``Last-Modified``/``ETag``/size),
+and its upload is skipped when the rebuilt file has the same EVALIDs and
+content hash as the published one.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .resource_profiles import ResourceProfile
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = "build_journal.json"
+
+# Journal statuses
+BUILDING = "building"
+BUILT = "built"
+UPLOADING = "uploading"
+UPLOADED = "uploaded"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+# DataMart archives whose headers identify a state's source data; a new
+# evaluation always republishes POP_EVAL
+SOURCE_TABLES = ("POP_EVAL", "PLOT", "COND", "TREE")
+
+
+@dataclass
+class BuildResult:
+    """A built state database, ready to publish.
+
+    Attributes:
+        state: State abbreviation
+        db_path: Database to publish (slim if a slim build was requested)
+        full_path: Database as downloaded
+        size: Size of db_path in bytes
+        version: SHA-256 of db_path
+        evalids: EVALIDs in the database
+    """
+
+    state: str
+    db_path: str
+    full_path: str
+    size: int
+    version: str
+    evalids: list[int] = field(default_factory=list)
+
+
+@dataclass
+class JournalEntry:
+    """Progress of one state in the journal."""
+
+    state: str
+    status: str
+    fingerprint: str | None = None
+    build: dict | None = None
+    published_version: str | None = None
+    published_evalids: list[int] | None = None
+    error: str | None = None
+    updated_at: float = 0.0
+
+
+class BuildJournal:
+    """Per-state build progress persisted after every change.
+
+    Example:
+        >>> journal = BuildJournal(Path("data/fia-build/build_journal.json"))
+        >>> journal.update("GA", status=BUILDING, fingerprint="...")
+        >>> journal.get("GA").status
+        'building'
+    """
+
+    def __init__(self, path: Path | None):
+        """Load the journal at path, if it exists (None keeps it in memory)."""
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._entries: dict[str, JournalEntry] = {}
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            self._entries = {
+                state: JournalEntry(**entry) for state, entry in data["states"].items()
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable build journal {self.path}: {e}")
+
+    def get(self, state: str) -> JournalEntry | None:
+        """Journal entry for a state."""
+        with self._lock:
+            return self._entries.get(state.upper())
+
+    def update(self, state: str, **changes: Any) -> JournalEntry:
+        """Change a state's entry and write the journal."""
+        state = state.upper()
+        with self._lock:
+            entry = self._entries.get(state) or JournalEntry(state=state, status=BUILDING)
+            for name, value in changes.items():
+                setattr(entry, name, value)
+            entry.updated_at = time.time()
+            self._entries[state] = entry
+            self._save()
+            return entry
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"states": {s: asdict(e) for s, e in sorted(self._entries.items())}}
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp, self.path)
+
+
+def source_fingerprint(state: str, timeout: float = 30.0) -> str | None:
+    """Fingerprint of a state's DataMart source archives from HEAD requests.
+
+    Returns None if any archive cannot be checked, so the state is rebuilt.
+    """
+    import requests
+    from pyfia.downloader.client import DATAMART_CSV_BASE
+
+    parts = []
+    try:
+        with requests.Session() as session:
+            for table in SOURCE_TABLES:
+                url = f"{DATAMART_CSV_BASE}{state.upper()}_{table}.zip"
+                response = session.head(url, timeout=timeout, allow_redirects=True)
+                if response.status_code != 200:
+                    return None
+                headers = response.headers
+                parts.append(
+                    f"{table}:{headers.get('Last-Modified', '')}:"
+                    f"{headers.get('ETag', '')}:{headers.get('Content-Length', '')}"
+                )
+    except requests.RequestException as e:
+        logger.debug(f"Cannot fingerprint {state} source: {e}")
+        return None
+    return "|".join(parts)
+
+
+def build_state(
+    state: str,
+    force: bool,
+    output_dir: Path,
+    slim: bool = False,
+    validate: bool = True,
+    profile: ResourceProfile | None = None,
+) -> BuildResult:
+    """Download a state from DataMart and build the database to publish.
+
+    Runs in a pipeline worker process. Use functools.partial to bind
+    output_dir, the slim options and the DuckDB resource profile (applied
+    to the slim build and validation; pyFIA's own download connection
+    keeps DuckDB's defaults).
+
+    Raises:
+        RuntimeError: If the slim database does not reproduce the full
+            database's estimates.
+    """
+    from pyfia import download
+
+    from .s3_download import file_sha256
+    from .slim_db import build_slim_database, validate_slim
+    from .state_versions import state_evalids
+
+    full_path = Path(download(state, dir=str(output_dir), force=force, show_progress=False))
+    db_path = full_path
+    if slim:
+        db_path = full_path.with_name(f"{state}.slim.duckdb")
+        build_slim_database(full_path, db_path, profile)
+        if validate:
+            failures = [
+                r for r in validate_slim(full_path, db_path, profile=profile) if not r.ok
+            ]
+            if failures:
+                db_path.unlink(missing_ok=True)
+                first = failures[0]
+                raise RuntimeError(
+                    f"slim {first.method}({first.params}) differs: {first.detail}"
+                )
+
+    return BuildResult(
+        state=state,
+        db_path=str(db_path),
+        full_path=str(full_path),
+        size=db_path.stat().st_size,
+        version=file_sha256(db_path),
+        evalids=state_evalids(db_path),
+    )
+
+
+def plan_states(
+    states: Iterable[str],
+    journal: BuildJournal,
+    fingerprints: dict[str, str | None],
+    force: bool = False,
+) -> tuple[list[str], list[BuildResult], list[str]]:
+    """Split states into builds, resumed uploads and skips.
+
+    Returns:
+        (states to build, built results to upload, states to skip)
+    """
+    to_build, to_upload, skipped = [], [], []
+    for state in states:
+        entry = journal.get(state)
+        fingerprint = fingerprints.get(state)
+        same_source = (
+            not force
+            and entry is not None
+            and fingerprint is not None
+            and entry.fingerprint == fingerprint
+        )
+        if same_source and entry.status in (UPLOADED, UNCHANGED):
+            skipped.append(state)
+        elif (
+            same_source
+            and entry.status in (BUILT, UPLOADING, FAILED)
+            and entry.build
+            and Path(entry.build["db_path"]).exists()
+        ):
+            to_upload.append(BuildResult(**entry.build))
+        else:
+            to_build.append(state)
+    return to_build, to_upload, skipped
+
+
+def run_pipeline(
+    states: Iterable[str],
+    build: Callable[..., BuildResult],
+    upload: Callable[[BuildResult], bool],
+    journal: BuildJournal,
+    fingerprint: Callable[[str], str | None] | None = source_fingerprint,
+    build_workers: int = 2,
+    upload_workers: int = 4,
+    force: bool = False,
+    on_event: Callable[[str, str, str], None] | None = None,
+) -> dict[str, list[str]]:
+    """Build and publish states with overlapping build and upload stages.
+
+    Args:
+        states: States to process.
+        build: Picklable function ``build(state, force) -> BuildResult``
+               run in the process pool; raises on failure.
+        upload: ``upload(result) -> bool`` run in the thread pool.
+        journal: Journal to resume from and record progress in.
+        fingerprint: Source fingerprint function; None means always rebuild.
+        build_workers: Concurrent builds (processes).
+        upload_workers: Concurrent uploads (threads).
+        force: Rebuild and upload every state regardless of the journal.
+        on_event: Called with (state, event, detail) for progress output.
+
+    Returns:
+        States by outcome: "uploaded", "unchanged", "skipped", "failed".
+    """
+    states = [s.upper() for s in states]
+    results: dict[str, list[str]] = {
+        "uploaded": [],
+        "unchanged": [],
+        "skipped": [],
+        "failed": [],
+    }
+
+    def emit(state: str, event: str, detail: str = "") -> None:
+        if on_event:
+            on_event(state, event, detail)
+
+    with ThreadPoolExecutor(max_workers=upload_workers) as uploads:
+        if fingerprint is None:
+            fingerprints: dict[str, str | None] = dict.fromkeys(states)
+        else:
+            fingerprints = dict(
+                zip(states, uploads.map(fingerprint, states), strict=True)
+            )
+        to_build, to_upload, skipped = plan_states(states, journal, fingerprints, force)
+        for state in skipped:
+            results["skipped"].append(state)
+            emit(state, "skipped", "source unchanged")
+
+        def do_upload(result: BuildResult) -> None:
+            entry = journal.get(result.state)
+            if (
+                not force
+                and entry is not None
+                and entry.published_version == result.version
+                and entry.published_evalids == result.evalids
+            ):
+                journal.update(result.state, status=UNCHANGED)
+                results["unchanged"].append(result.state)
+                emit(result.state, "unchanged", "same content as published")
+                return
+
+            journal.update(result.state, status=UPLOADING)
+            try:
+                ok = upload(result)
+            except Exception as e:
+                ok = False
+                logger.error(f"Upload of {result.state} failed: {e}")
+            if ok:
+                journal.update(
+                    result.state,
+                    status=UPLOADED,
+                    published_version=result.version,
+                    published_evalids=result.evalids,
+                    error=None,
+                )
+                results["uploaded"].append(result.state)
+                emit(result.state, "uploaded", f"{result.size / 1e6:.1f} MB")
+            else:
+                journal.update(result.state, status=FAILED, error="upload failed")
+                results["failed"].append(result.state)
+                emit(result.state, "failed", "upload failed")
+
+        pending: list[Future] = []
+        for result in to_upload:
+            emit(result.state, "resumed", "uploading previous build")
+            pending.append(uploads.submit(do_upload, result))
+
+        with ProcessPoolExecutor(max_workers=max(1, build_workers)) as builds:
+            futures: dict[Future, str] = {}
+            for state in to_build:
+                entry = journal.get(state)
+                # A changed source must not be served from pyFIA's download cache
+                stale = force or (
+                    entry is not None and entry.fingerprint != fingerprints[state]
+                )
+                journal.update(
+                    state, status=BUILDING, fingerprint=fingerprints[state], build=None
+                )
+                futures[builds.submit(build, state, stale)] = state
+
+            for future in as_completed(futures):
+                state = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    journal.update(state, status=FAILED, error=str(e))
+                    results["failed"].append(state)
+                    emit(state, "failed", str(e))
+                    continue
+                journal.update(state, status=BUILT, build=asdict(result), error=None)
+                emit(state, "built", f"{result.size / 1e6:.1f} MB")
+                pending.append(uploads.submit(do_upload, result))
+
+        wait(pending)
+
+    return results
+
@@ -0,0 +1,415 @@
+"""Persistent accounting for the local DuckDB file cache.
+
+The cache limit used to be enforced by walking the cache directory and
+stat-ing every file after each download, ordering by atime (which is
+often not updated on noatime mounts) and deleting files that might be
+open in another thread. The manifest instead keeps:
+
+- size, last-use time and use count per state, persisted to
+  ``<local_dir>/.cache_manifest.json`` so recency survives restarts;
+- a running byte total, so admission is O(1);
+- in-use reference counts, backed by a shared ``flock`` per state so
+  files opened by other worker processes are not evicted either;
+- pinned states that are never evicted.
+
+An entry is usually a state's database file, but may be a directory (the
+table store's per-state Parquet cache), accounted and evicted as a whole.
+
+Eviction is LRU (default) or LFU, skipping pinned and in-use states.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".cache_manifest.json"
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+@dataclass
+class CacheEntry:
+    """A cached state database.
+
+    Attributes:
+        state: State abbreviation
+        path: File or directory path relative to the cache directory
+        size: Size in bytes (total of the files for a directory)
+        last_used: Unix time of the last use
+        uses: Number of uses since the file was cached
+    """
+
+    state: str
+    path: str
+    size: int
+    last_used: float
+    uses: int = 0
+
+
+class CacheManifest:
+    """Sizes, recency and references for the files in a cache directory.
+
+    Example:
+        >>> manifest = CacheManifest(Path("data/fia"), max_bytes=5e9, pinned=["NC"])
+        >>> manifest.admit("TX", Path("data/fia/TX.duckdb"))
+        >>> manifest.evict_to_fit(protect={"TX"})
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: float,
+        policy: str = "lru",
+        pinned: list[str] | None = None,
+        save_interval: float = 30.0,
+    ):
+        """Initialize the manifest, loading any saved state.
+
+        Args:
+            directory: Cache directory holding the state databases.
+            max_bytes: Cache size limit.
+            policy: Eviction order, "lru" or "lfu".
+            pinned: States that are never evicted.
+            save_interval: Minimum seconds between saves caused by uses alone.
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown cache policy '{policy}', expected one of {EVICTION_POLICIES}")
+
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_NAME
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.pinned = {s.upper() for s in pinned or []}
+        self.save_interval = save_interval
+
+        # Least recently used first
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._refs: dict[str, int] = {}
+        self._use_locks: dict[str, IO] = {}
+        self._lock = threading.RLock()
+        self._last_save = 0.0
+        self._dirty = False
+        self.total_bytes = 0
+        self.evictions = 0
+
+        self._load()
+
+    # -- Persistence --------------------------------------------------------
+
+    def _read_saved(self) -> dict[str, CacheEntry]:
+        try:
+            data = json.loads(self.path.read_text())
+            return {e["state"]: CacheEntry(**e) for e in data.get("entries", [])}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cache manifest {self.path}: {e}")
+            return {}
+
+    def _load(self) -> None:
+        entries = sorted(self._read_saved().values(), key=lambda e: e.last_used)
+        with self._lock:
+            for entry in entries:
+                self._put(entry)
+
+    def _merge_saved(self) -> None:
+        """Fold in entries saved by other worker processes."""
+        for state, saved in self._read_saved().items():
+            entry = self._entries.get(state)
+            if entry is None:
+                if (self.directory / saved.path).exists():
+                    self._put(saved)
+                    self._entries.move_to_end(state, last=False)
+            else:
+                entry.uses = max(entry.uses, saved.uses)
+                entry.last_used = max(entry.last_used, saved.last_used)
+
+    def save(self) -> None:
+        """Write the manifest atomically, merging other workers' entries."""
+        with self._lock:
+            self._merge_saved()
+            payload = {"entries": [asdict(e) for e in self._entries.values()]}
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                tmp.write_text(json.dumps(payload))
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save cache manifest: {e}")
+                return
+            self._last_save = time.time()
+            self._dirty = False
+
+    def _maybe_save(self) -> None:
+        if self._dirty and time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    # -- Accounting ---------------------------------------------------------
+
+    def _put(self, entry: CacheEntry) -> None:
+        old = self._entries.pop(entry.state, None)
+        if old is not None:
+            self.total_bytes -= old.size
+        self._entries[entry.state] = entry
+        self.total_bytes += entry.size
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        path = Path(path)
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+        return path.stat().st_size
+
+    def _relative(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return str(path.relative_to(self.directory))
+        except ValueError:
+            return str(path)
+
+    def reconcile(self, files: dict[str, Path]) -> None:
+        """Sync entries with the files actually on disk.
+
+        Untracked files are admitted with their mtime as last use; entries
+        whose file is gone are dropped.
+
+        Args:
+            files: State -> path of every cached database found on disk.
+        """
+        with self._lock:
+            for state in list(self._entries):
+                if state not in files:
+                    self.total_bytes -= self._entries.pop(state).size
+            for state, path in sorted(files.items(), key=lambda kv: kv[1].stat().st_mtime):
+                entry = self._entries.get(state)
+                size = self._size(path)
+                if entry is None or entry.path != self._relative(path) or entry.size != size:
+                    self._put(
+                        CacheEntry(
+                            state=state,
+                            path=self._relative(path),
+                            size=size,
+                            last_used=entry.last_used if entry else path.stat().st_mtime,
+                            uses=entry.uses if entry else 0,
+                        )
+                    )
+            self.save()
+
+    def admit(self, state: str, path: Path) -> None:
+        """Add a newly cached file (or a new version of one, keeping its use count)."""
+        state = state.upper()
+        with self._lock:
+            previous = self._entries.get(state)
+            self._put(
+                CacheEntry(
+                    state=state,
+                    path=self._relative(path),
+                    size=self._size(path),
+                    last_used=time.time(),
+                    uses=previous.uses if previous else 0,
+                )
+            )
+            self.save()
+
+    def record_use(self, state: str, path: Path | None = None) -> None:
+        """Mark a state as just used, admitting it if another worker cached it."""
+        state = state.upper()
+        with self._lock:
+            entry = self._entries.get(state)
+            if entry is None:
+                if path is None:
+                    return
+                self.admit(state, path)
+                entry = self._entries[state]
+            entry.last_used = time.time()
+            entry.uses += 1
+            self._entries.move_to_end(state)
+            self._dirty = True
+            self._maybe_save()
+
+    def fits(self, size: int) -> bool:
+        """Whether size more bytes fit without eviction."""
+        return self.total_bytes + size <= self.max_bytes
+
+    # -- References ---------------------------------------------------------
+
+    def _use_lock_path(self, state: str) -> Path:
+        lock_dir = self.directory / ".locks"
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        return lock_dir / f"{state}.use"
+
+    def acquire(self, state: str) -> None:
+        """Mark a state's file as open so it is not evicted."""
+        state = state.upper()
+        with self._lock:
+            self._refs[state] = self._refs.get(state, 0) + 1
+            if self._refs[state] == 1 and fcntl is not None:
+                lock_file = open(self._use_lock_path(state), "a")
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+                self._use_locks[state] = lock_file
+
+    def release(self, state: str) -> None:
+        """Drop a reference taken by acquire()."""
+        state = state.upper()
+        with self._lock:
+            refs = self._refs.get(state, 0) - 1
+            if refs > 0:
+                self._refs[state] = refs
+                return
+            self._refs.pop(state, None)
+            lock_file = self._use_locks.pop(state, None)
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def in_use(self, state: str) -> bool:
+        """Whether any thread or worker process has the state's file open."""
+        with self.exclusive(state) as unused:
+            return not unused
+
+    @contextmanager
+    def exclusive(self, state: str) -> Iterator[bool]:
+        """Hold a state's use lock exclusively if nobody has its file open.
+
+        Yields True while the lock is held: acquire() in other worker
+        processes blocks until the block exits, so a file can be checked
+        and deleted without another process opening it in between. Yields
+        False if the state is in use.
+        """
+        state = state.upper()
+        if self._refs.get(state, 0) > 0:
+            yield False
+            return
+        if fcntl is None:
+            yield True
+            return
+
+        with open(self._use_lock_path(state), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # -- Eviction -----------------------------------------------------------
+
+    def _eviction_order(self) -> list[CacheEntry]:
+        entries = list(self._entries.values())
+        if self.policy == "lfu":
+            entries.sort(key=lambda e: (e.uses, e.last_used))
+        return entries
+
+    def _remove_file(self, entry: CacheEntry) -> bool:
+        path = self.directory / entry.path
+        try:
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink(missing_ok=True)
+            # Also remove parent directory if empty
+            if path.parent != self.directory and not any(path.parent.iterdir()):
+                path.parent.rmdir()
+        except OSError as e:
+            logger.warning(f"Failed to evict {path}: {e}")
+            return False
+        return True
+
+    def evict_to_fit(self, protect: set[str] | None = None) -> list[str]:
+        """Evict states until the cache is within its limit.
+
+        Pinned, protected and in-use states are skipped, so the cache may
+        stay over its limit if everything else is in use.
+
+        Returns:
+            Evicted states.
+        """
+        protect = {s.upper() for s in protect or set()}
+        evicted = []
+        with self._lock:
+            for entry in self._eviction_order():
+                if self.total_bytes <= self.max_bytes:
+                    break
+                if entry.state in self.pinned or entry.state in protect:
+                    continue
+                with self.exclusive(entry.state) as unused:
+                    if not unused:
+                        logger.debug(f"Not evicting {entry.state}: in use")
+                        continue
+                    removed = self._remove_file(entry)
+                if removed:
+                    del self._entries[entry.state]
+                    self.total_bytes -= entry.size
+                    self.evictions += 1
+                    evicted.append(entry.state)
+                    logger.info(f"Evicted {entry.state} from cache ({entry.size / 1e6:.1f} MB)")
+
+            if self.total_bytes > self.max_bytes:
+                logger.warning(
+                    f"Local cache over limit ({self.total_bytes / 1e9:.1f} GB > "
+                    f"{self.max_bytes / 1e9:.1f} GB); remaining states are pinned or in use"
+                )
+            if evicted:
+                self.save()
+        return evicted
+
+    def remove(self, state: str) -> bool:
+        """Delete a state's file unless it is in use."""
+        state = state.upper()
+        with self._lock, self.exclusive(state) as unused:
+            entry = self._entries.get(state)
+            if entry is None or not unused:
+                return False
+            if not self._remove_file(entry):
+                return False
+            del self._entries[state]
+            self.total_bytes -= entry.size
+            self.save()
+            return True
+
+    # -- Introspection ------------------------------------------------------
+
+    def entries(self) -> list[dict]:
+        """Cached states with size, recency and reference information."""
+        with self._lock:
+            return [
+                {
+                    **asdict(entry),
+                    "path": str(self.directory / entry.path),
+                    "pinned": entry.state in self.pinned,
+                    "refs": self._refs.get(entry.state, 0),
+                }
+                for entry in self._entries.values()
+            ]
+
+    def stats(self) -> dict:
+        """Cache usage summary."""
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "states": len(self._entries),
+                "used_gb": self.total_bytes / 1e9,
+                "max_gb": self.max_bytes / 1e9,
+                "pinned": sorted(self.pinned),
+                "in_use": sorted(s for s, n in self._refs.items() if n > 0),
+                "evictions": self.evictions,
+            }
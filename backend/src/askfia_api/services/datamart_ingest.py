@@ -0,0 +1,378 @@
+"""Cold tier: build a state database straight from FIA DataMart archives.
+
+pyFIA's ``download()`` extracts every CSV to disk and has DuckDB read each
+one as text before casting, so a state is written three times and large
+tables (TREE, SEEDLING) go through several full passes. The ingester
+instead:
+
+1. Streams each ``{STATE}_{TABLE}.zip`` archive to disk in chunks (a zip
+   needs its trailing directory, so the compressed archive is spooled,
+   never the extracted CSV).
+2. Decompresses the CSV member as a stream and parses it in fixed-size
+   blocks with pyarrow's multithreaded CSV reader, using FIADB column
+   types from pyFIA's schema instead of type inference.
+3. Appends each block to a staging DuckDB file as it is parsed, several
+   tables at once, then writes the output with each table sorted by its
+   plot keys so DuckDB's row-group zone maps (or Parquet row-group
+   statistics) prune plot-filtered scans.
+
+The archive source is the DataMart URL or a local directory of archives,
+which stands in for DataMart in tests and benchmarks.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from .slim_db import DEFAULT_SORT_KEYS, SORT_KEYS
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_ARCHIVE = "FIADB_REFERENCE"
+FETCH_CHUNK_SIZE = 1024 * 1024
+PARSE_BLOCK_SIZE = 16 * 1024 * 1024
+
+# FIADB column types (pyfia.constants.fiadb_schema) as parsed by pyarrow.
+# Integers parse as float64 because DataMart writes some as "693.0"; they
+# are checked and cast to int64 per block.
+_ARROW_TYPES = {
+    "BIGINT": pa.float64(),
+    "DOUBLE": pa.float64(),
+    "VARCHAR": pa.string(),
+    "TIMESTAMP": pa.timestamp("us"),
+}
+
+
+@dataclass
+class IngestResult:
+    """Summary of a cold-tier build.
+
+    Attributes:
+        state: State abbreviation
+        path: Output DuckDB file or Parquet directory
+        rows: Rows loaded per table
+        archive_bytes: Compressed bytes fetched
+        seconds: Wall time of the build
+    """
+
+    state: str
+    path: Path
+    rows: dict[str, int] = field(default_factory=dict)
+    archive_bytes: int = 0
+    seconds: float = 0.0
+
+
+class ArchiveSource:
+    """Fetches DataMart zip archives from a URL or a local directory.
+
+    Example:
+        >>> ArchiveSource("tests/fixtures/datamart").fetch("NC_PLOT", Path("/tmp"))
+    """
+
+    def __init__(self, location: str | Path | None = None, timeout: float = 300.0):
+        """Initialize the source.
+
+        Args:
+            location: DataMart CSV base URL or a directory of archives
+                      (default: pyFIA's DataMart URL).
+            timeout: HTTP timeout in seconds.
+        """
+        if location is None:
+            from pyfia.downloader.client import DATAMART_CSV_BASE
+
+            location = DATAMART_CSV_BASE
+        self.location = str(location)
+        self.is_remote = self.location.startswith(("http://", "https://"))
+        self.timeout = timeout
+
+    def fetch(self, name: str, work_dir: Path) -> Path:
+        """Local path of ``{name}.zip``, streaming it into work_dir if remote.
+
+        Raises:
+            FileNotFoundError: If the archive does not exist.
+        """
+        if not self.is_remote:
+            path = Path(self.location) / f"{name}.zip"
+            if not path.exists():
+                raise FileNotFoundError(f"No DataMart archive {path}")
+            return path
+
+        import requests
+
+        url = f"{self.location.rstrip('/')}/{name}.zip"
+        dest = Path(work_dir) / f"{name}.zip"
+        with requests.get(url, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 404:
+                raise FileNotFoundError(f"No DataMart archive {url}")
+            response.raise_for_status()
+            with open(dest, "wb") as f:
+                for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                    f.write(chunk)
+        return dest
+
+
+def _column_types(table: str, header: list[str]) -> dict[str, pa.DataType]:
+    from pyfia.constants.fiadb_schema import COLUMN_TYPES
+
+    declared = COLUMN_TYPES.get(table, {})
+    return {col: _ARROW_TYPES.get(declared.get(col, "VARCHAR"), pa.string()) for col in header}
+
+
+def _duckdb_columns(table: str, header: list[str], state_code: int | None) -> str:
+    from pyfia.constants.fiadb_schema import COLUMN_TYPES
+
+    declared = COLUMN_TYPES.get(table, {})
+    columns = [f'"{col}" {declared.get(col, "VARCHAR")}' for col in header]
+    if state_code is not None:
+        columns.append('"STATE_ADDED" BIGINT')
+    return ", ".join(columns)
+
+
+def _integer_columns(table: str, header: list[str]) -> list[str]:
+    from pyfia.constants.fiadb_schema import COLUMN_TYPES
+
+    declared = COLUMN_TYPES.get(table, {})
+    return [col for col in header if declared.get(col) == "BIGINT"]
+
+
+def _to_integers(batch: pa.RecordBatch, columns: list[str], table: str) -> pa.RecordBatch:
+    """Cast whole-number float columns to int64, failing on fractions."""
+    arrays = list(batch.columns)
+    for col in columns:
+        i = batch.schema.get_field_index(col)
+        try:
+            arrays[i] = pc.cast(arrays[i], pa.int64(), safe=True)
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"{table}.{col} holds a value that is not an integer: {e}") from e
+    return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+
+def load_csv_member(
+    con: duckdb.DuckDBPyConnection,
+    archive: zipfile.ZipFile,
+    member: str,
+    table: str,
+    state_code: int | None = None,
+    block_size: int = PARSE_BLOCK_SIZE,
+) -> int:
+    """Stream one CSV member of an archive into a new DuckDB table.
+
+    Returns:
+        Rows loaded.
+    """
+    with archive.open(member) as raw:
+        header = next(csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig")))
+    header = [col.strip().upper() for col in header]
+
+    con.execute(f'CREATE TABLE "{table}" ({_duckdb_columns(table, header, state_code)})')
+    integers = _integer_columns(table, header)
+    rows = 0
+    with archive.open(member) as raw:
+        reader = pacsv.open_csv(
+            raw,
+            read_options=pacsv.ReadOptions(
+                block_size=block_size,
+                use_threads=True,
+                column_names=header,
+                skip_rows=1,
+                encoding="utf8",
+            ),
+            convert_options=pacsv.ConvertOptions(
+                column_types=_column_types(table, header),
+                strings_can_be_null=True,
+            ),
+        )
+        for batch in reader:
+            batch = _to_integers(batch, integers, table)
+            if state_code is not None:
+                batch = batch.append_column(
+                    "STATE_ADDED", pa.array([state_code] * batch.num_rows, pa.int64())
+                )
+            con.register("_ingest_batch", batch)
+            con.execute(f'INSERT INTO "{table}" SELECT * FROM _ingest_batch')
+            con.unregister("_ingest_batch")
+            rows += batch.num_rows
+    return rows
+
+
+def write_sorted_database(raw_path: Path, dest: Path) -> None:
+    """Copy every table of raw_path into dest, ordered by its plot keys.
+
+    Writing the sorted copy into a fresh file keeps it compact; sorting in
+    place would leave the unsorted blocks behind as free space.
+    """
+    con = duckdb.connect(str(dest))
+    try:
+        con.execute(f"ATTACH '{raw_path}' AS raw (READ_ONLY)")
+        tables = [
+            row[0]
+            for row in con.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_catalog = 'raw' AND table_schema = 'main'"
+            ).fetchall()
+        ]
+        for table in tables:
+            columns = {row[0] for row in con.execute(f'DESCRIBE raw."{table}"').fetchall()}
+            keys = [k for k in SORT_KEYS.get(table, DEFAULT_SORT_KEYS) if k in columns]
+            order = f"ORDER BY {', '.join(keys)}" if keys else ""
+            con.execute(f'CREATE TABLE "{table}" AS SELECT * FROM raw."{table}" {order}')
+        con.execute("DETACH raw")
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+
+
+def _archives_for(state: str, tables: Iterable[str]) -> list[tuple[str, str | None]]:
+    """(archive name, state code prefix) pairs to ingest."""
+    archives = [(f"{state}_{table}", state) for table in tables]
+    archives.append((REFERENCE_ARCHIVE, None))
+    return archives
+
+
+def ingest_state(
+    state: str,
+    dest: Path,
+    source: ArchiveSource | None = None,
+    tables: Iterable[str] | None = None,
+    layout: str = "duckdb",
+    max_parallel: int = 4,
+    block_size: int = PARSE_BLOCK_SIZE,
+    progress: Callable[[int, int], None] | None = None,
+) -> IngestResult:
+    """Build a state's database from DataMart archives.
+
+    Args:
+        state: State abbreviation.
+        dest: Output DuckDB file (layout "duckdb") or directory of
+              ``{TABLE}.parquet`` files plus a table-store manifest
+              (layout "parquet"). Written atomically.
+        source: Archive source (default: FIA DataMart).
+        tables: State tables to load (default: pyFIA's common tables).
+        layout: "duckdb" or "parquet".
+        max_parallel: Archives fetched and parsed concurrently.
+        block_size: Bytes of CSV parsed per block.
+        progress: Called with (archives done, archives total).
+
+    Returns:
+        Rows per table and transfer statistics.
+
+    Raises:
+        FileNotFoundError: If DataMart has no archives for the state.
+    """
+    from pyfia.downloader import (
+        COMMON_TABLES,
+        REQUIRED_REFERENCE_TABLES,
+        get_state_fips,
+    )
+
+    if layout not in ("duckdb", "parquet"):
+        raise ValueError(f"Unknown layout '{layout}', expected 'duckdb' or 'parquet'")
+
+    started = time.perf_counter()
+    state = state.upper()
+    source = source or ArchiveSource()
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    state_code = get_state_fips(state)
+    archives = _archives_for(state, tables or COMMON_TABLES)
+    result = IngestResult(state=state, path=dest)
+    done = 0
+    lock = threading.Lock()
+
+    work_dir = Path(tempfile.mkdtemp(prefix=f".ingest-{state}-", dir=dest.parent))
+    db_path = work_dir / "raw.duckdb"
+    con = duckdb.connect(str(db_path))
+    try:
+
+        def ingest(archive_name: str, prefix: str | None) -> None:
+            nonlocal done
+            try:
+                path = source.fetch(archive_name, work_dir)
+            except FileNotFoundError:
+                if prefix is None:
+                    raise
+                # Not every state publishes every table (e.g. no GRM data)
+                logger.info(f"{archive_name} not published, skipping")
+                return
+
+            cursor = con.cursor()
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    for member in archive.namelist():
+                        if not member.lower().endswith(".csv"):
+                            continue
+                        table = Path(member).stem.upper()
+                        if prefix:
+                            table = table.removeprefix(f"{prefix}_")
+                        elif table not in REQUIRED_REFERENCE_TABLES:
+                            continue
+                        rows = load_csv_member(
+                            cursor,
+                            archive,
+                            member,
+                            table,
+                            state_code if prefix else None,
+                            block_size,
+                        )
+                        with lock:
+                            result.rows[table] = rows
+                with lock:
+                    result.archive_bytes += path.stat().st_size
+            finally:
+                cursor.close()
+                if source.is_remote:
+                    path.unlink(missing_ok=True)
+            with lock:
+                done += 1
+                if progress:
+                    progress(done, len(archives))
+
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+            # list() re-raises the first failure
+            list(pool.map(lambda a: ingest(*a), archives))
+
+        if not any(table in result.rows for table in ("PLOT", "POP_EVAL")):
+            raise FileNotFoundError(f"No DataMart data found for {state}")
+        con.execute("CHECKPOINT")
+        con.close()
+
+        if layout == "duckdb":
+            write_sorted_database(db_path, work_dir / f"{state}.duckdb")
+            os.replace(work_dir / f"{state}.duckdb", dest)
+        else:
+            from .table_store import export_state_tables
+
+            export_state_tables(db_path, work_dir / "parquet", state)
+            shutil.rmtree(dest, ignore_errors=True)
+            os.replace(work_dir / "parquet", dest)
+    finally:
+        try:
+            con.close()
+        except duckdb.Error:
+            pass
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result.seconds = time.perf_counter() - started
+    logger.info(
+        f"Ingested {state} from DataMart: {sum(result.rows.values()):,} rows in "
+        f"{len(result.rows)} tables, {result.archive_bytes / 1e6:.1f} MB of archives, "
+        f"{result.seconds:.1f}s"
+    )
+    return result
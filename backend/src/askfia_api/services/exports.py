@@ -0,0 +1,334 @@
+"""Background export jobs for the downloads API.
+
+An export copies the requested tables of the requested states out of the
+state databases the API already caches, with DuckDB COPY, so only those
+tables are written and nothing is loaded into Python:
+
+- ``parquet`` and ``csv``: one file per state and table, zipped when
+  there is more than one;
+- ``duckdb``: one database holding the requested tables of all states.
+
+Exports run on a small worker pool and report progress (tables done and
+total). Like query jobs, they are JSON records in a job store on local
+disk, shared by all API processes on the host; an export and its files
+are deleted once it expires.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import secrets
+import shutil
+import time
+import zipfile
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+from .jobs import FAILED, QUEUED, SUCCEEDED, JobRunner, JobStore, spec_key
+from .resource_profiles import BATCH, ResourceGovernor
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("parquet", "csv", "duckdb")
+
+_EXTENSIONS = {"parquet": ".parquet", "csv": ".csv", "duckdb": ".duckdb"}
+_COPY_OPTIONS = {
+    "parquet": "FORMAT PARQUET, COMPRESSION ZSTD",
+    "csv": "FORMAT CSV, HEADER",
+}
+_TABLE_NAME = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+
+@dataclass
+class ExportJob:
+    """A requested export and its progress.
+
+    Attributes:
+        id: Export ID
+        states: State codes
+        tables: Requested FIA tables
+        format: parquet, csv or duckdb
+        key: Spec key identical requests share
+        status: queued, running, succeeded or failed
+        owner: Token (see jobs.process_token) of the process running, or
+               queued to run, the export
+        progress: Tables exported and total (states x tables)
+        filename: Name of the finished download
+        size_bytes: Size of the finished download
+        missing_tables: "STATE.TABLE" entries not present in the data
+        error: Failure message
+    """
+
+    id: str
+    states: list[str]
+    tables: list[str]
+    format: str
+    key: str
+    status: str = QUEUED
+    owner: str = ""
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    updated_at: float = field(default_factory=time.time)
+    progress: dict[str, int] = field(default_factory=lambda: {"done": 0, "total": 1})
+    filename: str | None = None
+    size_bytes: int | None = None
+    missing_tables: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class ExportStore(JobStore):
+    """Export records, and the exported files of each in its own directory."""
+
+    def __init__(self, directory: str | Path, ttl: float = 86400.0):
+        """
+        Args:
+            directory: Directory holding export records (``jobs/``) and
+                       files (``files/{id}/``).
+            ttl: Seconds a finished export is kept.
+        """
+        super().__init__(Path(directory) / "jobs", ttl=ttl, record=ExportJob)
+        self.files_dir = Path(directory) / "files"
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+
+    def output_dir(self, export_id: str) -> Path:
+        return self.files_dir / export_id
+
+    def file_path(self, export: ExportJob) -> Path | None:
+        """The finished download of an export, if it exists."""
+        if export.status != SUCCEEDED or not export.filename:
+            return None
+        path = self.output_dir(export.id) / export.filename
+        return path if path.exists() else None
+
+    def purge(self) -> int:
+        """Delete expired exports and their files; returns how many."""
+        live = {path.stem for path in self.directory.glob("*.json")}
+        removed = super().purge()
+        for export_dir in self.files_dir.iterdir():
+            if export_dir.name not in live or self.get(export_dir.name) is None:
+                shutil.rmtree(export_dir, ignore_errors=True)
+        return removed
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(path: Path) -> str:
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+def available_tables(con: duckdb.DuckDBPyConnection, catalog: str) -> dict[str, str]:
+    """Tables and views of an attached database, by upper-case name."""
+    rows = con.execute(
+        "SELECT table_name FROM information_schema.tables WHERE table_catalog = ?",
+        [catalog],
+    ).fetchall()
+    return {name.upper(): name for (name,) in rows}
+
+
+def copy_table(
+    con: duckdb.DuckDBPyConnection, source: str, target: Path, format: str
+) -> None:
+    """Write a table to a Parquet or CSV file with DuckDB COPY."""
+    con.execute(
+        f"COPY (SELECT * FROM {source}) TO {_literal(target)} ({_COPY_OPTIONS[format]})"
+    )
+
+
+def append_table(con: duckdb.DuckDBPyConnection, source: str, table: str) -> None:
+    """Add a table's rows to the connection's own (export) database."""
+    exists = con.execute(
+        "SELECT 1 FROM information_schema.tables "
+        "WHERE table_catalog = current_database() AND table_name = ?",
+        [table],
+    ).fetchone()
+    if exists:
+        con.execute(f"INSERT INTO {_quote(table)} BY NAME SELECT * FROM {source}")
+    else:
+        con.execute(f"CREATE TABLE {_quote(table)} AS SELECT * FROM {source}")
+
+
+def package(files: list[tuple[Path, str]], target: Path, compress: bool) -> None:
+    """Zip exported files (path, name in the archive), deleting each one."""
+    method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(target, "w", compression=method, allowZip64=True) as archive:
+        for path, name in files:
+            archive.write(path, name)
+            path.unlink()
+
+
+def download_filename(states: list[str], format: str, archive: bool) -> str:
+    stem = f"FIA_{'_'.join(states)}"
+    return stem + (".zip" if archive else _EXTENSIONS[format])
+
+
+class ExportManager(JobRunner):
+    """Runs export jobs on a bounded worker pool.
+
+    Example:
+        >>> export, deduplicated = export_manager.submit(["NC"], ["TREE"], "parquet")
+        >>> export_manager.store.get(export.id).progress
+        {'done': 1, 'total': 1}
+    """
+
+    label = "Export"
+
+    def __init__(
+        self,
+        store: ExportStore,
+        open_state: Callable[[str, tuple[str, ...]], AbstractContextManager[str]],
+        resources: ResourceGovernor | None = None,
+        max_concurrency: int = 1,
+    ):
+        """
+        Args:
+            store: Export store.
+            open_state: Context manager yielding the path of a state's
+                        database with the given tables (FIAStorage.use).
+            resources: Governor whose batch profile export connections use.
+            max_concurrency: Exports running at once in this process.
+        """
+        super().__init__(store, max_concurrency)
+        self._open_state = open_state
+        self.resources = resources
+
+    def submit(
+        self, states: list[str], tables: list[str], format: str
+    ) -> tuple[ExportJob, bool]:
+        """Queue an export, or return the export already serving it.
+
+        Raises:
+            ValueError: For an unknown format or an invalid table name.
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown export format: {format}")
+        invalid = [table for table in tables if not _TABLE_NAME.match(table)]
+        if invalid:
+            raise ValueError(f"Invalid table names: {', '.join(invalid)}")
+        tables = list(dict.fromkeys(table.upper() for table in tables))
+        states = [state.upper() for state in states]
+
+        self.store.purge()
+        key = spec_key("export", {"states": states, "tables": tables, "format": format})
+        return self._submit(
+            key,
+            lambda: ExportJob(
+                id=secrets.token_hex(8),
+                states=states,
+                tables=tables,
+                format=format,
+                key=key,
+                progress={"done": 0, "total": len(states) * len(tables)},
+            ),
+        )
+
+    def _requeued(self, export: ExportJob) -> None:
+        export.progress["done"] = 0
+        export.missing_tables = []
+
+    def _perform(self, export: ExportJob) -> None:
+        output_dir = self.store.output_dir(export.id)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        output_dir.mkdir(parents=True)
+        self._export(export, output_dir)
+        export.size_bytes = (output_dir / export.filename).stat().st_size
+
+    def _failed(self, export: ExportJob) -> None:
+        shutil.rmtree(self.store.output_dir(export.id), ignore_errors=True)
+
+    def _export(self, export: ExportJob, output_dir: Path) -> None:
+        # One connection for the whole export, attaching each state's
+        # database read-only in turn; a duckdb export writes into its own
+        database = output_dir / download_filename(export.states, "duckdb", False)
+        con = duckdb.connect(str(database) if export.format == "duckdb" else ":memory:")
+        files: list[tuple[Path, str]] = []
+        try:
+            resources = (
+                self.resources.apply(con, BATCH) if self.resources else nullcontext()
+            )
+            with resources:
+                for state in export.states:
+                    with self._open_state(state, tuple(export.tables)) as db_path:
+                        source = _literal(Path(db_path))
+                        con.execute(f"ATTACH {source} AS src (READ_ONLY)")
+                        try:
+                            files += self._export_state(export, con, state, output_dir)
+                        finally:
+                            con.execute("DETACH src")
+        finally:
+            con.close()
+
+        if len(export.missing_tables) == export.progress["total"]:
+            raise ValueError(
+                f"None of the tables {', '.join(export.tables)} exist for "
+                f"{', '.join(export.states)}"
+            )
+        if export.format == "duckdb":
+            export.filename = database.name
+        elif len(files) == 1:
+            path, _ = files[0]
+            export.filename = download_filename(export.states, export.format, False)
+            path.rename(output_dir / export.filename)
+        else:
+            export.filename = download_filename(export.states, export.format, True)
+            package(files, output_dir / export.filename, export.format == "csv")
+
+    def _export_state(
+        self,
+        export: ExportJob,
+        con: duckdb.DuckDBPyConnection,
+        state: str,
+        output_dir: Path,
+    ) -> list[tuple[Path, str]]:
+        """Export one state's tables, updating progress after each table."""
+        files = []
+        extension = _EXTENSIONS[export.format]
+        available = available_tables(con, "src")
+        for table in export.tables:
+            name = available.get(table)
+            if name is None:
+                export.missing_tables.append(f"{state}.{table}")
+            elif export.format == "duckdb":
+                append_table(con, f"src.{_quote(name)}", table)
+            else:
+                target = output_dir / f"{state}_{table}{extension}"
+                copy_table(con, f"src.{_quote(name)}", target, export.format)
+                files.append((target, f"{state}/{table}{extension}"))
+            export.progress["done"] += 1
+            self.store.save(export)
+        return files
+
+    def stats(self) -> dict:
+        return {**super().stats(), "ttl_seconds": self.store.ttl}
+
+
+def get_export_manager() -> ExportManager:
+    """Get the configured ExportManager instance."""
+    from ..config import settings
+    from .fia_service import fia_service
+    from .storage import storage
+
+    return ExportManager(
+        ExportStore(settings.downloads_dir, ttl=settings.export_ttl_hours * 3600),
+        open_state=storage.use,
+        resources=fia_service.resources,
+        max_concurrency=settings.export_max_concurrency,
+    )
+
+
+export_manager = get_export_manager()
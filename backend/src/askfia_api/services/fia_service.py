@@ -1,93 +1,42 @@
 """Service layer for pyFIA operations."""
 
+import asyncio
+import hashlib
+import json
 import logging
-import re
+import os
+import threading
 from collections.abc import Generator
 from contextlib import contextmanager
-from functools import lru_cache
 
-import duckdb
 import pandas as pd
+import pyarrow as pa
 
 from ..config import settings
 from . import species_data
+from .approximate import apply_stratified_subsample, restore_full_sample
+from .backend_router import (
+    LOCAL,
+    MOTHERDUCK,
+    HedgedConnection,
+    backend_router,
+    eval_year,
+)
+from .batch_query import current_scope
+from .hot_tier import hot_tier
+from .motherduck_catalog import motherduck_catalog
+from .parquet_lake import parquet_lake
+from .resource_profiles import BATCH, INTERACTIVE, get_resource_governor
+from .result_store import result_store
+from .state_router import RoutedConnection, state_router
 from .statistics import SEAggregator
 from .storage import storage
+from .strat_cache import strat_cache
+from .table_store import tables_for
 
 logger = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=1)
-def _get_motherduck_databases(token: str) -> dict[str, str]:
-    """Get available FIA databases from MotherDuck.
-
-    Returns a dict mapping state codes to their latest database names.
-    Database naming convention: fia_{state}_eval{year}
-
-    Falls back to legacy naming (fia_{state}) if no eval year databases found.
-    """
-    state_to_db = {}
-
-    try:
-        conn = duckdb.connect(f"md:?motherduck_token={token}")
-        result = conn.execute("SHOW DATABASES").fetchall()
-        conn.close()
-
-        # Parse database names and find latest eval year per state
-        # Pattern: fia_{state}_eval{year} or legacy fia_{state}
-        eval_pattern = re.compile(r"^fia_([a-z]{2})_eval(\d{4})$")
-        legacy_pattern = re.compile(r"^fia_([a-z]{2})$")
-
-        state_eval_years: dict[str, list[tuple[int, str]]] = {}
-
-        for (db_name,) in result:
-            db_name = db_name.lower()
-
-            # Try new naming convention first
-            match = eval_pattern.match(db_name)
-            if match:
-                state = match.group(1).upper()
-                year = int(match.group(2))
-                if state not in state_eval_years:
-                    state_eval_years[state] = []
-                state_eval_years[state].append((year, db_name))
-                continue
-
-            # Try legacy naming
-            match = legacy_pattern.match(db_name)
-            if match:
-                state = match.group(1).upper()
-                # Use year 0 for legacy databases (lowest priority)
-                if state not in state_eval_years:
-                    state_eval_years[state] = []
-                state_eval_years[state].append((0, db_name))
-
-        # Select latest eval year for each state
-        for state, year_dbs in state_eval_years.items():
-            year_dbs.sort(reverse=True)  # Sort by year descending
-            latest_db = year_dbs[0][1]
-            state_to_db[state] = latest_db
-            if year_dbs[0][0] > 0:
-                logger.info(f"Found {state}: {latest_db} (eval {year_dbs[0][0]})")
-            else:
-                logger.info(f"Found {state}: {latest_db} (legacy naming)")
-
-    except Exception as e:
-        logger.warning(f"Could not query MotherDuck databases: {e}")
-
-    return state_to_db
-
-
-def get_motherduck_database(state: str, token: str) -> str | None:
-    """Get the MotherDuck database name for a state.
-
-    Returns the latest eval year database if available, or None if not found.
-    """
-    state = state.upper()
-    databases = _get_motherduck_databases(token)
-    return databases.get(state)
-
-
 def _get_estimate_column(df: pd.DataFrame, metric: str) -> str:
     """Find the estimate column name dynamically."""
     # Try metric-specific columns first (e.g., AREA, VOLUME, BIOMASS)
@@ -191,58 +140,575 @@ class FIAService:
 
     def __init__(self):
         self.storage = storage
+        self.strat_cache = strat_cache
+        self.hot_tier = hot_tier
+        self.result_store = result_store
+        self.state_router = state_router
+        self.parquet_lake = parquet_lake
+        self.motherduck_catalog = motherduck_catalog
+        self.backend_router = backend_router
+        self.resources = get_resource_governor()
+        self.approximate_fraction = settings.approximate_sample_fraction
         self._motherduck_token = settings.motherduck_token
+        self._warming: set[str] = set()
+        self._warming_lock = threading.Lock()
+        # In-memory copies of a replaced state's data are stale
+        self.storage.add_replace_listener(self._on_state_replaced)
+
+    def _on_state_replaced(self, state: str) -> None:
+        """Drop the hot-tier tables and stratification of a replaced state."""
+        self.hot_tier.evict(state)
+        for path in self.storage.state_locations(state):
+            self.strat_cache.invalidate(str(path), prefix=True)
 
     def _get_db_path(self, state: str) -> str:
         """Get path to state database using tiered storage."""
         return self.storage.get_db_path(state)
 
+    @staticmethod
+    def _connection_source(db) -> str:
+        """Identify the database behind a pyFIA connection.
+
+        MotherDuck databases are identified by name (which carries the eval
+        year). Local files use inode and size rather than mtime, which storage
+        bumps on every cache hit for LRU tracking, so a replaced file gets a
+        new identity.
+        """
+        database = getattr(db, "database", None)
+        if database:
+            return f"md:{database}"
+
+        db_path = str(db.db_path)
+        try:
+            stat = os.stat(db_path)
+            return f"{db_path}@{stat.st_ino}:{stat.st_size}"
+        except OSError:
+            return db_path
+
+    def _prepare_connection(self, db, state: str, warm: bool = False) -> None:
+        """Clip to the most recent evaluation and inject cached tables.
+
+        Hot states get their core tables from memory; every state gets the
+        shared stratification tables. Connections that load the hot tier
+        (``warm``) are neither counted as queries nor promote the state.
+        """
+        db.clip_most_recent()
+        source = self._connection_source(db)
+        self.strat_cache.inject(db, source)
+        if warm:
+            return
+
+        self.hot_tier.record_access(state)
+        if not self.hot_tier.inject(db, state, source):
+            self._promote_hot_state(state)
+
+    def _promote_hot_state(self, state: str) -> None:
+        """Load a newly hot state into memory in the background."""
+        if state not in self.hot_tier.missing_candidates():
+            return
+        if not self._claim_warming([state]):
+            return
+
+        threading.Thread(
+            target=self._load_hot_states,
+            args=([state],),
+            name=f"hot-tier-{state}",
+            daemon=True,
+        ).start()
+
+    def warm_hot_tier(self, states: list[str] | None = None) -> list[str]:
+        """Load states into the in-memory hot tier.
+
+        Args:
+            states: States to load. Defaults to hot-set candidates that are
+                   not resident yet.
+
+        Returns:
+            States that are resident after warming.
+        """
+        if not self.hot_tier.enabled:
+            return []
+        if states is None:
+            states = self.hot_tier.missing_candidates()
+        return self._load_hot_states(self._claim_warming(states))
+
+    def _claim_warming(self, states: list[str]) -> list[str]:
+        """Mark states as loading into the hot tier.
+
+        Returns:
+            The states that were not already being loaded.
+        """
+        claimed = []
+        with self._warming_lock:
+            for state in states:
+                state = state.upper()
+                if state not in self._warming:
+                    self._warming.add(state)
+                    claimed.append(state)
+        return claimed
+
+    def _load_hot_states(self, states: list[str]) -> list[str]:
+        """Load claimed states into the hot tier, then release them."""
+        loaded = []
+        for state in states:
+            try:
+                if not self.state_router.is_local(state):
+                    # Owned (and kept hot) by another worker
+                    continue
+                with self._open_connection(state, workload=BATCH, warm=True) as db:
+                    if self.hot_tier.load(state, db, self._connection_source(db)):
+                        loaded.append(state)
+            except Exception as e:
+                logger.warning(f"Failed to load {state} into hot tier: {e}")
+            finally:
+                with self._warming_lock:
+                    self._warming.discard(state)
+        return loaded
+
+    def _estimate(
+        self, db, state: str, method: str, approximate: bool = False, **kwargs
+    ):
+        """Run a pyFIA estimator, reusing a stored result when available.
+
+        Results are keyed by the estimator, its arguments, and the database
+        and EVALID the connection is clipped to, and are shared by all
+        workers through the on-disk result store. Inside a batch (see
+        batch_query.SharedScope), an estimate already run for the same
+        state and arguments is reused.
+
+        Args:
+            db: Clipped pyFIA connection for the state.
+            state: State code.
+            method: Estimator method name on the connection (e.g. "area").
+            approximate: Estimate from a stratified subsample of plots.
+            **kwargs: Estimator arguments.
+
+        Returns:
+            Polars DataFrame with the estimator output.
+        """
+        scope = current_scope.get()
+        if scope is not None:
+            return scope.estimate(
+                state,
+                method,
+                approximate,
+                kwargs,
+                lambda: self._run_estimate(db, state, method, approximate, kwargs),
+            )
+        return self._run_estimate(db, state, method, approximate, kwargs)
+
+    async def _estimate_async(
+        self, db, state: str, method: str, approximate: bool = False, **kwargs
+    ):
+        """_estimate() for async query methods.
+
+        A forwarded estimate waits on the owning worker over HTTP, so it runs
+        in a thread: blocking the event loop meanwhile would stop this worker
+        serving the peer's own forwarded estimates.
+        """
+        if isinstance(db, RoutedConnection):
+            return await asyncio.to_thread(
+                self._estimate, db, state, method, approximate=approximate, **kwargs
+            )
+        return self._estimate(db, state, method, approximate=approximate, **kwargs)
+
+    def _run_estimate(
+        self, db, state: str, method: str, approximate: bool, kwargs: dict
+    ):
+        if isinstance(db, (RoutedConnection, HedgedConnection)):
+            return db.estimate(method, kwargs, approximate=approximate)
+
+        if self.storage.tables_missing(getattr(db, "db_path", None), state, method):
+            # Table storage: the connection was opened over fewer tables
+            # than this estimator reads, so fetch them and reopen
+            tables = tables_for([method])
+            with self._open_connection(state, tables=tables, backend=LOCAL) as full_db:
+                return self._run_estimate(full_db, state, method, approximate, kwargs)
+
+        spec = dict(kwargs)
+        if approximate:
+            spec["_sample_fraction"] = self.approximate_fraction
+
+        def compute():
+            if approximate:
+                apply_stratified_subsample(db, self.approximate_fraction)
+            else:
+                restore_full_sample(db)
+            return getattr(db, method)(**kwargs)
+
+        key = self.result_store.make_key(
+            method, state, self._connection_source(db), db.evalid, spec
+        )
+        return self.result_store.get_or_compute(key, compute)
+
+    def _approximation_fields(self, approximate: bool) -> dict:
+        """Response fields describing whether an estimate was approximate."""
+        return {
+            "approximate": approximate,
+            "sample_fraction": self.approximate_fraction if approximate else None,
+        }
+
+    @staticmethod
+    def _rows(df: pd.DataFrame, tabular: bool = False) -> list[dict] | pa.Table:
+        """A breakdown as a list of row dicts, or as an Arrow table.
+
+        Building row dicts is slow for large breakdowns; callers sending
+        columnar or streamed responses ask for the table instead.
+        """
+        if tabular:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        return df.to_dict("records")
+
+    def estimate_local(
+        self, state: str, method: str, params: dict, approximate: bool = False
+    ):
+        """Run an estimator for a state on this worker, bypassing routing.
+
+        Serves estimates forwarded by other workers, and is the fallback when
+        a state's owner is down.
+        """
+        with self._open_connection(state) as db:
+            return self._estimate(
+                db, state.upper(), method, approximate=approximate, **params
+            )
+
+    def _missing_tables(self, db, state: str, tables: list[str]) -> list[str]:
+        """Tables a connection lacks, of those an estimator reads.
+
+        A routed connection reports none: the owning worker checks, and its
+        estimator error for a missing table is reported like any other. A
+        table storage view only lacks unpublished tables, since estimates
+        on it fetch the rest.
+        """
+        if isinstance(db, RoutedConnection):
+            return []
+        unpublished = self.storage.unpublished_tables(
+            getattr(db, "db_path", None), state, tables
+        )
+        if unpublished is not None:
+            return unpublished
+        backend = getattr(getattr(db, "_reader", None), "_backend", None)
+        missing = []
+        for table in tables:
+            if hasattr(backend, "table_exists"):
+                if not backend.table_exists(table):
+                    missing.append(table)
+                continue
+            # Fallback: try to load table and catch error
+            try:
+                if table not in db.tables:
+                    db.load_table(table)
+            except Exception:
+                missing.append(table)
+        return missing
+
+    async def ensure_states(self, states: list[str]) -> None:
+        """Wait for local database files without blocking the event loop.
+
+        Query methods call this before opening connections so a state that
+        is still downloading (e.g. queued for preload) is awaited here
+        instead of inside a blocking get_db_path(). Failures are left for
+        the connection code to report.
+        """
+        if self._motherduck_token:
+            return
+        local = [s.upper() for s in states if self.state_router.is_local(s)]
+        await asyncio.gather(
+            *(self.storage.ensure(state) for state in local), return_exceptions=True
+        )
+
+    def data_version(self, states: list[str]) -> str | None:
+        """Identify the data queries over these states are answered from.
+
+        Built without opening a connection or running an estimator from:
+        the lake version when a multi-state query scans the lake; each
+        local state's EVALIDs and file or table version and, with
+        MotherDuck, the database serving it; and for states owned by
+        another worker, the version the owner last reported. Changes
+        whenever a state's evaluation, file, tables or lake partitions are
+        replaced.
+
+        Returns:
+            A version string, or None if a state's version is unknown (not
+            cached locally, in MotherDuck or the lake, or not yet reported
+            by its owner).
+        """
+        states = sorted({s.upper() for s in states})
+        parts: dict = {"sample_fraction": self.approximate_fraction}
+        lake_states: dict = {}
+        if self._use_lake(states):
+            manifest = self.parquet_lake.manifest()
+            parts["lake"] = manifest["version"]
+            lake_states = manifest["states"]
+        for state in states:
+            part = self._state_version(state)
+            if part is None:
+                if state not in lake_states:
+                    return None
+                # Only read from the lake, which is versioned as a whole
+                continue
+            parts[state] = part
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def _state_version(self, state: str) -> list | None:
+        """data_version() component of one state, or None if unknown."""
+        if not self.state_router.is_local(state):
+            version = self.state_router.remote_version(state)
+            return ["routed", version] if version else None
+
+        evalids = self.storage.local_evalids(state)
+        info = None
+        if self._motherduck_token:
+            info = self.motherduck_catalog.get(state)
+        if evalids is None and info is None:
+            return None
+        return [
+            evalids,
+            self.storage.local_version(state) if evalids is not None else None,
+            info.name if info else None,
+        ]
+
+    def _backends_for(self, state: str) -> list[str]:
+        """Backends holding the newest evaluation of a state.
+
+        Without MotherDuck this is always local storage. With it, a local
+        file counts only if already cached and at least as recent as the
+        MotherDuck database; local storage is the fallback when neither
+        has the state.
+        """
+        if not self._motherduck_token:
+            return [LOCAL]
+
+        info = self.motherduck_catalog.get(state)
+        evalids = self.storage.local_evalids(state)
+        # 0: cached, but without an annual evaluation to compare
+        local_year = (eval_year(evalids) or 0) if evalids is not None else None
+        backends = self.backend_router.eligible(
+            {LOCAL: local_year, MOTHERDUCK: info.eval_year if info else None}
+        )
+        return backends or [LOCAL]
+
+    def _estimate_on(
+        self, state: str, backend: str, method: str, params: dict, approximate: bool
+    ):
+        """Run an estimator on a fresh connection to one backend."""
+        with self._open_connection(state, backend=backend) as db:
+            return self._estimate(db, state, method, approximate=approximate, **params)
+
     @contextmanager
     def _get_fia_connection(self, state: str) -> Generator:
-        """Get FIA connection, preferring MotherDuck if configured."""
+        """Get a connection for a state, routed to its owning worker.
+
+        With state-affinity routing enabled, states owned by another worker
+        yield a RoutedConnection whose estimator calls run on the owner.
+        States current on both local storage and MotherDuck yield a
+        HedgedConnection whose estimates run on the faster backend, hedged
+        on the other when slow. Inside a batch, the connection is shared
+        with the batch's other queries for the state.
+        """
         state = state.upper()
+        scope = current_scope.get()
+        if scope is not None:
+            yield scope.connection(
+                ("state", (state,)), lambda: self._connect_state(state)
+            )
+            return
+        with self._connect_state(state) as db:
+            yield db
 
-        # Use MotherDuck if token is configured
-        if self._motherduck_token:
-            from pyfia import MotherDuckFIA
+    @contextmanager
+    def _connect_state(self, state: str) -> Generator:
+        if not self.state_router.is_local(state):
+            yield RoutedConnection(self.state_router, state, self.estimate_local)
+            return
+
+        backends = self._backends_for(state)
+        if len(backends) > 1:
+            hedged = HedgedConnection(
+                self.backend_router,
+                state,
+                backends,
+                estimate_on=lambda backend, method, params, approximate: (
+                    self._estimate_on(state, backend, method, params, approximate)
+                ),
+                connect=lambda backend: self._open_connection(state, backend=backend),
+            )
+            try:
+                yield hedged
+            finally:
+                hedged.close()
+            return
 
-            # Find the database for this state (supports eval year naming)
-            database = get_motherduck_database(state, self._motherduck_token)
+        with self._open_connection(state, backend=backends[0]) as db:
+            yield db
 
-            if database:
-                logger.info(f"Using MotherDuck for {state}: {database}")
-                with MotherDuckFIA(
-                    database, motherduck_token=self._motherduck_token
-                ) as db:
-                    db.clip_most_recent()
-                    yield db
-            else:
-                # State not found in MotherDuck, fall back to local storage
-                logger.warning(
-                    f"State {state} not found in MotherDuck, falling back to local storage"
-                )
-                from pyfia import FIA
+    @contextmanager
+    def _open_connection(
+        self,
+        state: str,
+        tables: tuple[str, ...] | None = None,
+        backend: str | None = None,
+        workload: str = INTERACTIVE,
+        warm: bool = False,
+    ) -> Generator:
+        """Open a local FIA connection on local storage or MotherDuck.
 
-                db_path = self._get_db_path(state)
-                with FIA(db_path) as db:
-                    db.clip_most_recent()
-                    yield db
+        Args:
+            state: State code.
+            tables: With table storage, the tables to fetch and expose
+                    (default: those of the area/volume/biomass/tpa estimators).
+            backend: LOCAL or MOTHERDUCK (default: the best-ranked backend
+                     holding the state's newest evaluation).
+            workload: Resource profile for the connection.
+            warm: The connection loads the hot tier rather than serving a
+                  query.
+        """
+        state = state.upper()
+        if backend is None:
+            backend = self.backend_router.rank(self._backends_for(state))[0]
+
+        # Find the database for this state (supports eval year naming)
+        info = self.motherduck_catalog.get(state) if backend == MOTHERDUCK else None
+
+        if info:
+            from pyfia import MotherDuckFIA
+
+            logger.info(
+                f"Using MotherDuck for {state}: {info.name} (eval {info.eval_year})"
+            )
+            with (
+                MotherDuckFIA(info.name, motherduck_token=self._motherduck_token) as db,
+                self.resources.apply(db, workload),
+            ):
+                self._prepare_connection(db, state, warm=warm)
+                yield db
         else:
-            # Fall back to local storage
             from pyfia import FIA
 
             logger.info(f"Using local storage for {state}")
-            db_path = self._get_db_path(state)
-            with FIA(db_path) as db:
-                db.clip_most_recent()
+            with (
+                self.storage.use(state, tables) as db_path,
+                FIA(db_path) as db,
+                self.resources.apply(db, workload),
+            ):
+                self._prepare_connection(db, state, warm=warm)
                 yield db
 
+    def _use_lake(self, states: list[str]) -> bool:
+        """Whether a multi-state query can run as one scan of the lake."""
+        scope = current_scope.get()
+        return (
+            self.parquet_lake is not None
+            and (scope is None or scope.use_lake)
+            and len(states) > 1
+            and self.parquet_lake.covers(states)
+        )
+
+    @contextmanager
+    def _open_lake_connection(self, states: list[str]) -> Generator:
+        """Open one pyFIA connection over the lake for a set of states.
+
+        The connection is clipped to each state's most recent evaluation,
+        and shared with a batch's other queries for the same states.
+        """
+        scope = current_scope.get()
+        if scope is not None:
+            yield scope.connection(
+                ("lake", tuple(states)), lambda: self._connect_lake(states)
+            )
+            return
+        with self._connect_lake(states) as db:
+            yield db
+
+    @contextmanager
+    def _connect_lake(self, states: list[str]) -> Generator:
+        from pyfia import FIA
+
+        path = self.parquet_lake.view_db(states)
+        logger.info(f"Using Parquet lake for {','.join(states)}")
+        with FIA(str(path)) as db, self.resources.apply(db, BATCH):
+            db.clip_most_recent()
+            self.strat_cache.inject(db, self._connection_source(db))
+            yield db
+
+    def _estimate_lake(
+        self, states: list[str], method: str, approximate: bool, **kwargs
+    ) -> list[pd.DataFrame]:
+        """Estimate all states in one lake scan, grouped by STATECD."""
+        from pyfia.downloader import STATE_FIPS_CODES
+
+        grp_by = kwargs.get("grp_by")
+        requested = [grp_by] if isinstance(grp_by, str) else list(grp_by or [])
+        kwargs["grp_by"] = ["STATECD", *(c for c in requested if c != "STATECD")]
+
+        with self._open_lake_connection(states) as db:
+            result_df = self._estimate(
+                db, ",".join(states), method, approximate=approximate, **kwargs
+            )
+        df = result_df.to_pandas() if hasattr(result_df, "to_pandas") else result_df
+
+        frames = []
+        for state in states:
+            state_df = df[df["STATECD"] == STATE_FIPS_CODES[state]].copy()
+            if "STATECD" not in requested:
+                state_df = state_df.drop(columns="STATECD")
+            state_df["STATE"] = state
+            frames.append(state_df.reset_index(drop=True))
+        return frames
+
+    async def _estimate_states(
+        self, states: list[str], method: str, approximate: bool = False, **kwargs
+    ) -> list[pd.DataFrame]:
+        """Run an estimator for each state.
+
+        With a Parquet lake covering every state, all states are estimated
+        in one scan grouped by STATECD; otherwise each state database is
+        opened in turn. Inside a batch, states whose estimate the scope
+        already holds are not opened at all.
+
+        Returns:
+            One DataFrame per state, with a STATE column.
+        """
+        states = [state.upper() for state in states]
+        if self._use_lake(states):
+            try:
+                return self._estimate_lake(states, method, approximate, **kwargs)
+            except Exception as e:
+                logger.warning(
+                    f"Lake {method} estimate failed for {','.join(states)}, "
+                    f"querying states separately: {e}"
+                )
+
+        scope = current_scope.get()
+        shared = {
+            state: scope.shared_estimate(state, method, approximate, kwargs)
+            if scope is not None
+            else None
+            for state in states
+        }
+        results = []
+        await self.ensure_states([s for s in states if shared[s] is None])
+        for state in states:
+            result_df = shared[state]
+            if result_df is None:
+                with self._get_fia_connection(state) as db:
+                    result_df = await self._estimate_async(
+                        db, state, method, approximate=approximate, **kwargs
+                    )
+            df = result_df.to_pandas() if hasattr(result_df, "to_pandas") else result_df
+            df["STATE"] = state
+            results.append(df)
+        return results
+
     async def query_area(
         self,
         states: list[str],
         land_type: str = "forest",
         grp_by: list[str] | str | None = None,
         cond_domain: str | None = None,
+        approximate: bool = False,
+        tabular: bool = False,
     ) -> dict:
         """Query forest area across states.
 
@@ -252,26 +718,18 @@ class FIAService:
             grp_by: Column(s) to group by
             cond_domain: Filter expression for condition-level attributes
                          (e.g., 'FORTYPCD == 141' for loblolly pine)
+            approximate: Estimate from a stratified subsample of plots
+                         (faster, larger SE)
+            tabular: Return the breakdown as an Arrow table instead of rows
         """
-        results = []
-
-        for state in states:
-            state = state.upper()
-
-            with self._get_fia_connection(state) as db:
-                # Use db.area() method which uses server-side aggregation for MotherDuck
-                # This avoids loading full tables into memory
-                kwargs = {"land_type": land_type, "grp_by": grp_by}
-                if cond_domain:
-                    kwargs["cond_domain"] = cond_domain
-                result_df = db.area(**kwargs)
-                df = (
-                    result_df.to_pandas()
-                    if hasattr(result_df, "to_pandas")
-                    else result_df
-                )
-                df["STATE"] = state
-                results.append(df)
+        # Use db.area() method which uses server-side aggregation for MotherDuck
+        # This avoids loading full tables into memory
+        kwargs = {"land_type": land_type, "grp_by": grp_by}
+        if cond_domain:
+            kwargs["cond_domain"] = cond_domain
+        results = await self._estimate_states(
+            states, "area", approximate=approximate, **kwargs
+        )
 
         combined = pd.concat(results, ignore_index=True)
 
@@ -291,7 +749,8 @@ class FIAService:
             "land_type": land_type,
             "total_area_acres": total_area,
             "se_percent": se_pct,
-            "breakdown": combined.to_dict("records") if grp_by else None,
+            "breakdown": self._rows(combined, tabular) if grp_by else None,
+            **self._approximation_fields(approximate),
             "source": "USDA Forest Service FIA (pyFIA validated)",
         }
 
@@ -300,29 +759,23 @@ class FIAService:
         states: list[str],
         by_species: bool = False,
         tree_domain: str | None = None,
+        approximate: bool = False,
+        tabular: bool = False,
     ) -> dict:
-        """Query timber volume across states."""
-        results = []
-
-        for state in states:
-            state = state.upper()
+        """Query timber volume across states.
 
-            with self._get_fia_connection(state) as db:
-                kwargs = {}
-                if by_species:
-                    kwargs["grp_by"] = "SPCD"
-                if tree_domain:
-                    kwargs["tree_domain"] = tree_domain
+        With tabular=True the species breakdown is an Arrow table.
+        """
+        kwargs = {}
+        if by_species:
+            kwargs["grp_by"] = "SPCD"
+        if tree_domain:
+            kwargs["tree_domain"] = tree_domain
 
-                # Use db.volume() method which handles MotherDuck type compatibility
-                result_df = db.volume(**kwargs)
-                df = (
-                    result_df.to_pandas()
-                    if hasattr(result_df, "to_pandas")
-                    else result_df
-                )
-                df["STATE"] = state
-                results.append(df)
+        # Use db.volume() method which handles MotherDuck type compatibility
+        results = await self._estimate_states(
+            states, "volume", approximate=approximate, **kwargs
+        )
 
         combined = pd.concat(results, ignore_index=True)
 
@@ -344,7 +797,7 @@ class FIAService:
             # Rename estimate column to ESTIMATE for consistent agent access
             if est_col != "ESTIMATE":
                 species_df = species_df.rename(columns={est_col: "ESTIMATE"})
-            by_species_data = species_df.to_dict("records")
+            by_species_data = self._rows(species_df, tabular)
 
         return {
             "states": states,
@@ -352,6 +805,7 @@ class FIAService:
             "total_volume_billion_cuft": total_vol / 1e9,
             "se_percent": se_pct,
             "by_species": by_species_data,
+            **self._approximation_fields(approximate),
             "source": "USDA Forest Service FIA (pyFIA validated)",
         }
 
@@ -360,27 +814,21 @@ class FIAService:
         states: list[str],
         land_type: str = "forest",
         by_species: bool = False,
+        approximate: bool = False,
+        tabular: bool = False,
     ) -> dict:
-        """Query biomass and carbon stocks."""
-        results = []
+        """Query biomass and carbon stocks.
 
-        for state in states:
-            state = state.upper()
-
-            with self._get_fia_connection(state) as db:
-                kwargs = {"land_type": land_type, "variance": True}
-                if by_species:
-                    kwargs["grp_by"] = "SPCD"
+        With tabular=True the species breakdown is an Arrow table.
+        """
+        kwargs = {"land_type": land_type, "variance": True}
+        if by_species:
+            kwargs["grp_by"] = "SPCD"
 
-                # Use db.biomass() method which handles MotherDuck type compatibility
-                result_df = db.biomass(**kwargs)
-                df = (
-                    result_df.to_pandas()
-                    if hasattr(result_df, "to_pandas")
-                    else result_df
-                )
-                df["STATE"] = state
-                results.append(df)
+        # Use db.biomass() method which handles MotherDuck type compatibility
+        results = await self._estimate_states(
+            states, "biomass", approximate=approximate, **kwargs
+        )
 
         combined = pd.concat(results, ignore_index=True)
 
@@ -412,7 +860,7 @@ class FIAService:
             # Rename estimate column to ESTIMATE for consistent agent access
             if "BIO_TOTAL" in species_df.columns:
                 species_df = species_df.rename(columns={"BIO_TOTAL": "ESTIMATE"})
-            by_species_data = species_df.to_dict("records")
+            by_species_data = self._rows(species_df, tabular)
 
         return {
             "states": states,
@@ -421,6 +869,7 @@ class FIAService:
             "carbon_mmt": total_carbon / 1e6,  # Convert to million metric tons
             "se_percent": se_pct,
             "by_species": by_species_data,
+            **self._approximation_fields(approximate),
             "source": "USDA Forest Service FIA (pyFIA validated)",
         }
 
@@ -432,35 +881,29 @@ class FIAService:
         tree_domain: str | None = None,
         land_type: str = "forest",
         tree_type: str = "live",
+        approximate: bool = False,
+        tabular: bool = False,
     ) -> dict:
-        """Query trees per acre with optional grouping and filtering."""
-        results = []
+        """Query trees per acre with optional grouping and filtering.
 
-        for state in states:
-            state = state.upper()
-
-            with self._get_fia_connection(state) as db:
-                kwargs = {
-                    "land_type": land_type,
-                    "tree_type": tree_type,
-                }
-
-                if by_species:
-                    kwargs["by_species"] = True
-                if by_size_class:
-                    kwargs["by_size_class"] = True
-                if tree_domain:
-                    kwargs["tree_domain"] = tree_domain
+        With tabular=True the breakdowns are Arrow tables.
+        """
+        kwargs = {
+            "land_type": land_type,
+            "tree_type": tree_type,
+        }
 
-                # Use db.tpa() method which handles MotherDuck type compatibility
-                result_df = db.tpa(**kwargs)
-                df = (
-                    result_df.to_pandas()
-                    if hasattr(result_df, "to_pandas")
-                    else result_df
-                )
-                df["STATE"] = state
-                results.append(df)
+        if by_species:
+            kwargs["by_species"] = True
+        if by_size_class:
+            kwargs["by_size_class"] = True
+        if tree_domain:
+            kwargs["tree_domain"] = tree_domain
+
+        # Use db.tpa() method which handles MotherDuck type compatibility
+        results = await self._estimate_states(
+            states, "tpa", approximate=approximate, **kwargs
+        )
 
         combined = pd.concat(results, ignore_index=True)
 
@@ -483,7 +926,7 @@ class FIAService:
             # Rename estimate column to ESTIMATE for consistent agent access
             if est_col != "ESTIMATE":
                 grouped_df = grouped_df.rename(columns={est_col: "ESTIMATE"})
-            records = grouped_df.to_dict("records")
+            records = self._rows(grouped_df, tabular)
             if by_species:
                 by_species_data = records
             if by_size_class:
@@ -498,6 +941,7 @@ class FIAService:
             "se_percent": se_pct,
             "by_species": by_species_data,
             "by_size_class": by_size_class_data,
+            **self._approximation_fields(approximate),
             "source": "USDA Forest Service FIA (pyFIA validated)",
         }
 
@@ -511,6 +955,7 @@ class FIAService:
         results = []
         missing_grm_states = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -518,17 +963,7 @@ class FIAService:
                 # Check if required GRM tables exist
                 required_tables = ["TREE_GRM_COMPONENT", "TREE_GRM_MIDPT"]
 
-                missing_tables = []
-                for table in required_tables:
-                    if hasattr(db._reader._backend, "table_exists"):
-                        if not db._reader._backend.table_exists(table):
-                            missing_tables.append(table)
-                    else:
-                        try:
-                            if table not in db.tables:
-                                db.load_table(table)
-                        except Exception:
-                            missing_tables.append(table)
+                missing_tables = self._missing_tables(db, state, required_tables)
 
                 if missing_tables:
                     logger.warning(
@@ -546,7 +981,9 @@ class FIAService:
 
                 try:
                     # Use db.mortality() method which handles MotherDuck type compatibility
-                    result_df = db.mortality(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "mortality", **kwargs
+                    )
                     df = (
                         result_df.to_pandas()
                         if hasattr(result_df, "to_pandas")
@@ -621,6 +1058,7 @@ class FIAService:
         """Query timber removals (harvest) across states."""
         results = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -632,7 +1070,7 @@ class FIAService:
                     kwargs["tree_domain"] = tree_domain
 
                 # Use db.removals() method which handles MotherDuck type compatibility
-                result_df = db.removals(**kwargs)
+                result_df = await self._estimate_async(db, state, "removals", **kwargs)
                 df = (
                     result_df.to_pandas()
                     if hasattr(result_df, "to_pandas")
@@ -680,6 +1118,7 @@ class FIAService:
         results = []
         missing_grm_states = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -693,18 +1132,7 @@ class FIAService:
                     "BEGINEND",
                 ]
 
-                missing_tables = []
-                for table in required_tables:
-                    if hasattr(db._reader._backend, "table_exists"):
-                        if not db._reader._backend.table_exists(table):
-                            missing_tables.append(table)
-                    else:
-                        # Fallback: try to load table and catch error
-                        try:
-                            if table not in db.tables:
-                                db.load_table(table)
-                        except Exception:
-                            missing_tables.append(table)
+                missing_tables = self._missing_tables(db, state, required_tables)
 
                 if missing_tables:
                     logger.warning(
@@ -726,7 +1154,9 @@ class FIAService:
 
                 try:
                     # Use db.growth() method which handles MotherDuck type compatibility
-                    result_df = db.growth(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "growth", **kwargs
+                    )
                     df = (
                         result_df.to_pandas()
                         if hasattr(result_df, "to_pandas")
@@ -832,6 +1262,7 @@ class FIAService:
         """Query forest area change across states."""
         results = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -846,7 +1277,9 @@ class FIAService:
                     kwargs["grp_by"] = grp_by
 
                 # Use db.area_change() method which handles MotherDuck type compatibility
-                result_df = db.area_change(**kwargs)
+                result_df = await self._estimate_async(
+                    db, state, "area_change", **kwargs
+                )
                 df = (
                     result_df.to_pandas()
                     if hasattr(result_df, "to_pandas")
@@ -908,6 +1341,7 @@ class FIAService:
 
         results = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -922,13 +1356,17 @@ class FIAService:
 
                 # Use db methods which handle MotherDuck type compatibility
                 if metric == "area":
-                    result_df = db.area(**kwargs)
+                    result_df = await self._estimate_async(db, state, "area", **kwargs)
                 elif metric == "volume":
-                    result_df = db.volume(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "volume", **kwargs
+                    )
                 elif metric == "biomass":
-                    result_df = db.biomass(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "biomass", **kwargs
+                    )
                 elif metric == "tpa":
-                    result_df = db.tpa(**kwargs)
+                    result_df = await self._estimate_async(db, state, "tpa", **kwargs)
                 else:
                     raise ValueError(f"Unknown metric: {metric}")
 
@@ -996,6 +1434,7 @@ class FIAService:
 
         results = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -1010,11 +1449,15 @@ class FIAService:
 
                 # Use db methods which handle MotherDuck type compatibility
                 if metric == "area":
-                    result_df = db.area(**kwargs)
+                    result_df = await self._estimate_async(db, state, "area", **kwargs)
                 elif metric == "volume":
-                    result_df = db.volume(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "volume", **kwargs
+                    )
                 elif metric == "biomass":
-                    result_df = db.biomass(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "biomass", **kwargs
+                    )
                 else:
                     raise ValueError(f"Unknown metric: {metric}")
 
@@ -1124,6 +1567,7 @@ class FIAService:
 
         results = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
             try:
@@ -1137,17 +1581,29 @@ class FIAService:
 
                     # Use db methods which handle MotherDuck type compatibility
                     if metric == "area":
-                        result_df = db.area(**kwargs)
+                        result_df = await self._estimate_async(
+                            db, state, "area", **kwargs
+                        )
                     elif metric == "volume":
-                        result_df = db.volume(**kwargs)
+                        result_df = await self._estimate_async(
+                            db, state, "volume", **kwargs
+                        )
                     elif metric == "biomass":
-                        result_df = db.biomass(**kwargs)
+                        result_df = await self._estimate_async(
+                            db, state, "biomass", **kwargs
+                        )
                     elif metric == "tpa":
-                        result_df = db.tpa(**kwargs)
+                        result_df = await self._estimate_async(
+                            db, state, "tpa", **kwargs
+                        )
                     elif metric == "mortality":
-                        result_df = db.mortality(**kwargs)
+                        result_df = await self._estimate_async(
+                            db, state, "mortality", **kwargs
+                        )
                     elif metric == "growth":
-                        result_df = db.growth(**kwargs)
+                        result_df = await self._estimate_async(
+                            db, state, "growth", **kwargs
+                        )
                     else:
                         raise ValueError(f"Unknown metric: {metric}")
 
@@ -1228,6 +1684,7 @@ class FIAService:
 
         results = []
 
+        await self.ensure_states(states)
         for state in states:
             state = state.upper()
 
@@ -1242,13 +1699,17 @@ class FIAService:
 
                 # Execute the appropriate query
                 if metric == "area":
-                    result_df = db.area(**kwargs)
+                    result_df = await self._estimate_async(db, state, "area", **kwargs)
                 elif metric == "volume":
-                    result_df = db.volume(**kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "volume", **kwargs
+                    )
                 elif metric == "biomass":
-                    result_df = db.biomass(variance=True, **kwargs)
+                    result_df = await self._estimate_async(
+                        db, state, "biomass", variance=True, **kwargs
+                    )
                 elif metric == "tpa":
-                    result_df = db.tpa(**kwargs)
+                    result_df = await self._estimate_async(db, state, "tpa", **kwargs)
 
                 df = (
                     result_df.to_pandas()
@@ -1339,6 +1800,7 @@ class FIAService:
         if metric not in valid_metrics:
             raise ValueError(f"Unknown metric: {metric}. Available: {valid_metrics}")
 
+        await self.ensure_states([state])
         with self._get_fia_connection(state) as db:
             # Use plot_domain to filter by COUNTYCD (PLOT-level attribute)
             plot_domain = f"COUNTYCD == {county_fips}"
@@ -1367,13 +1829,13 @@ class FIAService:
 
             # Execute query with plot_domain filter
             if metric == "area":
-                result_df = db.area(**kwargs)
+                result_df = await self._estimate_async(db, state, "area", **kwargs)
             elif metric == "volume":
-                result_df = db.volume(**kwargs)
+                result_df = await self._estimate_async(db, state, "volume", **kwargs)
             elif metric == "biomass":
-                result_df = db.biomass(**kwargs)
+                result_df = await self._estimate_async(db, state, "biomass", **kwargs)
             elif metric == "tpa":
-                result_df = db.tpa(**kwargs)
+                result_df = await self._estimate_async(db, state, "tpa", **kwargs)
             else:
                 raise ValueError(f"Unknown metric: {metric}")
 
@@ -1541,9 +2003,12 @@ class FIAService:
             if state is not None:
                 state = state.upper()
 
+                await self.ensure_states([state])
                 with self._get_fia_connection(state) as db:
                     # Query volume by species for the state
-                    volume_df = db.volume(grp_by="SPCD")
+                    volume_df = await self._estimate_async(
+                        db, state, "volume", grp_by="SPCD"
+                    )
                     vol_pd = (
                         volume_df.to_pandas()
                         if hasattr(volume_df, "to_pandas")
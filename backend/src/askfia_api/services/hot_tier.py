@@ -0,0 +1,364 @@
+"""In-memory hot tier for the busiest states.
+
+Local DuckDB files are read through the buffer manager on every query and
+MotherDuck queries pay network round trips. For a small "hot set" of states
+this module keeps the core estimation tables (PLOT, COND, a projection of
+TREE, and the POP_* stratification tables) resident as Arrow tables and
+injects them into each new pyFIA connection for that state.
+
+The hot set comes from configuration (HOT_STATES, defaulting to
+PRELOAD_STATES) plus states learned from usage, and is bounded by a memory
+budget; the least-used state is evicted when a new one does not fit.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import polars as pl
+import pyarrow as pa
+
+from .strat_cache import STRATIFICATION_TABLES
+
+logger = logging.getLogger(__name__)
+
+# TREE columns read by the estimators FIAService calls (area, volume,
+# biomass, TPA, growth, mortality, removals) and common tree_domain filters.
+# pyFIA reloads TREE from the database if an estimator needs anything else.
+TREE_COLUMNS = [
+    "CN",
+    "PLT_CN",
+    "CONDID",
+    "SUBP",
+    "TREE",
+    "INVYR",
+    "STATECD",
+    "STATUSCD",
+    "SPCD",
+    "SPGRPCD",
+    "DIA",
+    "HT",
+    "ACTUALHT",
+    "CCLCD",
+    "TREECLCD",
+    "AGENTCD",
+    "TPA_UNADJ",
+    "VOLCFNET",
+    "VOLCFGRS",
+    "VOLCSNET",
+    "VOLCSGRS",
+    "VOLBFNET",
+    "VOLBFGRS",
+    "DRYBIO_AG",
+    "DRYBIO_BG",
+    "DRYBIO_BOLE",
+    "DRYBIO_STUMP",
+    "DRYBIO_FOLIAGE",
+    "CARBON_AG",
+    "CARBON_BG",
+]
+
+# Tables kept resident per hot state (None = all columns)
+HOT_TABLES: dict[str, list[str] | None] = {
+    "PLOT": None,
+    "COND": None,
+    "TREE": TREE_COLUMNS,
+    **{table: None for table in STRATIFICATION_TABLES},
+}
+
+
+@dataclass
+class HotState:
+    """Resident tables for one state.
+
+    Attributes:
+        state: State code (uppercase)
+        source: Identifier of the database the tables were read from
+        evalid: EVALIDs the tables are filtered to
+        tables: Arrow tables keyed by FIA table name
+        hits: Number of connections served from memory
+        last_used: Monotonic timestamp of the last injection
+    """
+
+    state: str
+    source: str
+    evalid: tuple[int, ...]
+    tables: dict[str, pa.Table]
+    hits: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def nbytes(self) -> int:
+        """In-memory size of the resident tables."""
+        return sum(table.nbytes for table in self.tables.values())
+
+
+class HotStateTier:
+    """Memory-budgeted store of core FIA tables for the busiest states.
+
+    Example:
+        >>> with fia_service._get_fia_connection("NC") as db:
+        ...     hot_tier.load("NC", db, source)
+        >>> # Later connections for NC read PLOT/COND/TREE/POP_* from memory
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: float = 0.0,
+        configured_states: list[str] | None = None,
+        max_learned_states: int = 0,
+    ):
+        """Initialize the tier.
+
+        Args:
+            memory_budget_mb: Total memory for resident tables. Zero disables.
+            configured_states: States to load at startup.
+            max_learned_states: How many of the most-queried states to add
+                               to the hot set on top of configured states.
+        """
+        self.memory_budget_bytes = memory_budget_mb * 1e6
+        self.configured_states = [s.upper() for s in configured_states or []]
+        self.max_learned_states = max_learned_states
+        self._states: dict[str, HotState] = {}
+        self._usage: Counter[str] = Counter()
+        # state -> (source, evalid, bytes) of loads that did not fit
+        self._rejected: dict[str, tuple[str, tuple[int, ...], int]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Check if the hot tier is enabled."""
+        return self.memory_budget_bytes > 0
+
+    @property
+    def used_bytes(self) -> int:
+        """Memory used by resident tables."""
+        with self._lock:
+            return sum(hot.nbytes for hot in self._states.values())
+
+    def is_hot(self, state: str) -> bool:
+        """Check if a state is resident."""
+        return state.upper() in self._states
+
+    def record_access(self, state: str) -> None:
+        """Count a query for a state, used to learn the hot set."""
+        if self.enabled:
+            with self._lock:
+                self._usage[state.upper()] += 1
+
+    def candidates(self) -> list[str]:
+        """States that should be resident: configured first, then most used."""
+        states = list(self.configured_states)
+        if self.max_learned_states > 0:
+            with self._lock:
+                learned = [
+                    state
+                    for state, _ in self._usage.most_common()
+                    if state not in states
+                ]
+            states.extend(learned[: self.max_learned_states])
+        return states
+
+    def missing_candidates(self) -> list[str]:
+        """Candidate states that are not resident yet.
+
+        States whose last load was rejected are left out until they would
+        fit, so they are not read again on every query.
+        """
+        missing = []
+        for state in self.candidates():
+            if self.is_hot(state):
+                continue
+            with self._lock:
+                rejected = self._rejected.get(state)
+                if rejected and not self._fits(state, rejected[2]):
+                    continue
+            missing.append(state)
+        return missing
+
+    def load(self, state: str, db: Any, source: str) -> bool:
+        """Read a state's core tables from a clipped connection into memory.
+
+        Args:
+            state: State code.
+            db: pyFIA connection after clip_most_recent().
+            source: Identifier of the underlying database.
+
+        Returns:
+            True if the state is resident afterwards.
+        """
+        if not self.enabled or not getattr(db, "evalid", None):
+            return False
+
+        state = state.upper()
+        evalid = tuple(sorted(int(e) for e in db.evalid))
+
+        with self._lock:
+            current = self._states.get(state)
+            if current and current.source == source and current.evalid == evalid:
+                return True
+            rejected = self._rejected.get(state)
+            if (
+                rejected
+                and rejected[:2] == (source, evalid)
+                and not self._fits(state, rejected[2])
+            ):
+                return False
+
+        start = time.monotonic()
+        tables: dict[str, pa.Table] = {}
+        evalid_str = ", ".join(str(e) for e in evalid)
+
+        for table_name, columns in HOT_TABLES.items():
+            if table_name in STRATIFICATION_TABLES:
+                df = db._reader.read_table(
+                    table_name, where=f"EVALID IN ({evalid_str})", lazy=False
+                )
+            else:
+                if columns is not None:
+                    available = set(db._reader.get_table_schema(table_name))
+                    columns = [c for c in columns if c in available]
+                # load_table applies pyFIA's EVALID plot filter
+                df = db.load_table(table_name, columns=columns).collect()
+            tables[table_name] = df.to_arrow()
+
+        hot = HotState(state=state, source=source, evalid=evalid, tables=tables)
+        if not self._admit(hot):
+            return False
+
+        logger.info(
+            f"Hot tier loaded {state} ({hot.nbytes / 1e6:.1f} MB) "
+            f"in {time.monotonic() - start:.1f}s"
+        )
+        return True
+
+    def inject(self, db: Any, state: str, source: str) -> bool:
+        """Serve a connection's core tables from memory if the state is hot.
+
+        Tables are only injected when they were read from the same database
+        and EVALID the connection is clipped to.
+
+        Returns:
+            True if tables were injected.
+        """
+        if not self.enabled:
+            return False
+
+        state = state.upper()
+        with self._lock:
+            hot = self._states.get(state)
+            if hot is None:
+                return False
+            evalid = tuple(sorted(int(e) for e in db.evalid or []))
+            if hot.source != source or hot.evalid != evalid:
+                return False
+            hot.hits += 1
+            hot.last_used = time.monotonic()
+
+        for table_name, table in hot.tables.items():
+            db.tables[table_name] = pl.from_arrow(table).lazy()
+        return True
+
+    def evict(self, state: str) -> bool:
+        """Drop a state from memory."""
+        with self._lock:
+            self._rejected.pop(state.upper(), None)
+            return self._states.pop(state.upper(), None) is not None
+
+    def stats(self) -> dict:
+        """Get tier statistics."""
+        with self._lock:
+            states = [
+                {
+                    "state": hot.state,
+                    "source": hot.source,
+                    "evalid": list(hot.evalid),
+                    "size_mb": hot.nbytes / 1e6,
+                    "hits": hot.hits,
+                }
+                for hot in self._states.values()
+            ]
+            usage = dict(self._usage.most_common(10))
+        return {
+            "enabled": self.enabled,
+            "memory_budget_mb": self.memory_budget_bytes / 1e6,
+            "used_mb": sum(s["size_mb"] for s in states),
+            "states": states,
+            "top_usage": usage,
+        }
+
+    def _priority(self, state: str) -> tuple[int, int]:
+        """Residency rank: configured states in order, then by query count."""
+        if state in self.configured_states:
+            return (1, -self.configured_states.index(state))
+        return (0, self._usage[state])
+
+    def _fits(self, state: str, size: int) -> bool:
+        """Check if a state fits beside the residents it may not evict.
+
+        Caller must hold the lock.
+        """
+        priority = self._priority(state)
+        kept = sum(
+            hot.nbytes
+            for hot in self._states.values()
+            if hot.state != state and self._priority(hot.state) >= priority
+        )
+        return kept + size <= self.memory_budget_bytes
+
+    def _admit(self, hot: HotState) -> bool:
+        """Insert a state, evicting lower-ranked states to fit the budget.
+
+        A state only evicts residents ranked below it, so two states that do
+        not fit together don't evict each other on alternate queries. A
+        state that doesn't fit is remembered by source and EVALID and not
+        loaded again until it would.
+        """
+        size = hot.nbytes
+        with self._lock:
+            if not self._fits(hot.state, size):
+                self._rejected[hot.state] = (hot.source, hot.evalid, size)
+                logger.warning(
+                    f"Hot tier: {hot.state} ({size / 1e6:.1f} MB) does not fit "
+                    f"the {self.memory_budget_bytes / 1e6:.0f} MB budget, "
+                    "not loading"
+                )
+                return False
+
+            self._rejected.pop(hot.state, None)
+            self._states.pop(hot.state, None)
+            used = sum(h.nbytes for h in self._states.values())
+
+            while used + size > self.memory_budget_bytes and self._states:
+                victim = min(
+                    self._states.values(),
+                    key=lambda h: (self._priority(h.state), h.hits, h.last_used),
+                )
+                del self._states[victim.state]
+                used -= victim.nbytes
+                logger.info(
+                    f"Hot tier evicted {victim.state} ({victim.nbytes / 1e6:.1f} MB)"
+                )
+
+            self._states[hot.state] = hot
+        return True
+
+
+def get_hot_tier() -> HotStateTier:
+    """Get the configured HotStateTier instance."""
+    from ..config import settings
+
+    return HotStateTier(
+        memory_budget_mb=settings.hot_tier_memory_mb,
+        configured_states=settings.hot_states_list,
+        max_learned_states=settings.hot_tier_learned_states,
+    )
+
+
+# Singleton instance
+hot_tier = get_hot_tier()
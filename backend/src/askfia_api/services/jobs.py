@@ -0,0 +1,489 @@
+"""Async jobs for long-running FIA queries.
+
+A 50-state by-species volume query can run for minutes, longer than the
+proxies in front of the API (Render, Netlify) keep a request open. A job
+runs a query spec (a query type and the parameters of its
+/api/v1/query endpoint) in the background instead:
+
+- Submitting returns a job ID at once. An identical spec submitted while
+  a job for it is queued, running, or has an unexpired result gets that
+  job instead of a new one, as long as the data it is answered from has
+  not changed since.
+- Jobs run on a pool of worker threads shared with exports, each job with
+  its own event loop, so running jobs never block the API's event loop.
+  Each runner caps how many of its records run at once.
+- A multi-state area/volume/biomass/TPA job estimates one state at a time
+  and publishes each state's result as a partial result; the final
+  result is combined from the same per-state estimates (kept in a
+  SharedScope), without reopening any state.
+- Jobs are JSON files in a local job store shared by all API processes
+  on the host, so any process can report on any job. Finished jobs
+  expire after a TTL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .batch_query import SharedScope
+from .s3_download import exclusive_file_lock
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Query types whose multi-state jobs publish a partial result per state
+PER_STATE_TYPES = ("area", "volume", "biomass", "tpa")
+
+
+def spec_key(
+    query_type: str, params: dict[str, Any], data_version: str | None = None
+) -> str:
+    """Key identical submissions share; with a data version, on that data only."""
+    spec = [query_type, params]
+    if data_version is not None:
+        spec.append(data_version)
+    return json.dumps(spec, sort_keys=True, default=str)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start(pid: int) -> str:
+    """Start time of a process in clock ticks since boot, or "" if unknown."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return ""
+    # Field 22; fields are counted from after the parenthesized command
+    return stat.rsplit(")", 1)[1].split()[19]
+
+
+def process_token(pid: int | None = None) -> str:
+    """Identifies a process across PID reuse: "{pid}:{start time}".
+
+    A container restarted on a persisted volume runs the API as the same
+    PID (often 1), so a bare PID cannot tell a job's owner from its
+    successor.
+    """
+    pid = os.getpid() if pid is None else pid
+    return f"{pid}:{_process_start(pid)}"
+
+
+def owner_running(owner: str | int) -> bool:
+    """Whether the process a job's owner token names is still running."""
+    pid, _, start = str(owner).partition(":")
+    if not pid.isdigit() or not _pid_alive(int(pid)):
+        return False
+    return _process_start(int(pid)) == start
+
+
+_shared_pool: ThreadPoolExecutor | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool() -> ThreadPoolExecutor:
+    """The worker threads query jobs and exports share.
+
+    Sized for both at their configured concurrency, so neither waits on
+    the other for a thread.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            from ..config import settings
+
+            workers = settings.job_max_concurrency + settings.export_max_concurrency
+            _shared_pool = ThreadPoolExecutor(
+                max_workers=max(2, workers), thread_name_prefix="job"
+            )
+        return _shared_pool
+
+
+@dataclass
+class Job:
+    """A submitted query and its progress.
+
+    Attributes:
+        id: Job ID
+        query_type: Query type (e.g. "volume")
+        params: Validated query parameters
+        key: Spec key identical submissions share
+        status: queued, running, succeeded or failed
+        owner: Token (see process_token) of the process running, or queued
+               to run, the job
+        progress: States done and total
+        partial: Per-state results published so far
+        result: Final result
+        error: Failure message
+    """
+
+    id: str
+    query_type: str
+    params: dict[str, Any]
+    key: str
+    status: str = QUEUED
+    owner: str = ""
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    updated_at: float = field(default_factory=time.time)
+    progress: dict[str, int] = field(default_factory=lambda: {"done": 0, "total": 1})
+    partial: list[dict[str, Any]] = field(default_factory=list)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class JobStore:
+    """Jobs persisted as JSON files, shared by the processes on a host."""
+
+    def __init__(self, directory: str | Path, ttl: float = 3600.0, record: type = Job):
+        """
+        Args:
+            directory: Directory holding one {id}.json file per job.
+            ttl: Seconds a finished job is kept.
+            record: Dataclass the jobs are stored as (Job, or another with
+                    its id, key, status and finished_at fields).
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.record = record
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def lock(self):
+        """Exclusive lock for check-then-create sequences across processes."""
+        return exclusive_file_lock(self.directory / ".jobs.lock")
+
+    def save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        path = self._path(job.id)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(job.to_dict(), default=str))
+        os.replace(tmp, path)
+
+    def _expired(self, job: Job) -> bool:
+        return job.finished and time.time() - (job.finished_at or 0) > self.ttl
+
+    def _load(self, path: Path) -> Job | None:
+        try:
+            return self.record(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def get(self, job_id: str) -> Job | None:
+        """A job, or None if unknown or expired."""
+        if not job_id.isalnum():
+            return None
+        job = self._load(self._path(job_id))
+        if job is None or self._expired(job):
+            return None
+        return job
+
+    def jobs(self) -> Iterator[Job]:
+        """All unexpired jobs."""
+        for path in self.directory.glob("*.json"):
+            job = self._load(path)
+            if job is not None and not self._expired(job):
+                yield job
+
+    def find(self, key: str) -> Job | None:
+        """A queued, running or succeeded job for a spec, if any."""
+        for job in self.jobs():
+            if job.key == key and job.status != FAILED:
+                return job
+        return None
+
+    def purge(self) -> int:
+        """Delete expired jobs; returns how many were deleted."""
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            job = self._load(path)
+            if job is not None and self._expired(job):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class JobRunner:
+    """Runs records of a JobStore on the shared pool, a bounded number at once.
+
+    Holds what query jobs and exports share: deduplicated submission,
+    ownership, recovery of interrupted records and status bookkeeping.
+    Subclasses implement _perform() (and optionally _requeued() and
+    _failed()).
+    """
+
+    # Names the records in log messages
+    label = "Job"
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_concurrency: int,
+        pool: ThreadPoolExecutor | None = None,
+    ):
+        """
+        Args:
+            store: Store holding the records.
+            max_concurrency: Records of this runner running at once.
+            pool: Worker threads (default: shared_pool()).
+        """
+        self.store = store
+        self.max_concurrency = max(1, max_concurrency)
+        self._pool = pool or shared_pool()
+        self._active: set[str] = set()
+        self._waiting: deque[Any] = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.deduplicated = 0
+
+    def _submit(self, key: str, create: Callable[[], Any]) -> tuple[Any, bool]:
+        """Start a record made by create(), unless one already serves key."""
+        with self.store.lock():
+            existing = self.store.find(key)
+            if existing is not None and (
+                existing.status == SUCCEEDED or self._owner_alive(existing)
+            ):
+                self.deduplicated += 1
+                return existing, True
+            job = create()
+            job.owner = process_token()
+            self.store.save(job)
+        self.submitted += 1
+        self._start(job)
+        return job, False
+
+    def _owner_alive(self, job: Any) -> bool:
+        if job.owner == process_token():
+            with self._lock:
+                return job.id in self._active
+        return owner_running(job.owner)
+
+    def _start(self, job: Any) -> None:
+        with self._lock:
+            self._active.add(job.id)
+            if self._running >= self.max_concurrency:
+                self._waiting.append(job)
+                return
+            self._running += 1
+        self._pool.submit(self._execute, job)
+
+    def _next(self) -> None:
+        """Start the next waiting record in place of one that finished."""
+        with self._lock:
+            if not self._waiting:
+                self._running -= 1
+                return
+            job = self._waiting.popleft()
+        self._pool.submit(self._execute, job)
+
+    def recover(self) -> int:
+        """Requeue unfinished records whose process is gone (e.g. after a restart).
+
+        Returns:
+            Number of records requeued.
+        """
+        requeued = 0
+        self.store.purge()
+        with self.store.lock():
+            for job in self.store.jobs():
+                if job.finished or self._owner_alive(job):
+                    continue
+                job.status = QUEUED
+                job.owner = process_token()
+                self._requeued(job)
+                self.store.save(job)
+                self._start(job)
+                requeued += 1
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted {self.label.lower()}s")
+        return requeued
+
+    def _requeued(self, job: Any) -> None:
+        """Reset a recovered record's progress before it runs again."""
+
+    def _execute(self, job: Any) -> None:
+        """Run a record in a worker thread, recording its status in the store."""
+        job.status = RUNNING
+        job.started_at = time.time()
+        self.store.save(job)
+        try:
+            self._perform(job)
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.warning(f"{self.label} {job.id} failed: {e}")
+            job.status = FAILED
+            job.error = f"{type(e).__name__}: {e}"
+            self._failed(job)
+        finally:
+            job.finished_at = time.time()
+            self.store.save(job)
+            with self._lock:
+                self._active.discard(job.id)
+            self._next()
+
+    def _perform(self, job: Any) -> None:
+        raise NotImplementedError
+
+    def _failed(self, job: Any) -> None:
+        """Clean up after a failed record."""
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = len(self._active)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": active,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+        }
+
+
+class JobManager(JobRunner):
+    """Runs submitted query jobs on a bounded worker pool.
+
+    Example:
+        >>> job, deduplicated = job_manager.submit("volume", params)
+        >>> job = await job_manager.wait(job.id, timeout=20)
+        >>> job.status, job.progress
+        ('running', {'done': 12, 'total': 50})
+    """
+
+    label = "Query job"
+
+    def __init__(
+        self,
+        store: JobStore,
+        run: Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]],
+        max_concurrency: int = 2,
+        poll_interval: float = 0.5,
+        data_version: Callable[[list[str]], str | None] | None = None,
+    ):
+        """
+        Args:
+            store: Job store.
+            run: Runs a query spec (query type, parameters) and returns
+                 its response.
+            max_concurrency: Jobs running at once in this process.
+            poll_interval: Seconds between job store reads when waiting.
+            data_version: Version of the data for a list of states (see
+                          FIAService.data_version); a finished job is only
+                          reused while it is unchanged.
+        """
+        super().__init__(store, max_concurrency)
+        self._run = run
+        self.poll_interval = poll_interval
+        self._data_version = data_version
+
+    def submit(self, query_type: str, params: dict[str, Any]) -> tuple[Job, bool]:
+        """Queue a query spec, or return the job already serving it.
+
+        Args:
+            query_type: Query type.
+            params: Validated parameters (e.g. a request model's model_dump()).
+
+        Returns:
+            The job, and whether it was an existing job for the same spec.
+        """
+        version = None
+        if self._data_version is not None:
+            version = self._data_version(params.get("states") or [])
+        key = spec_key(query_type, params, version)
+        return self._submit(
+            key,
+            lambda: Job(
+                id=secrets.token_hex(8), query_type=query_type, params=params, key=key
+            ),
+        )
+
+    def _requeued(self, job: Job) -> None:
+        job.partial = []
+        job.progress = {"done": 0, "total": job.progress.get("total", 1)}
+
+    def _perform(self, job: Job) -> None:
+        job.result = asyncio.run(self._run_job(job))
+
+    async def _run_job(self, job: Job) -> dict[str, Any]:
+        states = job.params.get("states") or []
+        if job.query_type not in PER_STATE_TYPES or len(states) < 2:
+            return await self._run(job.query_type, job.params)
+
+        # Per-state estimates, each published as it finishes; the final
+        # result is combined from them in the scope, without opening a
+        # state again or scanning the lake
+        job.progress = {"done": 0, "total": len(states)}
+        with SharedScope(use_lake=False) as scope:
+            for state in states:
+                result = await self._run(job.query_type, {**job.params, "states": [state]})
+                job.partial.append({"state": state, "result": result})
+                job.progress["done"] += 1
+                self.store.save(job)
+                scope.release([state])
+            return await self._run(job.query_type, job.params)
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        """Wait up to timeout seconds for a job to finish.
+
+        Returns:
+            The job (finished or not), or None if unknown.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job.finished or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "result_ttl_seconds": self.store.ttl}
+
+
+def get_job_manager() -> JobManager:
+    """Get the configured JobManager instance."""
+    from ..config import settings
+    from .fia_service import fia_service
+    from .query_types import run_query
+
+    return JobManager(
+        JobStore(settings.job_store_dir, ttl=settings.job_result_ttl),
+        run=lambda query_type, params: run_query(fia_service, query_type, params),
+        max_concurrency=settings.job_max_concurrency,
+        data_version=fia_service.data_version,
+    )
+
+
+job_manager = get_job_manager()
@@ -0,0 +1,287 @@
+"""Cached catalog of the FIA databases published to MotherDuck.
+
+The list of databases used to be fetched once per process with an
+``lru_cache``: databases uploaded later stayed invisible until a restart,
+and a failed first ``SHOW DATABASES`` cached an empty catalog forever, so
+every state silently fell back to local storage. This catalog:
+
+- serves a fresh listing for ``ttl`` seconds;
+- after that, keeps serving the stale listing (up to ``stale_ttl``) while
+  one background thread refreshes it;
+- after a failed refresh keeps the last good listing, and retries after
+  ``negative_ttl`` seconds rather than caching the failure;
+- refreshes in the background when a state is missing from a listing
+  older than ``negative_ttl``, so a newly uploaded state shows up within
+  seconds.
+
+Each entry carries the database's evaluation year and size for routing.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+# fia_{state}_eval{year}, or legacy fia_{state}
+EVAL_PATTERN = re.compile(r"^fia_([a-z]{2})_eval(\d{4})$")
+LEGACY_PATTERN = re.compile(r"^fia_([a-z]{2})$")
+
+
+@dataclass(frozen=True)
+class DatabaseInfo:
+    """A state database on MotherDuck.
+
+    Attributes:
+        name: Database name (e.g. "fia_nc_eval2023")
+        state: State code
+        eval_year: Evaluation year from the name; 0 for legacy names
+        size_bytes: Storage used, if MotherDuck reported it
+    """
+
+    name: str
+    state: str
+    eval_year: int
+    size_bytes: int | None = None
+
+
+@dataclass
+class _Listing:
+    """One fetch of the catalog."""
+
+    databases: dict[str, DatabaseInfo] = field(default_factory=dict)
+    fetched_at: float = 0.0
+    ok: bool = False
+
+
+def parse_databases(rows: Iterable[tuple[str, int | None]]) -> dict[str, DatabaseInfo]:
+    """Pick the latest database per state from (name, size) rows.
+
+    Eval-year names win over legacy ones; other databases are ignored.
+    """
+    latest: dict[str, DatabaseInfo] = {}
+    for name, size in rows:
+        name = name.lower()
+        match = EVAL_PATTERN.match(name)
+        if match:
+            info = DatabaseInfo(name, match.group(1).upper(), int(match.group(2)), size)
+        else:
+            match = LEGACY_PATTERN.match(name)
+            if not match:
+                continue
+            info = DatabaseInfo(name, match.group(1).upper(), 0, size)
+        current = latest.get(info.state)
+        if current is None or (info.eval_year, info.name) > (
+            current.eval_year,
+            current.name,
+        ):
+            latest[info.state] = info
+    return latest
+
+
+def list_motherduck_databases(token: str) -> list[tuple[str, int | None]]:
+    """(name, size in bytes) of every database visible to a token."""
+    conn = duckdb.connect(f"md:?motherduck_token={token}")
+    try:
+        names = [row[0] for row in conn.execute("SHOW DATABASES").fetchall()]
+        try:
+            sizes = {
+                name: blocks * block_size
+                for name, blocks, block_size in conn.execute(
+                    "SELECT database_name, used_blocks, block_size "
+                    "FROM pragma_database_size()"
+                ).fetchall()
+            }
+        except duckdb.Error as e:
+            logger.debug(f"MotherDuck database sizes unavailable: {e}")
+            sizes = {}
+    finally:
+        conn.close()
+    return [(name, sizes.get(name)) for name in names]
+
+
+class MotherDuckCatalog:
+    """TTL cache of the latest MotherDuck database per state.
+
+    Example:
+        >>> catalog = MotherDuckCatalog(token)
+        >>> info = catalog.get("NC")
+        >>> info.name, info.eval_year
+        ('fia_nc_eval2023', 2023)
+    """
+
+    def __init__(
+        self,
+        token: str | None,
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        negative_ttl: float = 30.0,
+        fetch: Callable[[str], list[tuple[str, int | None]]] | None = None,
+    ):
+        """
+        Args:
+            token: MotherDuck token; without one the catalog is empty.
+            ttl: Seconds a listing is served without refreshing.
+            stale_ttl: Seconds a listing may be served while a background
+                       refresh runs; older listings are refreshed inline.
+            negative_ttl: Seconds before a failed listing, or a state
+                          missing from the listing, triggers a new fetch.
+            fetch: Lists (name, size) rows for a token.
+        """
+        self.token = token
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.negative_ttl = negative_ttl
+        self._fetch = fetch or list_motherduck_databases
+        self._listing: _Listing | None = None
+        self._last_attempt: float | None = None
+        self._last_error: str | None = None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        self.refreshes = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def get(self, state: str) -> DatabaseInfo | None:
+        """The latest database for a state, or None if it has none."""
+        state = state.upper()
+        info = self.databases().get(state)
+        if info is None and self.enabled:
+            # Possibly uploaded since the listing was fetched
+            self._refresh_if(lambda age: age >= self.negative_ttl)
+        return info
+
+    def databases(self) -> dict[str, DatabaseInfo]:
+        """Latest database per state, refreshing as the TTLs require."""
+        if not self.enabled:
+            return {}
+
+        with self._lock:
+            listing = self._listing
+        if listing is None or self._age(listing) >= self.stale_ttl:
+            # Nothing usable to serve meanwhile: fetch inline
+            listing = self.refresh()
+        elif self._age(listing) >= self.ttl:
+            self._refresh_if(lambda age: age >= self.ttl)
+        return listing.databases
+
+    def refresh(self) -> _Listing:
+        """Fetch the listing now (one fetch at a time).
+
+        A failure keeps the last good listing; with none, an empty listing
+        is served until negative_ttl passes.
+        """
+        with self._fetch_lock:
+            with self._lock:
+                current = self._listing
+            recent = self._since_attempt() < self.negative_ttl
+            # Another caller just fetched, or failed to, while this one waited
+            if current is not None and recent and (
+                self._age(current) < self.ttl or self._last_error
+            ):
+                return current
+
+            self._last_attempt = time.monotonic()
+            try:
+                rows = self._fetch(self.token)
+            except Exception as e:
+                self.failures += 1
+                self._last_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Could not query MotherDuck databases: {e}")
+                with self._lock:
+                    if self._listing is None or not self._listing.ok:
+                        # Expires after negative_ttl instead of being kept
+                        self._listing = _Listing(
+                            fetched_at=time.monotonic() - self.stale_ttl + self.negative_ttl
+                        )
+                    return self._listing
+
+            listing = _Listing(parse_databases(rows), time.monotonic(), ok=True)
+            self.refreshes += 1
+            self._last_error = None
+            previous = current.databases if current else {}
+            for state, info in listing.databases.items():
+                if previous.get(state) != info:
+                    logger.info(f"MotherDuck {state}: {info.name} (eval {info.eval_year})")
+            with self._lock:
+                self._listing = listing
+            return listing
+
+    def _age(self, listing: _Listing) -> float:
+        return time.monotonic() - listing.fetched_at
+
+    def _since_attempt(self) -> float:
+        if self._last_attempt is None:
+            return float("inf")
+        return time.monotonic() - self._last_attempt
+
+    def _refresh_if(self, due: Callable[[float], bool]) -> None:
+        """Refresh in a background thread if due and not already running."""
+        with self._lock:
+            listing = self._listing
+            if (
+                self._refreshing
+                or listing is None
+                or not due(self._age(listing))
+                or self._since_attempt() < min(self.negative_ttl, self.ttl)
+            ):
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="motherduck-catalog", daemon=True).start()
+
+    def stats(self) -> dict:
+        """Catalog state for the storage diagnostics endpoint."""
+        with self._lock:
+            listing = self._listing
+        return {
+            "enabled": self.enabled,
+            "states": len(listing.databases) if listing else 0,
+            "age_seconds": round(self._age(listing), 1) if listing else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self._last_error,
+            "databases": {
+                state: {
+                    "name": info.name,
+                    "eval_year": info.eval_year,
+                    "size_bytes": info.size_bytes,
+                }
+                for state, info in sorted(listing.databases.items())
+            }
+            if listing
+            else {},
+        }
+
+
+def get_motherduck_catalog() -> MotherDuckCatalog:
+    """Create the catalog from settings."""
+    from ..config import settings
+
+    return MotherDuckCatalog(
+        settings.motherduck_token,
+        ttl=settings.motherduck_catalog_ttl,
+        stale_ttl=settings.motherduck_catalog_stale_ttl,
+        negative_ttl=settings.motherduck_catalog_negative_ttl,
+    )
+
+
+motherduck_catalog = get_motherduck_catalog()
@@ -0,0 +1,258 @@
+"""Incremental uploads of state databases to MotherDuck.
+
+Uploading a state used to drop and recreate every table with one
+``CREATE TABLE AS SELECT`` at a time, then count each table's rows, even
+when only one table had changed; queries running meanwhile could see a
+database with some tables dropped or half copied. This uploader:
+
+1. Fingerprints each local table (schema, row count and an
+   order-independent sum of row hashes) and compares the fingerprints
+   stored in the remote ``_askfia_tables`` table by the previous upload.
+2. Writes each changed table to a ZSTD Parquet file and loads it into a
+   ``__staging_{table}`` table, several tables in parallel.
+3. Swaps every staged table in, drops tables no longer present and
+   records the new fingerprints in one transaction, so readers see the
+   old or the new state database, never a mix.
+
+The remote is any DuckDB connection: a MotherDuck ``md:`` connection in
+production, or a local DuckDB file in tests.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_TABLE = "_askfia_tables"
+STAGING_PREFIX = "__staging_"
+
+
+@dataclass
+class TableFingerprint:
+    """Content fingerprint of one table."""
+
+    table: str
+    fingerprint: str
+    rows: int
+
+
+@dataclass
+class SyncResult:
+    """Outcome of syncing a local database to a remote one.
+
+    Attributes:
+        uploaded: Tables whose content changed and were replaced
+        unchanged: Tables left as they were
+        removed: Remote tables dropped because they are gone locally
+        rows: Row counts of the uploaded tables
+    """
+
+    uploaded: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    rows: dict[str, int] = field(default_factory=dict)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def list_tables(con: duckdb.DuckDBPyConnection) -> list[str]:
+    """User tables in a connection's current database."""
+    return [
+        row[0]
+        for row in con.execute(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_schema = 'main' AND table_catalog = current_database() "
+            "AND table_type = 'BASE TABLE' ORDER BY table_name"
+        ).fetchall()
+        if row[0] != FINGERPRINT_TABLE and not row[0].startswith(STAGING_PREFIX)
+    ]
+
+
+def table_fingerprint(con: duckdb.DuckDBPyConnection, table: str) -> TableFingerprint:
+    """Fingerprint a table's schema and content.
+
+    Row hashes are summed rather than XORed so duplicate rows do not
+    cancel out, and the sum does not depend on row order.
+    """
+    schema = con.execute(f"DESCRIBE {_quote(table)}").fetchall()
+    rows, row_hash = con.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(HASH(t)::HUGEINT), 0) FROM {_quote(table)} t"
+    ).fetchone()
+    digest = hashlib.sha256(
+        repr([(column, dtype) for column, dtype, *_ in schema]).encode()
+        + f"|{rows}|{row_hash}".encode()
+    ).hexdigest()
+    return TableFingerprint(table=table, fingerprint=digest, rows=rows)
+
+
+def local_fingerprints(local_path: Path) -> dict[str, TableFingerprint]:
+    """Fingerprints of every table in a local DuckDB file."""
+    con = duckdb.connect(str(local_path), read_only=True)
+    try:
+        return {table: table_fingerprint(con, table) for table in list_tables(con)}
+    finally:
+        con.close()
+
+
+def remote_fingerprints(remote: duckdb.DuckDBPyConnection) -> dict[str, str]:
+    """Fingerprints recorded by the previous upload to a remote database."""
+    remote.execute(
+        f"CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} ("
+        "table_name VARCHAR PRIMARY KEY, fingerprint VARCHAR, "
+        "row_count BIGINT, uploaded_at TIMESTAMP)"
+    )
+    return dict(
+        remote.execute(f"SELECT table_name, fingerprint FROM {FINGERPRINT_TABLE}").fetchall()
+    )
+
+
+def sync_database(
+    local_path: Path,
+    remote: duckdb.DuckDBPyConnection,
+    max_parallel: int = 4,
+    staging_dir: Path | None = None,
+    on_table: Callable[[str, int], None] | None = None,
+) -> SyncResult:
+    """Make a remote database's tables match a local DuckDB file.
+
+    Args:
+        local_path: Local state database.
+        remote: Connection whose current database is the upload target.
+        max_parallel: Tables staged concurrently.
+        staging_dir: Directory for Parquet staging files (a temporary
+                     directory by default).
+        on_table: Called with (table, rows) as each table is staged.
+
+    Returns:
+        Which tables were uploaded, unchanged or removed.
+    """
+    local = local_fingerprints(local_path)
+    database = remote.execute("SELECT current_database()").fetchone()[0]
+    remote_prints = remote_fingerprints(remote)
+    remote_tables = set(list_tables(remote))
+
+    result = SyncResult()
+    changed = []
+    for table, fp in local.items():
+        if remote_prints.get(table) == fp.fingerprint and table in remote_tables:
+            result.unchanged.append(table)
+        else:
+            changed.append(table)
+    result.removed = sorted(remote_tables - set(local))
+
+    if not changed and not result.removed:
+        return result
+
+    with tempfile.TemporaryDirectory(dir=staging_dir) as tmp:
+        staged: list[str] = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+                staged = list(
+                    pool.map(
+                        lambda table: _stage_table(
+                            local_path,
+                            remote,
+                            database,
+                            table,
+                            local[table].rows,
+                            Path(tmp),
+                            on_table,
+                        ),
+                        changed,
+                    )
+                )
+            _swap_in(remote, staged, result.removed, {t: local[t] for t in staged})
+        except Exception:
+            _drop_staging(remote, changed)
+            raise
+
+    result.uploaded = staged
+    result.rows = {table: local[table].rows for table in staged}
+    return result
+
+
+def _stage_table(
+    local_path: Path,
+    remote: duckdb.DuckDBPyConnection,
+    database: str,
+    table: str,
+    rows: int,
+    staging_dir: Path,
+    on_table: Callable[[str, int], None] | None,
+) -> str:
+    """Copy one table into its remote staging table via Parquet."""
+    parquet = staging_dir / f"{table}.parquet"
+    local = duckdb.connect(str(local_path), read_only=True)
+    try:
+        local.execute(
+            f"COPY {_quote(table)} TO '{parquet}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+        )
+    finally:
+        local.close()
+
+    # Cursors start in the default database, not the one the remote USEs
+    cursor = remote.cursor()
+    try:
+        cursor.execute(f"USE {_quote(database)}")
+        staging = _quote(STAGING_PREFIX + table)
+        cursor.execute(
+            f"CREATE OR REPLACE TABLE {staging} AS SELECT * FROM read_parquet('{parquet}')"
+        )
+        staged_rows = cursor.execute(f"SELECT COUNT(*) FROM {staging}").fetchone()[0]
+    finally:
+        cursor.close()
+    parquet.unlink(missing_ok=True)
+
+    if staged_rows != rows:
+        raise RuntimeError(f"Staged {table} has {staged_rows} rows, expected {rows}")
+    if on_table:
+        on_table(table, rows)
+    return table
+
+
+def _swap_in(
+    remote: duckdb.DuckDBPyConnection,
+    staged: list[str],
+    removed: list[str],
+    fingerprints: dict[str, TableFingerprint],
+) -> None:
+    """Replace tables with their staged copies in one transaction."""
+    remote.execute("BEGIN TRANSACTION")
+    try:
+        for table in staged:
+            remote.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+            remote.execute(
+                f"ALTER TABLE {_quote(STAGING_PREFIX + table)} RENAME TO {_quote(table)}"
+            )
+        for table in removed:
+            remote.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+        for table in [*staged, *removed]:
+            remote.execute(f"DELETE FROM {FINGERPRINT_TABLE} WHERE table_name = ?", [table])
+        for fp in fingerprints.values():
+            remote.execute(
+                f"INSERT INTO {FINGERPRINT_TABLE} VALUES (?, ?, ?, now())",
+                [fp.table, fp.fingerprint, fp.rows],
+            )
+        remote.execute("COMMIT")
+    except Exception:
+        remote.execute("ROLLBACK")
+        raise
+
+
+def _drop_staging(remote: duckdb.DuckDBPyConnection, tables: list[str]) -> None:
+    for table in tables:
+        try:
+            remote.execute(f"DROP TABLE IF EXISTS {_quote(STAGING_PREFIX + table)}")
+        except duckdb.Error as e:
+            logger.warning(f"Could not drop staging table for {table}: {e}")
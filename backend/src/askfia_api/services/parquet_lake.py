@@ -0,0 +1,328 @@
+"""National Parquet lake for cross-state queries.
+
+A regional or national question used to open one state database after
+another, up to 50 connection cycles for a US total. The build pipeline can
+also export every state into one hive-partitioned Parquet dataset per FIA
+table:
+
+    {lake}/_lake.json
+    {lake}/PLOT/STATECD=37/data_0.parquet
+    {lake}/POP_STRATUM/STATECD=37/EVALID=372301/data_0.parquet
+    {lake}/REF_SPECIES/data.parquet
+
+State tables are partitioned by STATECD (taken from STATE_ADDED for tables
+without a STATECD column), and additionally by EVALID where the table has
+one. Reference tables are shared by all states and are not partitioned.
+
+ParquetLake exposes any set of states to pyFIA through a small DuckDB file
+of views over just those states' partitions, so one estimator call runs a
+single parallel scan that never opens another state's files, and EVALID
+filters on the POP tables prune further by partition path.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import duckdb
+
+from .s3_download import exclusive_file_lock
+
+logger = logging.getLogger(__name__)
+
+LAKE_MANIFEST = "_lake.json"
+VIEWS_DIR = "_views"
+STAGING_DIR = "_staging"
+STATE_COLUMN = "STATECD"
+EVALID_COLUMN = "EVALID"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _read_manifest(lake_dir: Path) -> dict:
+    try:
+        return json.loads((lake_dir / LAKE_MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {"version": 0, "tables": {}, "states": {}}
+
+
+def _write_manifest(lake_dir: Path, manifest: dict) -> None:
+    tmp = lake_dir / f"{LAKE_MANIFEST}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, lake_dir / LAKE_MANIFEST)
+
+
+def export_state_to_lake(db_path: Path, lake_dir: Path, state: str) -> dict:
+    """Write a state database's tables into the lake.
+
+    The state's previous partitions are replaced table by table, so
+    exporting a rebuilt state never leaves partitions of an EVALID it no
+    longer publishes. States can be exported concurrently, from threads
+    or processes.
+
+    Args:
+        db_path: Path to the state's DuckDB file.
+        lake_dir: Root directory of the lake.
+        state: State abbreviation.
+
+    Returns:
+        The state's manifest entry (STATECD, EVALIDs and row counts).
+    """
+    from pyfia.downloader import get_state_fips
+
+    state = state.upper()
+    statecd = get_state_fips(state)
+    lake_dir = Path(lake_dir)
+    staging = lake_dir / STAGING_DIR / state
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    tables: dict[str, dict] = {}
+    rows: dict[str, int] = {}
+    reference: list[str] = []
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        names = [
+            row[0]
+            for row in con.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' ORDER BY table_name"
+            ).fetchall()
+        ]
+        for name in names:
+            columns = {row[0] for row in con.execute(f"DESCRIBE {_quote(name)}").fetchall()}
+            if STATE_COLUMN in columns:
+                select = "*"
+            elif "STATE_ADDED" in columns:
+                select = f"*, STATE_ADDED AS {STATE_COLUMN}"
+            else:
+                reference.append(name)
+                continue
+
+            partitions = [STATE_COLUMN]
+            if EVALID_COLUMN in columns:
+                partitions.append(EVALID_COLUMN)
+            order = "ORDER BY PLT_CN" if "PLT_CN" in columns else ""
+            con.execute(
+                f"COPY (SELECT {select} FROM {_quote(name)} {order}) "
+                f"TO '{staging / name}' (FORMAT PARQUET, COMPRESSION ZSTD, "
+                f"PARTITION_BY ({', '.join(partitions)}), FILENAME_PATTERN 'data_{{i}}')"
+            )
+            tables[name] = {"partitions": partitions}
+            rows[name] = con.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0]
+
+        for name in reference:
+            path = staging / f"{name}.parquet"
+            con.execute(
+                f"COPY {_quote(name)} TO '{path}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+            )
+            tables[name] = {"partitions": []}
+            rows[name] = con.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0]
+
+        evalids = []
+        if "POP_EVAL" in tables:
+            evalids = [
+                row[0]
+                for row in con.execute(
+                    "SELECT DISTINCT EVALID FROM POP_EVAL ORDER BY EVALID"
+                ).fetchall()
+            ]
+    finally:
+        con.close()
+
+    with exclusive_file_lock(lake_dir / ".lake.lock"):
+        manifest = _read_manifest(lake_dir)
+        previous = manifest["states"].get(state, {}).get("rows", {})
+        partition = f"{STATE_COLUMN}={statecd}"
+
+        for name, spec in tables.items():
+            table_dir = lake_dir / name
+            table_dir.mkdir(exist_ok=True)
+            if spec["partitions"]:
+                shutil.rmtree(table_dir / partition, ignore_errors=True)
+                if (staging / name / partition).exists():  # Empty tables write nothing
+                    os.replace(staging / name / partition, table_dir / partition)
+            else:
+                os.replace(staging / f"{name}.parquet", table_dir / "data.parquet")
+            manifest["tables"][name] = spec
+        # Tables the state no longer has
+        for name in set(previous) - set(tables):
+            if manifest["tables"].get(name, {}).get("partitions"):
+                shutil.rmtree(lake_dir / name / partition, ignore_errors=True)
+
+        entry = {
+            "statecd": statecd,
+            "evalids": evalids,
+            "rows": rows,
+            "exported_at": time.time(),
+        }
+        manifest["states"][state] = entry
+        manifest["version"] = manifest.get("version", 0) + 1
+        _write_manifest(lake_dir, manifest)
+
+    shutil.rmtree(staging, ignore_errors=True)
+    logger.info(f"Exported {state} to lake: {len(tables)} tables")
+    return entry
+
+
+class ParquetLake:
+    """Cross-state views over the national Parquet lake.
+
+    Example:
+        >>> lake = ParquetLake("./data/lake")
+        >>> path = lake.view_db(["NC", "SC", "GA"])
+        >>> with FIA(str(path)) as db:
+        ...     db.clip_most_recent()
+        ...     db.area(grp_by=["STATECD"])
+    """
+
+    def __init__(self, directory: str | Path, max_views: int = 64):
+        """Initialize the lake.
+
+        Args:
+            directory: Lake directory.
+            max_views: View files kept for the current lake version; the
+                       least recently used are deleted beyond that.
+        """
+        self.directory = Path(directory)
+        self.max_views = max(1, max_views)
+        self._lock = threading.Lock()
+        self._manifest: dict | None = None
+        self._manifest_stamp: tuple[int, int] | None = None
+
+    def manifest(self) -> dict:
+        """The lake manifest, re-read whenever an export replaces it."""
+        try:
+            stat = (self.directory / LAKE_MANIFEST).stat()
+        except OSError:
+            return {"version": 0, "tables": {}, "states": {}}
+        with self._lock:
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._manifest is None or stamp != self._manifest_stamp:
+                self._manifest = _read_manifest(self.directory)
+                self._manifest_stamp = stamp
+            return self._manifest
+
+    def states(self) -> set[str]:
+        """States exported to the lake."""
+        return set(self.manifest()["states"])
+
+    def covers(self, states: Iterable[str]) -> bool:
+        """Whether every state is in the lake."""
+        wanted = {state.upper() for state in states}
+        return bool(wanted) and wanted <= self.states()
+
+    def view_db(self, states: Iterable[str]) -> Path | None:
+        """DuckDB file exposing the lake's tables for a set of states.
+
+        State tables are views over the states' STATECD partitions, with
+        the partition columns read back from the paths; tables none of the
+        states have are left out. The file is named after the lake version
+        and the state set, so an export never changes a view file a
+        connection already has open. Creating a view deletes those of older
+        lake versions and the least recently used beyond ``max_views``;
+        connections that have one open keep reading it.
+
+        Returns:
+            Path to the view database, or None if a state is not in the lake.
+        """
+        wanted = sorted({state.upper() for state in states})
+        manifest = self.manifest()
+        if not wanted or not set(wanted) <= set(manifest["states"]):
+            return None
+
+        version = manifest["version"]
+        digest = hashlib.sha256(",".join(wanted).encode()).hexdigest()[:12]
+        path = self.directory / VIEWS_DIR / f"lake-{version}-{digest}.duckdb"
+        if path.exists():
+            with contextlib.suppress(OSError):
+                os.utime(path)  # Recency for pruning
+            return path
+
+        partitions = [
+            f"{STATE_COLUMN}={manifest['states'][state]['statecd']}" for state in wanted
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        con = duckdb.connect(str(tmp))
+        try:
+            for table, spec in sorted(manifest["tables"].items()):
+                table_dir = (self.directory / table).resolve()
+                if spec["partitions"]:
+                    globs = [
+                        f"'{table_dir / partition}/**/*.parquet'"
+                        for partition in partitions
+                        if (table_dir / partition).is_dir()
+                    ]
+                    if not globs:
+                        continue
+                    hive_types = ", ".join(f"'{c}': BIGINT" for c in spec["partitions"])
+                    source = (
+                        f"read_parquet([{', '.join(globs)}], hive_partitioning = true, "
+                        f"hive_types = {{{hive_types}}}, union_by_name = true)"
+                    )
+                else:
+                    source = f"read_parquet('{table_dir}/data.parquet')"
+                con.execute(f"CREATE VIEW {_quote(table)} AS SELECT * FROM {source}")
+        finally:
+            con.close()
+        os.replace(tmp, path)
+        self._prune_views(version, keep=path)
+        return path
+
+    def _prune_views(self, version: int, keep: Path) -> list[Path]:
+        """Delete view files of older lake versions and the least recently used."""
+        current = []
+        removed = []
+        for path in (self.directory / VIEWS_DIR).glob("lake-*.duckdb"):
+            if path == keep:
+                continue
+            if path.name.startswith(f"lake-{version}-"):
+                current.append(path)
+            else:
+                removed.append(path)
+
+        def last_used(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        current.sort(key=last_used, reverse=True)
+        removed.extend(current[self.max_views - 1 :])
+        for path in removed:
+            path.unlink(missing_ok=True)
+        return removed
+
+    def stats(self) -> dict:
+        """Lake contents for the storage stats endpoint."""
+        manifest = self.manifest()
+        return {
+            "directory": str(self.directory),
+            "version": manifest["version"],
+            "states": sorted(manifest["states"]),
+            "tables": len(manifest["tables"]),
+        }
+
+
+def get_parquet_lake() -> ParquetLake | None:
+    """Create the lake from settings, or None if not configured."""
+    from ..config import settings
+
+    if not settings.fia_lake_dir:
+        return None
+    return ParquetLake(settings.fia_lake_dir, max_views=settings.fia_lake_max_views)
+
+
+parquet_lake = get_parquet_lake()
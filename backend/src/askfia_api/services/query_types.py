@@ -0,0 +1,116 @@
+"""Query types shared by the query routes, batches and jobs.
+
+Each type pairs the request and response models of its /api/v1/query
+endpoint with the FIAService call that answers it.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from ..models.schemas import (
+    AreaQuery,
+    AreaResponse,
+    BiomassQuery,
+    BiomassResponse,
+    CompareQuery,
+    CompareResponse,
+    TPAQuery,
+    TPAResponse,
+    VolumeQuery,
+    VolumeResponse,
+)
+from .fia_service import FIAService
+
+
+async def _area(fia_service: FIAService, query: AreaQuery, tabular: bool) -> dict:
+    return await fia_service.query_area(
+        states=query.states,
+        land_type=query.land_type,
+        grp_by=query.grp_by,
+        approximate=query.approximate,
+        tabular=tabular,
+    )
+
+
+async def _volume(fia_service: FIAService, query: VolumeQuery, tabular: bool) -> dict:
+    return await fia_service.query_volume(
+        states=query.states,
+        by_species=query.by_species,
+        tree_domain=query.tree_domain,
+        approximate=query.approximate,
+        tabular=tabular,
+    )
+
+
+async def _biomass(fia_service: FIAService, query: BiomassQuery, tabular: bool) -> dict:
+    return await fia_service.query_biomass(
+        states=query.states,
+        land_type=query.land_type,
+        by_species=query.by_species,
+        approximate=query.approximate,
+        tabular=tabular,
+    )
+
+
+async def _tpa(fia_service: FIAService, query: TPAQuery, tabular: bool) -> dict:
+    return await fia_service.query_tpa(
+        states=query.states,
+        tree_domain=query.tree_domain,
+        by_species=query.by_species,
+        approximate=query.approximate,
+        tabular=tabular,
+    )
+
+
+async def _compare(fia_service: FIAService, query: CompareQuery, tabular: bool) -> dict:
+    return await fia_service.compare_states(
+        states=query.states,
+        metric=query.metric,
+        land_type=query.land_type,
+    )
+
+
+@dataclass(frozen=True)
+class QueryType:
+    """A query type: its endpoint's models and the FIAService call behind it.
+
+    Attributes:
+        request: Request model
+        response: Response model
+        execute: Calls FIAService and returns its result dict; with
+                 tabular=True, breakdowns are Arrow tables instead of rows
+        table_field: Response field holding the type's row breakdown
+    """
+
+    request: type[BaseModel]
+    response: type[BaseModel]
+    execute: Callable[[FIAService, Any, bool], Awaitable[dict[str, Any]]]
+    table_field: str | None = None
+
+    async def run(self, fia_service: FIAService, query: BaseModel) -> BaseModel:
+        """Run a validated query and build the endpoint's response."""
+        return self.response(**await self.execute(fia_service, query, False))
+
+
+QUERY_TYPES: dict[str, QueryType] = {
+    "area": QueryType(AreaQuery, AreaResponse, _area, "breakdown"),
+    "volume": QueryType(VolumeQuery, VolumeResponse, _volume, "by_species"),
+    "biomass": QueryType(BiomassQuery, BiomassResponse, _biomass, "by_species"),
+    "tpa": QueryType(TPAQuery, TPAResponse, _tpa, "by_species"),
+    "compare": QueryType(CompareQuery, CompareResponse, _compare, "states"),
+}
+
+
+async def run_query(fia_service: FIAService, query_type: str, params: dict) -> dict:
+    """Validate and run a query spec.
+
+    Raises:
+        KeyError: If the query type is unknown.
+        pydantic.ValidationError: If the parameters are invalid.
+    """
+    spec = QUERY_TYPES[query_type]
+    response = await spec.run(fia_service, spec.request(**params))
+    return response.model_dump()
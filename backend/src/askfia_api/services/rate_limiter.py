@@ -102,6 +102,13 @@ def get_client_ip(request: Request) -> str:
     return "unknown"
 
 
+def _is_peer(request: Request) -> bool:
+    """Check if a request carries a valid worker-to-worker token."""
+    from .state_router import state_router
+
+    return state_router.verify_token(request.headers.get("X-Internal-Token"))
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Rate limiting middleware for FastAPI.
@@ -114,9 +121,11 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         self.requests_per_minute = requests_per_minute
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        # Skip rate limiting for health checks
+        # Skip rate limiting for health checks and authenticated peer traffic
         if request.url.path in ("/health", "/health/ready"):
             return await call_next(request)
+        if request.url.path.startswith("/api/v1/internal/") and _is_peer(request):
+            return await call_next(request)
 
         client_ip = get_client_ip(request)
         is_allowed, remaining = _rate_limiter.is_allowed(
@@ -0,0 +1,294 @@
+"""DuckDB resource profiles per workload.
+
+Every pyFIA connection used to run with DuckDB's defaults: all cores and
+most of the machine's memory each, so a few estimations in parallel
+oversubscribed the CPU. Connections are now opened under a profile for
+their workload class:
+
+- ``interactive``: single-state API queries; a few threads each so many
+  can run side by side.
+- ``batch``: multi-state lake scans and hot-tier loading; as many threads
+  as are free, less one interactive query's share.
+- ``build``: build scripts; the cores divided among parallel builds.
+
+A profile sets ``threads``, ``memory_limit``, a ``temp_directory`` to
+spill to, and the Parquet object cache. API connections also reserve
+their threads from a process-wide budget (the core count by default), so
+the DuckDB threads of all concurrent queries never exceed it. A
+reservation made on the event loop thread never waits for threads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BUILD = "build"
+
+# Each connection spills to its own directory, which DuckDB removes on close
+_temp_ids = itertools.count()
+
+
+def cpu_count() -> int:
+    return os.cpu_count() or 1
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class ResourceProfile:
+    """DuckDB settings for one workload class.
+
+    Attributes:
+        name: Workload class
+        threads: DuckDB threads per connection; 0 = as many as available
+        memory_limit: DuckDB memory limit (e.g. "2GB"); None = DuckDB default
+        temp_directory: Base directory for spilling; None = DuckDB default
+        object_cache: Cache Parquet metadata between queries
+    """
+
+    name: str
+    threads: int = 0
+    memory_limit: str | None = None
+    temp_directory: str | None = None
+    object_cache: bool = True
+
+    def statements(self, threads: int) -> list[str]:
+        """SET statements applying the profile with a thread count."""
+        statements = [f"SET threads = {max(1, threads)}"]
+        if self.memory_limit:
+            statements.append(f"SET memory_limit = '{self.memory_limit}'")
+        if self.temp_directory:
+            spill = Path(self.temp_directory) / f"{os.getpid()}-{next(_temp_ids)}"
+            statements.append(f"SET temp_directory = '{spill}'")
+        statements.append(f"SET enable_object_cache = {str(self.object_cache).lower()}")
+        return statements
+
+
+def configure(
+    con: duckdb.DuckDBPyConnection, profile: ResourceProfile, threads: int | None = None
+) -> None:
+    """Apply a profile to a DuckDB connection.
+
+    Settings a connection rejects (e.g. a temp directory that is already
+    in use, or settings MotherDuck does not allow) are skipped.
+    """
+    for statement in profile.statements(threads or profile.threads or cpu_count()):
+        try:
+            con.execute(statement)
+        except duckdb.Error as e:
+            logger.debug(f"Skipped '{statement}' for {profile.name} profile: {e}")
+
+
+def duckdb_connection(db: Any) -> duckdb.DuckDBPyConnection | None:
+    """The DuckDB connection under a pyFIA connection, if it has one.
+
+    A DuckDB connection is returned as is.
+    """
+    if isinstance(db, duckdb.DuckDBPyConnection):
+        return db
+    backend = getattr(getattr(db, "_reader", None), "_backend", None)
+    if backend is None:
+        backend = getattr(db, "_backend", None)
+    if backend is None:
+        return None
+    if getattr(backend, "_connection", None) is None and hasattr(backend, "connect"):
+        backend.connect()
+    return getattr(backend, "_connection", None)
+
+
+class ThreadBudget:
+    """Threads shared by concurrent connections, at most ``total`` at once.
+
+    Reservations are re-entrant per thread: a connection opened while the
+    same thread already holds a reservation shares it, so nested
+    connections cannot deadlock waiting on their parent.
+    """
+
+    def __init__(self, total: int, max_wait: float = 30.0):
+        self.total = max(1, total)
+        self.max_wait = max_wait
+        self._available = self.total
+        self._cond = threading.Condition()
+        self._held = threading.local()
+        self.waits = 0
+        self.overruns = 0
+
+    @property
+    def in_use(self) -> int:
+        return self.total - self._available
+
+    @contextmanager
+    def reserve(self, wanted: int, keep_free: int = 0) -> Iterator[int]:
+        """Reserve up to ``wanted`` threads (0 = all free), waiting for at least one.
+
+        After ``max_wait`` seconds without a free thread the caller gets
+        one thread anyway rather than stalling indefinitely. On an event
+        loop thread it gets that thread at once, so the loop never blocks.
+
+        Args:
+            wanted: Threads to reserve; 0 = as many as are free.
+            keep_free: Threads to leave for other reservations; the caller
+                       still gets at least one.
+        """
+        held = getattr(self._held, "threads", 0)
+        if held:
+            yield held
+            return
+
+        wanted = self.total if wanted <= 0 else min(wanted, self.total)
+        overrun = False
+        with self._cond:
+            if self._available < 1:
+                self.waits += 1
+                max_wait = 0 if _on_event_loop() else self.max_wait
+                if not self._cond.wait_for(lambda: self._available >= 1, max_wait):
+                    self.overruns += 1
+                    overrun = True
+                    logger.warning(f"DuckDB thread budget of {self.total} exhausted")
+            granted = 1 if overrun else min(wanted, max(1, self._available - keep_free))
+            if not overrun:
+                self._available -= granted
+
+        self._held.threads = granted
+        try:
+            yield granted
+        finally:
+            self._held.threads = 0
+            if not overrun:
+                with self._cond:
+                    self._available += granted
+                    self._cond.notify_all()
+
+
+class ResourceGovernor:
+    """Applies workload profiles to API connections within a thread budget.
+
+    Example:
+        >>> governor = get_resource_governor()
+        >>> with FIA(db_path) as db, governor.apply(db, INTERACTIVE):
+        ...     db.area()
+    """
+
+    def __init__(self, profiles: dict[str, ResourceProfile], total_threads: int):
+        self.profiles = profiles
+        self.budget = ThreadBudget(total_threads)
+
+    def profile(self, workload: str) -> ResourceProfile:
+        return self.profiles.get(workload) or self.profiles[INTERACTIVE]
+
+    @contextmanager
+    def apply(self, db: Any, workload: str = INTERACTIVE) -> Iterator[int]:
+        """Reserve threads for a pyFIA (or DuckDB) connection and apply its profile.
+
+        Yields:
+            The DuckDB threads granted to the connection.
+        """
+        profile = self.profile(workload)
+        keep_free = 0
+        if profile.name == BATCH:
+            # Batch work never takes the threads an interactive query needs
+            keep_free = min(self.profile(INTERACTIVE).threads or 1, self.budget.total - 1)
+        with self.budget.reserve(profile.threads, keep_free) as threads:
+            con = duckdb_connection(db)
+            if con is not None:
+                configure(con, profile, threads)
+            yield threads
+
+    def stats(self) -> dict:
+        """Thread budget usage for the storage diagnostics endpoint."""
+        return {
+            "total_threads": self.budget.total,
+            "threads_in_use": self.budget.in_use,
+            "waits": self.budget.waits,
+            "overruns": self.budget.overruns,
+            "profiles": {
+                name: {"threads": p.threads, "memory_limit": p.memory_limit}
+                for name, p in self.profiles.items()
+            },
+        }
+
+
+def get_profiles() -> dict[str, ResourceProfile]:
+    """Workload profiles from settings."""
+    from ..config import settings
+
+    common = {
+        "temp_directory": settings.duckdb_temp_dir or None,
+        "object_cache": settings.duckdb_object_cache,
+    }
+    return {
+        INTERACTIVE: ResourceProfile(
+            INTERACTIVE,
+            threads=settings.duckdb_interactive_threads,
+            memory_limit=settings.duckdb_interactive_memory_limit or None,
+            **common,
+        ),
+        BATCH: ResourceProfile(
+            BATCH,
+            threads=settings.duckdb_batch_threads,
+            memory_limit=settings.duckdb_batch_memory_limit or None,
+            **common,
+        ),
+        BUILD: ResourceProfile(
+            BUILD,
+            threads=settings.duckdb_build_threads,
+            memory_limit=settings.duckdb_build_memory_limit or None,
+            **common,
+        ),
+    }
+
+
+def build_profile(
+    jobs: int = 1,
+    threads: int = 0,
+    memory_limit: str | None = None,
+    temp_directory: str | None = None,
+) -> ResourceProfile:
+    """The profile for build scripts, which run without API settings.
+
+    Args:
+        jobs: States built in parallel; unless ``threads`` is given, the
+              cores are divided among them.
+        threads: DuckDB threads per build.
+        memory_limit: DuckDB memory limit per build.
+        temp_directory: Base directory for spilling.
+    """
+    return ResourceProfile(
+        BUILD,
+        threads=threads or max(1, cpu_count() // max(1, jobs)),
+        memory_limit=memory_limit,
+        temp_directory=temp_directory,
+    )
+
+
+def get_resource_governor() -> ResourceGovernor:
+    """Create the governor from settings.
+
+    Owned by the FIA service rather than created at import, so build
+    scripts can use this module without API settings.
+    """
+    from ..config import settings
+
+    return ResourceGovernor(get_profiles(), settings.duckdb_total_threads or cpu_count())
+
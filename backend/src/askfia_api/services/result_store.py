@@ -0,0 +1,271 @@
+"""Disk-backed store of per-state estimator results shared across workers.
+
+Each uvicorn worker has its own memory, so in-process caches are cold in
+every worker and after every restart. This store writes each pyFIA estimator
+result as an Arrow IPC file keyed by the normalized query spec plus the
+database source and EVALID, and reads it back through a memory map, so
+every worker on the host shares one warmed copy without deserializing it.
+
+Files are published atomically (written to a temp file, then renamed) and
+the directory is trimmed to a size budget, least recently used first. Temp
+files left behind by writers that crashed mid-write are swept on the way.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+RESULT_SUFFIX = ".arrow"
+TEMP_SUFFIX = ".tmp"
+
+# Temp files older than this belong to a writer that died mid-write
+STALE_TEMP_SECONDS = 3600
+
+
+class ResultStore:
+    """Arrow IPC result files keyed by query spec and data version.
+
+    Example:
+        >>> key = result_store.make_key("area", "NC", source, evalid, {"land_type": "forest"})
+        >>> table = result_store.get(key)
+        >>> if table is None:
+        ...     table = db.area(land_type="forest").to_arrow()
+        ...     result_store.put(key, table)
+    """
+
+    def __init__(self, directory: str | Path, max_size_gb: float = 2.0):
+        """Initialize the store.
+
+        Args:
+            directory: Directory shared by all workers on the host.
+            max_size_gb: Size budget for stored results. Zero disables.
+        """
+        self.directory = Path(directory)
+        self.max_size_bytes = int(max_size_gb * 1024**3)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        """Check if the store is enabled."""
+        return self.max_size_bytes > 0
+
+    @staticmethod
+    def make_key(
+        method: str,
+        state: str,
+        source: str,
+        evalid: list[int] | None,
+        params: dict[str, Any],
+    ) -> str | None:
+        """Build a key from the query spec and the data it was computed from.
+
+        Parameters are normalized so equivalent specs share a key: None values
+        are dropped, keys are sorted, and a single-column grp_by is a list.
+
+        Returns:
+            Hex digest, or None if the connection is not clipped to an EVALID.
+        """
+        if not evalid:
+            return None
+
+        normalized = {}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if name == "grp_by" and isinstance(value, str):
+                value = [value]
+            normalized[name] = value
+
+        spec = {
+            "method": method,
+            "state": state.upper(),
+            "source": source,
+            "evalid": sorted(int(e) for e in evalid),
+            "params": normalized,
+        }
+        payload = json.dumps(spec, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{RESULT_SUFFIX}"
+
+    def get(self, key: str) -> pa.Table | None:
+        """Read a stored result through a memory map.
+
+        Returns:
+            The stored table, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            source = pa.memory_map(str(path), "r")
+            table = pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pa.ArrowInvalid) as e:
+            # Corrupt or truncated file - drop it and recompute
+            logger.warning(f"Discarding unreadable result {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # mtime drives LRU eviction (atime is often disabled)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return table
+
+    def put(self, key: str, table: pa.Table) -> None:
+        """Publish a result atomically, then enforce the size budget."""
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                with pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        self._enforce_size_limit()
+
+    def get_or_compute(self, key: str | None, compute) -> pl.DataFrame:
+        """Return a stored result, computing and storing it on a miss.
+
+        Args:
+            key: Key from make_key(), or None to bypass the store.
+            compute: Callable returning a polars DataFrame (or anything
+                    convertible with pl.DataFrame()).
+        """
+        if key is not None:
+            table = self.get(key)
+            if table is not None:
+                return pl.from_arrow(table)
+
+        result = compute()
+        df = result if isinstance(result, pl.DataFrame) else pl.DataFrame(result)
+
+        if key is not None:
+            try:
+                self.put(key, df.to_arrow())
+            except Exception as e:
+                # Never fail a query because the store is unwritable
+                logger.warning(f"Could not store result {key[:12]}: {e}")
+
+        return df
+
+    def _files(self) -> list[tuple[Path, os.stat_result]]:
+        files = []
+        for path in self.directory.rglob(f"*{RESULT_SUFFIX}"):
+            try:
+                files.append((path, path.stat()))
+            except FileNotFoundError:
+                # Removed by another worker
+                continue
+        return files
+
+    def _sweep_stale_temps(self) -> int:
+        """Remove temp files abandoned by crashed writers.
+
+        Returns:
+            Number of files removed.
+        """
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        removed = 0
+        for path in self.directory.rglob(f"*{TEMP_SUFFIX}"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # Renamed or removed by another worker
+                continue
+        if removed:
+            logger.info(f"Removed {removed} stale temp files from {self.directory}")
+        return removed
+
+    def _enforce_size_limit(self) -> None:
+        """Remove least recently used results beyond the size budget."""
+        with self._lock:
+            self._sweep_stale_temps()
+            files = self._files()
+            total = sum(stat.st_size for _, stat in files)
+            if total <= self.max_size_bytes:
+                return
+
+            files.sort(key=lambda item: item[1].st_mtime)
+            for path, stat in files:
+                if total <= self.max_size_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+                logger.debug(f"Evicted result {path.name}")
+
+    def clear(self) -> int:
+        """Remove all stored results.
+
+        Returns:
+            Number of files removed.
+        """
+        removed = 0
+        for path, _ in self._files():
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        """Get store statistics."""
+        files = self._files() if self.enabled else []
+        return {
+            "enabled": self.enabled,
+            "directory": str(self.directory),
+            "results": len(files),
+            "size_mb": sum(stat.st_size for _, stat in files) / 1e6,
+            "max_size_mb": self.max_size_bytes / 1e6,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def get_result_store() -> ResultStore:
+    """Get the configured ResultStore instance."""
+    from ..config import settings
+
+    return ResultStore(
+        directory=settings.result_store_dir,
+        max_size_gb=settings.result_store_max_gb,
+    )
+
+
+# Singleton instance
+result_store = get_result_store()
@@ -0,0 +1,347 @@
+"""Parallel, resumable, verified downloads from S3-compatible storage.
+
+State databases are several GB, so a single-stream ``download_file`` is slow
+and an interrupted transfer used to leave a truncated file at the final
+path. This downloader:
+
+1. Fetches fixed-size byte ranges in parallel into ``<dest>.part``.
+2. Records completed ranges in a ``<dest>.part.json`` sidecar so an
+   interrupted download resumes from where it stopped, as long as the
+   object (ETag and size) is unchanged.
+3. Verifies the result against a ``sha256`` object metadata entry or the
+   ETag (plain MD5, or the multipart MD5-of-MD5s).
+4. Atomically renames the verified file into place.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+HASH_BLOCK_SIZE = 8 * MB
+STREAM_BLOCK_SIZE = 1 * MB
+
+
+class DownloadVerificationError(Exception):
+    """Downloaded bytes do not match the object's checksum."""
+
+
+@contextmanager
+def exclusive_file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on path, shared by all processes on the host.
+
+    Without fcntl (Windows) only in-process locking by the caller applies.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_partial_progress(part_state_path: Path) -> tuple[int, int] | None:
+    """(bytes downloaded, total bytes) recorded in a ``.part.json`` sidecar.
+
+    Lets any worker report on a download running in another process.
+    """
+    try:
+        state = json.loads(Path(part_state_path).read_text())
+        size, chunk_size = int(state["size"]), int(state["chunk_size"])
+        done = sum(min(chunk_size, size - i * chunk_size) for i in state["done"])
+        return done, size
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+@dataclass
+class ObjectInfo:
+    """Size and checksums of a remote object."""
+
+    size: int
+    etag: str
+    sha256: str | None = None
+    part_size: int | None = None
+
+    @property
+    def multipart_parts(self) -> int | None:
+        """Number of parts if the ETag is a multipart ETag."""
+        if "-" in self.etag:
+            return int(self.etag.rsplit("-", 1)[1])
+        return None
+
+
+def _file_md5(path: Path, start: int = 0, length: int | None = None) -> bytes:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining)
+            block = f.read(size)
+            if not block:
+                break
+            md5.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return md5.digest()
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, as stored in the ``sha256`` object metadata."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def multipart_etag(path: Path, part_size: int, parts: int) -> str:
+    """Compute the S3 multipart ETag of a local file."""
+    digests = b"".join(
+        _file_md5(path, i * part_size, part_size) for i in range(parts)
+    )
+    return f"{hashlib.md5(digests).hexdigest()}-{parts}"
+
+
+class RangedDownloader:
+    """Downloads an S3 object with parallel ranged GETs.
+
+    Example:
+        >>> downloader = RangedDownloader(storage.s3, chunk_size=64 * MB, max_workers=8)
+        >>> downloader.download("fia-bucket", "fia-duckdb/TX.duckdb", Path("data/fia/TX.duckdb"))
+    """
+
+    def __init__(self, client: Any, chunk_size: int = 64 * MB, max_workers: int = 8):
+        """Initialize the downloader.
+
+        Args:
+            client: boto3 S3 client (or compatible object).
+            chunk_size: Bytes per ranged GET.
+            max_workers: Concurrent ranged GETs.
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def head(self, bucket: str, key: str) -> ObjectInfo:
+        """Read size and checksums of an object."""
+        response = self.client.head_object(Bucket=bucket, Key=key)
+        info = ObjectInfo(
+            size=int(response["ContentLength"]),
+            etag=response["ETag"].strip('"'),
+            sha256=(response.get("Metadata") or {}).get("sha256"),
+        )
+
+        if info.multipart_parts and not info.sha256:
+            # The first part's size is needed to recompute a multipart ETag
+            try:
+                part = self.client.head_object(Bucket=bucket, Key=key, PartNumber=1)
+                info.part_size = int(part["ContentLength"])
+            except Exception as e:
+                logger.debug(f"Could not read part size for {key}: {e}")
+
+        return info
+
+    def download(
+        self,
+        bucket: str,
+        key: str,
+        dest: Path,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> ObjectInfo:
+        """Download an object to dest, resuming a previous partial download.
+
+        Args:
+            bucket: Bucket name.
+            key: Object key.
+            dest: Final local path.
+            progress: Called with (bytes downloaded, total bytes) as chunks
+                     complete, including chunks resumed from a previous attempt.
+
+        Raises:
+            DownloadVerificationError: If the checksum does not match. The
+                partial file is discarded so the next attempt starts clean.
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest.with_name(dest.name + ".part")
+        state_path = dest.with_name(dest.name + ".part.json")
+
+        info = self.head(bucket, key)
+        chunks = -(-info.size // self.chunk_size)
+        done = self._load_progress(state_path, part_path, info)
+
+        if not done:
+            with open(part_path, "wb") as f:
+                f.truncate(info.size)
+
+        pending = [i for i in range(chunks) if i not in done]
+        if done:
+            logger.info(
+                f"Resuming {key}: {len(done)}/{chunks} chunks already downloaded"
+            )
+
+        if progress:
+            progress(self._bytes_done(done, info), info.size)
+
+        if pending:
+            self._fetch_chunks(
+                bucket, key, info, part_path, state_path, pending, done, progress
+            )
+
+        try:
+            self._verify(part_path, info)
+        except DownloadVerificationError:
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise
+
+        os.replace(part_path, dest)
+        state_path.unlink(missing_ok=True)
+        return info
+
+    def _load_progress(self, state_path: Path, part_path: Path, info: ObjectInfo) -> set[int]:
+        """Completed chunks from a previous attempt at the same object version."""
+        if not state_path.exists() or not part_path.exists():
+            return set()
+        try:
+            state = json.loads(state_path.read_text())
+        except (OSError, ValueError):
+            return set()
+
+        if (
+            state.get("etag") != info.etag
+            or state.get("size") != info.size
+            or state.get("chunk_size") != self.chunk_size
+            or part_path.stat().st_size != info.size
+        ):
+            logger.info(f"Discarding stale partial download {part_path.name}")
+            return set()
+        return set(state.get("done", []))
+
+    def _bytes_done(self, done: set[int], info: ObjectInfo) -> int:
+        return sum(
+            min(self.chunk_size, info.size - index * self.chunk_size) for index in done
+        )
+
+    def _save_progress(self, state_path: Path, info: ObjectInfo, done: set[int]) -> None:
+        tmp = state_path.with_name(state_path.name + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "etag": info.etag,
+                    "size": info.size,
+                    "chunk_size": self.chunk_size,
+                    "done": sorted(done),
+                }
+            )
+        )
+        os.replace(tmp, state_path)
+
+    def _fetch_chunks(
+        self,
+        bucket: str,
+        key: str,
+        info: ObjectInfo,
+        part_path: Path,
+        state_path: Path,
+        pending: list[int],
+        done: set[int],
+        progress: Callable[[int, int], None] | None = None,
+    ) -> None:
+        fd = os.open(part_path, os.O_WRONLY)
+
+        def fetch(index: int) -> int:
+            start = index * self.chunk_size
+            end = min(start + self.chunk_size, info.size) - 1
+            response = self.client.get_object(
+                Bucket=bucket,
+                Key=key,
+                Range=f"bytes={start}-{end}",
+                # Fail rather than mix bytes from two object versions
+                IfMatch=f'"{info.etag}"',
+            )
+            # Stream in blocks to bound memory at max_workers * STREAM_BLOCK_SIZE
+            body = response["Body"]
+            offset = start
+            for block in iter(lambda: body.read(STREAM_BLOCK_SIZE), b""):
+                os.pwrite(fd, block, offset)
+                offset += len(block)
+
+            if offset != end + 1:
+                raise OSError(
+                    f"Short read for {key} bytes {start}-{end}: got {offset - start}"
+                )
+            return index
+
+        error: Exception | None = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(fetch, index) for index in pending]
+                for future in as_completed(futures):
+                    try:
+                        done.add(future.result())
+                    except Exception as e:
+                        # Keep recording finished chunks so a retry resumes
+                        error = error or e
+                        continue
+                    self._save_progress(state_path, info, done)
+                    if progress:
+                        progress(self._bytes_done(done, info), info.size)
+        finally:
+            os.fsync(fd)
+            os.close(fd)
+
+        if error is not None:
+            raise error
+
+    def _verify(self, path: Path, info: ObjectInfo) -> None:
+        """Check the downloaded file against the object's checksum."""
+        size = path.stat().st_size
+        if size != info.size:
+            raise DownloadVerificationError(
+                f"{path.name}: size {size} != expected {info.size}"
+            )
+
+        if info.sha256:
+            actual = file_sha256(path)
+            expected = info.sha256
+        elif info.multipart_parts:
+            if not info.part_size:
+                logger.warning(
+                    f"{path.name}: multipart ETag without part size, verified size only"
+                )
+                return
+            actual = multipart_etag(path, info.part_size, info.multipart_parts)
+            expected = info.etag
+        else:
+            actual = _file_md5(path).hex()
+            expected = info.etag
+
+        if actual != expected:
+            raise DownloadVerificationError(
+                f"{path.name}: checksum {actual} != expected {expected}"
+            )
@@ -0,0 +1,255 @@
+"""Column-pruned "slim" state databases.
+
+A full pyFIA download carries every FIADB table and column, but the
+estimators FIAService calls read a handful of tables and, for the wide
+TREE and COND tables, a small set of columns. A slim database keeps:
+
+- only the tables in table_store.ESTIMATOR_TABLES;
+- for TREE and COND, only the columns pyFIA's estimators, grouping
+  options and the domain filters used by FIAService and the agent read;
+- every row, sorted on the join keys (PLT_CN, CONDID) so DuckDB's
+  per-row-group min/max zone maps prune plot-filtered scans.
+
+validate_slim() runs a fixed set of estimates against both databases so a
+slim build is only published when it reproduces the full estimates.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from .resource_profiles import ResourceProfile, configure, duckdb_connection
+from .table_store import ESTIMATOR_TABLES, tables_for
+
+logger = logging.getLogger(__name__)
+
+# pyFIA estimation columns (pyfia.estimation.columns) plus estimator extras
+_TREE_COLUMNS = (
+    # Base
+    "CN", "PLT_CN", "CONDID", "STATUSCD", "SPCD", "DIA", "TPA_UNADJ", "TREECLCD",
+    "INVYR", "PREV_TRE_CN",
+    # Volume, biomass and carbon
+    "VOLCFNET", "VOLCFGRS", "VOLCFSND", "VOLBFNET", "VOLBFGRS",
+    "DRYBIO_AG", "DRYBIO_BG", "DRYBIO_STEM", "DRYBIO_BRANCH", "DRYBIO_FOLIAGE",
+    "CARBON_AG", "CARBON_BG",
+    # Grouping and tree_domain
+    "HT", "ACTUALHT", "CR", "CCLCD", "SPGRPCD", "DECAYCD", "AGENTCD",
+)
+_COND_COLUMNS = (
+    # Base
+    "CN", "PLT_CN", "CONDID", "COND_STATUS_CD", "CONDPROP_UNADJ", "PROP_BASIS",
+    "COND_NONSAMPLE_REASN_CD", "INVYR",
+    # Land type
+    "SITECLCD", "RESERVCD",
+    # Grouping and cond_domain
+    "OWNGRPCD", "OWNCD", "FORTYPCD", "FORTYPGRPCD", "STDSZCD", "STDAGE",
+    "STDORGCD", "SICOND", "SIBASE", "SISP", "SLOPE", "ASPECT", "PHYSCLCD",
+    "DSTRBCD1", "DSTRBCD2", "DSTRBCD3", "TRTCD1", "TRTCD2", "TRTCD3",
+    "BALIVE", "LIVE_CANOPY_CVR_PCT",
+)
+
+# Columns kept per pruned table; tables not listed keep every column
+SLIM_COLUMNS: dict[str, tuple[str, ...]] = {
+    "TREE": _TREE_COLUMNS,
+    "COND": _COND_COLUMNS,
+}
+
+# Sort keys that cluster rows by plot for zone-map pruning
+SORT_KEYS: dict[str, tuple[str, ...]] = {
+    "PLOT": ("CN",),
+    "TREE": ("PLT_CN", "CONDID"),
+    "COND": ("PLT_CN", "CONDID"),
+}
+DEFAULT_SORT_KEYS = ("PLT_CN",)
+
+SLIM_TABLES = tables_for(ESTIMATOR_TABLES)
+
+# Estimates compared by validate_slim(): (method, kwargs)
+VALIDATION_QUERIES: list[tuple[str, dict]] = [
+    ("area", {"land_type": "forest"}),
+    ("area", {"land_type": "timber", "grp_by": "OWNGRPCD"}),
+    ("area", {"land_type": "forest", "grp_by": "FORTYPCD"}),
+    ("volume", {"land_type": "forest"}),
+    ("volume", {"land_type": "forest", "grp_by": "SPCD"}),
+    ("biomass", {"land_type": "forest"}),
+    ("tpa", {"land_type": "forest", "grp_by": "STDSZCD"}),
+    ("mortality", {"land_type": "forest"}),
+    ("removals", {"land_type": "forest"}),
+    ("growth", {"land_type": "forest"}),
+]
+
+
+def build_slim_database(
+    full_path: Path, slim_path: Path, profile: ResourceProfile | None = None
+) -> dict:
+    """Write a slim copy of a state database.
+
+    Args:
+        full_path: Full pyFIA DuckDB file.
+        slim_path: Output path; written atomically.
+        profile: DuckDB resource profile for the copy.
+
+    Returns:
+        Summary with per-table column counts and file sizes.
+    """
+    full_path, slim_path = Path(full_path), Path(slim_path)
+    slim_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = slim_path.with_name(slim_path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+
+    tables: dict[str, dict] = {}
+    con = duckdb.connect(str(tmp))
+    try:
+        if profile is not None:
+            configure(con, profile)
+        con.execute(f"ATTACH '{full_path}' AS src (READ_ONLY)")
+        available = {
+            row[0]
+            for row in con.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_catalog = 'src' AND table_schema = 'main'"
+            ).fetchall()
+        }
+        for table in SLIM_TABLES:
+            if table not in available:
+                continue
+            source_columns = [
+                row[0] for row in con.execute(f'DESCRIBE src."{table}"').fetchall()
+            ]
+            keep = SLIM_COLUMNS.get(table)
+            columns = (
+                [c for c in source_columns if c in keep] if keep else source_columns
+            )
+            sort_keys = [
+                c
+                for c in SORT_KEYS.get(table, DEFAULT_SORT_KEYS)
+                if c in source_columns
+            ]
+            order = f"ORDER BY {', '.join(sort_keys)}" if sort_keys else ""
+            select = ", ".join(f'"{c}"' for c in columns)
+            con.execute(
+                f'CREATE TABLE "{table}" AS SELECT {select} FROM src."{table}" {order}'
+            )
+            tables[table] = {
+                "columns": len(columns),
+                "dropped_columns": len(source_columns) - len(columns),
+            }
+        con.execute("DETACH src")
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+
+    os.replace(tmp, slim_path)
+    summary = {
+        "tables": tables,
+        "dropped_tables": sorted(available - set(tables)),
+        "full_mb": full_path.stat().st_size / 1e6,
+        "slim_mb": slim_path.stat().st_size / 1e6,
+    }
+    logger.info(
+        f"Slim build {slim_path.name}: {summary['full_mb']:.1f} MB -> "
+        f"{summary['slim_mb']:.1f} MB, dropped {len(summary['dropped_tables'])} tables"
+    )
+    return summary
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of comparing one estimate between full and slim databases."""
+
+    method: str
+    params: dict = field(default_factory=dict)
+    ok: bool = True
+    detail: str = ""
+
+
+def compare_frames(full: pl.DataFrame, slim: pl.DataFrame, rtol: float = 1e-9) -> str | None:
+    """Describe the first difference between two estimate frames, or None."""
+    if full.columns != slim.columns:
+        return f"columns differ: {full.columns} vs {slim.columns}"
+    if full.height != slim.height:
+        return f"row count differs: {full.height} vs {slim.height}"
+
+    # Align rows on grouping columns (floats may differ in the last bits)
+    keys = [c for c in full.columns if not full[c].dtype.is_float()] or full.columns
+    full = full.sort(keys, nulls_last=True)
+    slim = slim.sort(keys, nulls_last=True)
+    for column in full.columns:
+        a, b = full[column], slim[column]
+        if a.dtype.is_numeric() and b.dtype.is_numeric():
+            a, b = a.cast(pl.Float64).fill_null(0.0), b.cast(pl.Float64).fill_null(0.0)
+            tolerance = rtol * (a.abs() + b.abs()) / 2 + 1e-12
+            mismatch = ((a - b).abs() > tolerance).arg_true()
+            if len(mismatch):
+                i = mismatch[0]
+                return f"{column}[{i}]: {a[i]} vs {b[i]}"
+        elif not a.equals(b):
+            return f"{column} values differ"
+    return None
+
+
+def _run_estimate(
+    db_path: Path, method: str, params: dict, profile: ResourceProfile | None = None
+) -> pl.DataFrame:
+    from pyfia import FIA
+
+    with FIA(str(db_path)) as db:
+        con = duckdb_connection(db) if profile is not None else None
+        if con is not None:
+            configure(con, profile)
+        db.clip_most_recent()
+        return getattr(db, method)(**params)
+
+
+def validate_slim(
+    full_path: Path,
+    slim_path: Path,
+    queries: list[tuple[str, dict]] | None = None,
+    rtol: float = 1e-9,
+    profile: ResourceProfile | None = None,
+) -> list[ValidationResult]:
+    """Compare estimates from a slim database against the full one.
+
+    Estimates the full database cannot produce (e.g. no GRM data for the
+    state) are skipped. The slim database must produce every other
+    estimate with the same values, and at least one estimate must be
+    compared: if the full database produces none, validation fails.
+    """
+    results = []
+    compared = 0
+    for method, params in queries or VALIDATION_QUERIES:
+        try:
+            full = _run_estimate(full_path, method, params, profile)
+        except Exception as e:
+            results.append(
+                ValidationResult(method, params, ok=True, detail=f"skipped: {e}")
+            )
+            continue
+        compared += 1
+
+        try:
+            slim = _run_estimate(slim_path, method, params, profile)
+        except Exception as e:
+            results.append(
+                ValidationResult(method, params, ok=False, detail=f"slim failed: {e}")
+            )
+            continue
+
+        difference = compare_frames(full, slim, rtol)
+        results.append(
+            ValidationResult(method, params, ok=difference is None, detail=difference or "")
+        )
+
+    if not compared:
+        results.append(
+            ValidationResult(
+                "all", ok=False, detail="no estimate could be run on the full database"
+            )
+        )
+    return results
@@ -0,0 +1,403 @@
+"""State-affinity routing of per-state estimator calls across workers.
+
+Without routing every worker opens every state's database, so connections,
+DuckDB buffer pools and the in-memory caches are duplicated per worker. With
+STATE_ROUTER_PEERS configured, states are assigned to workers on a consistent
+hash ring and each per-state estimator call is sent to the state's owner,
+which keeps hot connections and caches for its subset of states.
+
+Each peer is a separately addressable API process (e.g. one uvicorn process
+per port). Results travel as Arrow IPC streams. When an owner is unreachable
+it is marked down for a cooldown period and its states fail over to the next
+node on the ring, ending with the local worker.
+
+Peers authenticate to each other with STATE_ROUTER_TOKEN; routing stays
+disabled unless it is set.
+
+Owners return the data version of each forwarded estimate, so a worker can
+version responses for states it does not own (see remote_version).
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import polars as pl
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# pyFIA estimators that may be executed on a peer
+ESTIMATOR_METHODS = frozenset(
+    {
+        "area",
+        "area_change",
+        "volume",
+        "biomass",
+        "tpa",
+        "mortality",
+        "growth",
+        "removals",
+    }
+)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+INTERNAL_TOKEN_HEADER = "X-Internal-Token"
+DATA_VERSION_HEADER = "X-Data-Version"
+
+
+class RemoteEstimateError(Exception):
+    """The owning worker ran the estimator and it failed."""
+
+
+class _PeerUnavailableError(Exception):
+    """The peer answered but cannot serve estimates right now."""
+
+
+def serialize_frame(df: pl.DataFrame) -> bytes:
+    """Encode a DataFrame as an Arrow IPC stream."""
+    table = df.to_arrow()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_frame(data: bytes) -> pl.DataFrame:
+    """Decode an Arrow IPC stream into a DataFrame."""
+    return pl.from_arrow(pa.ipc.open_stream(data).read_all())
+
+
+def _ring_hash(value: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Adding or removing a node only moves the states that hashed to it.
+    """
+
+    def __init__(self, nodes: list[str], replicas: int = 64):
+        self.nodes = sorted(set(nodes))
+        self._ring: list[tuple[int, str]] = sorted(
+            (_ring_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(replicas)
+        )
+        self._hashes = [h for h, _ in self._ring]
+
+    def preference_list(self, key: str) -> list[str]:
+        """Distinct nodes in ring order starting at the key's position."""
+        if not self._ring:
+            return []
+
+        start = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._ring)
+        nodes: list[str] = []
+        for offset in range(len(self._ring)):
+            node = self._ring[(start + offset) % len(self._ring)][1]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == len(self.nodes):
+                    break
+        return nodes
+
+
+class StateRouter:
+    """Assigns states to workers and forwards estimator calls to owners.
+
+    Example:
+        >>> router = StateRouter("http://api-1:8000", ["http://api-1:8000", "http://api-2:8000"])
+        >>> router.is_local("NC")
+        False
+        >>> df = router.estimate("NC", "area", {"land_type": "forest"}, local=compute_locally)
+    """
+
+    def __init__(
+        self,
+        self_url: str | None,
+        peers: list[str],
+        token: str | None = None,
+        timeout: float = 300.0,
+        down_cooldown: float = 30.0,
+        version_ttl: float = 60.0,
+    ):
+        """Initialize the router.
+
+        Args:
+            self_url: Base URL other peers use to reach this worker.
+            peers: Base URLs of all workers, including this one.
+            token: Shared secret sent with internal requests.
+            timeout: Seconds to wait for a peer's estimate.
+            down_cooldown: Seconds a failed peer is skipped before retrying.
+            version_ttl: Seconds an owner's reported data version is trusted.
+        """
+        self.self_url = self_url.rstrip("/") if self_url else None
+        nodes = [p.rstrip("/") for p in peers]
+        if self.self_url and self.self_url not in nodes:
+            nodes.append(self.self_url)
+
+        self.ring = HashRing(nodes)
+        self.token = token
+        self.timeout = timeout
+        self.down_cooldown = down_cooldown
+        self.version_ttl = version_ttl
+        self._down_until: dict[str, float] = {}
+        # state -> (owner, data version, monotonic time reported)
+        self._remote_versions: dict[str, tuple[str, str, float]] = {}
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self.forwarded = 0
+        self.failovers = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if routing is active (this worker plus at least one peer)."""
+        return bool(self.self_url) and len(self.ring.nodes) > 1
+
+    def verify_token(self, token: str | None) -> bool:
+        """Check a request's internal token against the shared secret.
+
+        Always False without a configured token, so internal endpoints are
+        never open to unauthenticated callers.
+        """
+        if not self.token or not token:
+            return False
+        return hmac.compare_digest(token, self.token)
+
+    def mark_down(self, node: str) -> None:
+        """Skip a node until the cooldown expires."""
+        with self._lock:
+            self._down_until[node] = time.monotonic() + self.down_cooldown
+        logger.warning(f"State router: {node} marked down for {self.down_cooldown:.0f}s")
+
+    def is_up(self, node: str) -> bool:
+        """Check if a node is eligible for routing."""
+        if node == self.self_url:
+            return True
+        with self._lock:
+            until = self._down_until.get(node)
+            if until is None:
+                return True
+            if time.monotonic() >= until:
+                del self._down_until[node]
+                return True
+            return False
+
+    def candidates(self, state: str) -> list[str]:
+        """Nodes to try for a state, in order, ending at this worker."""
+        if not self.enabled:
+            return []
+
+        nodes = []
+        for node in self.ring.preference_list(state.upper()):
+            if node == self.self_url:
+                break
+            if self.is_up(node):
+                nodes.append(node)
+        nodes.append(self.self_url)
+        return nodes
+
+    def owner(self, state: str) -> str | None:
+        """Current owner of a state, taking down nodes into account."""
+        return self.candidates(state)[0] if self.enabled else None
+
+    def is_local(self, state: str) -> bool:
+        """Check if this worker owns a state."""
+        return not self.enabled or self.owner(state) == self.self_url
+
+    def remote_version(self, state: str) -> str | None:
+        """Data version the current owner last reported for a state.
+
+        Returns:
+            The version, or None if the owner has not answered an estimate
+            for the state within ``version_ttl`` seconds.
+        """
+        state = state.upper()
+        owner = self.owner(state)
+        with self._lock:
+            reported = self._remote_versions.get(state)
+        if reported is None:
+            return None
+        node, version, at = reported
+        if node != owner or time.monotonic() - at >= self.version_ttl:
+            return None
+        return version
+
+    def estimate(
+        self,
+        state: str,
+        method: str,
+        params: dict[str, Any],
+        local: Callable[[], pl.DataFrame],
+        approximate: bool = False,
+    ) -> pl.DataFrame:
+        """Run an estimator on the state's owner, failing over along the ring.
+
+        Args:
+            state: State code.
+            method: pyFIA estimator name (see ESTIMATOR_METHODS).
+            params: Estimator keyword arguments (JSON-serializable).
+            local: Computes the result on this worker; used when this worker
+                   is the owner or every peer ahead of it is down.
+            approximate: Estimate from a stratified subsample of plots.
+
+        Raises:
+            RemoteEstimateError: If the owner ran the estimator and it failed.
+        """
+        if not self.enabled:
+            return local()
+
+        for node in self.candidates(state):
+            if node == self.self_url:
+                return local()
+            try:
+                df = self._post_estimate(node, state, method, params, approximate)
+                self.forwarded += 1
+                return df
+            except (httpx.TransportError, _PeerUnavailableError) as e:
+                self.mark_down(node)
+                self.failovers += 1
+                logger.warning(f"State router: {state}/{method} failing over from {node}: {e}")
+
+        return local()
+
+    def stats(self) -> dict:
+        """Get routing statistics."""
+        with self._lock:
+            down = [
+                node for node, until in self._down_until.items()
+                if until > time.monotonic()
+            ]
+        return {
+            "enabled": self.enabled,
+            "self": self.self_url,
+            "nodes": self.ring.nodes,
+            "down": down,
+            "forwarded": self.forwarded,
+            "failovers": self.failovers,
+        }
+
+    def _post_estimate(
+        self,
+        node: str,
+        state: str,
+        method: str,
+        params: dict[str, Any],
+        approximate: bool = False,
+    ) -> pl.DataFrame:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout)
+
+        headers = {INTERNAL_TOKEN_HEADER: self.token} if self.token else {}
+        response = self._client.post(
+            f"{node}/api/v1/internal/estimate",
+            json={
+                "state": state,
+                "method": method,
+                "params": params,
+                "approximate": approximate,
+            },
+            headers=headers,
+        )
+
+        if response.status_code in (404, 502, 503, 504):
+            # Not routing-enabled, restarting, or overloaded
+            raise _PeerUnavailableError(f"HTTP {response.status_code}")
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise RemoteEstimateError(f"{node}: {detail}")
+
+        version = response.headers.get(DATA_VERSION_HEADER)
+        if version:
+            with self._lock:
+                self._remote_versions[state.upper()] = (node, version, time.monotonic())
+        return deserialize_frame(response.content)
+
+
+class RoutedConnection:
+    """Stand-in for a pyFIA connection to a state owned by another worker.
+
+    Estimator methods (``db.area(...)`` etc.) are forwarded to the owner and
+    return polars DataFrames, so code written against a pyFIA connection
+    works unchanged.
+    """
+
+    def __init__(
+        self,
+        router: StateRouter,
+        state: str,
+        local_estimate: Callable[..., pl.DataFrame],
+    ):
+        self.router = router
+        self.state = state.upper()
+        self._local_estimate = local_estimate
+        self.evalid = None
+        self.tables: dict[str, Any] = {}
+
+    def estimate(
+        self, method: str, params: dict[str, Any], approximate: bool = False
+    ) -> pl.DataFrame:
+        """Run an estimator on the owning worker."""
+        if method not in ESTIMATOR_METHODS:
+            raise ValueError(f"Unknown estimator: {method}")
+        return self.router.estimate(
+            self.state,
+            method,
+            params,
+            local=lambda: self._local_estimate(
+                self.state, method, params, approximate=approximate
+            ),
+            approximate=approximate,
+        )
+
+    def load_table(self, table_name: str, *args, **kwargs) -> None:
+        """No-op: table availability is checked by the owning worker.
+
+        The owner's estimator fails if a required table is missing, which is
+        reported like any other estimator error.
+        """
+        return None
+
+    def __getattr__(self, name: str):
+        if name in ESTIMATOR_METHODS:
+            return lambda approximate=False, **kwargs: self.estimate(
+                name, kwargs, approximate=approximate
+            )
+        raise AttributeError(name)
+
+
+def get_state_router() -> StateRouter:
+    """Get the configured StateRouter instance."""
+    from ..config import settings
+
+    peers = settings.state_router_peers_list
+    if peers and not settings.state_router_token:
+        logger.error(
+            "STATE_ROUTER_PEERS is set without STATE_ROUTER_TOKEN; "
+            "state routing disabled"
+        )
+        peers = []
+
+    return StateRouter(
+        self_url=settings.state_router_self_url,
+        peers=peers,
+        token=settings.state_router_token,
+        timeout=settings.state_router_timeout,
+    )
+
+
+# Singleton instance
+state_router = get_state_router()
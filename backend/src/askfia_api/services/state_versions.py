@@ -0,0 +1,162 @@
+"""Published versions of state databases.
+
+The build pipeline publishes ``{prefix}/manifest.json`` next to the state
+databases:
+
+    {"states": {"NC": {"version": "<sha256>", "evalids": [372301, ...],
+                       "size": 1234, "published_at": 1700000000.0}}}
+
+``version`` is the SHA-256 of the published file, so it identifies the
+content rather than the upload. Each local copy records the version it was
+downloaded as in a ``<file>.version`` sidecar, which lets every worker
+compare local and published versions without hashing multi-GB files.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_MANIFEST = "manifest.json"
+VERSION_SUFFIX = ".version"
+
+# Serializes read-modify-write of the published manifest across upload threads
+_publish_lock = threading.Lock()
+
+
+def manifest_key(prefix: str) -> str:
+    """Object key of the published manifest."""
+    return f"{prefix}/{PUBLISHED_MANIFEST}"
+
+
+def read_published_manifest(client: Any, bucket: str, prefix: str) -> dict:
+    """Fetch the published manifest, or an empty one if none exists yet."""
+    try:
+        response = client.get_object(Bucket=bucket, Key=manifest_key(prefix))
+        manifest = json.loads(response["Body"].read())
+    except Exception as e:
+        logger.debug(f"No published manifest at {bucket}/{manifest_key(prefix)}: {e}")
+        return {"states": {}}
+    manifest.setdefault("states", {})
+    return manifest
+
+
+def update_published_manifest(
+    client: Any, bucket: str, prefix: str, updates: dict[str, dict]
+) -> dict:
+    """Merge state entries into the published manifest and upload it.
+
+    Call after the state databases themselves are uploaded, so readers
+    never see a version whose file is not yet available. Concurrent calls
+    in one process (the build pipeline's upload threads) are serialized so
+    no update is lost; run one publishing process per bucket.
+    """
+    with _publish_lock:
+        manifest = read_published_manifest(client, bucket, prefix)
+        manifest["states"].update(updates)
+        manifest["updated_at"] = time.time()
+        client.put_object(
+            Bucket=bucket,
+            Key=manifest_key(prefix),
+            Body=json.dumps(manifest, indent=2).encode(),
+            ContentType="application/json",
+        )
+    return manifest
+
+
+def state_evalids(db_path: Path) -> list[int]:
+    """EVALIDs present in a state database."""
+    import duckdb
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        return [
+            row[0]
+            for row in con.execute(
+                "SELECT DISTINCT EVALID FROM POP_EVAL ORDER BY EVALID"
+            ).fetchall()
+        ]
+    except duckdb.Error:
+        return []
+    finally:
+        con.close()
+
+
+def read_local_version(path: Path) -> str | None:
+    """Version recorded for a local database file, if any."""
+    try:
+        return Path(f"{path}{VERSION_SUFFIX}").read_text().strip() or None
+    except OSError:
+        return None
+
+
+def write_local_version(path: Path, version: str | None) -> None:
+    """Record the version of a local database file (None clears it)."""
+    sidecar = Path(f"{path}{VERSION_SUFFIX}")
+    if version is None:
+        sidecar.unlink(missing_ok=True)
+        return
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    tmp.write_text(version)
+    os.replace(tmp, sidecar)
+
+
+class PublishedVersions:
+    """The published manifest, re-fetched at most once per TTL.
+
+    Example:
+        >>> versions = PublishedVersions(lambda: storage.s3, "fia-bucket", "fia-duckdb", ttl=300)
+        >>> versions.get("NC")["version"]
+    """
+
+    def __init__(
+        self,
+        client: Callable[[], Any],
+        bucket: str | None,
+        prefix: str,
+        ttl: float = 300.0,
+    ):
+        """Initialize the version source.
+
+        Args:
+            client: Returns the S3 client, or None if unavailable.
+            bucket: Bucket holding the manifest.
+            prefix: Key prefix of the state databases.
+            ttl: Seconds between manifest fetches.
+        """
+        self._client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.ttl = ttl
+        self._states: dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh_if_due(self) -> None:
+        if time.monotonic() - self._fetched_at < self.ttl and self._fetched_at:
+            return
+        client = self._client() if self.bucket else None
+        if client is None:
+            return
+        manifest = read_published_manifest(client, self.bucket, self.prefix)
+        self._states = {k.upper(): v for k, v in manifest["states"].items()}
+        self._fetched_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Re-fetch the manifest on the next lookup."""
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def get(self, state: str) -> dict | None:
+        """Published entry for a state (version, evalids, size)."""
+        with self._lock:
+            self._refresh_if_due()
+            return self._states.get(state.upper())
@@ -1,15 +1,103 @@
 """Tiered storage for FIA DuckDB files."""
 
+import asyncio
 import logging
 import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
 
 from botocore.exceptions import ClientError
 
+from .cache_manifest import CacheManifest
+from .s3_download import (
+    MB,
+    DownloadVerificationError,
+    ObjectInfo,
+    RangedDownloader,
+    exclusive_file_lock,
+    file_sha256,
+    read_partial_progress,
+)
+from .state_versions import (
+    PublishedVersions,
+    read_local_version,
+    state_evalids,
+    write_local_version,
+)
+from .table_store import (
+    DEFAULT_TABLES,
+    ESTIMATOR_TABLES,
+    TableStore,
+    cache_key,
+    manifest_version,
+)
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DownloadFlight:
+    """A state download shared by every caller that asks for the state.
+
+    The first caller runs the download; later callers wait on ``done`` and
+    receive the same path or exception.
+    """
+
+    state: str
+    started_at: float = field(default_factory=time.time)
+    downloaded_bytes: int = 0
+    total_bytes: int | None = None
+    status: str = "downloading"  # downloading, done, failed
+    error: str | None = None
+    waiters: int = 0
+    done: threading.Event = field(default_factory=threading.Event)
+    _path: str | None = None
+    _exception: BaseException | None = None
+
+    def update(self, downloaded: int, total: int) -> None:
+        """Progress callback for the downloader."""
+        self.downloaded_bytes = downloaded
+        self.total_bytes = total
+
+    def finish(self, path: str | None = None, exception: BaseException | None = None) -> None:
+        """Record the outcome and release waiters."""
+        self._path = path
+        self._exception = exception
+        self.status = "failed" if exception else "done"
+        self.error = str(exception) if exception else None
+        self.done.set()
+
+    def result(self) -> str:
+        """Wait for the download and return its path, or raise its error."""
+        self.done.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._path
+
+    def to_dict(self) -> dict:
+        """Progress snapshot for status endpoints."""
+        percent = (
+            100.0 * self.downloaded_bytes / self.total_bytes
+            if self.total_bytes
+            else None
+        )
+        return {
+            "state": self.state,
+            "status": self.status,
+            "downloaded_mb": self.downloaded_bytes / 1e6,
+            "total_mb": self.total_bytes / 1e6 if self.total_bytes else None,
+            "percent": percent,
+            "elapsed_s": time.time() - self.started_at,
+            "waiters": self.waiters,
+            "error": self.error,
+        }
+
+
 class FIAStorage:
     """
     Tiered storage for FIA DuckDB files.
@@ -26,13 +114,59 @@ class FIAStorage:
         s3_bucket: str | None = None,
         s3_prefix: str = "fia-duckdb",
         max_local_gb: float = 5.0,
+        download_chunk_mb: int = 64,
+        download_workers: int = 8,
+        cache_policy: str = "lru",
+        pinned_states: list[str] | None = None,
+        table_storage: bool = False,
+        version_check_ttl: float = 0.0,
+        datamart_fallback: bool = False,
+        datamart_source: str | None = None,
     ):
         self.local_dir = Path(local_dir)
         self.local_dir.mkdir(parents=True, exist_ok=True)
         self.s3_bucket = s3_bucket
         self.s3_prefix = s3_prefix
         self.max_local_bytes = max_local_gb * 1e9
+        self.download_chunk_size = download_chunk_mb * MB
+        self.download_workers = download_workers
         self._s3_client = None
+        self._flights: dict[str, DownloadFlight] = {}
+        self._recent: dict[str, DownloadFlight] = {}
+        self._flights_lock = threading.Lock()
+        self._preload_states: list[str] = []
+        self._preload_task: asyncio.Task | None = None
+        self._preload_errors: dict[str, str] = {}
+        # Background replacement of files whose published version changed
+        self.version_check_ttl = version_check_ttl
+        self.published = PublishedVersions(
+            lambda: self.s3, s3_bucket, s3_prefix, ttl=version_check_ttl
+        )
+        self._version_checked: dict[str, float] = {}
+        self._refreshing: set[str] = set()
+        self._replace_listeners: list[Callable[[str], None]] = []
+        self._local_evalids: dict[str, tuple[tuple, list[int]]] = {}
+        # Cold tier: build missing states from DataMart archives
+        self.datamart_fallback = datamart_fallback
+        self.datamart_source = datamart_source or None
+        pinned_states = pinned_states or []
+        self.manifest = CacheManifest(
+            self.local_dir,
+            self.max_local_bytes,
+            policy=cache_policy,
+            pinned=pinned_states + [cache_key(state) for state in pinned_states],
+        )
+        self.manifest.reconcile(self._scan_local())
+        # Per-table Parquet fetches instead of whole-database downloads
+        self.table_store = (
+            TableStore(self.local_dir / "tables", s3_bucket, s3_prefix, self._downloader)
+            if table_storage
+            else None
+        )
+        # States whose older table versions can go once no query reads them
+        self._stale_table_versions: set[str] = set()
+        if self.table_store is not None:
+            self.table_store.add_version_listener(self._on_tables_replaced)
 
     @property
     def s3(self):
@@ -78,45 +212,434 @@ class FIAStorage:
         """
         Get path to state DuckDB file, downloading if necessary.
 
+        Concurrent callers for the same uncached state share one download:
+        in-process callers wait on the first caller's download, and other
+        worker processes wait on a per-state file lock.
+
         Returns the path as a string for compatibility with pyFIA.
         """
         state = state.upper()
 
-        # Check for state directory structure (pyfia default)
+        # Tier 1: Check local cache
+        local_path = self._find_local(state)
+        if local_path is not None:
+            logger.debug(f"Cache hit: {state} (local: {local_path})")
+            self.manifest.record_use(state, local_path)
+            self._maybe_refresh(state, local_path)
+            return str(local_path)
+
+        # Tiers 2 and 3: S3/R2, then DataMart (one fetch per state)
+        if self.s3_bucket or self.datamart_fallback:
+            return self._fetch_single_flight(state)
+
+        raise FileNotFoundError(self._not_found_message(state))
+
+    @contextmanager
+    def use(self, state: str, tables: tuple[str, ...] | None = None) -> Iterator[str]:
+        """Get a state's database path, keeping the file from being evicted.
+
+        With table storage enabled and the state's tables published, the
+        path is a view database over just ``tables`` (default: the tables
+        of the area/volume/biomass/tpa estimators).
+
+        Example:
+            >>> with storage.use("NC") as db_path:
+            ...     with FIA(db_path) as db:
+            ...         ...
+        """
+        state = state.upper()
+        if self.table_store is not None:
+            key = cache_key(state)
+            self.manifest.acquire(key)
+            try:
+                view_path = self._table_view(state, tables or DEFAULT_TABLES)
+                if view_path is not None:
+                    yield str(view_path)
+                    return
+            finally:
+                self.manifest.release(key)
+                self._prune_table_versions(state)
+
+        # Reference first so the file cannot be evicted between lookup and open
+        self.manifest.acquire(state)
+        try:
+            yield self.get_db_path(state)
+        finally:
+            self.manifest.release(state)
+
+    def _table_view(self, state: str, tables: tuple[str, ...]) -> Path | None:
+        """Table store view database, accounting the tables in the manifest.
+
+        The caller holds a reference on the state's cache key, so the
+        directory is not evicted while its tables are fetched or read.
+        """
+        key = cache_key(state)
+        fetched = self.table_store.tables_fetched
+        view_path = self.table_store.view_db(state, tables)
+        if view_path is None:
+            return None
+        # The entry is the state's directory, holding every cached version
+        state_dir = view_path.parent.parent
+        if self.table_store.tables_fetched != fetched:
+            self.manifest.admit(key, state_dir)
+            self.manifest.evict_to_fit(protect={key})
+        else:
+            self.manifest.record_use(key, state_dir)
+        return view_path
+
+    def _on_tables_replaced(self, state: str) -> None:
+        """Table store listener: a state's published tables changed version."""
+        with self._flights_lock:
+            self._stale_table_versions.add(state)
+        self._notify_replaced(state)
+
+    def _prune_table_versions(self, state: str) -> None:
+        """Delete a state's older table versions once no query reads them."""
+        with self._flights_lock:
+            if state not in self._stale_table_versions:
+                return
+        key = cache_key(state)
+        with self.manifest.exclusive(key) as unused:
+            if not unused:
+                return
+            with self._flights_lock:
+                self._stale_table_versions.discard(state)
+            removed = self.table_store.prune_versions(state)
+        if removed:
+            self.manifest.admit(key, self.table_store.directory / state)
+
+    def tables_missing(self, db_path, state: str, method: str) -> bool:
+        """Whether a view database lacks published tables an estimator needs."""
+        if self.table_store is None:
+            return False
+        exposed = self.table_store.view_tables(db_path)
+        if exposed is None:
+            return False
+        needed = set(ESTIMATOR_TABLES.get(method, DEFAULT_TABLES))
+        return not needed & self.table_store.published_tables(state) <= exposed
+
+    def unpublished_tables(
+        self, db_path, state: str, tables: list[str]
+    ) -> list[str] | None:
+        """Tables a state does not publish, for a view database.
+
+        Returns:
+            The unpublished tables among ``tables``, or None if db_path is
+            not a table storage view.
+        """
+        if self.table_store is None or self.table_store.view_tables(db_path) is None:
+            return None
+        published = self.table_store.published_tables(state)
+        return [table for table in tables if table not in published]
+
+    def local_evalids(self, state: str) -> list[int] | None:
+        """EVALIDs of a state's local data, without fetching it.
+
+        Published tables the table store serves the state from take
+        precedence over a local file. A file is read once per version
+        (inode and size).
+
+        Returns:
+            The EVALIDs, or None if the state is not cached locally.
+        """
+        state = state.upper()
+        manifest = self._table_manifest(state)
+        if manifest is not None:
+            return manifest["evalids"]
+        local_path = self._find_local(state)
+        if local_path is None:
+            return None
+        try:
+            stat = local_path.stat()
+        except OSError:
+            return None
+        identity = (str(local_path), stat.st_ino, stat.st_size)
+        cached = self._local_evalids.get(state)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+        evalids = state_evalids(local_path)
+        self._local_evalids[state] = (identity, evalids)
+        return evalids
+
+    def local_version(self, state: str) -> str | None:
+        """Published version of a state's local data, without fetching it.
+
+        Returns:
+            The version, or None if the state is not cached locally or its
+            file predates versioning.
+        """
+        state = state.upper()
+        manifest = self._table_manifest(state)
+        if manifest is not None:
+            return f"tables:{manifest_version(manifest)}"
+        local_path = self._find_local(state)
+        return read_local_version(local_path) if local_path is not None else None
+
+    def _table_manifest(self, state: str) -> dict | None:
+        """Table manifest of a state served from the table store, if loaded."""
+        if self.table_store is None:
+            return None
+        return self.table_store.loaded_manifest(state)
+
+    def _local_paths(self, state: str) -> list[Path]:
+        """Candidate local paths for a state (pyfia layout first)."""
         state_dir = self.local_dir / state.lower()
-        possible_paths = [
+        return [
             state_dir / f"{state.lower()}.duckdb",
             state_dir / "fia.duckdb",
             self.local_dir / f"{state}.duckdb",
         ]
 
-        # Tier 1: Check local cache
-        for local_path in possible_paths:
+    def _find_local(self, state: str) -> Path | None:
+        for local_path in self._local_paths(state):
             if local_path.exists():
-                logger.debug(f"Cache hit: {state} (local: {local_path})")
-                self._touch(local_path)
-                return str(local_path)
-
-        # Tier 2: Check S3/R2
-        target_path = self.local_dir / f"{state}.duckdb"
-        if self.s3_bucket and self._download_from_s3(state, target_path):
-            logger.info(f"Cache hit: {state} (S3)")
-            self._enforce_cache_limit()
-            return str(target_path)
+                return local_path
+        return None
 
-        # No fallback to FIA DataMart - all data must be preloaded
-        raise FileNotFoundError(
+    @staticmethod
+    def _not_found_message(state: str) -> str:
+        return (
             f"State {state} not found in cache or R2. "
             f"Run 'uv run python scripts/build_fia_cache.py --states {state}' to preload."
         )
 
-    def _download_from_s3(self, state: str, local_path: Path) -> bool:
-        """Try to download from S3. Returns True if successful."""
+    def _fetch_single_flight(self, state: str) -> str:
+        """Download a state once, sharing the outcome with concurrent callers."""
+        with self._flights_lock:
+            flight = self._flights.get(state)
+            leader = flight is None
+            if leader:
+                flight = DownloadFlight(state=state)
+                self._flights[state] = flight
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            logger.info(f"Waiting for in-flight download of {state}")
+            return flight.result()
+
+        try:
+            flight.finish(path=self._fetch_locked(state, flight))
+        except BaseException as e:
+            flight.finish(exception=e)
+        finally:
+            with self._flights_lock:
+                self._flights.pop(state, None)
+                self._recent[state] = flight
+
+        return flight.result()
+
+    def _fetch_locked(self, state: str, flight: DownloadFlight) -> str:
+        """Download a state while holding its cross-process lock."""
+        target_path = self.local_dir / f"{state}.duckdb"
+
+        with self._state_file_lock(state):
+            # Another worker may have finished the download while we waited
+            local_path = self._find_local(state)
+            if local_path is not None:
+                logger.info(f"Cache hit: {state} (downloaded by another worker)")
+                self.manifest.record_use(state, local_path)
+                return str(local_path)
+
+            source = "S3"
+            info = (
+                self._download_from_s3(state, target_path, progress=flight.update)
+                if self.s3_bucket
+                else None
+            )
+            if not info and self.datamart_fallback:
+                source = "DataMart"
+                info = self._ingest_from_datamart(state, target_path)
+            if info:
+                logger.info(f"Fetched {state} ({source})")
+                # Unknown versions are hashed on the first version check
+                write_local_version(target_path, info.sha256)
+                self._version_checked[state] = time.monotonic()
+                self.manifest.admit(state, target_path)
+                self.manifest.record_use(state)
+                self.manifest.evict_to_fit(protect={state})
+                return str(target_path)
+
+        raise FileNotFoundError(self._not_found_message(state))
+
+    def _ingest_from_datamart(self, state: str, target_path: Path) -> ObjectInfo | None:
+        """Build a state database from FIA DataMart archives (cold tier)."""
+        from .datamart_ingest import ArchiveSource, ingest_state
+
+        logger.info(f"Building {state} from FIA DataMart (cold tier)")
+        try:
+            result = ingest_state(state, target_path, ArchiveSource(self.datamart_source))
+        except Exception as e:
+            logger.warning(f"DataMart build failed for {state}: {e}")
+            return None
+        # No published version; the first version check hashes the file
+        return ObjectInfo(size=result.path.stat().st_size, etag="")
+
+    @contextmanager
+    def _state_file_lock(self, state: str) -> Iterator[None]:
+        """Exclusive per-state lock shared by all processes using local_dir."""
+        with exclusive_file_lock(self.local_dir / ".locks" / f"{state}.lock"):
+            yield
+
+    def add_replace_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(state) after a state's data is replaced by a newer version.
+
+        Fires for a refreshed state file and for a new version of the
+        state's published tables.
+        """
+        self._replace_listeners.append(listener)
+
+    def _notify_replaced(self, state: str) -> None:
+        for listener in self._replace_listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                logger.warning(f"Replace listener failed for {state}: {e}")
+
+    def state_locations(self, state: str) -> list[Path]:
+        """Local paths a state's data is read from (files and table directory)."""
+        state = state.upper()
+        paths = self._local_paths(state)
+        if self.table_store is not None:
+            paths.append(self.table_store.directory / state)
+        return paths
+
+    def _maybe_refresh(self, state: str, local_path: Path) -> None:
+        """Check a cached state against the published version, at most once per TTL.
+
+        The check and any replacement run in a background thread, so the
+        caller keeps using the current file.
+        """
+        if not self.version_check_ttl or not self.s3_bucket:
+            return
+        now = time.monotonic()
+        with self._flights_lock:
+            last = self._version_checked.get(state)
+            if state in self._refreshing or (
+                last is not None and now - last < self.version_check_ttl
+            ):
+                return
+            self._version_checked[state] = now
+            self._refreshing.add(state)
+
+        threading.Thread(
+            target=self._refresh_state,
+            args=(state, local_path),
+            name=f"refresh-{state}",
+            daemon=True,
+        ).start()
+
+    def _refresh_state(self, state: str, local_path: Path) -> bool:
+        """Replace a cached file if a newer version is published.
+
+        The new version is downloaded next to the old one and renamed over
+        it. Queries that already opened the old file keep reading it (the
+        open descriptor pins the old inode) until they finish; new
+        connections open the new version.
+
+        Returns:
+            True if the file was replaced.
+        """
+        try:
+            published = self.published.get(state)
+            if not published or not published.get("version"):
+                return False
+
+            local_version = read_local_version(local_path)
+            if local_version is None:
+                # Files cached before versioning: hash once and remember
+                local_version = file_sha256(local_path)
+                write_local_version(local_path, local_version)
+            if local_version == published["version"]:
+                return False
+
+            with self._state_file_lock(state):
+                # Another worker may have replaced it while we waited
+                if read_local_version(local_path) == published["version"]:
+                    return False
+
+                logger.info(
+                    f"Refreshing {state}: {local_version[:12]} -> "
+                    f"{published['version'][:12]}"
+                )
+                staging = local_path.with_name(f"{local_path.name}.new")
+                info = self._download_from_s3(state, staging)
+                if not info:
+                    return False
+                version = info.sha256 or file_sha256(staging)
+                if version != published["version"]:
+                    # Published mid-download, or a stale manifest: keep the
+                    # current file and retry with a fresh manifest next check
+                    logger.warning(
+                        f"Downloaded {state} version {version[:12]} does not match "
+                        f"published {published['version'][:12]}; keeping the "
+                        "current file"
+                    )
+                    staging.unlink(missing_ok=True)
+                    self.published.invalidate()
+                    return False
+                os.replace(staging, local_path)
+                write_local_version(local_path, version)
+                self.manifest.admit(state, local_path)
+
+            self._notify_replaced(state)
+            return True
+        except Exception as e:
+            logger.warning(f"Version check failed for {state}: {e}")
+            return False
+        finally:
+            with self._flights_lock:
+                self._refreshing.discard(state)
+
+    def download_status(self) -> list[dict]:
+        """Progress of running and recently finished downloads.
+
+        Includes downloads running in other worker processes, read from the
+        downloader's ``.part.json`` progress files.
+        """
+        with self._flights_lock:
+            flights = {**self._recent, **self._flights}
+        status = [flight.to_dict() for flight in flights.values()]
+
+        for sidecar in self.local_dir.rglob("*.duckdb.part.json"):
+            state = sidecar.name.split(".")[0].upper()
+            if state in self._flights:
+                continue
+            progress = read_partial_progress(sidecar)
+            if progress is None:
+                continue
+            downloaded, total = progress
+            status.append({
+                "state": state,
+                "status": "downloading" if state not in flights else "partial",
+                "downloaded_mb": downloaded / 1e6,
+                "total_mb": total / 1e6,
+                "percent": 100.0 * downloaded / total if total else None,
+                "elapsed_s": None,
+                "waiters": 0,
+                "error": None,
+            })
+
+        return sorted(status, key=lambda x: x["state"])
+
+    def _downloader(self) -> RangedDownloader | None:
+        if not self.s3:
+            return None
+        return RangedDownloader(
+            self.s3,
+            chunk_size=self.download_chunk_size,
+            max_workers=self.download_workers,
+        )
+
+    def _download_from_s3(
+        self, state: str, local_path: Path, progress=None
+    ) -> ObjectInfo | None:
+        """Try to download from S3. Returns the object's info if successful."""
         logger.info(f"Attempting S3 download for {state}, bucket={self.s3_bucket}, prefix={self.s3_prefix}")
 
         if not self.s3:
             logger.error(f"S3 client is None! Cannot download {state}")
-            return False
+            return None
 
         s3_key = f"{self.s3_prefix}/{state}.duckdb"
         try:
@@ -124,16 +647,20 @@ class FIAStorage:
             local_path.parent.mkdir(parents=True, exist_ok=True)
 
             logger.info(f"Downloading {state} from S3: s3://{self.s3_bucket}/{s3_key} -> {local_path}")
-            self.s3.download_file(self.s3_bucket, s3_key, str(local_path))
+            downloader = self._downloader()
+            info = downloader.download(self.s3_bucket, s3_key, local_path, progress=progress)
             logger.info(f"Successfully downloaded {state} ({local_path.stat().st_size / 1e6:.1f} MB)")
-            return True
+            return info
+        except DownloadVerificationError as e:
+            logger.error(f"S3 download for {state} failed verification: {e}")
+            return None
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
             logger.error(f"S3 ClientError for {state}: {error_code} - {e}")
-            return False
+            return None
         except Exception as e:
             logger.error(f"S3 download failed for {state}: {type(e).__name__}: {e}", exc_info=True)
-            return False
+            return None
 
     def _upload_to_s3(self, state: str, local_path: Path) -> bool:
         """Upload to S3 for future cache hits."""
@@ -143,50 +670,115 @@ class FIAStorage:
         s3_key = f"{self.s3_prefix}/{state}.duckdb"
         try:
             logger.info(f"Uploading {state} to S3: {s3_key}")
-            self.s3.upload_file(str(local_path), self.s3_bucket, s3_key)
+            # sha256 metadata lets downloads verify multipart objects end to end
+            self.s3.upload_file(
+                str(local_path),
+                self.s3_bucket,
+                s3_key,
+                ExtraArgs={"Metadata": {"sha256": file_sha256(local_path)}},
+            )
             logger.info(f"Uploaded {state} to S3 ({local_path.stat().st_size / 1e6:.1f} MB)")
             return True
         except Exception as e:
             logger.warning(f"S3 upload failed for {state}: {e}")
             return False
 
-    def _touch(self, path: Path):
-        """Update access time for LRU tracking."""
-        try:
-            path.touch()
-        except Exception:
-            pass  # Ignore errors
-
-    def _enforce_cache_limit(self):
-        """Remove oldest files if over cache limit."""
-        # Find all duckdb files recursively
-        files = list(self.local_dir.rglob("*.duckdb"))
-        if not files:
-            return
+    async def ensure(self, state: str) -> str:
+        """Async get_db_path() that never blocks the event loop.
 
-        total_size = sum(f.stat().st_size for f in files)
+        Joins an in-flight download of the state (including a queued
+        preload) rather than starting a second one.
+        """
+        state = state.upper()
+        local_path = self._find_local(state)
+        if local_path is not None and self.table_store is None:
+            return str(local_path)
+        return await asyncio.to_thread(self._ensure_sync, state)
+
+    def _ensure_sync(self, state: str) -> str:
+        # Like get_db_path() but without counting a cache use; the query
+        # that follows ensure() records its own
+        if self.table_store is not None:
+            key = cache_key(state)
+            self.manifest.acquire(key)
+            try:
+                view_path = self._table_view(state, DEFAULT_TABLES)
+            finally:
+                self.manifest.release(key)
+            if view_path is not None:
+                return str(view_path)
+
+        local_path = self._find_local(state)
+        if local_path is not None:
+            return str(local_path)
+        if self.s3_bucket or self.datamart_fallback:
+            return self._fetch_single_flight(state)
+        raise FileNotFoundError(self._not_found_message(state))
+
+    def start_preload(self, states: list[str], max_parallel: int = 2) -> asyncio.Task:
+        """Download states in the background with bounded parallelism.
+
+        Must be called from a running event loop. Progress is reported per
+        state by readiness().
+
+        Returns:
+            Task that completes when every state has been attempted.
+        """
+        states = [state.upper() for state in states]
+        self._preload_states = list(dict.fromkeys(self._preload_states + states))
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        async def preload_one(state: str) -> None:
+            async with semaphore:
+                try:
+                    logger.info(f"Preloading {state}...")
+                    await self.ensure(state)
+                    self._preload_errors.pop(state, None)
+                except Exception as e:
+                    self._preload_errors[state] = str(e)
+                    logger.warning(f"Failed to preload {state}: {e}")
+
+        async def run() -> None:
+            await asyncio.gather(*(preload_one(state) for state in states))
+            logger.info(f"Preload finished: {self.readiness()}")
+
+        self._preload_task = asyncio.create_task(run())
+        return self._preload_task
 
-        if total_size <= self.max_local_bytes:
-            return
+    @property
+    def preloading(self) -> bool:
+        """Whether a background preload is still running."""
+        return self._preload_task is not None and not self._preload_task.done()
 
-        # Sort by access time (oldest first)
-        files.sort(key=lambda f: f.stat().st_atime)
+    def readiness(self) -> dict[str, str]:
+        """Per-state status of preloaded and downloading states.
 
-        while total_size > self.max_local_bytes and files:
-            oldest = files.pop(0)
-            size = oldest.stat().st_size
-            try:
-                oldest.unlink()
-                # Also remove parent directory if empty
-                if oldest.parent != self.local_dir and not any(oldest.parent.iterdir()):
-                    oldest.parent.rmdir()
-                total_size -= size
-                logger.info(f"Evicted {oldest.name} from cache ({size / 1e6:.1f} MB)")
-            except Exception as e:
-                logger.warning(f"Failed to evict {oldest}: {e}")
+        Values are "ready", "downloading", "queued" (waiting for a preload
+        slot) or "failed".
+        """
+        with self._flights_lock:
+            flights = {**self._recent, **self._flights}
+
+        status = {}
+        for state in sorted(set(self._preload_states) | set(flights)):
+            flight = flights.get(state)
+            if flight is not None and flight.status == "downloading":
+                status[state] = "downloading"
+            elif self._find_local(state) is not None or (
+                self.table_store is not None
+                and self.table_store.has_tables(state, DEFAULT_TABLES)
+            ):
+                status[state] = "ready"
+            elif state in self._preload_errors or (
+                flight is not None and flight.status == "failed"
+            ):
+                status[state] = "failed"
+            else:
+                status[state] = "queued"
+        return status
 
     def preload(self, states: list[str]):
-        """Preload states into local cache (call on startup)."""
+        """Preload states into local cache, blocking until done (for scripts)."""
         for state in states:
             try:
                 logger.info(f"Preloading {state}...")
@@ -194,30 +786,46 @@ class FIAStorage:
             except Exception as e:
                 logger.warning(f"Failed to preload {state}: {e}")
 
-    def list_cached_states(self) -> list[dict]:
-        """List all cached states with their sizes."""
-        cached = []
+    def _scan_local(self) -> dict[str, Path]:
+        """Find every cached state database and table directory on disk."""
+        files = {}
+        tables_dir = self.local_dir / "tables"
         for db_file in self.local_dir.rglob("*.duckdb"):
-            stat = db_file.stat()
+            if tables_dir in db_file.parents:
+                continue  # view databases of the table store
             state = db_file.stem.upper()
             if state == "FIA":
                 state = db_file.parent.name.upper()
-            cached.append({
-                "state": state,
-                "path": str(db_file),
-                "size_mb": stat.st_size / 1e6,
-                "last_accessed": stat.st_atime,
-            })
+            files.setdefault(state, db_file)
+        if tables_dir.is_dir():
+            for state_dir in tables_dir.iterdir():
+                if state_dir.is_dir():
+                    files[cache_key(state_dir.name)] = state_dir
+        return files
+
+    def list_cached_states(self) -> list[dict]:
+        """List all cached states with their sizes."""
+        cached = [
+            {
+                "state": entry["state"],
+                "path": entry["path"],
+                "size_mb": entry["size"] / 1e6,
+                "last_accessed": entry["last_used"],
+                "uses": entry["uses"],
+                "pinned": entry["pinned"],
+                "in_use": entry["refs"] > 0,
+            }
+            for entry in self.manifest.entries()
+        ]
         return sorted(cached, key=lambda x: x["state"])
 
     def clear_cache(self):
-        """Clear all cached files."""
-        for db_file in self.local_dir.rglob("*.duckdb"):
-            try:
-                db_file.unlink()
-                logger.info(f"Removed {db_file}")
-            except Exception as e:
-                logger.warning(f"Failed to remove {db_file}: {e}")
+        """Clear all cached files that are not in use."""
+        for state in list(self._scan_local()):
+            if self.manifest.remove(state):
+                logger.info(f"Removed {state} from cache")
+            else:
+                logger.warning(f"Failed to remove {state}: in use")
 
 
 # Create singleton from settings
@@ -230,6 +838,14 @@ def get_storage() -> FIAStorage:
         s3_bucket=settings.fia_s3_bucket,
         s3_prefix=settings.fia_s3_prefix,
         max_local_gb=settings.fia_local_cache_gb,
+        download_chunk_mb=settings.s3_download_chunk_mb,
+        download_workers=settings.s3_download_workers,
+        cache_policy=settings.fia_cache_policy,
+        pinned_states=settings.fia_cache_pinned_states_list,
+        table_storage=settings.fia_table_storage,
+        version_check_ttl=settings.fia_version_check_ttl,
+        datamart_fallback=settings.fia_datamart_fallback,
+        datamart_source=settings.fia_datamart_source,
     )
 
 
@@ -0,0 +1,256 @@
+"""Shared stratification cache for pyFIA estimators.
+
+Every pyFIA estimator (area, volume, biomass, TPA, mortality, growth, ...)
+joins the same POP_STRATUM / POP_PLOT_STRATUM_ASSGN / POP_ESTN_UNIT tables for
+the clipped EVALID. This module materializes those tables once per
+(database, EVALID) as in-memory Arrow tables and injects them into each new
+pyFIA connection, so only the first metric for a state pays the load cost.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import polars as pl
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Population tables shared by all design-based estimators
+STRATIFICATION_TABLES = ("POP_STRATUM", "POP_PLOT_STRATUM_ASSGN", "POP_ESTN_UNIT")
+
+# Cache key: (database source identifier, sorted EVALIDs)
+CacheKey = tuple[str, tuple[int, ...]]
+
+
+@dataclass
+class StratificationEntry:
+    """Materialized stratification tables for one (database, EVALID) pair.
+
+    Attributes:
+        tables: Arrow tables keyed by FIA table name, filtered to the EVALIDs
+        plot_cns: Unique PLT_CN values assigned to the EVALIDs
+        hits: Number of times the entry was injected after the initial load
+    """
+
+    tables: dict[str, pa.Table]
+    plot_cns: list[str] = field(default_factory=list)
+    hits: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate in-memory size of the cached tables."""
+        return sum(table.nbytes for table in self.tables.values())
+
+
+class StratificationCache:
+    """Process-wide LRU cache of stratification tables.
+
+    Entries are keyed by a database source identifier (MotherDuck database
+    name or local file signature) plus the clipped EVALIDs, so a rebuilt
+    database or a new evaluation never reuses stale expansion factors.
+
+    Example:
+        >>> with FIA(db_path) as db:
+        ...     db.clip_most_recent()
+        ...     strat_cache.inject(db, source=db_path)
+        ...     db.area()  # Uses the cached POP_* tables
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of (database, EVALID) entries to keep.
+                        Zero disables caching.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, StratificationEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[CacheKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if caching is enabled."""
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(source: str, evalid: list[int] | None) -> CacheKey | None:
+        """Build a cache key, or None if the connection is not clipped."""
+        if not evalid:
+            return None
+        return (source, tuple(sorted(int(e) for e in evalid)))
+
+    def get(self, key: CacheKey) -> StratificationEntry | None:
+        """Get a cached entry and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: CacheKey, entry: StratificationEntry) -> None:
+        """Store an entry, evicting the least recently used beyond the limit."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted_key, None)
+                logger.debug(f"Evicted stratification tables for {evicted_key}")
+
+    def get_or_load(self, db: Any, source: str) -> StratificationEntry | None:
+        """Return the entry for a clipped connection, loading it on first use.
+
+        Concurrent callers for the same key wait for a single load.
+
+        Args:
+            db: pyFIA FIA/MotherDuckFIA instance after clip_most_recent().
+            source: Identifier of the underlying database.
+
+        Returns:
+            The cached entry, or None if caching is disabled or db is unclipped.
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(source, getattr(db, "evalid", None))
+        if key is None:
+            return None
+
+        entry = self.get(key)
+        if entry is not None:
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another caller may have loaded it while we waited
+            entry = self.get(key)
+            if entry is not None:
+                entry.hits += 1
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            entry = self._load(db, key[1])
+            self.put(key, entry)
+            logger.info(
+                f"Cached stratification tables for {source} "
+                f"(EVALID {list(key[1])}, {entry.nbytes / 1e6:.1f} MB)"
+            )
+            return entry
+
+    def inject(self, db: Any, source: str) -> bool:
+        """Inject cached stratification tables into a pyFIA connection.
+
+        pyFIA estimators read these tables from ``db.tables`` when present
+        instead of re-querying the database.
+
+        Returns:
+            True if tables were injected.
+        """
+        try:
+            entry = self.get_or_load(db, source)
+        except Exception as e:
+            # Never fail a query because of the cache - pyFIA loads on its own
+            logger.warning(f"Stratification cache unavailable for {source}: {e}")
+            return False
+
+        if entry is None:
+            return False
+
+        for table_name, table in entry.tables.items():
+            db.tables[table_name] = pl.from_arrow(table).lazy()
+
+        # Pre-seed pyFIA's EVALID plot list so load_table() skips its PPSA query
+        if entry.plot_cns and hasattr(db, "_valid_plot_cns"):
+            db._valid_plot_cns = entry.plot_cns
+
+        return True
+
+    def invalidate(self, source: str | None = None, prefix: bool = False) -> int:
+        """Drop cached entries for a source, or all entries if source is None.
+
+        Args:
+            source: Source identifier (see FIAService._connection_source).
+            prefix: Match every source starting with ``source``, e.g. all
+                    versions of a file.
+
+        Returns:
+            Number of entries removed.
+        """
+        with self._lock:
+            if source is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._key_locks.clear()
+                return removed
+
+            keys = [
+                key
+                for key in self._entries
+                if key[0] == source or (prefix and key[0].startswith(source))
+            ]
+            for key in keys:
+                del self._entries[key]
+                self._key_locks.pop(key, None)
+            return len(keys)
+
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            entries = list(self._entries.items())
+        return {
+            "entries": len(entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_mb": sum(entry.nbytes for _, entry in entries) / 1e6,
+            "sources": [
+                {"source": key[0], "evalid": list(key[1]), "hits": entry.hits}
+                for key, entry in entries
+            ],
+        }
+
+    def _load(self, db: Any, evalid: tuple[int, ...]) -> StratificationEntry:
+        """Read the stratification tables for the EVALIDs from the database."""
+        evalid_str = ", ".join(str(e) for e in evalid)
+        tables: dict[str, pa.Table] = {}
+
+        for table_name in STRATIFICATION_TABLES:
+            df = db._reader.read_table(
+                table_name,
+                where=f"EVALID IN ({evalid_str})",
+                lazy=False,
+            )
+            tables[table_name] = df.to_arrow()
+
+        ppsa = tables["POP_PLOT_STRATUM_ASSGN"]
+        plot_cns = (
+            pl.from_arrow(ppsa.select(["PLT_CN"]))["PLT_CN"].unique().to_list()
+            if "PLT_CN" in ppsa.column_names
+            else []
+        )
+
+        return StratificationEntry(tables=tables, plot_cns=plot_cns)
+
+
+def get_strat_cache() -> StratificationCache:
+    """Get the configured StratificationCache instance."""
+    from ..config import settings
+
+    return StratificationCache(max_entries=settings.strat_cache_max_entries)
+
+
+# Singleton instance
+strat_cache = get_strat_cache()
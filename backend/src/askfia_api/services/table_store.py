@@ -0,0 +1,425 @@
+"""Per-table Parquet storage for state databases.
+
+A state query reads PLOT, COND, TREE and the POP_* tables, but a whole
+``{STATE}.duckdb`` also carries seedlings, P2VEG, down woody material and
+other tables most queries never touch. The build pipeline can publish each
+table of a state as its own Parquet object:
+
+    {prefix}/tables/{STATE}/manifest.json
+    {prefix}/tables/{STATE}/{TABLE}.parquet
+
+The manifest lists the published tables with row counts and sizes, and
+the state's EVALIDs. TableStore fetches only the tables an estimator
+needs, caches them per table, and exposes them to pyFIA through a small
+DuckDB file of views over the local Parquet files. Each state's table
+directory is one entry in the local cache manifest (see cache_key), so it
+counts toward the cache limit and is evicted like a state database.
+
+The manifest is re-validated every ``manifest_ttl`` seconds. Cached tables
+and view files live in one subdirectory per manifest version, so a view
+never mixes tables from two builds of a state.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+from .s3_download import RangedDownloader, exclusive_file_lock
+
+logger = logging.getLogger(__name__)
+
+TABLES_PREFIX = "tables"
+MANIFEST_FILE = "manifest.json"
+
+# Tables needed to clip to an evaluation and post-stratify any estimate
+CORE_TABLES = (
+    "PLOT",
+    "COND",
+    "POP_EVAL",
+    "POP_EVAL_GRP",
+    "POP_EVAL_TYP",
+    "POP_ESTN_UNIT",
+    "POP_STRATUM",
+    "POP_PLOT_STRATUM_ASSGN",
+)
+TREE_TABLES = CORE_TABLES + ("TREE", "REF_SPECIES")
+GRM_TABLES = TREE_TABLES + (
+    "TREE_GRM_COMPONENT",
+    "TREE_GRM_MIDPT",
+    "TREE_GRM_BEGIN",
+    "BEGINEND",
+)
+
+# Tables each pyFIA estimator reads
+ESTIMATOR_TABLES: dict[str, tuple[str, ...]] = {
+    "area": CORE_TABLES,
+    "area_change": CORE_TABLES + ("SUBP_COND_CHNG_MTRX",),
+    "volume": TREE_TABLES,
+    "biomass": TREE_TABLES,
+    "tpa": TREE_TABLES,
+    "mortality": GRM_TABLES,
+    "removals": GRM_TABLES,
+    "growth": GRM_TABLES,
+}
+
+# Fetched when a connection is opened without naming its estimators
+DEFAULT_TABLES = TREE_TABLES
+
+
+def cache_key(state: str) -> str:
+    """Cache manifest key of a state's table directory."""
+    return f"{state.upper()}-TABLES"
+
+
+def manifest_version(manifest: dict) -> str:
+    """Version of a published table manifest (a hash of its contents)."""
+    encoded = json.dumps(manifest, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def tables_for(methods: Iterable[str]) -> tuple[str, ...]:
+    """Tables needed by a set of estimator methods."""
+    tables: set[str] = set(CORE_TABLES)
+    for method in methods:
+        tables.update(ESTIMATOR_TABLES.get(method, DEFAULT_TABLES))
+    return tuple(sorted(tables))
+
+
+def export_state_tables(db_path: Path, out_dir: Path, state: str) -> dict:
+    """Write every table of a state database as Parquet, plus a manifest.
+
+    Tables with a PLT_CN column are sorted by it so row groups cluster by
+    plot and DuckDB can skip row groups when filtering on plots.
+
+    Args:
+        db_path: Path to the state's DuckDB file.
+        out_dir: Directory for ``{TABLE}.parquet`` and ``manifest.json``.
+        state: State abbreviation recorded in the manifest.
+
+    Returns:
+        The manifest.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tables: dict[str, dict] = {}
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        names = [
+            row[0]
+            for row in con.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = 'main' ORDER BY table_name"
+            ).fetchall()
+        ]
+        for name in names:
+            columns = {row[0] for row in con.execute(f'DESCRIBE "{name}"').fetchall()}
+            order = "ORDER BY PLT_CN" if "PLT_CN" in columns else ""
+            path = out_dir / f"{name}.parquet"
+            con.execute(
+                f"COPY (SELECT * FROM \"{name}\" {order}) TO '{path}' "
+                "(FORMAT PARQUET, COMPRESSION ZSTD)"
+            )
+            rows = con.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            tables[name] = {"rows": rows, "bytes": path.stat().st_size}
+
+        evalids = []
+        if "POP_EVAL" in tables:
+            evalids = [
+                row[0]
+                for row in con.execute(
+                    "SELECT DISTINCT EVALID FROM POP_EVAL ORDER BY EVALID"
+                ).fetchall()
+            ]
+    finally:
+        con.close()
+
+    manifest = {
+        "state": state.upper(),
+        "created_at": time.time(),
+        "evalids": evalids,
+        "tables": tables,
+    }
+    (out_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+class TableStore:
+    """Local cache of per-table Parquet files fetched from object storage.
+
+    Example:
+        >>> store = TableStore(Path("data/fia/tables"), "fia-bucket", "fia-duckdb", make_downloader)
+        >>> path = store.view_db("NC", ESTIMATOR_TABLES["area"])
+        >>> with FIA(str(path)) as db:
+        ...     db.area()
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        bucket: str | None,
+        prefix: str,
+        downloader: Callable[[], RangedDownloader | None],
+        max_parallel: int = 4,
+        missing_ttl: float = 300.0,
+        manifest_ttl: float = 300.0,
+    ):
+        """Initialize the store.
+
+        Args:
+            directory: Local cache directory for table files.
+            bucket: Bucket holding the published tables.
+            prefix: Key prefix of the state databases (tables live under
+                    ``{prefix}/tables/``).
+            downloader: Returns a RangedDownloader, or None if S3 is unavailable.
+            max_parallel: Tables fetched concurrently.
+            missing_ttl: Seconds before a state found unpublished is checked
+                         again.
+            manifest_ttl: Seconds before a published manifest is checked
+                          for a newer version.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.bucket = bucket
+        self.prefix = prefix
+        self._downloader = downloader
+        self.max_parallel = max_parallel
+        self.missing_ttl = missing_ttl
+        self.manifest_ttl = manifest_ttl
+
+        self._manifests: dict[str, dict | None] = {}
+        self._checked_at: dict[str, float] = {}
+        self._version_listeners: list[Callable[[str], None]] = []
+        self._view_tables: dict[str, frozenset[str]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self.bytes_fetched = 0
+        self.tables_fetched = 0
+
+    def _key(self, state: str, filename: str) -> str:
+        return f"{self.prefix}/{TABLES_PREFIX}/{state}/{filename}"
+
+    def _state_dir(self, state: str) -> Path:
+        return self.directory / state
+
+    def _version_dir(self, state: str, manifest: dict) -> Path:
+        return self._state_dir(state) / manifest_version(manifest)
+
+    def _lock(self, state: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(state, threading.Lock())
+
+    def add_version_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(state) when a state's published tables change version."""
+        self._version_listeners.append(listener)
+
+    def manifest(self, state: str) -> dict | None:
+        """Published table manifest for a state, or None if not published.
+
+        A published manifest is re-fetched every ``manifest_ttl`` seconds and
+        a missing one every ``missing_ttl`` seconds. The local copy is used
+        when S3 is unavailable.
+        """
+        state = state.upper()
+        cached = self._manifests.get(state)
+        ttl = self.manifest_ttl if cached is not None else self.missing_ttl
+        checked = self._checked_at.get(state)
+        if checked is not None and time.monotonic() - checked < ttl:
+            return cached
+
+        path = self._state_dir(state) / MANIFEST_FILE
+        manifest = None
+        downloader = self._downloader() if self.bucket else None
+        if downloader is not None:
+            try:
+                response = downloader.client.get_object(
+                    Bucket=self.bucket, Key=self._key(state, MANIFEST_FILE)
+                )
+                manifest = json.loads(response["Body"].read())
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(manifest))
+            except Exception as e:
+                logger.debug(f"No published tables for {state}: {e}")
+        if manifest is None and path.exists():
+            manifest = json.loads(path.read_text())
+
+        self._manifests[state] = manifest
+        self._checked_at[state] = time.monotonic()
+        if (
+            cached is not None
+            and manifest is not None
+            and manifest_version(manifest) != manifest_version(cached)
+        ):
+            logger.info(
+                f"{state} tables changed: {manifest_version(cached)} -> "
+                f"{manifest_version(manifest)}"
+            )
+            for listener in self._version_listeners:
+                try:
+                    listener(state)
+                except Exception as e:
+                    logger.warning(f"Version listener failed for {state}: {e}")
+        return manifest
+
+    def loaded_manifest(self, state: str) -> dict | None:
+        """The manifest last loaded for a state, without fetching it."""
+        return self._manifests.get(state.upper())
+
+    def prune_versions(self, state: str) -> list[str]:
+        """Delete cached tables of a state's older manifest versions.
+
+        The caller must make sure no connection still reads them.
+
+        Returns:
+            The versions removed.
+        """
+        state = state.upper()
+        manifest = self._manifests.get(state)
+        state_dir = self._state_dir(state)
+        if not manifest or not state_dir.is_dir():
+            return []
+        current = manifest_version(manifest)
+        removed = []
+        for version_dir in state_dir.iterdir():
+            if version_dir.is_dir() and version_dir.name != current:
+                shutil.rmtree(version_dir, ignore_errors=True)
+                removed.append(version_dir.name)
+        return removed
+
+    def published_tables(self, state: str) -> set[str]:
+        """Tables published for a state."""
+        manifest = self.manifest(state)
+        return set(manifest["tables"]) if manifest else set()
+
+    def cached_tables(self, state: str) -> set[str]:
+        """Tables of a state's current version already in the local cache."""
+        state = state.upper()
+        manifest = self._manifests.get(state)
+        if not manifest:
+            return set()
+        return self._cached_in(self._version_dir(state, manifest))
+
+    @staticmethod
+    def _cached_in(version_dir: Path) -> set[str]:
+        return {path.stem for path in version_dir.glob("*.parquet")}
+
+    def has_tables(self, state: str, tables: Iterable[str]) -> bool:
+        """Whether the published tables among ``tables`` are all cached.
+
+        Only consults manifests already loaded, so it never blocks on S3.
+        """
+        state = state.upper()
+        manifest = self.loaded_manifest(state)
+        if not manifest:
+            return False
+        return set(tables) & set(manifest["tables"]) <= self.cached_tables(state)
+
+    def fetch(self, state: str, tables: Iterable[str]) -> set[str]:
+        """Download the published tables among ``tables`` that are not cached.
+
+        Returns:
+            The requested tables now available locally.
+        """
+        state = state.upper()
+        manifest = self.manifest(state)
+        if manifest is None:
+            return set()
+        return self._fetch(state, manifest, tables)
+
+    def _fetch(self, state: str, manifest: dict, tables: Iterable[str]) -> set[str]:
+        """fetch() into the directory of a given manifest version."""
+        version_dir = self._version_dir(state, manifest)
+        wanted = set(tables) & set(manifest["tables"])
+        missing = wanted - self._cached_in(version_dir)
+        if not missing:
+            return wanted
+
+        with self._lock(state), exclusive_file_lock(self._state_dir(state) / ".lock"):
+            # Another thread or worker may have fetched them meanwhile
+            missing = wanted - self._cached_in(version_dir)
+            if missing:
+                downloader = self._downloader()
+                if downloader is None:
+                    raise FileNotFoundError(f"Cannot fetch {state} tables: S3 unavailable")
+                logger.info(f"Fetching {state} tables: {sorted(missing)}")
+
+                def fetch_one(table: str) -> None:
+                    dest = version_dir / f"{table}.parquet"
+                    info = downloader.download(
+                        self.bucket, self._key(state, f"{table}.parquet"), dest
+                    )
+                    self.bytes_fetched += info.size
+                    self.tables_fetched += 1
+
+                with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+                    # list() re-raises the first failure
+                    list(pool.map(fetch_one, sorted(missing)))
+
+        return wanted
+
+    def view_db(self, state: str, tables: Iterable[str]) -> Path | None:
+        """DuckDB file exposing a state's cached tables as views.
+
+        Fetches the requested tables first. The file lives in the manifest
+        version's directory and is named after the set of tables it exposes,
+        so connections already open on an older view file are never
+        disturbed when more tables or a new version arrive.
+
+        Returns:
+            Path to the view database, or None if the state's tables are
+            not published.
+        """
+        state = state.upper()
+        manifest = self.manifest(state)
+        if manifest is None:
+            return None
+
+        self._fetch(state, manifest, tables)
+        version_dir = self._version_dir(state, manifest)
+        version_dir.mkdir(parents=True, exist_ok=True)
+        available = sorted(self._cached_in(version_dir))
+        digest = hashlib.sha256(",".join(available).encode()).hexdigest()[:12]
+        path = version_dir / f"views-{digest}.duckdb"
+
+        if not path.exists():
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            con = duckdb.connect(str(tmp))
+            try:
+                for table in available:
+                    parquet = (version_dir / f"{table}.parquet").resolve()
+                    con.execute(
+                        f"CREATE VIEW \"{table}\" AS SELECT * FROM read_parquet('{parquet}')"
+                    )
+            finally:
+                con.close()
+            os.replace(tmp, path)
+
+        self._view_tables[str(path)] = frozenset(available)
+        return path
+
+    def view_tables(self, path: Any) -> frozenset[str] | None:
+        """Tables exposed by a view database returned from view_db()."""
+        return self._view_tables.get(str(path))
+
+    def stats(self) -> dict:
+        """Cache and transfer statistics."""
+        states = [p.name for p in self.directory.iterdir() if p.is_dir()]
+        cached_bytes = sum(p.stat().st_size for p in self.directory.rglob("*.parquet"))
+        return {
+            "states": sorted(states),
+            "cached_mb": cached_bytes / 1e6,
+            "tables_fetched": self.tables_fetched,
+            "fetched_mb": self.bytes_fetched / 1e6,
+        }
@@ -3,8 +3,9 @@
 import json
 import logging
 import os
+from collections.abc import Iterator
 from dataclasses import asdict, dataclass
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Optional
 import asyncio
@@ -47,6 +48,7 @@ class UsageRecord:
     tool_calls: int = 0
     latency_ms: int = 0
     query_type: Optional[str] = None  # e.g., "forest_area", "timber_volume"
+    tool_specs: list[dict] | None = None  # Normalized tool calls (name + args)
 
 
 class UsageTracker:
@@ -96,6 +98,7 @@ class UsageTracker:
         tool_calls: int = 0,
         latency_ms: int = 0,
         query_type: str | None = None,
+        tool_specs: list[dict] | None = None,
     ) -> UsageRecord:
         """Record a usage event."""
         cost = self.calculate_cost(model, input_tokens, output_tokens)
@@ -111,6 +114,7 @@ class UsageTracker:
             tool_calls=tool_calls,
             latency_ms=latency_ms,
             query_type=query_type,
+            tool_specs=tool_specs,
         )
 
         # Append to daily log file
@@ -211,6 +215,19 @@ class UsageTracker:
 
         return total
 
+    def iter_records(self, days: int = 7) -> Iterator[dict]:
+        """Iterate over the records of the last N days, oldest first."""
+        today = date.today()
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            log_file = self.storage_dir / f"{day.isoformat()}.jsonl"
+            if not log_file.exists():
+                continue
+            with open(log_file) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
     def get_recent_records(self, limit: int = 100) -> list[dict]:
         """Get the most recent usage records."""
         records = []
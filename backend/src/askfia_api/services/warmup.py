@@ -0,0 +1,357 @@
+"""Cache warm-up by replaying popular historical queries.
+
+The usage log records every agent tool call in normalized form (tool name
+plus arguments, see ``normalize_tool_call``). CacheWarmer takes the most
+frequent specs from recent history and replays them through the same
+tools, so the first user to ask a popular question after a restart, or
+after a state's data is replaced by a new evaluation, hits the result
+store, stratification cache and hot tier instead of a cold estimate.
+
+A warm-up runs in a background thread, one spec at a time, and yields to
+live traffic: before each spec it waits until no API query holds DuckDB
+threads. It stops starting new specs once its time budget is spent, and
+reports what it warmed, what failed and what it skipped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Argument names holding state codes
+STATE_ARGS = ("state", "states")
+
+
+def normalize_tool_call(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    """Canonical form of a tool call, so equivalent calls count as one spec.
+
+    None values are dropped, state codes are upper-cased, and state lists
+    are sorted and de-duplicated.
+    """
+    normalized = {}
+    for key, value in sorted(args.items()):
+        if value is None:
+            continue
+        if key in STATE_ARGS:
+            if isinstance(value, str):
+                value = value.strip().upper()
+            elif isinstance(value, list):
+                value = sorted({str(s).strip().upper() for s in value})
+        normalized[key] = value
+    return {"name": name, "args": normalized}
+
+
+def spec_key(spec: dict[str, Any]) -> str:
+    return json.dumps(spec, sort_keys=True, default=str)
+
+
+def spec_states(spec: dict[str, Any]) -> set[str]:
+    """States a spec queries."""
+    states: set[str] = set()
+    for key in STATE_ARGS:
+        value = spec["args"].get(key)
+        if isinstance(value, str):
+            states.add(value)
+        elif isinstance(value, list):
+            states.update(value)
+    return states
+
+
+def popular_specs(
+    records: Iterable[dict],
+    top_n: int,
+    min_count: int = 1,
+    tools: Iterable[str] | None = None,
+) -> list[dict[str, Any]]:
+    """The most frequent tool call specs in usage records.
+
+    Args:
+        records: Usage records with a ``tool_specs`` list.
+        top_n: Specs to return.
+        min_count: Calls a spec needs to be returned.
+        tools: Tool names to consider (default: all).
+
+    Returns:
+        Specs, most frequent first; ties keep first-seen order.
+    """
+    allowed = set(tools) if tools is not None else None
+    counts: Counter[str] = Counter()
+    specs: dict[str, dict] = {}
+    for record in records:
+        for spec in record.get("tool_specs") or []:
+            if allowed is not None and spec.get("name") not in allowed:
+                continue
+            key = spec_key(spec)
+            counts[key] += 1
+            specs.setdefault(key, spec)
+    return [
+        specs[key] for key, count in counts.most_common(top_n) if count >= min_count
+    ]
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of one warm-up run."""
+
+    reason: str
+    started_at: str
+    states: list[str] | None = None
+    specs: int = 0
+    warmed: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    skipped: int = 0
+    budget_exhausted: bool = False
+    seconds: float = 0.0
+
+
+def _label(spec: dict[str, Any]) -> str:
+    args = ", ".join(f"{k}={v}" for k, v in spec["args"].items())
+    return f"{spec['name']}({args})"
+
+
+class CacheWarmer:
+    """Replays popular tool calls to pre-populate FIAService caches.
+
+    Example:
+        >>> warmer = CacheWarmer(history, replay, top_n=20)
+        >>> report = warmer.run("startup")
+        >>> report.warmed
+        ['query_forest_area(states=[\\'NC\\'])', ...]
+    """
+
+    def __init__(
+        self,
+        history: Callable[[], Iterable[dict]],
+        replay: Callable[[str, dict[str, Any]], Awaitable[Any]],
+        top_n: int = 20,
+        min_count: int = 2,
+        time_budget: float = 300.0,
+        tools: Iterable[str] | None = None,
+        is_busy: Callable[[], bool] | None = None,
+        idle_poll: float = 0.5,
+    ):
+        """
+        Args:
+            history: Returns recent usage records.
+            replay: Runs a tool by name with arguments.
+            top_n: Specs replayed per run; 0 disables warm-up.
+            min_count: Calls a spec needs to be replayed.
+            time_budget: Seconds after which a run starts no new specs.
+            tools: Tools whose calls may be replayed (default: all).
+            is_busy: Whether live queries are running; replays wait for it
+                     to turn False.
+            idle_poll: Seconds between is_busy checks.
+        """
+        self._history = history
+        self._replay = replay
+        self.top_n = top_n
+        self.min_count = min_count
+        self.time_budget = time_budget
+        self.tools = set(tools) if tools is not None else None
+        self._is_busy = is_busy or (lambda: False)
+        self.idle_poll = idle_poll
+        self._lock = threading.Lock()
+        self._running = False
+        # Follow-up run (reason, states) triggered while a run was in progress
+        self._queued: tuple[str, set[str] | None] | None = None
+        self.last_report: WarmupReport | None = None
+        self.runs = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0
+
+    def specs(self, states: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """The specs a run would replay, optionally only those for some states."""
+        specs = popular_specs(
+            self._history(), self.top_n, self.min_count, self.tools
+        )
+        if states is not None:
+            wanted = {s.upper() for s in states}
+            specs = [spec for spec in specs if spec_states(spec) & wanted]
+        return specs
+
+    def run(self, reason: str, states: Iterable[str] | None = None) -> WarmupReport:
+        """Replay popular specs now, within the time budget.
+
+        Args:
+            reason: Why the run started (e.g. "startup"), for the report.
+            states: Only replay specs for these states (default: all specs).
+        """
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        report = WarmupReport(
+            reason=reason,
+            started_at=datetime.utcnow().isoformat(),
+            states=sorted({s.upper() for s in states}) if states is not None else None,
+        )
+        try:
+            specs = self.specs(states)
+        except Exception as e:
+            logger.warning(f"Could not read query history for warm-up: {e}")
+            specs = []
+        report.specs = len(specs)
+
+        for i, spec in enumerate(specs):
+            if not self._wait_idle(deadline):
+                report.budget_exhausted = True
+                report.skipped = len(specs) - i
+                break
+            label = _label(spec)
+            try:
+                asyncio.run(
+                    asyncio.wait_for(
+                        self._replay(spec["name"], dict(spec["args"])),
+                        deadline - time.monotonic(),
+                    )
+                )
+            except TimeoutError:
+                report.failed[label] = "time budget exhausted"
+                report.budget_exhausted = True
+                report.skipped = len(specs) - i - 1
+                break
+            except Exception as e:
+                report.failed[label] = f"{type(e).__name__}: {e}"
+            else:
+                report.warmed.append(label)
+
+        report.seconds = round(time.monotonic() - started, 2)
+        with self._lock:
+            self.last_report = report
+            self.runs += 1
+        logger.info(
+            f"Cache warm-up ({reason}): {len(report.warmed)}/{report.specs} specs "
+            f"warmed, {len(report.failed)} failed, {report.skipped} skipped "
+            f"in {report.seconds}s"
+        )
+        return report
+
+    def _wait_idle(self, deadline: float) -> bool:
+        """Wait for live queries to finish; False if the deadline passes first."""
+        while self._is_busy():
+            if time.monotonic() + self.idle_poll >= deadline:
+                return False
+            time.sleep(self.idle_poll)
+        return time.monotonic() < deadline
+
+    def trigger(self, reason: str, states: Iterable[str] | None = None) -> bool:
+        """Start a run in a background thread.
+
+        A trigger during a run is folded into one follow-up run, which
+        covers all the states triggered meanwhile (or every spec, if any
+        trigger was for all states).
+
+        Returns:
+            True if a new run was started.
+        """
+        if not self.enabled:
+            return False
+        wanted = {s.upper() for s in states} if states is not None else None
+        with self._lock:
+            if self._running:
+                if self._queued is None:
+                    self._queued = (reason, wanted)
+                else:
+                    queued = self._queued[1]
+                    merged = None if queued is None or wanted is None else queued | wanted
+                    self._queued = (reason, merged)
+                return False
+            self._running = True
+
+        threading.Thread(
+            target=self._run_loop,
+            args=(reason, wanted),
+            name="cache-warmup",
+            daemon=True,
+        ).start()
+        return True
+
+    def _run_loop(self, reason: str, states: set[str] | None) -> None:
+        while True:
+            try:
+                self.run(reason, states)
+            except Exception as e:
+                logger.warning(f"Cache warm-up failed: {e}")
+            with self._lock:
+                if self._queued is None:
+                    self._running = False
+                    return
+                (reason, states), self._queued = self._queued, None
+
+    def on_state_replaced(self, state: str) -> None:
+        """Storage listener: re-warm a state's specs after its data changes."""
+        self.trigger("evalid_change", [state])
+
+    def stats(self) -> dict:
+        """Warm-up configuration and last report for the diagnostics endpoint."""
+        with self._lock:
+            report = self.last_report
+            running = self._running
+        return {
+            "enabled": self.enabled,
+            "top_n": self.top_n,
+            "time_budget_seconds": self.time_budget,
+            "running": running,
+            "runs": self.runs,
+            "last_report": asdict(report) if report else None,
+        }
+
+
+async def replay_tool(name: str, args: dict[str, Any]) -> Any:
+    """Invoke an agent tool by name."""
+    from .agent import PYFIA_TOOLS
+
+    tool = {t.name: t for t in PYFIA_TOOLS}.get(name)
+    if tool is None:
+        raise KeyError(f"Unknown tool {name}")
+    return await tool.ainvoke(args)
+
+
+# Tools that run estimates (lookups are cheap and not worth replaying)
+WARMABLE_TOOLS = (
+    "query_forest_area",
+    "query_timber_volume",
+    "query_biomass_carbon",
+    "query_mortality",
+    "query_removals",
+    "query_growth",
+    "query_area_change",
+    "query_tpa",
+    "query_by_forest_type",
+    "compare_states",
+    "query_by_stand_size",
+    "query_by_ownership",
+    "query_by_county",
+)
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get the configured CacheWarmer instance."""
+    from ..config import settings
+    from .fia_service import fia_service
+    from .usage_tracker import usage_tracker
+
+    warmer = CacheWarmer(
+        history=lambda: usage_tracker.iter_records(settings.warmup_history_days),
+        replay=replay_tool,
+        top_n=settings.warmup_top_n,
+        min_count=settings.warmup_min_count,
+        time_budget=settings.warmup_time_budget,
+        tools=WARMABLE_TOOLS,
+        is_busy=lambda: fia_service.resources.budget.in_use > 0,
+    )
+    fia_service.storage.add_replace_listener(warmer.on_state_replaced)
+    return warmer
+
+
+cache_warmer = get_cache_warmer()
@@ -0,0 +1,105 @@
+"""Tests for approximate-mode plot subsampling."""
+
+import polars as pl
+import pytest
+
+from askfia_api.services.approximate import (
+    apply_stratified_subsample,
+    restore_full_sample,
+)
+
+
+class FakeFIA:
+    """Clipped connection with two strata of 100 and 3 plots."""
+
+    def __init__(self):
+        plots = [(f"A{i}", "S1") for i in range(100)] + [(f"B{i}", "S2") for i in range(3)]
+        self.evalid = [372301]
+        self._valid_plot_cns = None
+        self.tables = {
+            "POP_PLOT_STRATUM_ASSGN": pl.DataFrame(
+                {
+                    "PLT_CN": [p for p, _ in plots],
+                    "STRATUM_CN": [s for _, s in plots],
+                    "EVALID": [372301] * len(plots),
+                }
+            ).lazy(),
+            "POP_STRATUM": pl.DataFrame(
+                {
+                    "CN": ["S1", "S2"],
+                    "EVALID": [372301, 372301],
+                    "EXPNS": [6000.0, 5000.0],
+                    "P2POINTCNT": [100, 3],
+                }
+            ).lazy(),
+        }
+
+    def table(self, name):
+        return self.tables[name].collect()
+
+
+def expanded_area(db):
+    """Sum of EXPNS over assigned plots (the estimate for y_i = 1)."""
+    ppsa = db.table("POP_PLOT_STRATUM_ASSGN")
+    stratum = db.table("POP_STRATUM")
+    return ppsa.join(stratum, left_on="STRATUM_CN", right_on="CN")["EXPNS"].sum()
+
+
+class TestStratifiedSubsample:
+    """Tests for apply_stratified_subsample."""
+
+    def test_keeps_fraction_per_stratum(self):
+        """Each stratum keeps ceil(fraction * n_h), at least two plots."""
+        db = FakeFIA()
+        info = apply_stratified_subsample(db, 0.2)
+
+        counts = dict(
+            db.table("POP_PLOT_STRATUM_ASSGN").group_by("STRATUM_CN").len().iter_rows()
+        )
+        assert counts == {"S1": 20, "S2": 2}
+        assert info.plots_sampled == 22
+        assert info.plots_total == 103
+        assert sorted(db._valid_plot_cns) == sorted(
+            db.table("POP_PLOT_STRATUM_ASSGN")["PLT_CN"].to_list()
+        )
+
+    def test_expansion_keeps_totals_unbiased(self):
+        """Scaled EXPNS reproduce the full-sample total area."""
+        db = FakeFIA()
+        full = expanded_area(db)
+        apply_stratified_subsample(db, 0.2)
+        assert expanded_area(db) == pytest.approx(full)
+
+    def test_p2pointcnt_is_sample_size(self):
+        """P2POINTCNT reflects the plots actually kept."""
+        db = FakeFIA()
+        apply_stratified_subsample(db, 0.2)
+        stratum = db.table("POP_STRATUM").sort("CN")
+        assert stratum["P2POINTCNT"].to_list() == [20, 2]
+
+    def test_sample_is_deterministic(self):
+        """Separate connections draw the same plots."""
+        a, b = FakeFIA(), FakeFIA()
+        apply_stratified_subsample(a, 0.3)
+        apply_stratified_subsample(b, 0.3)
+        assert sorted(a._valid_plot_cns) == sorted(b._valid_plot_cns)
+
+    def test_full_fraction_is_noop(self):
+        """A fraction of 1 leaves the connection untouched."""
+        db = FakeFIA()
+        assert apply_stratified_subsample(db, 1.0) is None
+        assert db._valid_plot_cns is None
+
+    def test_restore(self):
+        """Restoring brings back the full sample and drops subsampled reads."""
+        db = FakeFIA()
+        full = expanded_area(db)
+        apply_stratified_subsample(db, 0.2)
+        db.tables["COND"] = pl.DataFrame({"PLT_CN": ["A0"]}).lazy()
+
+        restore_full_sample(db)
+
+        assert expanded_area(db) == pytest.approx(full)
+        assert db.table("POP_PLOT_STRATUM_ASSGN").height == 103
+        assert "COND" not in db.tables
+        assert db._valid_plot_cns is None
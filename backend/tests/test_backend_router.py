@@ -0,0 +1,218 @@
+"""Tests for latency-aware routing between local storage and MotherDuck."""
+
+import threading
+import time
+
+import duckdb
+import pytest
+
+from askfia_api.services.backend_router import (
+    LOCAL,
+    MOTHERDUCK,
+    BackendRouter,
+    HedgedConnection,
+    eval_year,
+    evalid_year,
+)
+from askfia_api.services.fia_service import FIAService
+from askfia_api.services.motherduck_catalog import MotherDuckCatalog
+from askfia_api.services.storage import FIAStorage
+
+
+def warm(router, backend, seconds, samples=20):
+    """Record latencies for a backend."""
+    for _ in range(samples):
+        router._timed(backend, lambda: time.sleep(seconds))
+
+
+class TestEligible:
+    """Tests for version parity."""
+
+    def test_newest_version_only(self):
+        """A backend with an older evaluation is not eligible."""
+        assert BackendRouter.eligible({LOCAL: 2021, MOTHERDUCK: 2023}) == [MOTHERDUCK]
+        assert BackendRouter.eligible({LOCAL: 2023, MOTHERDUCK: 2023}) == [LOCAL, MOTHERDUCK]
+
+    def test_missing_and_unknown(self):
+        """Missing backends are skipped; unknown versions lose to known ones."""
+        assert BackendRouter.eligible({LOCAL: None, MOTHERDUCK: 2023}) == [MOTHERDUCK]
+        assert BackendRouter.eligible({LOCAL: 0, MOTHERDUCK: 2023}) == [MOTHERDUCK]
+        assert BackendRouter.eligible({LOCAL: 0, MOTHERDUCK: None}) == [LOCAL]
+        assert BackendRouter.eligible({LOCAL: None, MOTHERDUCK: None}) == []
+
+    def test_evalid_year(self):
+        """EVALIDs encode a two-digit inventory year."""
+        assert evalid_year(372301) == 2023
+        assert evalid_year(60501) == 2005
+
+    def test_periodic_and_other_types_ignored(self):
+        """Periodic inventories and non-01 evaluations carry no annual year."""
+        assert evalid_year(379501) is None
+        assert evalid_year(372303) is None
+        assert eval_year([379501, 372201, 372303]) == 2022
+        assert eval_year([379501]) is None
+
+
+class TestRanking:
+    """Tests for latency and load ranking."""
+
+    def test_unmeasured_backend_first(self):
+        """A backend without measurements is tried so it gets measured."""
+        router = BackendRouter()
+        warm(router, LOCAL, 0.0, samples=1)
+
+        assert router.rank([LOCAL, MOTHERDUCK]) == [MOTHERDUCK, LOCAL]
+
+    def test_faster_backend_first(self):
+        """The backend with the lower median latency ranks first."""
+        router = BackendRouter()
+        warm(router, LOCAL, 0.02, samples=3)
+        warm(router, MOTHERDUCK, 0.0, samples=3)
+
+        assert router.rank([LOCAL, MOTHERDUCK]) == [MOTHERDUCK, LOCAL]
+
+    def test_load_penalizes_backend(self):
+        """Estimates in flight on a backend push it down the ranking."""
+        router = BackendRouter()
+        warm(router, LOCAL, 0.01, samples=3)
+        warm(router, MOTHERDUCK, 0.015, samples=3)
+        router._inflight[LOCAL] = 2
+
+        assert router.rank([LOCAL, MOTHERDUCK]) == [MOTHERDUCK, LOCAL]
+
+
+class TestRun:
+    """Tests for hedged and failed-over estimates."""
+
+    def test_hedges_slow_primary(self):
+        """A primary slower than its p95 is hedged and the hedge wins."""
+        router = BackendRouter(hedge_min_samples=5)
+        warm(router, LOCAL, 0.0, samples=5)
+        warm(router, MOTHERDUCK, 0.05, samples=5)
+        release = threading.Event()
+
+        result = router.run({
+            LOCAL: lambda: release.wait(5) and "local",
+            MOTHERDUCK: lambda: "motherduck",
+        })
+        release.set()
+
+        assert result == "motherduck"
+        assert router.hedges == 1
+        assert router.hedge_wins == 1
+
+    def test_no_hedge_without_samples(self):
+        """Backends with too few measurements are not hedged."""
+        router = BackendRouter(hedge_min_samples=50)
+        warm(router, LOCAL, 0.0, samples=5)
+        warm(router, MOTHERDUCK, 0.01, samples=5)
+
+        result = router.run({
+            LOCAL: lambda: time.sleep(0.05) or "local",
+            MOTHERDUCK: lambda: "motherduck",
+        })
+
+        assert result == "local"
+        assert router.hedges == 0
+
+    def test_fails_over(self):
+        """A failing backend is retried on the next one."""
+        router = BackendRouter()
+
+        def fail():
+            raise ConnectionError("MotherDuck unavailable")
+
+        assert router.run({MOTHERDUCK: fail, LOCAL: lambda: "local"}) == "local"
+        assert router.failovers == 1
+        assert router.stats()["backends"][LOCAL]["samples"] == 1
+
+    def test_all_fail_raises_first_error(self):
+        """If every backend fails the first backend's error is raised."""
+        router = BackendRouter()
+
+        def fail(message):
+            raise RuntimeError(message)
+
+        with pytest.raises(RuntimeError, match="first"):
+            router.run({LOCAL: lambda: fail("first"), MOTHERDUCK: lambda: fail("second")})
+
+
+class TestHedgedConnection:
+    """Tests for the hedged connection stand-in."""
+
+    def test_estimates_and_lazy_connection(self):
+        """Estimates go through the router; other attributes open one connection."""
+        from contextlib import contextmanager
+
+        opened = []
+
+        @contextmanager
+        def connect(backend):
+            opened.append(backend)
+            yield type("Connection", (), {"evalid": [372301]})()
+
+        hedged = HedgedConnection(
+            BackendRouter(),
+            "NC",
+            [LOCAL, MOTHERDUCK],
+            estimate_on=lambda backend, method, params, approximate: (backend, method),
+            connect=connect,
+        )
+
+        assert hedged.estimate("area", {}) == (LOCAL, "area")
+        assert opened == []
+        assert hedged.evalid == [372301]
+        assert hedged.evalid == [372301]
+        # Local has a measurement now; unmeasured MotherDuck ranks first
+        assert opened == [MOTHERDUCK]
+        hedged.close()
+
+
+class TestServiceBackends:
+    """Tests for FIAService backend selection."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        path = tmp_path / "NC.duckdb"
+        con = duckdb.connect(str(path))
+        con.execute("CREATE TABLE POP_EVAL AS SELECT 372301 AS EVALID")
+        con.close()
+
+        service = FIAService()
+        service._motherduck_token = "token"
+        service.storage = FIAStorage(local_dir=tmp_path)
+        service.motherduck_catalog = MotherDuckCatalog(
+            "token", fetch=lambda token: [("fia_nc_eval2023", None), ("fia_sc_eval2023", None)]
+        )
+        return service
+
+    def test_current_local_file_is_eligible(self, service):
+        """A cached file as recent as MotherDuck makes both backends eligible."""
+        assert service._backends_for("NC") == [LOCAL, MOTHERDUCK]
+        assert service._backends_for("SC") == [MOTHERDUCK]
+        assert service._backends_for("GA") == [LOCAL]
+
+    def test_stale_local_file_not_eligible(self, service):
+        """MotherDuck wins when it has a newer evaluation."""
+        service.motherduck_catalog = MotherDuckCatalog(
+            "token", fetch=lambda token: [("fia_nc_eval2024", None)]
+        )
+
+        assert service._backends_for("NC") == [MOTHERDUCK]
+
+    def test_periodic_evalid_not_newest(self, service, tmp_path):
+        """A periodic inventory EVALID doesn't make a local file look newest."""
+        con = duckdb.connect(str(tmp_path / "NC.duckdb"))
+        con.execute("INSERT INTO POP_EVAL VALUES (379501)")
+        con.close()
+        service.motherduck_catalog = MotherDuckCatalog(
+            "token", fetch=lambda token: [("fia_nc_eval2024", None)]
+        )
+
+        assert service._backends_for("NC") == [MOTHERDUCK]
+
+    def test_without_motherduck(self, service):
+        """Without a token only local storage is used."""
+        service._motherduck_token = None
+
+        assert service._backends_for("SC") == [LOCAL]
@@ -0,0 +1,198 @@
+"""Tests for batch queries with shared execution."""
+
+import asyncio
+from contextlib import contextmanager
+
+import polars as pl
+import pytest
+
+from askfia_api.api.routes.query import query_batch
+from askfia_api.models.schemas import BatchQuery
+from askfia_api.services.batch_query import SharedScope, plan_batch
+from askfia_api.services.fia_service import FIAService
+
+
+class TestPlanBatch:
+    """Tests for plan_batch."""
+
+    def test_deduplicates(self):
+        """Identical specs run once; every request maps to its spec."""
+        specs = [
+            {"type": "area", "states": ["NC"]},
+            {"type": "volume", "states": ["NC"]},
+            {"type": "area", "states": ["NC"]},
+        ]
+
+        plan = plan_batch(specs)
+
+        assert len(plan.specs) == 2
+        assert plan.deduplicated == 1
+        assert plan.positions[0] == plan.positions[2]
+
+    def test_groups_by_states_and_releases_after_last_use(self):
+        """Specs over the same states run together; connections close after."""
+        specs = [
+            {"type": "area", "states": ["NC"]},
+            {"type": "area", "states": ["GA"]},
+            {"type": "volume", "states": ["NC"]},
+            {"type": "compare", "states": ["GA", "NC"]},
+        ]
+
+        plan = plan_batch(specs)
+
+        assert [s["type"] + ":" + ",".join(s["states"]) for s in plan.specs] == [
+            "area:NC",
+            "volume:NC",
+            "area:GA",
+            "compare:GA,NC",
+        ]
+        assert [plan.specs[p] for p in plan.positions] == specs
+        assert plan.release_after == {3: {"GA", "NC"}}
+
+
+class TestSharedScope:
+    """Tests for SharedScope."""
+
+    def test_connection_reused_until_released(self):
+        """A key's connection opens once and closes on release."""
+        events = []
+
+        @contextmanager
+        def connect(state):
+            events.append(f"open {state}")
+            yield state
+            events.append(f"close {state}")
+
+        with SharedScope() as scope:
+            assert scope.connection(("state", ("NC",)), lambda: connect("NC")) == "NC"
+            scope.connection(("state", ("NC",)), lambda: connect("NC"))
+            scope.connection(("lake", ("GA", "NC")), lambda: connect("GA+NC"))
+            scope.connection(("state", ("GA",)), lambda: connect("GA"))
+            scope.release(["NC"])
+            assert events == [
+                "open NC",
+                "open GA+NC",
+                "open GA",
+                "close NC",
+                "close GA+NC",
+            ]
+
+        assert events[-1] == "close GA"
+        assert scope.stats()["connections_reused"] == 1
+
+    def test_estimates_shared_as_copies(self):
+        """Equal estimates are computed once and handed out as copies."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return pl.DataFrame({"AREA": [1.0]})
+
+        with SharedScope() as scope:
+            first = scope.estimate("NC", "area", False, {"grp_by": None}, compute)
+            second = scope.estimate("NC", "area", False, {}, compute)
+            other = scope.estimate("NC", "area", True, {}, compute)
+
+        assert len(calls) == 2
+        assert first is not second
+        assert first.equals(second) and other.equals(first)
+        assert scope.estimates_shared == 1
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """An FIAService whose connections and estimates are counted fakes."""
+    service = FIAService()
+    service.parquet_lake = None
+    service.opened = []
+    service.estimates = []
+
+    @contextmanager
+    def connect_state(state):
+        service.opened.append(state)
+        yield object()
+
+    def run_estimate(db, state, method, approximate, kwargs):
+        service.estimates.append((state, method))
+        if state == "GA":
+            raise RuntimeError("GA is down")
+        column = {"area": "AREA", "volume": "VOLCFNET_TOTAL", "tpa": "TPA"}[method]
+        return pl.DataFrame({column: [100.0], f"{column}_SE": [5.0]})
+
+    async def ensure_states(states):
+        return None
+
+    monkeypatch.setattr(service, "_connect_state", connect_state)
+    monkeypatch.setattr(service, "_run_estimate", run_estimate)
+    monkeypatch.setattr(service, "ensure_states", ensure_states)
+    return service
+
+
+class TestBatchEndpoint:
+    """Tests for /api/v1/query/batch."""
+
+    def test_shared_execution(self, service):
+        """A dashboard batch opens each state once and reports per item."""
+        batch = BatchQuery(
+            queries=[
+                {"id": "a", "type": "area", "params": {"states": ["nc"]}},
+                {"id": "v", "type": "volume", "params": {"states": ["NC"]}},
+                {"id": "a2", "type": "area", "params": {"states": ["NC"]}},
+                {
+                    "id": "c",
+                    "type": "compare",
+                    "params": {"states": ["NC", "SC"], "metric": "area"},
+                },
+                {"id": "t", "type": "tpa", "params": {"states": ["XX"]}},
+            ]
+        )
+
+        response = asyncio.run(query_batch(batch, fia_service=service))
+
+        assert [r.id for r in response.results] == ["a", "v", "a2", "c", "t"]
+        assert response.results[0].result["total_area_acres"] == 100.0
+        assert response.results[2].result == response.results[0].result
+        assert response.results[4].status_code == 422
+        assert response.executed == 3
+        assert response.deduplicated == 1
+        assert sorted(service.opened) == ["NC", "SC"]
+        # The comparison reuses the area query's NC estimate
+        assert service.estimates.count(("NC", "area")) == 1
+        assert response.estimates_shared == 1
+
+    def test_item_errors_do_not_fail_batch(self, service):
+        """A failing query reports its error next to the others' results."""
+        batch = BatchQuery(
+            queries=[
+                {"type": "area", "params": {"states": ["GA"]}},
+                {"type": "area", "params": {"states": ["NC"]}},
+            ]
+        )
+
+        response = asyncio.run(query_batch(batch, fia_service=service))
+
+        failed, ok = response.results
+        assert failed.status_code == 500
+        assert "GA is down" in failed.error
+        assert ok.status_code == 200
+
+
+class TestCombineFromScope:
+    """Tests for multi-state queries over estimates a scope already holds."""
+
+    def test_combined_without_reopening_states(self, service):
+        """Per-state estimates are combined without opening the states again."""
+
+        async def run():
+            with SharedScope(use_lake=False) as scope:
+                for state in ("NC", "SC"):
+                    await service.query_area([state])
+                    scope.release([state])
+                service.opened.clear()
+                return await service.query_area(["NC", "SC"])
+
+        result = asyncio.run(run())
+
+        assert result["total_area_acres"] == 200.0
+        assert service.opened == []
+        assert service.estimates == [("NC", "area"), ("SC", "area")]
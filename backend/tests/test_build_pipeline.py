@@ -0,0 +1,192 @@
+"""Tests for the parallel, resumable build pipeline."""
+
+import json
+from functools import partial
+
+from askfia_api.services.build_pipeline import (
+    BUILT,
+    FAILED,
+    UPLOADED,
+    BuildJournal,
+    BuildResult,
+    plan_states,
+    run_pipeline,
+)
+
+
+def fake_build(state, force, output_dir, fail=()):
+    """Pipeline build stand-in; runs in a worker process."""
+    if state in fail:
+        raise RuntimeError(f"{state} download failed")
+    path = output_dir / f"{state}.duckdb"
+    path.write_bytes(state.encode())
+    return BuildResult(
+        state=state,
+        db_path=str(path),
+        full_path=str(path),
+        size=path.stat().st_size,
+        version=f"v-{state}",
+        evalids=[1],
+    )
+
+
+def same_source(state):
+    return f"src-{state}"
+
+
+class Uploads:
+    """Records uploads, optionally failing some states."""
+
+    def __init__(self, fail=()):
+        self.states = []
+        self.fail = set(fail)
+
+    def __call__(self, result):
+        self.states.append(result.state)
+        return result.state not in self.fail
+
+
+def run(tmp_path, states, journal, upload, **kwargs):
+    build = partial(fake_build, output_dir=tmp_path, fail=kwargs.pop("fail", ()))
+    return run_pipeline(
+        states,
+        build=build,
+        upload=upload,
+        journal=journal,
+        fingerprint=kwargs.pop("fingerprint", same_source),
+        build_workers=2,
+        upload_workers=2,
+        **kwargs,
+    )
+
+
+class TestBuildJournal:
+    """Tests for BuildJournal."""
+
+    def test_persists_updates(self, tmp_path):
+        """Entries survive reloading the journal."""
+        path = tmp_path / "journal.json"
+        BuildJournal(path).update("ga", status=BUILT, fingerprint="x")
+
+        entry = BuildJournal(path).get("GA")
+
+        assert entry.status == BUILT
+        assert entry.fingerprint == "x"
+
+    def test_in_memory_journal(self, tmp_path):
+        """A journal without a path never touches disk."""
+        journal = BuildJournal(None)
+        journal.update("GA", status=BUILT)
+
+        assert journal.get("GA").status == BUILT
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestPipeline:
+    """Tests for run_pipeline."""
+
+    def test_builds_and_uploads_all_states(self, tmp_path):
+        """Every state is built and uploaded, and the journal says so."""
+        journal = BuildJournal(tmp_path / "journal.json")
+        upload = Uploads()
+
+        results = run(tmp_path, ["GA", "NC", "SC"], journal, upload)
+
+        assert sorted(results["uploaded"]) == ["GA", "NC", "SC"]
+        assert sorted(upload.states) == ["GA", "NC", "SC"]
+        saved = json.loads((tmp_path / "journal.json").read_text())["states"]
+        assert {s: e["status"] for s, e in saved.items()} == dict.fromkeys(
+            ["GA", "NC", "SC"], UPLOADED
+        )
+
+    def test_unchanged_source_is_skipped(self, tmp_path):
+        """A second run skips states whose source fingerprint is unchanged."""
+        journal = BuildJournal(tmp_path / "journal.json")
+        run(tmp_path, ["GA", "NC"], journal, Uploads())
+        upload = Uploads()
+
+        results = run(tmp_path, ["GA", "NC"], journal, upload)
+
+        assert sorted(results["skipped"]) == ["GA", "NC"]
+        assert upload.states == []
+
+    def test_unknown_fingerprint_rebuilds(self, tmp_path):
+        """Without a fingerprint the state is rebuilt, but identical content is not re-uploaded."""
+        journal = BuildJournal(tmp_path / "journal.json")
+        run(tmp_path, ["GA"], journal, Uploads(), fingerprint=lambda s: None)
+        upload = Uploads()
+
+        results = run(tmp_path, ["GA"], journal, upload, fingerprint=lambda s: None)
+
+        assert results["unchanged"] == ["GA"]
+        assert upload.states == []
+
+    def test_no_fingerprint_function_rebuilds(self, tmp_path):
+        """With fingerprint=None every state is rebuilt."""
+        journal = BuildJournal(tmp_path / "journal.json")
+        run(tmp_path, ["GA"], journal, Uploads(), fingerprint=None)
+
+        results = run(tmp_path, ["GA"], journal, Uploads(), fingerprint=None)
+
+        assert results["skipped"] == []
+        assert results["unchanged"] == ["GA"]
+
+    def test_failed_build_is_recorded(self, tmp_path):
+        """A failed build does not stop the other states."""
+        journal = BuildJournal(tmp_path / "journal.json")
+
+        results = run(tmp_path, ["GA", "NC"], journal, Uploads(), fail=("NC",))
+
+        assert results["uploaded"] == ["GA"]
+        assert results["failed"] == ["NC"]
+        assert journal.get("NC").status == FAILED
+        assert "download failed" in journal.get("NC").error
+
+    def test_resume_uploads_without_rebuilding(self, tmp_path):
+        """A state built before a failed upload is only uploaded on the next run."""
+        journal = BuildJournal(tmp_path / "journal.json")
+        run(tmp_path, ["GA"], journal, Uploads(fail=("GA",)))
+        assert journal.get("GA").status == FAILED
+
+        # The next run cannot build GA, so it must reuse the earlier build
+        upload = Uploads()
+        results = run(tmp_path, ["GA"], journal, upload, fail=("GA",))
+
+        assert results["uploaded"] == ["GA"]
+        assert upload.states == ["GA"]
+
+    def test_force_rebuilds_everything(self, tmp_path):
+        """force ignores the journal."""
+        journal = BuildJournal(tmp_path / "journal.json")
+        run(tmp_path, ["GA"], journal, Uploads())
+        upload = Uploads()
+
+        results = run(tmp_path, ["GA"], journal, upload, force=True)
+
+        assert results["uploaded"] == ["GA"]
+        assert upload.states == ["GA"]
+
+
+class TestPlanStates:
+    """Tests for plan_states."""
+
+    def test_changed_source_rebuilds(self, tmp_path):
+        """A state whose fingerprint changed since its upload is rebuilt."""
+        journal = BuildJournal(None)
+        journal.update("GA", status=UPLOADED, fingerprint="old")
+
+        to_build, to_upload, skipped = plan_states(["GA"], journal, {"GA": "new"})
+
+        assert (to_build, to_upload, skipped) == (["GA"], [], [])
+
+    def test_missing_build_file_rebuilds(self, tmp_path):
+        """A journaled build whose file is gone is rebuilt, not uploaded."""
+        journal = BuildJournal(None)
+        build = fake_build("GA", False, tmp_path)
+        journal.update("GA", status=BUILT, fingerprint="f", build=build.__dict__)
+        (tmp_path / "GA.duckdb").unlink()
+
+        to_build, to_upload, _ = plan_states(["GA"], journal, {"GA": "f"})
+
+        assert to_build == ["GA"]
+        assert to_upload == []
@@ -0,0 +1,174 @@
+"""Tests for local cache accounting and eviction."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from askfia_api.services.cache_manifest import CacheManifest
+from askfia_api.services.storage import FIAStorage
+
+
+def write_db(directory, state, size=1000, age=0.0):
+    path = directory / f"{state}.duckdb"
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestCacheManifest:
+    """Tests for CacheManifest."""
+
+    def test_reconcile_adopts_existing_files(self, tmp_path):
+        """Files cached before the manifest existed are tracked by mtime."""
+        write_db(tmp_path, "NC", age=100)
+        write_db(tmp_path, "GA", age=10)
+        manifest = CacheManifest(tmp_path, max_bytes=10_000)
+        manifest.reconcile({"NC": tmp_path / "NC.duckdb", "GA": tmp_path / "GA.duckdb"})
+
+        assert manifest.total_bytes == 2000
+        assert [e["state"] for e in manifest.entries()] == ["NC", "GA"]
+
+    def test_lru_eviction(self, tmp_path):
+        """The least recently used state is evicted first."""
+        manifest = CacheManifest(tmp_path, max_bytes=2500)
+        for state in ("NC", "GA", "SC"):
+            manifest.admit(state, write_db(tmp_path, state))
+        manifest.record_use("NC")
+
+        assert manifest.evict_to_fit() == ["GA"]
+        assert not (tmp_path / "GA.duckdb").exists()
+        assert manifest.total_bytes == 2000
+
+    def test_lfu_eviction(self, tmp_path):
+        """With LFU, the least used state goes first regardless of recency."""
+        manifest = CacheManifest(tmp_path, max_bytes=2500, policy="lfu")
+        for state in ("NC", "GA", "SC"):
+            manifest.admit(state, write_db(tmp_path, state))
+        for _ in range(3):
+            manifest.record_use("NC")
+        manifest.record_use("GA")
+        manifest.record_use("SC")
+        manifest.record_use("SC")
+
+        assert manifest.evict_to_fit() == ["GA"]
+
+    def test_pinned_never_evicted(self, tmp_path):
+        """Pinned states stay even when they are the oldest."""
+        manifest = CacheManifest(tmp_path, max_bytes=1500, pinned=["nc"])
+        manifest.admit("NC", write_db(tmp_path, "NC"))
+        manifest.admit("GA", write_db(tmp_path, "GA"))
+
+        assert manifest.evict_to_fit() == ["GA"]
+        assert (tmp_path / "NC.duckdb").exists()
+
+    def test_in_use_not_evicted(self, tmp_path):
+        """A referenced file survives eviction until it is released."""
+        manifest = CacheManifest(tmp_path, max_bytes=1500)
+        manifest.admit("NC", write_db(tmp_path, "NC"))
+        manifest.admit("GA", write_db(tmp_path, "GA"))
+        manifest.acquire("NC")
+
+        assert manifest.evict_to_fit() == ["GA"]
+
+        manifest.admit("SC", write_db(tmp_path, "SC"))
+        assert manifest.evict_to_fit(protect={"SC"}) == []
+        manifest.release("NC")
+        assert manifest.evict_to_fit(protect={"SC"}) == ["NC"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="flock is POSIX only")
+    def test_in_use_by_other_process(self, tmp_path):
+        """A file held open by another worker process is not evicted."""
+        manifest = CacheManifest(tmp_path, max_bytes=500)
+        manifest.admit("NC", write_db(tmp_path, "NC"))
+        holder = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from askfia_api.services.cache_manifest import CacheManifest;"
+                f"m = CacheManifest({str(tmp_path)!r}, 500); m.acquire('NC');"
+                "print('ok', flush=True); sys.stdin.read()",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert holder.stdout.readline().strip() == "ok"
+            assert manifest.evict_to_fit() == []
+        finally:
+            holder.stdin.close()
+            holder.wait()
+        assert manifest.evict_to_fit() == ["NC"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="flock is POSIX only")
+    def test_acquire_waits_for_eviction(self, tmp_path, monkeypatch):
+        """Another worker cannot open a file between the in-use check and delete."""
+        manifest = CacheManifest(tmp_path, max_bytes=500)
+        manifest.admit("NC", write_db(tmp_path, "NC"))
+        other = CacheManifest(tmp_path, max_bytes=500)
+        remove_file = manifest._remove_file
+        events = []
+
+        def acquire():
+            other.acquire("NC")
+            events.append(("acquired", (tmp_path / "NC.duckdb").exists()))
+            other.release("NC")
+
+        def interleaved(entry):
+            worker = threading.Thread(target=acquire)
+            worker.start()
+            worker.join(0.2)
+            events.append(("deleting", worker.is_alive()))
+            interleaved.worker = worker
+            return remove_file(entry)
+
+        monkeypatch.setattr(manifest, "_remove_file", interleaved)
+
+        assert manifest.evict_to_fit() == ["NC"]
+        interleaved.worker.join(1)
+        # The acquire waited for the delete, then found the file gone
+        assert events == [("deleting", True), ("acquired", False)]
+
+    def test_persists_recency(self, tmp_path):
+        """Use times survive a restart."""
+        manifest = CacheManifest(tmp_path, max_bytes=10_000)
+        manifest.admit("NC", write_db(tmp_path, "NC"))
+        manifest.admit("GA", write_db(tmp_path, "GA"))
+        manifest.record_use("NC")
+        manifest.save()
+
+        reloaded = CacheManifest(tmp_path, max_bytes=10_000)
+        entries = {e["state"]: e for e in reloaded.entries()}
+        assert entries["NC"]["uses"] == 1
+        assert [e["state"] for e in reloaded.entries()] == ["GA", "NC"]
+
+
+class TestStorageCache:
+    """Tests for FIAStorage cache accounting."""
+
+    def test_use_protects_file(self, tmp_path):
+        """Files opened through storage.use() are not evicted."""
+        write_db(tmp_path, "NC", size=2000)
+        storage = FIAStorage(local_dir=tmp_path, max_local_gb=1e-6)
+
+        with storage.use("nc") as path:
+            assert path == str(tmp_path / "NC.duckdb")
+            assert storage.manifest.evict_to_fit() == []
+        assert storage.manifest.evict_to_fit() == ["NC"]
+
+    def test_list_cached_states(self, tmp_path):
+        """Cached states come from the manifest."""
+        write_db(tmp_path, "NC", size=2_000_000)
+        storage = FIAStorage(local_dir=tmp_path, pinned_states=["NC"])
+        storage.get_db_path("NC")
+
+        (entry,) = storage.list_cached_states()
+        assert entry["state"] == "NC"
+        assert entry["size_mb"] == pytest.approx(2.0)
+        assert entry["uses"] == 1
+        assert entry["pinned"]
@@ -0,0 +1,164 @@
+"""Tests for the cold-tier DataMart ingester, using local fixture archives."""
+
+import asyncio
+import zipfile
+
+import duckdb
+import pytest
+
+from askfia_api.services.datamart_ingest import ArchiveSource, ingest_state
+from askfia_api.services.storage import FIAStorage
+
+TABLES = ["PLOT", "TREE", "POP_EVAL", "SEEDLING"]
+
+
+def write_archive(directory, name, members):
+    with zipfile.ZipFile(directory / f"{name}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        for member, lines in members.items():
+            archive.writestr(member, "\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def datamart(tmp_path):
+    """A DataMart stand-in for NC with plots listed out of order."""
+    directory = tmp_path / "datamart"
+    directory.mkdir()
+    plots = [5, 3, 1, 4, 2]
+    write_archive(directory, "NC_PLOT", {
+        "NC_PLOT.csv": ["CN,STATECD,INVYR,LAT,CREATED_DATE"]
+        + [f"P{p},37,2021.0,35.{p},2021-06-01 10:00:00" for p in plots],
+    })
+    write_archive(directory, "NC_TREE", {
+        "NC_TREE.csv": ["CN,PLT_CN,CONDID,SPCD,DIA,TPA_UNADJ"]
+        + [f"T{p}{t},P{p},1,{110 + t},{5 + t}.5,6.018" for p in plots for t in range(3)]
+        + ["T99,P1,1,131,,"],
+    })
+    write_archive(directory, "NC_POP_EVAL", {
+        "NC_POP_EVAL.csv": ["CN,EVALID,STATECD", "E1,372101,37"],
+    })
+    write_archive(directory, "FIADB_REFERENCE", {
+        "REF_SPECIES.csv": ["SPCD,COMMON_NAME", "110,shortleaf pine", "131,loblolly pine"],
+        "REF_CITATION.csv": ["CITATION_NBR,CITATION", "1,ignored"],
+    })
+    return directory
+
+
+class TestIngestState:
+    """Tests for ingest_state."""
+
+    def test_builds_typed_sorted_database(self, tmp_path, datamart):
+        """Tables load with FIADB types, sorted by plot."""
+        dest = tmp_path / "NC.duckdb"
+
+        result = ingest_state("NC", dest, ArchiveSource(datamart), tables=TABLES)
+
+        assert result.rows == {"PLOT": 5, "TREE": 16, "POP_EVAL": 1, "REF_SPECIES": 2}
+        con = duckdb.connect(str(dest), read_only=True)
+        types = dict(con.execute("SELECT column_name, data_type FROM "
+                                 "information_schema.columns WHERE table_name = 'PLOT'").fetchall())
+        assert types["INVYR"] == "BIGINT"
+        assert types["LAT"] == "DOUBLE"
+        assert types["CREATED_DATE"] == "TIMESTAMP"
+        assert con.execute("SELECT DISTINCT STATE_ADDED FROM TREE").fetchall() == [(37,)]
+        plt_cns = [row[0] for row in con.execute("SELECT PLT_CN FROM TREE").fetchall()]
+        assert plt_cns == sorted(plt_cns)
+        assert con.execute("SELECT DIA FROM TREE WHERE CN = 'T99'").fetchone() == (None,)
+        con.close()
+
+    def test_missing_tables_and_extra_reference_skipped(self, tmp_path, datamart):
+        """Unpublished state tables and unneeded reference tables are skipped."""
+        dest = tmp_path / "NC.duckdb"
+        ingest_state("NC", dest, ArchiveSource(datamart), tables=TABLES)
+
+        con = duckdb.connect(str(dest), read_only=True)
+        tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+        con.close()
+        assert tables == {"PLOT", "TREE", "POP_EVAL", "REF_SPECIES"}
+
+    def test_fractional_integer_fails(self, tmp_path, datamart):
+        """An integer column holding a fraction fails instead of rounding."""
+        write_archive(datamart, "NC_POP_EVAL", {
+            "NC_POP_EVAL.csv": ["CN,EVALID,STATECD", "E1,372101.5,37"],
+        })
+        dest = tmp_path / "NC.duckdb"
+
+        with pytest.raises(ValueError, match="POP_EVAL.EVALID"):
+            ingest_state("NC", dest, ArchiveSource(datamart), tables=TABLES)
+        assert not dest.exists()
+        assert not list(tmp_path.glob(".ingest-*"))
+
+    def test_unknown_state_raises(self, tmp_path, datamart):
+        """A state with no archives is reported as not found."""
+        with pytest.raises(FileNotFoundError):
+            ingest_state("GA", tmp_path / "GA.duckdb", ArchiveSource(datamart), tables=TABLES)
+
+    def test_parquet_layout(self, tmp_path, datamart):
+        """The Parquet layout writes one file per table plus a manifest."""
+        dest = tmp_path / "NC"
+
+        ingest_state("NC", dest, ArchiveSource(datamart), tables=TABLES, layout="parquet")
+
+        assert (dest / "manifest.json").exists()
+        assert duckdb.sql(f"SELECT COUNT(*) FROM '{dest / 'TREE.parquet'}'").fetchone() == (16,)
+
+    def test_small_blocks(self, tmp_path, datamart):
+        """Parsing in many small blocks gives the same rows."""
+        dest = tmp_path / "NC.duckdb"
+
+        result = ingest_state(
+            "NC", dest, ArchiveSource(datamart), tables=TABLES, block_size=64
+        )
+
+        assert result.rows["TREE"] == 16
+
+
+class TestColdTier:
+    """Tests for the DataMart fallback in FIAStorage."""
+
+    def test_storage_builds_missing_state(self, tmp_path, datamart, monkeypatch):
+        """A state missing locally and without S3 is built from DataMart."""
+        from askfia_api.services import datamart_ingest
+
+        real_ingest = datamart_ingest.ingest_state
+        monkeypatch.setattr(
+            datamart_ingest,
+            "ingest_state",
+            lambda state, dest, source: real_ingest(state, dest, source, tables=TABLES),
+        )
+        storage = FIAStorage(
+            local_dir=tmp_path / "cache",
+            datamart_fallback=True,
+            datamart_source=str(datamart),
+        )
+
+        path = storage.get_db_path("nc")
+
+        assert path == str(tmp_path / "cache" / "NC.duckdb")
+        assert [entry["state"] for entry in storage.list_cached_states()] == ["NC"]
+
+    def test_async_ensure_builds_missing_state(self, tmp_path, datamart, monkeypatch):
+        """ensure() falls back to DataMart like get_db_path()."""
+        from askfia_api.services import datamart_ingest
+
+        real_ingest = datamart_ingest.ingest_state
+        monkeypatch.setattr(
+            datamart_ingest,
+            "ingest_state",
+            lambda state, dest, source: real_ingest(state, dest, source, tables=TABLES),
+        )
+        storage = FIAStorage(
+            local_dir=tmp_path / "cache",
+            datamart_fallback=True,
+            datamart_source=str(datamart),
+        )
+
+        path = asyncio.run(storage.ensure("nc"))
+
+        assert path == str(tmp_path / "cache" / "NC.duckdb")
+
+    def test_no_fallback_by_default(self, tmp_path, datamart):
+        """Without the fallback a missing state is still an error."""
+        storage = FIAStorage(local_dir=tmp_path / "cache", datamart_source=str(datamart))
+
+        with pytest.raises(FileNotFoundError):
+            storage.get_db_path("NC")
@@ -0,0 +1,195 @@
+"""Tests for background download exports."""
+
+import asyncio
+import time
+import zipfile
+from contextlib import contextmanager
+
+import duckdb
+import pyarrow.parquet as pq
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from askfia_api.api.routes import downloads
+from askfia_api.services.exports import ExportJob, ExportManager, ExportStore
+from askfia_api.services.jobs import FAILED, RUNNING, SUCCEEDED
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Two small state databases; only NC has a COND table."""
+    paths = {}
+    for state, rows in (("NC", 3), ("SC", 2)):
+        path = tmp_path / f"{state.lower()}.duckdb"
+        con = duckdb.connect(str(path))
+        con.execute(f"CREATE TABLE TREE AS SELECT range AS CN FROM range({rows})")
+        con.execute("CREATE TABLE PLOT AS SELECT 1 AS CN")
+        if state == "NC":
+            con.execute("CREATE TABLE COND AS SELECT 1 AS CONDID")
+        con.close()
+        paths[state] = path
+    return paths
+
+
+@pytest.fixture
+def manager(tmp_path, databases):
+    opened = []
+
+    @contextmanager
+    def open_state(state, tables):
+        opened.append((state, tables))
+        yield str(databases[state])
+
+    manager = ExportManager(ExportStore(tmp_path / "downloads", ttl=60), open_state)
+    manager.opened = opened
+    return manager
+
+
+def finish(manager, export_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        export = manager.store.get(export_id)
+        if export.finished:
+            return export
+        time.sleep(0.01)
+    raise AssertionError("export did not finish")
+
+
+class TestExportManager:
+    """Tests for ExportManager."""
+
+    def test_single_table_parquet(self, manager):
+        """One state and table export to a single Parquet file."""
+        export, _ = manager.submit(["nc"], ["tree"], "parquet")
+        done = finish(manager, export.id)
+        path = manager.store.file_path(done)
+
+        assert done.status == SUCCEEDED
+        assert done.progress == {"done": 1, "total": 1}
+        assert path.name == "FIA_NC.parquet"
+        assert pq.read_table(path).num_rows == 3
+        assert manager.opened == [("NC", ("TREE",))]
+
+    def test_multiple_files_zipped(self, manager):
+        """Several tables are zipped per state; missing tables are reported."""
+        export, _ = manager.submit(["NC", "SC"], ["TREE", "COND"], "csv")
+        done = finish(manager, export.id)
+
+        with zipfile.ZipFile(manager.store.file_path(done)) as archive:
+            names = sorted(archive.namelist())
+            tree = archive.read("SC/TREE.csv").decode().splitlines()
+
+        assert names == ["NC/COND.csv", "NC/TREE.csv", "SC/TREE.csv"]
+        assert tree == ["CN", "0", "1"]
+        assert done.missing_tables == ["SC.COND"]
+        assert done.progress == {"done": 4, "total": 4}
+
+    def test_duckdb_combines_states(self, manager):
+        """A duckdb export holds each requested table across all states."""
+        export, _ = manager.submit(["NC", "SC"], ["TREE"], "duckdb")
+        done = finish(manager, export.id)
+
+        con = duckdb.connect(str(manager.store.file_path(done)), read_only=True)
+        try:
+            tables = [row[0] for row in con.execute("SHOW TABLES").fetchall()]
+            rows = con.execute("SELECT count(*) FROM TREE").fetchone()[0]
+        finally:
+            con.close()
+
+        assert tables == ["TREE"]
+        assert rows == 5
+
+    def test_no_tables_found(self, manager):
+        """An export none of whose tables exist fails."""
+        export, _ = manager.submit(["SC"], ["COND"], "parquet")
+        done = finish(manager, export.id)
+
+        assert done.status == FAILED
+        assert "None of the tables" in done.error
+        assert not manager.store.output_dir(export.id).exists()
+
+    def test_identical_requests_share_an_export(self, manager):
+        """An identical request joins the existing export."""
+        first, _ = manager.submit(["NC"], ["TREE"], "parquet")
+        finish(manager, first.id)
+        second, deduplicated = manager.submit(["NC"], ["tree"], "parquet")
+
+        assert second.id == first.id and deduplicated
+        assert len(manager.opened) == 1
+
+    def test_rejects_invalid_requests(self, manager):
+        """Table names must be identifiers and formats known."""
+        with pytest.raises(ValueError):
+            manager.submit(["NC"], ['TREE"; DROP'], "parquet")
+        with pytest.raises(ValueError):
+            manager.submit(["NC"], ["TREE"], "xlsx")
+
+    def test_expired_exports_deleted(self, manager):
+        """Purging removes expired exports along with their files."""
+        export, _ = manager.submit(["NC"], ["TREE"], "parquet")
+        done = finish(manager, export.id)
+        done.finished_at = time.time() - 120
+        manager.store.save(done)
+
+        assert manager.store.purge() == 1
+        assert not manager.store.output_dir(export.id).exists()
+
+
+    def test_recover_interrupted_export(self, manager):
+        """An export left running by a dead process is requeued and finishes."""
+        stale = ExportJob(
+            id="abc123",
+            states=["NC"],
+            tables=["TREE"],
+            format="parquet",
+            key="k",
+            status=RUNNING,
+            owner=f"{2**22 + 12345}:0",
+            progress={"done": 1, "total": 1},
+        )
+        manager.store.save(stale)
+
+        assert manager.recover() == 1
+        assert finish(manager, "abc123").status == SUCCEEDED
+
+
+class TestDownloadRoutes:
+    """Tests for the download endpoints."""
+
+    def test_prepare_poll_and_range_download(self, manager, monkeypatch):
+        """Exports are polled, then downloaded whole or by byte range."""
+        monkeypatch.setattr(downloads, "export_manager", manager)
+        app = FastAPI()
+        app.include_router(downloads.router, prefix="/api/v1/downloads")
+        client = TestClient(app)
+
+        prepared = client.post(
+            "/api/v1/downloads/prepare",
+            json={"states": ["NC"], "tables": ["TREE"], "format": "csv"},
+        )
+        download_id = prepared.json()["download_id"]
+        finish(manager, download_id)
+        info = client.get(f"/api/v1/downloads/{download_id}/info").json()
+        whole = client.get(info["download_url"])
+        part = client.get(info["download_url"], headers={"Range": "bytes=0-2"})
+
+        assert prepared.status_code == 202
+        assert info["status"] == "succeeded"
+        assert whole.content == b"CN\n0\n1\n2\n"
+        assert part.status_code == 206
+        assert part.content == b"CN\n"
+        assert client.get("/api/v1/downloads/unknown").status_code == 404
+
+    def test_unfinished_download_conflicts(self, manager, monkeypatch):
+        """Fetching an export before it finishes is a 409."""
+        monkeypatch.setattr(downloads, "export_manager", manager)
+        export, _ = manager.submit(["NC"], ["TREE"], "parquet")
+        finish(manager, export.id)
+        export.status = "running"
+        manager.store.save(export)
+
+        with pytest.raises(downloads.HTTPException) as exc:
+            asyncio.run(downloads.get_download(export.id))
+
+        assert exc.value.status_code == 409
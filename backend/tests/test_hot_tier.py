@@ -0,0 +1,203 @@
+"""Tests for the in-memory hot-state tier."""
+
+from contextlib import contextmanager
+
+import polars as pl
+
+from askfia_api.services.fia_service import FIAService
+from askfia_api.services.hot_tier import HOT_TABLES, HotStateTier
+
+
+class FakeReader:
+    """Minimal stand-in for pyFIA's FIADataReader."""
+
+    def __init__(self, rows: int = 3):
+        self.calls: list[str] = []
+        self.data = {
+            name: pl.DataFrame(
+                {
+                    "CN": [f"{name}{i}" for i in range(rows)],
+                    "PLT_CN": [f"P{i}" for i in range(rows)],
+                    "EVALID": [372301] * rows,
+                    "EXTRA": [1.0] * rows,
+                }
+            )
+            for name in HOT_TABLES
+        }
+
+    def read_table(self, table_name, columns=None, where=None, lazy=True):
+        self.calls.append(table_name)
+        df = self.data[table_name]
+        return df.lazy() if lazy else df
+
+    def get_table_schema(self, table_name):
+        return {name: "VARCHAR" for name in self.data[table_name].columns}
+
+
+class FakeFIA:
+    """Minimal stand-in for a clipped pyFIA FIA connection."""
+
+    def __init__(self, reader, evalid=(372301,), db_path="nc.duckdb"):
+        self._reader = reader
+        self.evalid = list(evalid) if evalid else None
+        self.db_path = db_path
+        self.tables = {}
+
+    def clip_most_recent(self):
+        pass
+
+    def load_table(self, table_name, columns=None, where=None):
+        df = self._reader.read_table(table_name, lazy=True)
+        if columns:
+            df = df.select(columns)
+        self.tables[table_name] = df
+        return df
+
+
+class TestHotStateTier:
+    """Tests for HotStateTier."""
+
+    def test_disabled_without_budget(self):
+        """A zero memory budget disables loading and injection."""
+        tier = HotStateTier(memory_budget_mb=0)
+        db = FakeFIA(FakeReader())
+
+        assert tier.load("NC", db, "nc.duckdb") is False
+        assert tier.inject(db, "NC", "nc.duckdb") is False
+
+    def test_load_then_inject(self):
+        """A loaded state serves later connections from memory."""
+        reader = FakeReader()
+        tier = HotStateTier(memory_budget_mb=10)
+
+        assert tier.load("nc", FakeFIA(reader), "nc.duckdb") is True
+        assert tier.is_hot("NC")
+
+        calls = len(reader.calls)
+        db = FakeFIA(reader)
+        assert tier.inject(db, "NC", "nc.duckdb") is True
+        assert len(reader.calls) == calls
+        assert set(db.tables) == set(HOT_TABLES)
+        assert isinstance(db.tables["PLOT"], pl.LazyFrame)
+
+    def test_tree_projection_limited_to_available_columns(self):
+        """TREE keeps only projected columns that exist in the database."""
+        tier = HotStateTier(memory_budget_mb=10)
+        tier.load("NC", FakeFIA(FakeReader()), "nc.duckdb")
+
+        db = FakeFIA(FakeReader())
+        tier.inject(db, "NC", "nc.duckdb")
+        assert db.tables["TREE"].collect_schema().names() == ["CN", "PLT_CN"]
+
+    def test_stale_source_or_evalid_not_injected(self):
+        """Tables are only reused for the same database and EVALID."""
+        tier = HotStateTier(memory_budget_mb=10)
+        tier.load("NC", FakeFIA(FakeReader()), "nc.duckdb@1")
+
+        assert tier.inject(FakeFIA(FakeReader()), "NC", "nc.duckdb@2") is False
+        assert tier.inject(
+            FakeFIA(FakeReader(), evalid=(372201,)), "NC", "nc.duckdb@1"
+        ) is False
+
+    def test_budget_evicts_least_used(self):
+        """A new state evicts the least-used resident state to fit."""
+        reader = FakeReader(rows=2000)
+        probe = HotStateTier(memory_budget_mb=100)
+        probe.load("NC", FakeFIA(reader), "nc.duckdb")
+        tier = HotStateTier(memory_budget_mb=probe.stats()["used_mb"] * 2.5)
+
+        for state in ["NC", "NC", "GA", "OR", "OR"]:
+            tier.record_access(state)
+        tier.load("NC", FakeFIA(reader), "nc.duckdb")
+        tier.load("GA", FakeFIA(reader), "ga.duckdb")
+        tier.load("OR", FakeFIA(reader), "or.duckdb")
+
+        assert tier.is_hot("NC")
+        assert tier.is_hot("OR")
+        assert not tier.is_hot("GA")
+
+    def test_oversized_state_rejected(self):
+        """A state larger than the whole budget is not loaded."""
+        tier = HotStateTier(memory_budget_mb=1e-6)
+        assert tier.load("NC", FakeFIA(FakeReader()), "nc.duckdb") is False
+        assert not tier.is_hot("NC")
+
+    def test_oversized_state_not_reloaded(self):
+        """A rejected state is not read again or promoted for the same data."""
+        reader = FakeReader()
+        tier = HotStateTier(memory_budget_mb=1e-6, configured_states=["NC"])
+        tier.load("NC", FakeFIA(reader), "nc.duckdb")
+        assert tier.missing_candidates() == []
+
+        calls = len(reader.calls)
+        assert tier.load("NC", FakeFIA(reader), "nc.duckdb") is False
+        assert len(reader.calls) == calls
+
+        # A replaced file gets another try
+        tier.evict("NC")
+        assert tier.missing_candidates() == ["NC"]
+
+    def test_configured_states_do_not_evict_each_other(self):
+        """Of two configured states that don't fit together, the first stays."""
+        reader = FakeReader(rows=2000)
+        probe = HotStateTier(memory_budget_mb=100)
+        probe.load("NC", FakeFIA(reader), "nc.duckdb")
+        tier = HotStateTier(
+            memory_budget_mb=probe.stats()["used_mb"] * 1.5,
+            configured_states=["NC", "GA"],
+        )
+
+        assert tier.load("GA", FakeFIA(reader), "ga.duckdb") is True
+        assert tier.load("NC", FakeFIA(reader), "nc.duckdb") is True
+        assert tier.load("GA", FakeFIA(reader), "ga.duckdb") is False
+        assert tier.is_hot("NC")
+        assert tier.missing_candidates() == []
+
+    def test_candidates_include_learned_states(self):
+        """Configured states come first, then the most-queried states."""
+        tier = HotStateTier(
+            memory_budget_mb=10, configured_states=["nc"], max_learned_states=1
+        )
+        for state in ["GA", "GA", "OR", "NC"]:
+            tier.record_access(state)
+
+        assert tier.candidates() == ["NC", "GA"]
+
+
+class NullStratCache:
+    """Stratification cache that injects nothing."""
+
+    def inject(self, db, source):
+        return False
+
+
+class TestWarmHotTier:
+    """Tests for FIAService hot-tier warming."""
+
+    def test_startup_warming(self, monkeypatch):
+        """Startup warming loads each state once and isn't counted as traffic."""
+        service = FIAService()
+        service.hot_tier = HotStateTier(memory_budget_mb=10, configured_states=["NC"])
+        service.strat_cache = NullStratCache()
+        promoted = []
+        monkeypatch.setattr(service, "_promote_hot_state", promoted.append)
+        opened = []
+        claimed_during_load = []
+
+        @contextmanager
+        def open_connection(state, workload=None, warm=False):
+            opened.append(state)
+            claimed_during_load.append(service._claim_warming([state]))
+            db = FakeFIA(FakeReader())
+            service._prepare_connection(db, state, warm=warm)
+            yield db
+
+        monkeypatch.setattr(service, "_open_connection", open_connection)
+
+        assert service.warm_hot_tier() == ["NC"]
+        assert opened == ["NC"]
+        # A query arriving mid-load doesn't start a second load
+        assert claimed_during_load == [[]]
+        assert promoted == []
+        assert service.hot_tier.stats()["top_usage"] == {}
+        assert service._warming == set()
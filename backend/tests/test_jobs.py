@@ -0,0 +1,262 @@
+"""Tests for async query jobs."""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from askfia_api.services.batch_query import current_scope
+from askfia_api.services.jobs import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    Job,
+    JobManager,
+    JobStore,
+    process_token,
+    spec_key,
+)
+
+
+class FakeRunner:
+    """Runs query specs, recording them; optionally blocking or failing."""
+
+    def __init__(self, block: threading.Event | None = None, fail=False):
+        self.calls = []
+        self.block = block
+        self.fail = fail
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    async def __call__(self, query_type, params):
+        with self.lock:
+            self.calls.append((query_type, params["states"]))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.block is not None:
+                await asyncio.to_thread(self.block.wait, 5)
+            if self.fail:
+                raise RuntimeError("no data")
+            scope = current_scope.get()
+            return {
+                "states": params["states"],
+                "total": 10.0 * len(params["states"]),
+                "lake": scope.use_lake if scope else None,
+            }
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def wait_finished(manager, job_id, timeout=5.0):
+    return asyncio.run(manager.wait(job_id, timeout))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(tmp_path / "jobs", ttl=60)
+
+
+class TestJobManager:
+    """Tests for JobManager."""
+
+    def test_runs_job(self, store):
+        """A submitted job runs in the background and stores its result."""
+        manager = JobManager(store, FakeRunner(), poll_interval=0.01)
+
+        job, deduplicated = manager.submit("area", {"states": ["NC"]})
+        done = wait_finished(manager, job.id)
+
+        assert not deduplicated
+        assert done.status == SUCCEEDED
+        assert done.result["total"] == 10.0
+        assert done.partial == []
+
+    def test_partial_results_per_state(self, store):
+        """Multi-state jobs publish each state's result, then the total."""
+        runner = FakeRunner()
+        manager = JobManager(store, runner, poll_interval=0.01)
+
+        job, _ = manager.submit("volume", {"states": ["NC", "SC", "GA"]})
+        done = wait_finished(manager, job.id)
+
+        assert [p["state"] for p in done.partial] == ["NC", "SC", "GA"]
+        assert done.progress == {"done": 3, "total": 3}
+        assert done.result["total"] == 30.0
+        # Per-state estimates are combined, not rescanned from the lake
+        assert done.result["lake"] is False
+        assert runner.calls[-1] == ("volume", ["NC", "SC", "GA"])
+
+    def test_identical_submissions_share_a_job(self, store):
+        """An identical spec joins the queued, running or finished job."""
+        release = threading.Event()
+        runner = FakeRunner(block=release)
+        manager = JobManager(store, runner, poll_interval=0.01)
+
+        first, _ = manager.submit("area", {"states": ["NC"]})
+        second, deduplicated = manager.submit("area", {"states": ["NC"]})
+        other, other_dedup = manager.submit("area", {"states": ["GA"]})
+        release.set()
+        wait_finished(manager, first.id)
+        third, third_dedup = manager.submit("area", {"states": ["NC"]})
+
+        assert second.id == first.id and deduplicated
+        assert other.id != first.id and not other_dedup
+        assert third.id == first.id and third_dedup
+        assert runner.calls.count(("area", ["NC"])) == 1
+
+    def test_changed_data_runs_again(self, store):
+        """A finished job is not reused once its states' data changes."""
+        runner = FakeRunner()
+        versions = {"NC": "v1"}
+        manager = JobManager(
+            store,
+            runner,
+            poll_interval=0.01,
+            data_version=lambda states: versions[states[0]],
+        )
+
+        first, _ = manager.submit("area", {"states": ["NC"]})
+        wait_finished(manager, first.id)
+        same, same_dedup = manager.submit("area", {"states": ["NC"]})
+        versions["NC"] = "v2"
+        rerun, rerun_dedup = manager.submit("area", {"states": ["NC"]})
+        wait_finished(manager, rerun.id)
+
+        assert same.id == first.id and same_dedup
+        assert rerun.id != first.id and not rerun_dedup
+        assert runner.calls.count(("area", ["NC"])) == 2
+
+    def test_bounded_concurrency(self, store):
+        """No more than max_concurrency jobs run at once."""
+        release = threading.Event()
+        runner = FakeRunner(block=release)
+        manager = JobManager(store, runner, max_concurrency=2, poll_interval=0.01)
+
+        jobs = [manager.submit("area", {"states": [s]})[0] for s in ("NC", "SC", "GA")]
+        time.sleep(0.1)
+        statuses = [store.get(job.id).status for job in jobs]
+        release.set()
+        for job in jobs:
+            wait_finished(manager, job.id)
+
+        assert sorted(statuses) == [QUEUED, RUNNING, RUNNING]
+        assert runner.max_active == 2
+
+    def test_managers_share_the_pool(self, tmp_path):
+        """Runners share one executor, each capped at its own concurrency."""
+        release = threading.Event()
+        one, two = FakeRunner(block=release), FakeRunner(block=release)
+        first = JobManager(
+            JobStore(tmp_path / "a"), one, max_concurrency=1, poll_interval=0.01
+        )
+        second = JobManager(
+            JobStore(tmp_path / "b"), two, max_concurrency=1, poll_interval=0.01
+        )
+
+        jobs = [
+            (manager, manager.submit("area", {"states": [s]})[0])
+            for manager in (first, second)
+            for s in ("NC", "SC")
+        ]
+        time.sleep(0.1)
+        running = [one.active, two.active]
+        release.set()
+        for manager, job in jobs:
+            wait_finished(manager, job.id)
+
+        assert first._pool is second._pool
+        assert running == [1, 1]
+        assert one.max_active == two.max_active == 1
+
+    def test_failed_job(self, store):
+        """Failures are stored, and an identical submission runs again."""
+        manager = JobManager(store, FakeRunner(fail=True), poll_interval=0.01)
+
+        job, _ = manager.submit("area", {"states": ["NC"]})
+        done = wait_finished(manager, job.id)
+        retry, deduplicated = manager.submit("area", {"states": ["NC"]})
+
+        assert done.status == FAILED
+        assert done.error == "RuntimeError: no data"
+        assert retry.id != job.id and not deduplicated
+
+    def test_recover_interrupted_jobs(self, store):
+        """Jobs left running by a dead process are requeued."""
+        dead = Job(
+            id="abc123",
+            query_type="area",
+            params={"states": ["NC"]},
+            key="k",
+            status=RUNNING,
+            owner=2**22 + 12345,
+        )
+        store.save(dead)
+        manager = JobManager(store, FakeRunner(), poll_interval=0.01)
+
+        assert manager.recover() == 1
+        done = wait_finished(manager, "abc123")
+
+        assert done.status == SUCCEEDED
+        assert done.owner == process_token()
+
+    def test_recover_after_pid_reuse(self, store):
+        """A job owned by an earlier process with this PID is requeued."""
+        stale = Job(
+            id="def456",
+            query_type="area",
+            params={"states": ["NC"]},
+            key="k",
+            status=RUNNING,
+            owner=f"{os.getpid()}:0",
+        )
+        store.save(stale)
+        manager = JobManager(store, FakeRunner(), poll_interval=0.01)
+
+        assert manager.recover() == 1
+        assert wait_finished(manager, "def456").status == SUCCEEDED
+
+    def test_lost_own_job_not_deduplicated(self, store):
+        """A job of this process that is not running does not serve new submits."""
+        lost = Job(
+            id="lost",
+            query_type="area",
+            params={"states": ["NC"]},
+            key=spec_key("area", {"states": ["NC"]}),
+            status=QUEUED,
+            owner=process_token(),
+        )
+        store.save(lost)
+        manager = JobManager(store, FakeRunner(), poll_interval=0.01)
+
+        job, deduplicated = manager.submit("area", {"states": ["NC"]})
+
+        assert job.id != "lost" and not deduplicated
+
+
+class TestJobStore:
+    """Tests for JobStore expiry."""
+
+    def test_finished_jobs_expire(self, tmp_path):
+        """Finished jobs are gone after the TTL; unfinished ones stay."""
+        store = JobStore(tmp_path, ttl=10)
+        old = Job(id="old", query_type="area", params={}, key="a", status=SUCCEEDED)
+        old.finished_at = time.time() - 60
+        running = Job(id="run", query_type="area", params={}, key="b", status=RUNNING)
+        store.save(old)
+        store.save(running)
+
+        assert store.get("old") is None
+        assert store.get("run") is not None
+        assert store.find("a") is None
+        assert store.purge() == 1
+        assert not (tmp_path / "old.json").exists()
+
+    def test_rejects_path_ids(self, tmp_path):
+        """Job IDs cannot address files outside the store."""
+        assert JobStore(tmp_path).get("../secrets") is None
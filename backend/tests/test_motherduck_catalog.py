@@ -0,0 +1,144 @@
+"""Tests for the MotherDuck catalog cache, with a fake database listing."""
+
+import threading
+
+import pytest
+
+from askfia_api.services.motherduck_catalog import MotherDuckCatalog, parse_databases
+
+
+class FakeListing:
+    """Stands in for SHOW DATABASES; can be changed or made to fail."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.fail = False
+        self.calls = 0
+
+    def __call__(self, token):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("MotherDuck unavailable")
+        return [(name, 1024) for name in self.names]
+
+
+def make_catalog(listing, **kwargs):
+    return MotherDuckCatalog("token", fetch=listing, **kwargs)
+
+
+def age(catalog, seconds):
+    """Make the cached listing and last fetch attempt older."""
+    catalog._listing.fetched_at -= seconds
+    catalog._last_attempt -= seconds
+
+
+def wait_for_refresh():
+    for thread in threading.enumerate():
+        if thread.name == "motherduck-catalog":
+            thread.join(5)
+
+
+class TestParseDatabases:
+    """Tests for parse_databases."""
+
+    def test_latest_eval_year_wins(self):
+        """The newest eval year is picked over older and legacy names."""
+        databases = parse_databases(
+            [("fia_nc", None), ("fia_nc_eval2022", 10), ("FIA_NC_EVAL2023", 20), ("other", 1)]
+        )
+
+        assert list(databases) == ["NC"]
+        assert databases["NC"].name == "fia_nc_eval2023"
+        assert databases["NC"].eval_year == 2023
+        assert databases["NC"].size_bytes == 20
+
+    def test_legacy_name(self):
+        """Legacy names map to eval year 0."""
+        assert parse_databases([("fia_ga", None)])["GA"].eval_year == 0
+
+
+class TestMotherDuckCatalog:
+    """Tests for MotherDuckCatalog."""
+
+    def test_fresh_listing_is_cached(self):
+        """Within the TTL the listing is fetched once."""
+        listing = FakeListing(["fia_nc_eval2023"])
+        catalog = make_catalog(listing)
+
+        assert catalog.get("nc").name == "fia_nc_eval2023"
+        assert catalog.get("NC").eval_year == 2023
+        assert listing.calls == 1
+
+    def test_stale_listing_served_while_refreshing(self):
+        """After the TTL the old listing is served and refreshed in the background."""
+        listing = FakeListing(["fia_nc_eval2022"])
+        catalog = make_catalog(listing, ttl=60)
+        catalog.get("NC")
+        listing.names = ["fia_nc_eval2023"]
+        age(catalog, 120)
+
+        assert catalog.get("NC").name == "fia_nc_eval2022"
+        wait_for_refresh()
+        assert catalog.get("NC").name == "fia_nc_eval2023"
+
+    def test_expired_listing_refreshed_inline(self):
+        """Past the stale TTL the listing is fetched before answering."""
+        listing = FakeListing(["fia_nc_eval2022"])
+        catalog = make_catalog(listing, ttl=60, stale_ttl=300)
+        catalog.get("NC")
+        listing.names = ["fia_nc_eval2023"]
+        age(catalog, 600)
+
+        assert catalog.get("NC").name == "fia_nc_eval2023"
+
+    def test_failed_first_fetch_expires(self):
+        """A failed first fetch is retried after the negative TTL, not cached forever."""
+        listing = FakeListing(["fia_nc_eval2023"])
+        listing.fail = True
+        catalog = make_catalog(listing, negative_ttl=30)
+
+        assert catalog.get("NC") is None
+        assert catalog.get("NC") is None
+        assert listing.calls == 1
+
+        listing.fail = False
+        age(catalog, 31)
+        assert catalog.get("NC").name == "fia_nc_eval2023"
+        assert catalog.stats()["last_error"] is None
+
+    def test_failed_refresh_keeps_last_listing(self):
+        """A failed refresh keeps serving the last good listing."""
+        listing = FakeListing(["fia_nc_eval2023"])
+        catalog = make_catalog(listing, ttl=60, stale_ttl=300)
+        catalog.get("NC")
+        listing.fail = True
+        age(catalog, 600)
+
+        assert catalog.get("NC").name == "fia_nc_eval2023"
+        assert catalog.get("NC").name == "fia_nc_eval2023"
+        assert listing.calls == 2
+        assert catalog.stats()["failures"] == 1
+
+    def test_missing_state_triggers_refresh(self):
+        """A state missing from an older listing is looked up again."""
+        listing = FakeListing(["fia_nc_eval2023"])
+        catalog = make_catalog(listing, ttl=300, negative_ttl=30)
+        catalog.get("NC")
+        listing.names.append("fia_sc_eval2023")
+
+        assert catalog.get("SC") is None
+        assert listing.calls == 1  # Listing too recent to refetch
+
+        age(catalog, 31)
+        assert catalog.get("SC") is None
+        wait_for_refresh()
+        assert catalog.get("SC").name == "fia_sc_eval2023"
+
+    @pytest.mark.parametrize("token", [None, ""])
+    def test_disabled_without_token(self, token):
+        """Without a token nothing is fetched."""
+        listing = FakeListing(["fia_nc_eval2023"])
+        catalog = MotherDuckCatalog(token, fetch=listing)
+
+        assert catalog.get("NC") is None
+        assert listing.calls == 0
@@ -0,0 +1,126 @@
+"""Tests for incremental MotherDuck uploads, against a local DuckDB remote."""
+
+import duckdb
+import pytest
+
+from askfia_api.services.motherduck_upload import (
+    FINGERPRINT_TABLE,
+    list_tables,
+    local_fingerprints,
+    sync_database,
+)
+
+
+@pytest.fixture
+def local_db(tmp_path):
+    path = tmp_path / "NC.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute("CREATE TABLE PLOT AS SELECT range AS CN, range % 7 AS STATECD FROM range(500)")
+    con.execute("CREATE TABLE TREE AS SELECT range AS CN, range % 500 AS PLT_CN FROM range(2000)")
+    con.execute("CREATE TABLE POP_EVAL AS SELECT 372301 AS EVALID")
+    con.close()
+    return path
+
+
+@pytest.fixture
+def remote(tmp_path):
+    con = duckdb.connect(str(tmp_path / "remote.duckdb"))
+    yield con
+    con.close()
+
+
+def modify(path, sql):
+    con = duckdb.connect(str(path))
+    con.execute(sql)
+    con.close()
+
+
+class TestFingerprints:
+    """Tests for table fingerprints."""
+
+    def test_row_order_does_not_matter(self, tmp_path, local_db):
+        """The same rows in a different order have the same fingerprint."""
+        other = tmp_path / "other.duckdb"
+        modify(
+            other,
+            f"ATTACH '{local_db}' AS src (READ_ONLY); "
+            "CREATE TABLE PLOT AS SELECT * FROM src.PLOT ORDER BY CN DESC",
+        )
+
+        assert (
+            local_fingerprints(other)["PLOT"].fingerprint
+            == local_fingerprints(local_db)["PLOT"].fingerprint
+        )
+
+    def test_duplicate_rows_change_fingerprint(self, local_db):
+        """Adding a duplicate of an existing row changes the fingerprint."""
+        before = local_fingerprints(local_db)["POP_EVAL"]
+        modify(local_db, "INSERT INTO POP_EVAL VALUES (372301), (372301)")
+
+        assert local_fingerprints(local_db)["POP_EVAL"].fingerprint != before.fingerprint
+
+
+class TestSyncDatabase:
+    """Tests for sync_database."""
+
+    def test_first_upload_copies_everything(self, local_db, remote):
+        """All tables are uploaded with their fingerprints recorded."""
+        result = sync_database(local_db, remote)
+
+        assert sorted(result.uploaded) == ["PLOT", "POP_EVAL", "TREE"]
+        assert result.rows["TREE"] == 2000
+        assert remote.execute("SELECT COUNT(*) FROM TREE").fetchone()[0] == 2000
+        assert remote.execute(f"SELECT COUNT(*) FROM {FINGERPRINT_TABLE}").fetchone()[0] == 3
+
+    def test_unchanged_tables_are_skipped(self, local_db, remote):
+        """A second upload of the same database copies nothing."""
+        sync_database(local_db, remote)
+
+        result = sync_database(local_db, remote)
+
+        assert result.uploaded == []
+        assert sorted(result.unchanged) == ["PLOT", "POP_EVAL", "TREE"]
+
+    def test_only_changed_table_uploaded(self, local_db, remote):
+        """Changing one table re-uploads only that table."""
+        sync_database(local_db, remote)
+        modify(local_db, "UPDATE TREE SET PLT_CN = 0 WHERE CN = 1")
+
+        result = sync_database(local_db, remote)
+
+        assert result.uploaded == ["TREE"]
+        assert remote.execute("SELECT PLT_CN FROM TREE WHERE CN = 1").fetchone()[0] == 0
+
+    def test_removed_tables_dropped(self, local_db, remote):
+        """Tables gone from the local database are dropped remotely."""
+        sync_database(local_db, remote)
+        modify(local_db, "DROP TABLE POP_EVAL")
+
+        result = sync_database(local_db, remote)
+
+        assert result.removed == ["POP_EVAL"]
+        assert list_tables(remote) == ["PLOT", "TREE"]
+
+    def test_failed_upload_leaves_remote_intact(self, local_db, remote, monkeypatch):
+        """If staging fails, the remote keeps its previous tables and no staging tables."""
+        sync_database(local_db, remote)
+        modify(local_db, "UPDATE TREE SET PLT_CN = 0; UPDATE PLOT SET STATECD = 0")
+
+        from askfia_api.services import motherduck_upload
+
+        real_stage = motherduck_upload._stage_table
+
+        def failing_stage(local_path, remote, database, table, *args):
+            if table == "TREE":
+                raise RuntimeError("connection lost")
+            return real_stage(local_path, remote, database, table, *args)
+
+        monkeypatch.setattr(motherduck_upload, "_stage_table", failing_stage)
+
+        with pytest.raises(RuntimeError):
+            sync_database(local_db, remote)
+
+        assert remote.execute("SELECT MAX(STATECD) FROM PLOT").fetchone()[0] == 6
+        assert remote.execute("SELECT MAX(PLT_CN) FROM TREE").fetchone()[0] == 499
+        tables = [row[0] for row in remote.execute("SHOW TABLES").fetchall()]
+        assert not [t for t in tables if t.startswith("__staging_")]
@@ -0,0 +1,197 @@
+"""Tests for the national Parquet lake."""
+
+import asyncio
+import json
+import os
+
+import duckdb
+import polars as pl
+import pytest
+
+from askfia_api.services.fia_service import FIAService
+from askfia_api.services.parquet_lake import (
+    LAKE_MANIFEST,
+    ParquetLake,
+    export_state_to_lake,
+)
+from askfia_api.services.storage import FIAStorage
+
+STATECDS = {"NC": 37, "SC": 45}
+
+
+def make_state_db(path, state, evalids=(2301, 2302), plots=10):
+    """A small state database shaped like a pyFIA one."""
+    statecd = STATECDS[state]
+    con = duckdb.connect(str(path))
+    con.execute(
+        f"CREATE TABLE PLOT AS SELECT 'P' || range AS CN, {statecd} AS STATECD "
+        f"FROM range({plots})"
+    )
+    con.execute(
+        f"CREATE TABLE TREE AS SELECT 'T' || range AS CN, 'P' || (range % {plots}) "
+        f"AS PLT_CN, {statecd} AS STATE_ADDED FROM range({plots * 3})"
+    )
+    evalid_rows = ", ".join(f"('S{e}', {statecd * 10000 + e}, {statecd})" for e in evalids)
+    con.execute("CREATE TABLE POP_STRATUM (CN VARCHAR, EVALID BIGINT, STATECD BIGINT)")
+    con.execute(f"INSERT INTO POP_STRATUM VALUES {evalid_rows}")
+    con.execute("CREATE TABLE POP_EVAL AS SELECT * FROM POP_STRATUM")
+    con.execute("CREATE TABLE REF_SPECIES AS SELECT 131 AS SPCD, 'loblolly pine' AS NAME")
+    con.close()
+    return path
+
+
+@pytest.fixture
+def lake(tmp_path):
+    lake_dir = tmp_path / "lake"
+    for state in STATECDS:
+        db = make_state_db(tmp_path / f"{state}.duckdb", state)
+        export_state_to_lake(db, lake_dir, state)
+    return ParquetLake(lake_dir)
+
+
+def query(path, sql):
+    con = duckdb.connect(str(path), read_only=True)
+    try:
+        return con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+class TestExportStateToLake:
+    """Tests for export_state_to_lake."""
+
+    def test_partitioned_layout(self, lake):
+        """State tables are partitioned by STATECD, POP tables also by EVALID."""
+        root = lake.directory
+
+        assert (root / "PLOT" / "STATECD=37" / "data_0.parquet").exists()
+        assert (root / "TREE" / "STATECD=45" / "data_0.parquet").exists()
+        assert (root / "POP_STRATUM" / "STATECD=37" / "EVALID=372301").is_dir()
+        assert (root / "REF_SPECIES" / "data.parquet").exists()
+        manifest = json.loads((root / LAKE_MANIFEST).read_text())
+        assert manifest["states"]["NC"]["evalids"] == [372301, 372302]
+        assert manifest["tables"]["REF_SPECIES"]["partitions"] == []
+
+    def test_reexport_replaces_partitions(self, tmp_path, lake):
+        """A rebuilt state drops partitions of EVALIDs it no longer has."""
+        db = make_state_db(tmp_path / "NC2.duckdb", "NC", evalids=(2401,), plots=4)
+
+        export_state_to_lake(db, lake.directory, "NC")
+
+        evalid_dirs = sorted(
+            p.name for p in (lake.directory / "POP_STRATUM" / "STATECD=37").iterdir()
+        )
+        assert evalid_dirs == ["EVALID=372401"]
+        assert lake.manifest()["states"]["NC"]["rows"]["PLOT"] == 4
+        assert not (lake.directory / "_staging" / "NC").exists()
+
+
+class TestParquetLake:
+    """Tests for ParquetLake views."""
+
+    def test_view_db_filters_states(self, lake):
+        """Views only return rows of the requested states."""
+        path = lake.view_db(["nc"])
+
+        assert query(path, "SELECT DISTINCT STATECD FROM PLOT") == [(37,)]
+        assert query(path, "SELECT COUNT(*) FROM TREE") == [(30,)]
+        assert query(path, "SELECT COUNT(*) FROM REF_SPECIES") == [(1,)]
+
+    def test_partition_pruning(self, lake):
+        """Other states' partitions are never opened."""
+        for file in (lake.directory / "TREE" / "STATECD=45").iterdir():
+            file.write_bytes(b"not parquet")
+
+        path = lake.view_db(["NC"])
+
+        assert query(path, "SELECT COUNT(*) FROM TREE") == [(30,)]
+
+    def test_multi_state_scan(self, lake):
+        """One view database spans several states."""
+        path = lake.view_db(["SC", "NC"])
+
+        assert query(
+            path, "SELECT STATECD, COUNT(*) FROM PLOT GROUP BY STATECD ORDER BY 1"
+        ) == [(37, 10), (45, 10)]
+
+    def test_export_creates_new_view_file(self, tmp_path, lake):
+        """A re-export changes the view file, leaving open ones untouched."""
+        before = lake.view_db(["NC", "SC"])
+        con = duckdb.connect(str(before), read_only=True)
+        db = make_state_db(tmp_path / "NC2.duckdb", "NC", plots=4)
+        export_state_to_lake(db, lake.directory, "NC")
+
+        after = lake.view_db(["NC", "SC"])
+
+        assert after != before
+        assert query(after, "SELECT COUNT(*) FROM PLOT") == [(14,)]
+        # The old version's file is gone, but an open connection still reads it
+        assert not before.exists()
+        assert con.execute("SELECT COUNT(*) FROM PLOT").fetchone() == (14,)
+        con.close()
+
+    def test_view_files_capped(self, lake):
+        """Only the most recently used max_views view files are kept."""
+        lake.max_views = 2
+        nc = lake.view_db(["NC"])
+        lake.view_db(["SC"])
+        os.utime(nc, (0, 0))
+        lake.view_db(["NC"])  # Marks NC used again
+
+        both = lake.view_db(["NC", "SC"])
+
+        views = sorted((lake.directory / "_views").glob("*.duckdb"))
+        assert views == sorted([nc, both])
+
+    def test_missing_state(self, lake):
+        """States not in the lake are not covered."""
+        assert lake.covers(["NC", "SC"])
+        assert not lake.covers(["NC", "GA"])
+        assert lake.view_db(["GA"]) is None
+
+
+class TestLakeEstimates:
+    """Tests for multi-state estimates through the lake."""
+
+    def test_split_by_state(self, lake, monkeypatch):
+        """One grouped estimate is split into per-state frames."""
+        service = FIAService()
+        service.parquet_lake = lake
+        calls = []
+
+        def fake_estimate(db, state, method, approximate=False, **kwargs):
+            calls.append((state, kwargs["grp_by"]))
+            return pl.DataFrame({"STATECD": [37, 45], "AREA": [1.0, 2.0]})
+
+        monkeypatch.setattr(service, "_estimate", fake_estimate)
+        monkeypatch.setattr(FIAService, "_open_lake_connection", _fake_connection)
+
+        frames = asyncio.run(service._estimate_states(["nc", "sc"], "area", grp_by=None))
+
+        assert calls == [("NC,SC", ["STATECD"])]
+        assert [f["STATE"].tolist() for f in frames] == [["NC"], ["SC"]]
+        assert [f["AREA"].tolist() for f in frames] == [[1.0], [2.0]]
+        assert "STATECD" not in frames[0].columns
+
+    def test_data_version_tracks_lake(self, tmp_path, lake):
+        """Lake queries are versioned by the lake, which changes on export."""
+        service = FIAService()
+        service.parquet_lake = lake
+        service._motherduck_token = None
+        service.storage = FIAStorage(local_dir=tmp_path / "fia")
+
+        version = service.data_version(["NC", "SC"])
+        assert version is not None
+        # Single-state queries don't use the lake
+        assert service.data_version(["NC"]) is None
+
+        db = make_state_db(tmp_path / "NC2.duckdb", "NC", evalids=(2401,))
+        export_state_to_lake(db, lake.directory, "NC")
+
+        assert service.data_version(["NC", "SC"]) not in (None, version)
+
+
+def _fake_connection(self, states):
+    from contextlib import nullcontext
+
+    return nullcontext(object())
@@ -0,0 +1,138 @@
+"""Tests for ETags, conditional requests and canonical query URLs."""
+
+import asyncio
+
+from fastapi import Response
+from starlette.requests import Request
+
+from askfia_api.api.caching import canonical_query_string, etag_matches
+from askfia_api.api.routes.query import query_get, query_volume
+from askfia_api.models.schemas import VolumeQuery
+
+
+class FakeService:
+    """Counts volume queries; data_version is settable."""
+
+    def __init__(self):
+        self.version = "v1"
+        self.calls = 0
+
+    def data_version(self, states):
+        return self.version
+
+    async def query_volume(self, states, by_species, tree_domain, approximate, tabular):
+        self.calls += 1
+        return {
+            "states": states,
+            "total_volume_cuft": 10.0,
+            "total_volume_billion_cuft": 1e-8,
+            "se_percent": 2.0,
+        }
+
+
+def post(service, if_none_match=None, **params):
+    query = VolumeQuery(states=["NC"], **params)
+    response = Response()
+    result = asyncio.run(
+        query_volume(query, response, fia_service=service, if_none_match=if_none_match)
+    )
+    return result, response
+
+
+def get(service, query_string, if_none_match=None):
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/query/volume",
+            "query_string": query_string.encode(),
+            "headers": [],
+        }
+    )
+    return asyncio.run(
+        query_get(
+            "volume",
+            request,
+            Response(),
+            fia_service=service,
+            if_none_match=if_none_match,
+        )
+    )
+
+
+class TestConditionalRequests:
+    """Tests for ETags and If-None-Match."""
+
+    def test_matching_etag_skips_query(self):
+        """A matching If-None-Match gets 304 without running the estimator."""
+        service = FakeService()
+        _, first = post(service)
+        etag = first.headers["ETag"]
+
+        result, _ = post(service, if_none_match=f'W/{etag}, "other"')
+
+        assert result.status_code == 304
+        assert result.headers["ETag"] == etag
+        assert service.calls == 1
+
+    def test_etag_tracks_spec_and_data_version(self):
+        """The ETag changes with the query and with the data version."""
+        service = FakeService()
+        etag = post(service)[1].headers["ETag"]
+        by_species = post(service, by_species=True)[1].headers["ETag"]
+        service.version = "v2"
+        new_data = post(service)[1].headers["ETag"]
+
+        assert len({etag, by_species, new_data}) == 3
+        result, _ = post(service, if_none_match=etag)
+        assert not isinstance(result, Response)
+
+    def test_unknown_version(self):
+        """Without a data version, the query runs and has no ETag."""
+        service = FakeService()
+        service.version = None
+
+        result, response = post(service, if_none_match="*")
+
+        assert result.total_volume_cuft == 10.0
+        assert "ETag" not in response.headers
+
+    def test_etag_matches(self):
+        """Weak and wildcard validators match."""
+        assert etag_matches('W/"a", "b"', '"a"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches('"b"', '"a"')
+        assert not etag_matches(None, '"a"')
+
+
+class TestCanonicalUrls:
+    """Tests for GET query URLs."""
+
+    def test_canonical_query_string(self):
+        """Parameters are sorted, defaults omitted and states joined."""
+        query = VolumeQuery(states=["nc", "ga"], by_species=True, approximate=False)
+
+        assert canonical_query_string(query, format="arrow", limit=None) == (
+            "by_species=true&format=arrow&states=NC,GA"
+        )
+
+    def test_redirects_to_canonical_url(self):
+        """Other spellings of a query redirect to its canonical URL."""
+        response = get(FakeService(), "states=nc&approximate=false&by_species=True")
+
+        assert response.status_code == 308
+        assert response.headers["location"] == (
+            "/api/v1/query/volume?by_species=true&states=NC"
+        )
+
+    def test_canonical_url_runs_query(self):
+        """The canonical URL answers with the query result and its ETag."""
+        service = FakeService()
+
+        result = get(service, "states=NC")
+        etag = post(service)[1].headers["ETag"]
+        not_modified = get(service, "states=NC", if_none_match=etag)
+
+        assert result.total_volume_cuft == 10.0
+        assert not_modified.status_code == 304
+        assert service.calls == 2
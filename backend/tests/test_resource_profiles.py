@@ -0,0 +1,216 @@
+"""Tests for DuckDB resource profiles."""
+
+import asyncio
+import threading
+import time
+
+import duckdb
+
+from askfia_api.services.resource_profiles import (
+    BATCH,
+    BUILD,
+    INTERACTIVE,
+    ResourceGovernor,
+    ResourceProfile,
+    ThreadBudget,
+    build_profile,
+    configure,
+)
+
+
+def setting(con, name):
+    return con.execute(f"SELECT current_setting('{name}')").fetchone()[0]
+
+
+class FakeBackend:
+    def __init__(self):
+        self._connection = duckdb.connect()
+
+
+class FakeFIA:
+    """Shaped like a pyFIA connection: db._reader._backend._connection."""
+
+    def __init__(self):
+        self._reader = type("Reader", (), {"_backend": FakeBackend()})()
+
+    @property
+    def con(self):
+        return self._reader._backend._connection
+
+
+class TestThreadBudget:
+    """Tests for ThreadBudget."""
+
+    def test_caps_concurrent_reservations(self):
+        """Reservations never hand out more threads than the total."""
+        budget = ThreadBudget(4)
+        other = []
+
+        def reserve():
+            with budget.reserve(3) as threads:
+                other.append((threads, budget.in_use))
+
+        with budget.reserve(3) as threads:
+            t = threading.Thread(target=reserve)
+            t.start()
+            t.join()
+
+        assert threads == 3
+        assert other == [(1, 4)]
+        assert budget.in_use == 0
+
+    def test_waits_for_free_thread(self):
+        """A reservation waits until another one is released."""
+        budget = ThreadBudget(1)
+        released = threading.Event()
+        order = []
+
+        def holder():
+            with budget.reserve(1):
+                order.append("held")
+                released.wait(1)
+                order.append("released")
+
+        t = threading.Thread(target=holder)
+        t.start()
+        while not order:
+            time.sleep(0.001)
+        threading.Timer(0.05, released.set).start()
+
+        with budget.reserve(1) as threads:
+            order.append("second")
+        t.join()
+
+        assert threads == 1
+        assert order == ["held", "released", "second"]
+        assert budget.waits == 1
+
+    def test_reentrant(self):
+        """A nested reservation on the same thread shares the outer one."""
+        budget = ThreadBudget(2)
+
+        with budget.reserve(2) as outer, budget.reserve(2) as inner:
+            assert (outer, inner) == (2, 2)
+            assert budget.in_use == 2
+
+        assert budget.in_use == 0
+
+    def test_overrun_after_max_wait(self):
+        """An exhausted budget grants one thread after max_wait."""
+        budget = ThreadBudget(1, max_wait=0.01)
+        held = threading.Event()
+        done = threading.Event()
+
+        def holder():
+            with budget.reserve(1):
+                held.set()
+                done.wait(1)
+
+        t = threading.Thread(target=holder)
+        t.start()
+        held.wait(1)
+        try:
+            with budget.reserve(1) as threads:
+                assert threads == 1
+        finally:
+            done.set()
+            t.join()
+
+        assert budget.overruns == 1
+        assert budget.in_use == 0
+
+    def test_no_wait_on_event_loop(self):
+        """On the event loop an exhausted budget grants one thread at once."""
+        budget = ThreadBudget(1, max_wait=5)
+        held = threading.Event()
+        done = threading.Event()
+
+        def holder():
+            with budget.reserve(1):
+                held.set()
+                done.wait(5)
+
+        async def reserve():
+            start = time.monotonic()
+            with budget.reserve(1) as threads:
+                return threads, time.monotonic() - start
+
+        t = threading.Thread(target=holder)
+        t.start()
+        held.wait(1)
+        try:
+            threads, waited = asyncio.run(reserve())
+        finally:
+            done.set()
+            t.join()
+
+        assert threads == 1
+        assert waited < 1
+        assert budget.overruns == 1
+
+
+class TestProfiles:
+    """Tests for applying profiles to DuckDB connections."""
+
+    def test_configure(self, tmp_path):
+        """A profile sets threads, memory limit and a private spill directory."""
+        con = duckdb.connect()
+        profile = ResourceProfile(
+            INTERACTIVE, threads=2, memory_limit="1GB", temp_directory=str(tmp_path)
+        )
+
+        configure(con, profile)
+
+        assert setting(con, "threads") == 2
+        assert setting(con, "memory_limit") in ("1000.0 MiB", "953.6 MiB")
+        assert setting(con, "temp_directory").startswith(str(tmp_path))
+
+    def test_governor_applies_granted_threads(self):
+        """The governor configures a pyFIA connection with its granted threads."""
+        governor = ResourceGovernor(
+            {INTERACTIVE: ResourceProfile(INTERACTIVE, threads=2, object_cache=False)},
+            total_threads=3,
+        )
+        db = FakeFIA()
+
+        with governor.apply(db, BATCH) as threads:
+            assert threads == 2
+            assert setting(db.con, "threads") == 2
+            assert governor.stats()["threads_in_use"] == 2
+
+        assert governor.stats()["threads_in_use"] == 0
+
+    def test_batch_leaves_threads_for_interactive(self):
+        """An interactive query gets its threads while a batch scan runs."""
+        governor = ResourceGovernor(
+            {
+                INTERACTIVE: ResourceProfile(INTERACTIVE, threads=2, object_cache=False),
+                BATCH: ResourceProfile(BATCH, threads=0, object_cache=False),
+            },
+            total_threads=8,
+        )
+        granted = []
+
+        def interactive():
+            with governor.apply(FakeFIA(), INTERACTIVE) as threads:
+                granted.append(threads)
+
+        with governor.apply(FakeFIA(), BATCH) as batch_threads:
+            t = threading.Thread(target=interactive)
+            t.start()
+            t.join(1)
+
+        assert batch_threads == 6
+        assert granted == [2]
+        assert governor.stats()["waits"] == 0
+
+    def test_build_profile_divides_cores(self, monkeypatch):
+        """Build profiles split the cores among parallel builds."""
+        monkeypatch.setattr(
+            "askfia_api.services.resource_profiles.cpu_count", lambda: 8
+        )
+
+        assert build_profile(4).threads == 2
+        assert build_profile(16).threads == 1
+        assert build_profile(4, threads=3).threads == 3
+        assert build_profile().name == BUILD
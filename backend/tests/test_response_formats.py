@@ -0,0 +1,172 @@
+"""Tests for columnar, streamed and paginated query responses."""
+
+import asyncio
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import HTTPException, Response
+
+from askfia_api.api.responses import SUMMARY_KEY, negotiate
+from askfia_api.api.routes.query import query_area, query_page, query_volume
+from askfia_api.models.schemas import AreaQuery, VolumeQuery
+from askfia_api.services.result_store import ResultStore
+
+ROWS = [{"SPCD": 100 + i, "VOLCFNET_TOTAL": float(i)} for i in range(5)]
+
+
+class FakeService:
+    """Answers volume queries with a five-species breakdown."""
+
+    def __init__(self, store):
+        self.result_store = store
+        self.calls = []
+
+    def data_version(self, states):
+        return "v1"
+
+    async def query_volume(self, states, by_species, tree_domain, approximate, tabular):
+        self.calls.append(tabular)
+        return {
+            "states": states,
+            "total_volume_cuft": 10.0,
+            "total_volume_billion_cuft": 1e-8,
+            "se_percent": 2.0,
+            "by_species": pa.Table.from_pylist(ROWS) if tabular else list(ROWS),
+        }
+
+    async def query_area(self, states, land_type, grp_by, approximate, tabular):
+        return {
+            "states": states,
+            "land_type": land_type,
+            "total_area_acres": 5.0,
+            "se_percent": 1.0,
+            "breakdown": None,
+        }
+
+
+@pytest.fixture
+def service(tmp_path):
+    return FakeService(ResultStore(tmp_path / "results"))
+
+
+def volume(service, **kwargs):
+    query = VolumeQuery(states=["NC"], by_species=True)
+    return asyncio.run(query_volume(query, Response(), fia_service=service, **kwargs))
+
+
+def body(response):
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(read())
+
+
+class TestNegotiate:
+    """Tests for negotiate."""
+
+    def test_format_parameter_wins(self):
+        """?format= overrides Accept; unknown formats are rejected."""
+        assert negotiate("Parquet", "application/x-ndjson") == "parquet"
+        with pytest.raises(HTTPException) as exc:
+            negotiate("xml", None)
+        assert exc.value.status_code == 406
+
+    def test_accept_header(self):
+        """The first supported media type in Accept is used; default JSON."""
+        accept = "text/html, application/vnd.apache.arrow.stream;q=0.9"
+        assert negotiate(None, accept) == "arrow"
+        assert negotiate(None, "*/*") == "json"
+        assert negotiate(None, None) == "json"
+
+
+class TestTabularFormats:
+    """Tests for Arrow, Parquet and NDJSON responses."""
+
+    def test_default_json_unchanged(self, service):
+        """Without a format or limit, the response is the JSON model."""
+        response = volume(service)
+
+        assert response.by_species == ROWS
+        assert service.calls == [False]
+
+    def test_arrow(self, service):
+        """Arrow bodies carry the rows, with the summary in the metadata."""
+        response = volume(service, format="arrow")
+        table = pa.ipc.open_stream(response.body).read_all()
+
+        assert response.media_type == "application/vnd.apache.arrow.stream"
+        assert table.to_pylist() == ROWS
+        summary = json.loads(table.schema.metadata[SUMMARY_KEY])
+        assert summary["total_volume_cuft"] == 10.0
+        assert "by_species" not in summary
+        assert service.calls == [True]
+
+    def test_parquet(self, service):
+        """Parquet bodies round-trip the rows and summary."""
+        response = volume(service, accept="application/vnd.apache.parquet")
+        table = pq.read_table(pa.BufferReader(response.body))
+
+        assert table.to_pylist() == ROWS
+        assert json.loads(table.schema.metadata[SUMMARY_KEY])["states"] == ["NC"]
+
+    def test_ndjson_streams_summary_then_rows(self, service):
+        """NDJSON starts with the summary line, then one line per row."""
+        response = volume(service, format="ndjson")
+        lines = [json.loads(line) for line in body(response).splitlines()]
+
+        assert lines[0]["se_percent"] == 2.0
+        assert lines[1:] == ROWS
+
+    def test_no_breakdown(self, service):
+        """A query without a breakdown gives an empty table."""
+        query = AreaQuery(states=["NC"])
+        response = asyncio.run(
+            query_area(query, Response(), fia_service=service, format="arrow")
+        )
+        table = pa.ipc.open_stream(response.body).read_all()
+
+        assert table.num_rows == 0
+        assert json.loads(table.schema.metadata[SUMMARY_KEY])["total_area_acres"] == 5.0
+
+
+class TestPagination:
+    """Tests for cursor pagination of JSON breakdowns."""
+
+    def test_pages_from_stored_result(self, service):
+        """Later pages come from the stored table, not a new query."""
+        first = volume(service, limit=2)
+        pages = [first["by_species"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = asyncio.run(query_page(cursor, fia_service=service))
+            pages.append(page.rows)
+            cursor = page.next_cursor
+
+        assert first["total_rows"] == 5
+        assert pages == [ROWS[:2], ROWS[2:4], ROWS[4:]]
+        assert len(service.calls) == 1
+
+    def test_repeat_queries_share_cursors(self, service):
+        """The same query on the same data pages from the same stored table."""
+        assert volume(service, limit=2)["next_cursor"] == (
+            volume(service, limit=2)["next_cursor"]
+        )
+
+    def test_small_results_not_stored(self, service):
+        """A breakdown within the limit is returned whole, without a cursor."""
+        result = volume(service, limit=10)
+
+        assert result["by_species"] == ROWS
+        assert result["next_cursor"] is None
+
+    def test_evicted_and_invalid_cursors(self, service):
+        """Evicted results are 410 Gone; malformed cursors are 400."""
+        cursor = volume(service, limit=2)["next_cursor"]
+        service.result_store.clear()
+
+        for bad, code in ((cursor, 410), ("../../etc.0.1", 400)):
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(query_page(bad, fia_service=service))
+            assert exc.value.status_code == code
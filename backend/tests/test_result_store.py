@@ -0,0 +1,134 @@
+"""Tests for the shared on-disk result store."""
+
+import os
+
+import polars as pl
+import pyarrow as pa
+
+from askfia_api.services.result_store import ResultStore
+
+
+def make_key(**params):
+    return ResultStore.make_key("area", "NC", "nc.duckdb", [372301], params)
+
+
+class TestMakeKey:
+    """Tests for query spec normalization."""
+
+    def test_equivalent_specs_share_key(self):
+        """None values, argument order and scalar grp_by are normalized."""
+        a = make_key(land_type="forest", grp_by="FORTYPCD", cond_domain=None)
+        b = make_key(grp_by=["FORTYPCD"], land_type="forest")
+        assert a == b
+
+    def test_evalid_and_source_change_key(self):
+        """Results are never shared across evaluations or databases."""
+        base = ResultStore.make_key("area", "NC", "nc.duckdb", [372301], {})
+        assert base != ResultStore.make_key("area", "NC", "nc.duckdb", [372201], {})
+        assert base != ResultStore.make_key("area", "NC", "other.duckdb", [372301], {})
+
+    def test_unclipped_connection_has_no_key(self):
+        """Without an EVALID there is no stable data version."""
+        assert ResultStore.make_key("area", "NC", "nc.duckdb", None, {}) is None
+
+
+class TestResultStore:
+    """Tests for ResultStore."""
+
+    def test_put_then_get(self, tmp_path):
+        """A stored table is read back intact."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        table = pa.table({"AREA": [1.5, 2.5], "STATE": ["NC", "NC"]})
+
+        store.put("ab" * 32, table)
+        assert store.get("ab" * 32).equals(table)
+        assert store.hits == 1
+
+    def test_miss(self, tmp_path):
+        """Unknown keys are misses."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        assert store.get("cd" * 32) is None
+        assert store.misses == 1
+
+    def test_shared_between_instances(self, tmp_path):
+        """A second store on the same directory (another worker) sees results."""
+        ResultStore(tmp_path, max_size_gb=1).put("ab" * 32, pa.table({"x": [1]}))
+        assert ResultStore(tmp_path, max_size_gb=1).get("ab" * 32) is not None
+
+    def test_get_or_compute_computes_once(self, tmp_path):
+        """The estimator only runs on the first call."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return pl.DataFrame({"AREA": [10.0]})
+
+        key = make_key(land_type="forest")
+        first = store.get_or_compute(key, compute)
+        second = store.get_or_compute(key, compute)
+
+        assert len(calls) == 1
+        assert first.equals(second)
+
+    def test_no_key_bypasses_store(self, tmp_path):
+        """A None key always computes and stores nothing."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        store.get_or_compute(None, lambda: pl.DataFrame({"x": [1]}))
+        assert store.stats()["results"] == 0
+
+    def test_corrupt_file_is_discarded(self, tmp_path):
+        """A truncated file is treated as a miss and removed."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        key = "ef" * 32
+        path = store._path(key)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not arrow")
+
+        assert store.get(key) is None
+        assert not path.exists()
+
+    def test_no_temp_files_left(self, tmp_path):
+        """Publishing leaves only the final file."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        store.put("ab" * 32, pa.table({"x": [1]}))
+        assert [p.suffix for p in tmp_path.rglob("*") if p.is_file()] == [".arrow"]
+
+    def test_stale_temp_files_swept(self, tmp_path):
+        """Temp files of crashed writers are removed; in-flight ones are kept."""
+        store = ResultStore(tmp_path, max_size_gb=1)
+        (tmp_path / "ab").mkdir()
+        stale = tmp_path / "ab" / "crashed.tmp"
+        fresh = tmp_path / "ab" / "writing.tmp"
+        stale.write_bytes(b"partial")
+        fresh.write_bytes(b"partial")
+        os.utime(stale, (1, 1))
+
+        store.put("ab" * 32, pa.table({"x": [1]}))
+
+        assert not stale.exists()
+        assert fresh.exists()
+
+    def test_size_eviction_drops_least_recent(self, tmp_path):
+        """Oldest results are removed once the budget is exceeded."""
+        table = pa.table({"x": list(range(10_000))})
+        probe = ResultStore(tmp_path / "probe", max_size_gb=1)
+        probe.put("00" * 32, table)
+        file_size = probe.stats()["size_mb"] * 1e6
+
+        store = ResultStore(tmp_path / "store", max_size_gb=2.5 * file_size / 1024**3)
+        store.put("aa" * 32, table)
+        os.utime(store._path("aa" * 32), (1, 1))
+        store.put("bb" * 32, table)
+        store.put("cc" * 32, table)
+
+        assert store.get("aa" * 32) is None
+        assert store.get("bb" * 32) is not None
+        assert store.get("cc" * 32) is not None
+
+    def test_disabled(self, tmp_path):
+        """max_size_gb=0 disables the store."""
+        store = ResultStore(tmp_path / "off", max_size_gb=0)
+        store.put("ab" * 32, pa.table({"x": [1]}))
+        assert store.get("ab" * 32) is None
+        assert not (tmp_path / "off").exists()
@@ -0,0 +1,335 @@
+"""Tests for parallel, resumable S3 downloads."""
+
+import asyncio
+import hashlib
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from askfia_api.services.s3_download import (
+    DownloadVerificationError,
+    RangedDownloader,
+    multipart_etag,
+)
+from askfia_api.services.storage import FIAStorage
+
+CHUNK = 1024
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client calls the downloader uses."""
+
+    def __init__(self, objects, etags=None, metadata=None, part_size=None):
+        self.objects = objects
+        self.etags = etags or {
+            key: hashlib.md5(data).hexdigest() for key, data in objects.items()
+        }
+        self.metadata = metadata or {}
+        self.part_size = part_size
+        self.ranges: list[str] = []
+        self.fail_ranges: set[str] = set()
+        self.corrupt = False
+
+    def head_object(self, Bucket, Key, PartNumber=None):  # noqa: N803
+        data = self.objects[Key]
+        size = len(data)
+        if PartNumber is not None:
+            size = min(self.part_size, len(data))
+        return {
+            "ContentLength": size,
+            "ETag": f'"{self.etags[Key]}"',
+            "Metadata": self.metadata.get(Key, {}),
+        }
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):  # noqa: N803
+        assert IfMatch == f'"{self.etags[Key]}"'
+        self.ranges.append(Range)
+        if Range in self.fail_ranges:
+            raise ConnectionError(f"dropped {Range}")
+        start, end = (int(x) for x in Range.removeprefix("bytes=").split("-"))
+        data = self.objects[Key][start : end + 1]
+        if self.corrupt:
+            data = bytes(len(data))
+        return {"Body": io.BytesIO(data)}
+
+
+@pytest.fixture
+def payload():
+    return bytes(range(256)) * 20  # 5120 bytes = 5 chunks
+
+
+class TestRangedDownloader:
+    """Tests for RangedDownloader."""
+
+    def test_downloads_in_ranges(self, tmp_path, payload):
+        """The object is fetched in chunk-sized ranges and renamed into place."""
+        s3 = FakeS3({"k": payload})
+        dest = tmp_path / "NC.duckdb"
+
+        RangedDownloader(s3, chunk_size=CHUNK, max_workers=4).download("b", "k", dest)
+
+        assert dest.read_bytes() == payload
+        assert sorted(s3.ranges) == sorted(
+            f"bytes={i}-{min(i + CHUNK, len(payload)) - 1}"
+            for i in range(0, len(payload), CHUNK)
+        )
+        assert not (tmp_path / "NC.duckdb.part").exists()
+        assert not (tmp_path / "NC.duckdb.part.json").exists()
+
+    def test_interrupted_download_resumes(self, tmp_path, payload):
+        """Only missing chunks are fetched after a failure."""
+        s3 = FakeS3({"k": payload})
+        s3.fail_ranges = {"bytes=2048-3071"}
+        dest = tmp_path / "NC.duckdb"
+        downloader = RangedDownloader(s3, chunk_size=CHUNK, max_workers=2)
+
+        with pytest.raises(ConnectionError):
+            downloader.download("b", "k", dest)
+        assert not dest.exists()
+        progress = json.loads((tmp_path / "NC.duckdb.part.json").read_text())
+        assert 2 not in progress["done"]
+
+        s3.fail_ranges.clear()
+        s3.ranges.clear()
+        downloader.download("b", "k", dest)
+
+        assert s3.ranges == ["bytes=2048-3071"]
+        assert dest.read_bytes() == payload
+
+    def test_changed_object_restarts(self, tmp_path, payload):
+        """A partial download of an older object version is discarded."""
+        dest = tmp_path / "NC.duckdb"
+        s3 = FakeS3({"k": payload})
+        s3.fail_ranges = {"bytes=0-1023"}
+        with pytest.raises(ConnectionError):
+            RangedDownloader(s3, chunk_size=CHUNK).download("b", "k", dest)
+
+        new_payload = payload[::-1]
+        s3 = FakeS3({"k": new_payload})
+        RangedDownloader(s3, chunk_size=CHUNK).download("b", "k", dest)
+
+        assert len(s3.ranges) == 5
+        assert dest.read_bytes() == new_payload
+
+    def test_checksum_mismatch_discards_file(self, tmp_path, payload):
+        """Corrupt bytes never reach the final path."""
+        s3 = FakeS3({"k": payload})
+        s3.corrupt = True
+        dest = tmp_path / "NC.duckdb"
+
+        with pytest.raises(DownloadVerificationError):
+            RangedDownloader(s3, chunk_size=CHUNK).download("b", "k", dest)
+
+        assert not dest.exists()
+        assert not (tmp_path / "NC.duckdb.part").exists()
+
+    def test_multipart_etag_verified(self, tmp_path, payload):
+        """Multipart ETags are recomputed from the first part's size."""
+        source = tmp_path / "source"
+        source.write_bytes(payload)
+        etag = multipart_etag(source, 2048, 3)
+        s3 = FakeS3({"k": payload}, etags={"k": etag}, part_size=2048)
+
+        dest = tmp_path / "NC.duckdb"
+        RangedDownloader(s3, chunk_size=CHUNK).download("b", "k", dest)
+        assert dest.read_bytes() == payload
+
+    def test_sha256_metadata_preferred(self, tmp_path, payload):
+        """A sha256 metadata entry is checked when present."""
+        s3 = FakeS3({"k": payload}, metadata={"k": {"sha256": "0" * 64}})
+        with pytest.raises(DownloadVerificationError):
+            RangedDownloader(s3, chunk_size=CHUNK).download("b", "k", tmp_path / "x")
+
+
+class TestStorageDownload:
+    """Tests for FIAStorage using the ranged downloader."""
+
+    def test_get_db_path_downloads_from_s3(self, tmp_path, payload):
+        """A cold state is fetched from S3 into the local cache."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        storage._s3_client = FakeS3({"fia-duckdb/NC.duckdb": payload})
+
+        path = storage.get_db_path("nc")
+
+        assert path == str(tmp_path / "NC.duckdb")
+        assert (tmp_path / "NC.duckdb").read_bytes() == payload
+
+    def test_failed_download_leaves_no_cache_hit(self, tmp_path, payload):
+        """A failed transfer does not create a file later treated as cached."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        s3 = FakeS3({"fia-duckdb/NC.duckdb": payload})
+        s3.corrupt = True
+        storage._s3_client = s3
+
+        with pytest.raises(FileNotFoundError):
+            storage.get_db_path("NC")
+        assert not (tmp_path / "NC.duckdb").exists()
+
+
+class SlowS3(FakeS3):
+    """FakeS3 whose ranged GETs block until released."""
+
+    def __init__(self, objects, **kwargs):
+        super().__init__(objects, **kwargs)
+        self.release = threading.Event()
+        self.heads = 0
+
+    def head_object(self, Bucket, Key, PartNumber=None):  # noqa: N803
+        self.heads += 1
+        return super().head_object(Bucket, Key, PartNumber)
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):  # noqa: N803
+        self.release.wait(timeout=5)
+        return super().get_object(Bucket, Key, Range, IfMatch)
+
+
+def fetch_concurrently(storage, state, callers=4):
+    """Call get_db_path from several threads; return results or exceptions."""
+    results = [None] * callers
+
+    def call(i):
+        try:
+            results[i] = storage.get_db_path(state)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def wait_for_flight(storage, state, waiters):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        flight = storage._flights.get(state)
+        if flight is not None and flight.waiters == waiters:
+            return flight
+        time.sleep(0.01)
+    pytest.fail("download never started")
+
+
+class TestSingleFlight:
+    """Tests for per-state download coalescing in FIAStorage."""
+
+    def test_concurrent_callers_share_one_download(self, tmp_path, payload):
+        """Simultaneous requests for a cold state trigger one download."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        s3 = SlowS3({"fia-duckdb/NC.duckdb": payload})
+        storage._s3_client = s3
+
+        threads, results = fetch_concurrently(storage, "NC")
+        wait_for_flight(storage, "NC", waiters=3)
+        s3.release.set()
+        for t in threads:
+            t.join()
+
+        assert results == [str(tmp_path / "NC.duckdb")] * 4
+        assert s3.heads == 1
+        assert len(s3.ranges) == 1
+
+    def test_waiters_share_failure(self, tmp_path, payload):
+        """Every caller sees the leader's failure."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        s3 = SlowS3({"fia-duckdb/NC.duckdb": payload})
+        s3.corrupt = True
+        storage._s3_client = s3
+
+        threads, results = fetch_concurrently(storage, "NC")
+        wait_for_flight(storage, "NC", waiters=3)
+        s3.release.set()
+        for t in threads:
+            t.join()
+
+        assert all(isinstance(r, FileNotFoundError) for r in results)
+        assert len({id(r) for r in results}) == 1
+        assert s3.heads == 1
+
+    def test_download_status_reports_progress(self, tmp_path, payload):
+        """In-flight downloads are visible with their progress."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        s3 = SlowS3({"fia-duckdb/NC.duckdb": payload})
+        storage._s3_client = s3
+
+        threads, _ = fetch_concurrently(storage, "NC", callers=2)
+        wait_for_flight(storage, "NC", waiters=1)
+        status = storage.download_status()
+        s3.release.set()
+        for t in threads:
+            t.join()
+
+        assert [s["state"] for s in status] == ["NC"]
+        assert status[0]["status"] == "downloading"
+        assert status[0]["waiters"] == 1
+        assert storage.download_status()[0]["status"] == "done"
+        assert storage.download_status()[0]["percent"] == pytest.approx(100.0)
+
+    def test_other_worker_partial_reported(self, tmp_path, payload):
+        """Partial downloads from other processes show up via the sidecar."""
+        s3 = FakeS3({"fia-duckdb/TX.duckdb": payload})
+        s3.fail_ranges = {"bytes=0-1023"}
+        with pytest.raises(ConnectionError):
+            RangedDownloader(s3, chunk_size=CHUNK).download(
+                "b", "fia-duckdb/TX.duckdb", tmp_path / "TX.duckdb"
+            )
+
+        storage = FIAStorage(local_dir=tmp_path)
+        (status,) = storage.download_status()
+
+        assert status["state"] == "TX"
+        assert status["downloaded_mb"] == pytest.approx((len(payload) - CHUNK) / 1e6)
+
+
+class TestBackgroundPreload:
+    """Tests for the async storage API."""
+
+    @pytest.mark.asyncio
+    async def test_ensure_joins_preload(self, tmp_path, payload):
+        """A query for a state being preloaded waits on the same download."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        s3 = SlowS3({"fia-duckdb/NC.duckdb": payload})
+        storage._s3_client = s3
+
+        preload = storage.start_preload(["nc"])
+        await asyncio.sleep(0.05)
+        assert storage.preloading
+        assert storage.readiness() == {"NC": "downloading"}
+
+        ensure = asyncio.create_task(storage.ensure("NC"))
+        await asyncio.sleep(0.05)
+        s3.release.set()
+
+        assert await ensure == str(tmp_path / "NC.duckdb")
+        await preload
+        assert s3.heads == 1
+        assert storage.readiness() == {"NC": "ready"}
+
+    @pytest.mark.asyncio
+    async def test_preload_parallelism_bounded(self, tmp_path, payload):
+        """At most max_parallel states download at once; the rest are queued."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        s3 = SlowS3({f"fia-duckdb/{s}.duckdb": payload for s in ("GA", "NC", "SC")})
+        storage._s3_client = s3
+
+        preload = storage.start_preload(["NC", "GA", "SC"], max_parallel=2)
+        await asyncio.sleep(0.05)
+        states = storage.readiness()
+        s3.release.set()
+        await preload
+
+        assert sorted(states.values()) == ["downloading", "downloading", "queued"]
+        assert set(storage.readiness().values()) == {"ready"}
+        assert not storage.preloading
+
+    @pytest.mark.asyncio
+    async def test_failed_preload_reported(self, tmp_path):
+        """States that cannot be fetched are reported as failed."""
+        storage = FIAStorage(local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1)
+        storage._s3_client = FakeS3({})
+
+        await storage.start_preload(["ZZ"])
+
+        assert storage.readiness() == {"ZZ": "failed"}
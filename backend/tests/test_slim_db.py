@@ -0,0 +1,119 @@
+"""Tests for slim state database builds."""
+
+import duckdb
+import polars as pl
+import pytest
+
+from askfia_api.services import slim_db
+from askfia_api.services.slim_db import (
+    build_slim_database,
+    compare_frames,
+    validate_slim,
+)
+
+
+@pytest.fixture
+def full_db(tmp_path):
+    """A full database with unused tables and columns."""
+    path = tmp_path / "NC.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute(
+        "CREATE TABLE TREE AS SELECT (100 - range)::VARCHAR AS PLT_CN, 1 AS CONDID, "
+        "range::VARCHAR AS CN, 10.0 AS DIA, 'x' AS UNUSED_NOTE, 0 AS MIST_CL_CD "
+        "FROM range(100)"
+    )
+    con.execute(
+        "CREATE TABLE COND AS SELECT (50 - range)::VARCHAR AS PLT_CN, 1 AS CONDID, "
+        "141 AS FORTYPCD, 0 AS GSSTKCD FROM range(50)"
+    )
+    con.execute("CREATE TABLE PLOT AS SELECT range::VARCHAR AS CN, 37 AS STATECD FROM range(50)")
+    con.execute("CREATE TABLE SEEDLING AS SELECT range::VARCHAR AS PLT_CN FROM range(10)")
+    con.execute("CREATE TABLE P2VEG_SUBPLOT_SPP AS SELECT 1 AS X")
+    con.close()
+    return path
+
+
+class TestBuildSlim:
+    """Tests for build_slim_database."""
+
+    def test_drops_unused_tables(self, tmp_path, full_db):
+        """Only estimator tables are kept."""
+        summary = build_slim_database(full_db, tmp_path / "slim.duckdb")
+
+        assert set(summary["tables"]) == {"TREE", "COND", "PLOT"}
+        assert summary["dropped_tables"] == ["P2VEG_SUBPLOT_SPP", "SEEDLING"]
+
+    def test_prunes_columns(self, tmp_path, full_db):
+        """TREE and COND keep only estimator columns; PLOT keeps all."""
+        slim = tmp_path / "slim.duckdb"
+        build_slim_database(full_db, slim)
+
+        con = duckdb.connect(str(slim), read_only=True)
+        columns = {
+            table: [row[0] for row in con.execute(f"DESCRIBE {table}").fetchall()]
+            for table in ("TREE", "COND", "PLOT")
+        }
+        con.close()
+
+        assert columns["TREE"] == ["PLT_CN", "CONDID", "CN", "DIA"]
+        assert columns["COND"] == ["PLT_CN", "CONDID", "FORTYPCD"]
+        assert columns["PLOT"] == ["CN", "STATECD"]
+
+    def test_sorted_on_join_keys(self, tmp_path, full_db):
+        """Rows are stored in PLT_CN order."""
+        slim = tmp_path / "slim.duckdb"
+        build_slim_database(full_db, slim)
+
+        con = duckdb.connect(str(slim), read_only=True)
+        plt_cns = [row[0] for row in con.execute("SELECT PLT_CN FROM TREE").fetchall()]
+        con.close()
+        assert plt_cns == sorted(plt_cns)
+
+
+class TestCompareFrames:
+    """Tests for compare_frames."""
+
+    def test_equal_up_to_row_order(self):
+        """Row order and float noise are ignored."""
+        a = pl.DataFrame({"SPCD": [131, 110], "VOL": [1.0, 2.0]})
+        b = pl.DataFrame({"SPCD": [110, 131], "VOL": [2.0 + 1e-13, 1.0]})
+        assert compare_frames(a, b) is None
+
+    def test_reports_difference(self):
+        """Value differences name the column."""
+        a = pl.DataFrame({"SPCD": [131], "VOL": [1.0]})
+        b = pl.DataFrame({"SPCD": [131], "VOL": [1.5]})
+        assert compare_frames(a, b).startswith("VOL")
+
+
+class TestValidateSlim:
+    """Tests for validate_slim."""
+
+    def test_fails_when_nothing_compared(self, tmp_path, monkeypatch):
+        """A full database that produces no estimate does not validate."""
+
+        def run_estimate(path, method, params, profile):
+            raise RuntimeError("no such table")
+
+        monkeypatch.setattr(slim_db, "_run_estimate", run_estimate)
+        results = validate_slim(tmp_path / "full.duckdb", tmp_path / "slim.duckdb")
+
+        assert not all(r.ok for r in results)
+
+    def test_skips_estimates_full_database_lacks(self, tmp_path, monkeypatch):
+        """Estimates the full database cannot produce are skipped, not failed."""
+
+        def run_estimate(path, method, params, profile):
+            if method == "growth":
+                raise RuntimeError("no GRM data")
+            return pl.DataFrame({"TOTAL": [1.0]})
+
+        monkeypatch.setattr(slim_db, "_run_estimate", run_estimate)
+        results = validate_slim(
+            tmp_path / "full.duckdb",
+            tmp_path / "slim.duckdb",
+            queries=[("area", {}), ("growth", {})],
+        )
+
+        assert all(r.ok for r in results)
+        assert results[1].detail.startswith("skipped")
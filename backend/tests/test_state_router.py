@@ -0,0 +1,354 @@
+"""Tests for state-affinity routing."""
+
+import asyncio
+import json
+
+import httpx
+import polars as pl
+import pytest
+from fastapi import HTTPException
+
+from askfia_api.api.routes import internal
+from askfia_api.config import settings
+from askfia_api.services.fia_service import FIAService
+from askfia_api.services.state_router import (
+    HashRing,
+    RemoteEstimateError,
+    RoutedConnection,
+    StateRouter,
+    deserialize_frame,
+    get_state_router,
+    serialize_frame,
+)
+
+NODES = ["http://api-1:8000", "http://api-2:8000", "http://api-3:8000"]
+STATES = ["AL", "AZ", "CA", "CO", "FL", "GA", "ME", "MN", "NC", "OR", "TX", "WA"]
+
+
+def make_router(self_url, handler):
+    router = StateRouter(self_url, NODES, token="secret")
+    router._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return router
+
+
+def remote_state(router):
+    """A state this router does not own."""
+    return next(s for s in STATES if not router.is_local(s))
+
+
+class TestHashRing:
+    """Tests for HashRing."""
+
+    def test_preference_list_covers_all_nodes(self):
+        """Each key gets every node exactly once, owner first."""
+        ring = HashRing(NODES)
+        for state in STATES:
+            assert sorted(ring.preference_list(state)) == sorted(NODES)
+
+    def test_assignment_is_stable(self):
+        """Separate processes compute the same owners."""
+        a, b = HashRing(NODES), HashRing(list(reversed(NODES)))
+        assert [a.preference_list(s)[0] for s in STATES] == [
+            b.preference_list(s)[0] for s in STATES
+        ]
+
+    def test_adding_node_moves_few_states(self):
+        """Only states claimed by the new node change owner."""
+        before = HashRing(NODES)
+        after = HashRing(NODES + ["http://api-4:8000"])
+        for state in STATES:
+            old, new = before.preference_list(state)[0], after.preference_list(state)[0]
+            assert new == old or new == "http://api-4:8000"
+
+
+class TestStateRouter:
+    """Tests for StateRouter."""
+
+    def test_disabled_without_peers(self):
+        """A single process computes everything locally."""
+        router = StateRouter("http://api-1:8000", [])
+        assert not router.enabled
+        assert router.is_local("NC")
+        assert router.estimate("NC", "area", {}, local=lambda: "local") == "local"
+
+    def test_every_state_has_one_owner(self):
+        """Exactly one node considers itself the owner of each state."""
+        routers = [StateRouter(node, NODES) for node in NODES]
+        for state in STATES:
+            assert sum(r.is_local(state) for r in routers) == 1
+
+    def test_forwards_to_owner(self):
+        """Remote states are estimated by the owner over Arrow IPC."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            body = serialize_frame(pl.DataFrame({"AREA": [42.0]}))
+            return httpx.Response(200, content=body)
+
+        router = make_router(NODES[0], handler)
+        state = remote_state(router)
+        df = router.estimate(state, "area", {"land_type": "forest"}, local=pytest.fail)
+
+        assert df["AREA"].to_list() == [42.0]
+        assert requests[0].headers["X-Internal-Token"] == "secret"
+        assert str(requests[0].url).startswith(router.owner(state))
+        assert router.forwarded == 1
+
+    def test_owner_reports_data_version(self):
+        """The owner's data version is kept for versioning routed responses."""
+
+        def handler(request):
+            body = serialize_frame(pl.DataFrame({"AREA": [42.0]}))
+            return httpx.Response(200, content=body, headers={"X-Data-Version": "v1"})
+
+        router = make_router(NODES[0], handler)
+        state = remote_state(router)
+        assert router.remote_version(state) is None
+
+        router.estimate(state, "area", {}, local=pytest.fail)
+        assert router.remote_version(state) == "v1"
+
+        service = FIAService()
+        service.state_router = router
+        version = service.data_version([state])
+        assert version is not None
+
+        router._remote_versions[state] = (router.owner(state), "v2", 0.0)
+        router.version_ttl = float("inf")
+        assert service.data_version([state]) not in (None, version)
+
+        # An expired report is not trusted
+        router.version_ttl = 0.0
+        assert service.data_version([state]) is None
+
+    def test_fails_over_when_peer_down(self):
+        """Unreachable owners are skipped and the state is served locally."""
+
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        router = make_router(NODES[0], handler)
+        state = remote_state(router)
+        df = router.estimate(state, "area", {}, local=lambda: pl.DataFrame({"AREA": [1.0]}))
+
+        assert df["AREA"].to_list() == [1.0]
+        assert router.failovers >= 1
+        assert router.is_local(state)
+
+    def test_estimator_error_is_not_failover(self):
+        """An estimator failure on the owner is reported, not retried."""
+
+        def handler(request):
+            return httpx.Response(500, json={"detail": "missing TREE_GRM_COMPONENT"})
+
+        router = make_router(NODES[0], handler)
+        with pytest.raises(RemoteEstimateError, match="TREE_GRM_COMPONENT"):
+            router.estimate(remote_state(router), "growth", {}, local=pytest.fail)
+        assert router.failovers == 0
+
+    def test_requires_token(self, monkeypatch):
+        """Peers without a shared token leave routing disabled."""
+        monkeypatch.setattr(settings, "state_router_self_url", NODES[0])
+        monkeypatch.setattr(settings, "state_router_peers", ",".join(NODES))
+        monkeypatch.setattr(settings, "state_router_token", None)
+        assert not get_state_router().enabled
+
+        monkeypatch.setattr(settings, "state_router_token", "secret")
+        assert get_state_router().enabled
+
+    def test_verify_token(self):
+        """Tokens are only accepted when one is configured and matches."""
+        assert StateRouter(NODES[0], NODES, token="secret").verify_token("secret")
+        assert not StateRouter(NODES[0], NODES, token="secret").verify_token("nope")
+        assert not StateRouter(NODES[0], NODES).verify_token(None)
+        assert not StateRouter(NODES[0], NODES).verify_token("")
+
+
+class TestInternalEstimate:
+    """Tests for the worker-to-worker estimate endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def router(self, monkeypatch):
+        router = StateRouter(NODES[0], NODES, token="secret")
+        monkeypatch.setattr(internal, "state_router", router)
+        return router
+
+    def call(self, token="secret", **params):
+        request = internal.EstimateRequest(state="NC", method="area", params=params)
+        return asyncio.run(internal.estimate(request, x_internal_token=token))
+
+    def test_rejects_bad_token(self):
+        """Requests without the shared token are refused."""
+        for token in (None, "nope"):
+            with pytest.raises(HTTPException) as exc:
+                self.call(token=token)
+            assert exc.value.status_code == 403
+
+    def test_rejects_unsafe_domain(self, monkeypatch):
+        """Forwarded domains get the same checks as public queries."""
+        monkeypatch.setattr(
+            internal.fia_service, "estimate_local", lambda *args: pytest.fail()
+        )
+        with pytest.raises(HTTPException) as exc:
+            self.call(tree_domain="DIA > 0; DROP TABLE TREE--")
+        assert exc.value.status_code == 400
+
+    def test_returns_data_version(self, monkeypatch):
+        """The owner's data version travels with the result."""
+        monkeypatch.setattr(
+            internal.fia_service,
+            "estimate_local",
+            lambda *args: pl.DataFrame({"AREA": [1.0]}),
+        )
+        monkeypatch.setattr(internal.fia_service, "data_version", lambda states: "v1")
+
+        assert self.call().headers["X-Data-Version"] == "v1"
+
+
+class TestRoutedConnection:
+    """Tests for RoutedConnection."""
+
+    def test_estimator_methods_forward(self):
+        """db.area(...) on a routed connection runs through the router."""
+        router = StateRouter(None, [])
+        calls = []
+
+        def local(state, method, params, approximate=False):
+            calls.append((state, method, params))
+            return pl.DataFrame({"x": [1]})
+
+        db = RoutedConnection(router, "nc", local)
+        db.area(land_type="timber")
+
+        assert calls == [("NC", "area", {"land_type": "timber"})]
+
+    def test_approximate_forwarded(self):
+        """db.area(approximate=True) reaches the estimate as a flag, not a param."""
+        router = StateRouter(None, [])
+        calls = []
+
+        def local(state, method, params, approximate=False):
+            calls.append((params, approximate))
+            return pl.DataFrame({"x": [1]})
+
+        RoutedConnection(router, "NC", local).area(approximate=True, land_type="timber")
+
+        assert calls == [({"land_type": "timber"}, True)]
+
+    def test_unknown_attribute(self):
+        """Only estimator methods are exposed."""
+        db = RoutedConnection(StateRouter(None, []), "NC", None)
+        with pytest.raises(AttributeError):
+            db.clip_most_recent()
+
+
+class TestRoutedGRMQueries:
+    """Tests for mortality and growth on states owned by another worker."""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        router = StateRouter(None, [])
+        forwarded = []
+
+        def estimate(state, method, params, local, approximate=False):
+            forwarded.append((state, method))
+            column = {"mortality": "MORT_TOTAL", "growth": "GROWTH_TOTAL"}[method]
+            return pl.DataFrame({column: [10.0], f"{column}_SE": [1.0]})
+
+        async def ensure_states(states):
+            return None
+
+        monkeypatch.setattr(router, "is_local", lambda state: False)
+        monkeypatch.setattr(router, "estimate", estimate)
+        service = FIAService()
+        service.state_router = router
+        service.forwarded = forwarded
+        monkeypatch.setattr(service, "ensure_states", ensure_states)
+        return service
+
+    def test_mortality_forwarded(self, service):
+        """The GRM table check is left to the owner; the estimate is forwarded."""
+        result = asyncio.run(service.query_mortality(["NC"]))
+
+        assert result["total_mortality_cuft"] == 10.0
+        assert service.forwarded == [("NC", "mortality")]
+
+    def test_growth_forwarded(self, service):
+        """Growth on a routed state is forwarded like mortality."""
+        result = asyncio.run(service.query_growth(["NC"]))
+
+        assert "error" not in result
+        assert service.forwarded == [("NC", "growth")]
+
+
+class TestConcurrentForwarding:
+    """Tests for two workers forwarding to each other at the same time."""
+
+    def test_forward_in_both_directions(self, monkeypatch):
+        """Each worker serves the other's estimate while waiting on its own."""
+        nodes = NODES[:2]
+        services = {}
+
+        async def ensure_states(states):
+            return None
+
+        for node in nodes:
+            service = FIAService()
+            service.state_router = StateRouter(node, nodes, token="secret")
+            monkeypatch.setattr(service, "ensure_states", ensure_states)
+            monkeypatch.setattr(
+                service,
+                "estimate_local",
+                lambda state, method, params, approximate=False, node=node: (
+                    pl.DataFrame({"AREA": [1.0], "NODE": [node]})
+                ),
+            )
+            services[node] = service
+
+        async def run():
+            loop = asyncio.get_running_loop()
+
+            def handler(request):
+                # Peers serve forwarded estimates on the (shared) event loop,
+                # as uvicorn does; a blocked loop never answers
+                body = json.loads(request.content)
+                node = f"{request.url.scheme}://{request.url.netloc.decode()}"
+                serve = asyncio.to_thread(
+                    services[node].estimate_local,
+                    body["state"],
+                    body["method"],
+                    body["params"],
+                )
+                future = asyncio.run_coroutine_threadsafe(serve, loop)
+                try:
+                    df = future.result(timeout=2)
+                except TimeoutError as e:
+                    raise httpx.ReadTimeout("peer loop blocked", request=request) from e
+                return httpx.Response(200, content=serialize_frame(df))
+
+            for service in services.values():
+                service.state_router._client = httpx.Client(
+                    transport=httpx.MockTransport(handler)
+                )
+            remote = {
+                node: remote_state(services[node].state_router) for node in nodes
+            }
+            return await asyncio.gather(
+                *(
+                    services[node]._estimate_states([remote[node]], "area")
+                    for node in nodes
+                )
+            )
+
+        first, second = asyncio.run(run())
+
+        assert first[0]["NODE"].tolist() == [NODES[1]]
+        assert second[0]["NODE"].tolist() == [NODES[0]]
+        assert all(s.state_router.failovers == 0 for s in services.values())
+
+
+def test_frame_round_trip():
+    """Frames survive Arrow IPC serialization."""
+    df = pl.DataFrame({"SPCD": [131, 110], "VOL": [1.5, None]})
+    assert deserialize_frame(serialize_frame(df)).equals(df)
@@ -0,0 +1,227 @@
+"""Tests for published state versions and cached file replacement."""
+
+import hashlib
+import io
+import json
+import threading
+import time
+
+from askfia_api.services.state_versions import (
+    PublishedVersions,
+    manifest_key,
+    read_local_version,
+    read_published_manifest,
+    update_published_manifest,
+    write_local_version,
+)
+from askfia_api.services.storage import FIAStorage
+
+PREFIX = "fia-duckdb"
+KEY = f"{PREFIX}/NC.duckdb"
+
+
+class VersionedS3:
+    """In-memory S3 holding state databases and the published manifest."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.metadata: dict[str, dict] = {}
+        self.manifest_reads = 0
+
+    def publish(self, data: bytes) -> str:
+        version = hashlib.sha256(data).hexdigest()
+        self.objects[KEY] = data
+        self.metadata[KEY] = {"sha256": version}
+        update_published_manifest(self, "b", PREFIX, {"NC": {"version": version}})
+        self.manifest_reads = 0
+        return version
+
+    def head_object(self, Bucket, Key, PartNumber=None):  # noqa: N803
+        data = self.objects[Key]
+        return {
+            "ContentLength": len(data),
+            "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+            "Metadata": self.metadata.get(Key, {}),
+        }
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):  # noqa: N803
+        if Key == manifest_key(PREFIX):
+            self.manifest_reads += 1
+        data = self.objects[Key]
+        if Range:
+            start, end = (int(x) for x in Range.removeprefix("bytes=").split("-"))
+            data = data[start : end + 1]
+        return {"Body": io.BytesIO(data)}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):  # noqa: N803
+        self.objects[Key] = Body
+
+
+def make_storage(tmp_path, s3, ttl=300.0):
+    storage = FIAStorage(
+        local_dir=tmp_path, s3_bucket="b", download_chunk_mb=1, version_check_ttl=ttl
+    )
+    storage._s3_client = s3
+    return storage
+
+
+class TestPublishedManifest:
+    """Tests for reading and updating the published manifest."""
+
+    def test_missing_manifest_is_empty(self):
+        """A bucket without a manifest has no published versions."""
+        assert read_published_manifest(VersionedS3(), "b", PREFIX) == {"states": {}}
+
+    def test_update_merges_states(self):
+        """Publishing one state keeps the entries of the others."""
+        s3 = VersionedS3()
+        update_published_manifest(s3, "b", PREFIX, {"NC": {"version": "a"}})
+        update_published_manifest(s3, "b", PREFIX, {"GA": {"version": "b"}})
+
+        states = json.loads(s3.objects[manifest_key(PREFIX)])["states"]
+        assert states == {"NC": {"version": "a"}, "GA": {"version": "b"}}
+
+    def test_concurrent_updates_not_lost(self):
+        """Uploads publishing in parallel threads all land in the manifest."""
+
+        class SlowS3(VersionedS3):
+            def put_object(self, **kwargs):
+                time.sleep(0.01)  # widen the read-modify-write window
+                super().put_object(**kwargs)
+
+        s3 = SlowS3()
+        threads = [
+            threading.Thread(
+                target=update_published_manifest,
+                args=(s3, "b", PREFIX, {state: {"version": state}}),
+            )
+            for state in ("NC", "GA", "SC", "VA")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        states = json.loads(s3.objects[manifest_key(PREFIX)])["states"]
+        assert sorted(states) == ["GA", "NC", "SC", "VA"]
+
+    def test_versions_cached_for_ttl(self):
+        """The manifest is fetched once per TTL, not once per lookup."""
+        s3 = VersionedS3()
+        s3.publish(b"v1")
+        versions = PublishedVersions(lambda: s3, "b", PREFIX, ttl=300)
+
+        versions.get("nc")
+        versions.get("NC")
+
+        assert s3.manifest_reads == 1
+
+    def test_local_version_sidecar(self, tmp_path):
+        """Versions round-trip through the sidecar and can be cleared."""
+        path = tmp_path / "NC.duckdb"
+        write_local_version(path, "abc")
+        assert read_local_version(path) == "abc"
+
+        write_local_version(path, None)
+        assert read_local_version(path) is None
+
+
+class TestStateRefresh:
+    """Tests for replacing cached files with newer published versions."""
+
+    def test_download_records_version(self, tmp_path):
+        """A fresh download remembers the version it fetched."""
+        s3 = VersionedS3()
+        version = s3.publish(b"v1")
+        storage = make_storage(tmp_path, s3)
+
+        path = storage.get_db_path("NC")
+
+        assert read_local_version(path) == version
+
+    def test_current_version_not_replaced(self, tmp_path):
+        """A file matching the published version is left alone."""
+        s3 = VersionedS3()
+        s3.publish(b"v1")
+        storage = make_storage(tmp_path, s3)
+        path = storage.get_db_path("NC")
+
+        assert storage._refresh_state("NC", tmp_path / "NC.duckdb") is False
+        assert open(path, "rb").read() == b"v1"
+
+    def test_newer_version_replaces_file(self, tmp_path):
+        """A newer published version is swapped in and listeners are told."""
+        s3 = VersionedS3()
+        s3.publish(b"v1")
+        storage = make_storage(tmp_path, s3)
+        path = tmp_path / "NC.duckdb"
+        storage.get_db_path("NC")
+        replaced = []
+        storage.add_replace_listener(replaced.append)
+
+        version = s3.publish(b"version two")
+        storage.published._fetched_at = 0.0  # expire the manifest TTL
+
+        assert storage._refresh_state("NC", path) is True
+        assert path.read_bytes() == b"version two"
+        assert read_local_version(path) == version
+        assert replaced == ["NC"]
+        assert not (tmp_path / "NC.duckdb.new").exists()
+
+    def test_open_reader_keeps_old_version(self, tmp_path):
+        """A reader that opened the old file keeps seeing the old bytes."""
+        s3 = VersionedS3()
+        s3.publish(b"v1")
+        storage = make_storage(tmp_path, s3)
+        path = tmp_path / "NC.duckdb"
+        storage.get_db_path("NC")
+
+        with open(path, "rb") as old:
+            s3.publish(b"version two")
+            storage.published._fetched_at = 0.0
+            storage._refresh_state("NC", path)
+
+            assert old.read() == b"v1"
+        assert path.read_bytes() == b"version two"
+
+    def test_mismatched_download_keeps_current_file(self, tmp_path):
+        """A download that does not match the published version is discarded."""
+        s3 = VersionedS3()
+        version = s3.publish(b"v1")
+        storage = make_storage(tmp_path, s3)
+        path = tmp_path / "NC.duckdb"
+        storage.get_db_path("NC")
+
+        s3.publish(b"version two")
+        s3.objects[KEY] = b"version three"
+        s3.metadata[KEY] = {"sha256": hashlib.sha256(b"version three").hexdigest()}
+        storage.published._fetched_at = 0.0
+
+        assert storage._refresh_state("NC", path) is False
+        assert path.read_bytes() == b"v1"
+        assert read_local_version(path) == version
+        assert not (tmp_path / "NC.duckdb.new").exists()
+        assert storage.published._fetched_at == 0.0
+
+    def test_unversioned_file_is_hashed(self, tmp_path):
+        """Files cached before versioning are hashed once and compared."""
+        s3 = VersionedS3()
+        version = s3.publish(b"v1")
+        path = tmp_path / "NC.duckdb"
+        path.write_bytes(b"v1")
+        storage = make_storage(tmp_path, s3)
+
+        assert storage._refresh_state("NC", path) is False
+        assert read_local_version(path) == version
+
+    def test_checks_disabled_without_ttl(self, tmp_path):
+        """A TTL of 0 turns version checks off."""
+        s3 = VersionedS3()
+        s3.publish(b"v1")
+        (tmp_path / "NC.duckdb").write_bytes(b"old")
+        storage = make_storage(tmp_path, s3, ttl=0)
+
+        storage.get_db_path("NC")
+
+        assert s3.manifest_reads == 0
+        assert not storage._refreshing
@@ -0,0 +1,165 @@
+"""Tests for the shared stratification cache."""
+
+import polars as pl
+import pytest
+
+from askfia_api.services.strat_cache import (
+    STRATIFICATION_TABLES,
+    StratificationCache,
+)
+
+
+class FakeReader:
+    """Minimal stand-in for pyFIA's FIADataReader."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str | None]] = []
+        self.data = {
+            "POP_STRATUM": pl.DataFrame(
+                {"CN": ["S1", "S2"], "EVALID": [372301, 372301], "EXPNS": [6000.0, 6100.0]}
+            ),
+            "POP_PLOT_STRATUM_ASSGN": pl.DataFrame(
+                {
+                    "PLT_CN": ["P1", "P2", "P2"],
+                    "STRATUM_CN": ["S1", "S2", "S2"],
+                    "EVALID": [372301, 372301, 372301],
+                }
+            ),
+            "POP_ESTN_UNIT": pl.DataFrame(
+                {"CN": ["E1"], "EVALID": [372301], "AREA_USED": [1.0e6]}
+            ),
+        }
+
+    def read_table(self, table_name, columns=None, where=None, lazy=True):
+        self.calls.append((table_name, where))
+        df = self.data[table_name]
+        return df.lazy() if lazy else df
+
+
+class FakeFIA:
+    """Minimal stand-in for a clipped pyFIA FIA connection."""
+
+    def __init__(self, reader, evalid=(372301,)):
+        self._reader = reader
+        self.evalid = list(evalid) if evalid else None
+        self.tables = {}
+        self._valid_plot_cns = None
+
+
+class TestStratificationCache:
+    """Tests for StratificationCache."""
+
+    def test_make_key_requires_evalid(self):
+        """Unclipped connections have no cache key."""
+        assert StratificationCache.make_key("db", None) is None
+        assert StratificationCache.make_key("db", [2, 1]) == ("db", (1, 2))
+
+    def test_first_inject_loads_tables(self):
+        """First injection reads each stratification table once."""
+        reader = FakeReader()
+        cache = StratificationCache(max_entries=4)
+        db = FakeFIA(reader)
+
+        assert cache.inject(db, "nc.duckdb") is True
+        assert {name for name, _ in reader.calls} == set(STRATIFICATION_TABLES)
+        assert all("EVALID IN (372301)" in where for _, where in reader.calls)
+        assert set(STRATIFICATION_TABLES) <= set(db.tables)
+        assert sorted(db._valid_plot_cns) == ["P1", "P2"]
+
+    def test_later_injects_reuse_tables(self):
+        """Subsequent connections for the same key skip the database."""
+        reader = FakeReader()
+        cache = StratificationCache(max_entries=4)
+
+        cache.inject(FakeFIA(reader), "nc.duckdb")
+        calls_after_first = len(reader.calls)
+
+        db = FakeFIA(reader)
+        cache.inject(db, "nc.duckdb")
+
+        assert len(reader.calls) == calls_after_first
+        assert cache.hits == 1
+        assert cache.misses == 1
+        stratum = db.tables["POP_STRATUM"].collect()
+        assert stratum["CN"].to_list() == ["S1", "S2"]
+
+    def test_different_evalid_is_separate_entry(self):
+        """A different EVALID never reuses cached expansion factors."""
+        reader = FakeReader()
+        cache = StratificationCache(max_entries=4)
+
+        cache.inject(FakeFIA(reader, evalid=(372301,)), "nc.duckdb")
+        cache.inject(FakeFIA(reader, evalid=(372201,)), "nc.duckdb")
+
+        assert cache.misses == 2
+        assert cache.stats()["entries"] == 2
+
+    def test_unclipped_connection_not_injected(self):
+        """Connections without an EVALID are left untouched."""
+        cache = StratificationCache(max_entries=4)
+        db = FakeFIA(FakeReader(), evalid=None)
+
+        assert cache.inject(db, "nc.duckdb") is False
+        assert db.tables == {}
+
+    def test_disabled_cache(self):
+        """max_entries=0 disables caching."""
+        cache = StratificationCache(max_entries=0)
+        db = FakeFIA(FakeReader())
+
+        assert cache.inject(db, "nc.duckdb") is False
+        assert db.tables == {}
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted beyond max_entries."""
+        reader = FakeReader()
+        cache = StratificationCache(max_entries=1)
+
+        cache.inject(FakeFIA(reader), "nc.duckdb")
+        cache.inject(FakeFIA(reader), "ga.duckdb")
+
+        sources = [s["source"] for s in cache.stats()["sources"]]
+        assert sources == ["ga.duckdb"]
+
+    def test_invalidate_source(self):
+        """Invalidating a source drops only its entries."""
+        reader = FakeReader()
+        cache = StratificationCache(max_entries=4)
+        cache.inject(FakeFIA(reader), "nc.duckdb")
+        cache.inject(FakeFIA(reader), "ga.duckdb")
+
+        assert cache.invalidate("nc.duckdb") == 1
+        assert [s["source"] for s in cache.stats()["sources"]] == ["ga.duckdb"]
+
+    def test_invalidate_source_prefix(self):
+        """A prefix drops every version of a file."""
+        reader = FakeReader()
+        cache = StratificationCache(max_entries=4)
+        cache.inject(FakeFIA(reader), "tables/NC/v1/views.duckdb@1:10")
+        cache.inject(FakeFIA(reader), "tables/NC/v2/views.duckdb@2:10")
+        cache.inject(FakeFIA(reader), "tables/GA/v1/views.duckdb@3:10")
+
+        assert cache.invalidate("tables/NC", prefix=True) == 2
+        assert len(cache.stats()["sources"]) == 1
+
+    def test_load_failure_does_not_raise(self):
+        """A failing load falls back to pyFIA's own loading."""
+
+        class BrokenReader(FakeReader):
+            def read_table(self, *args, **kwargs):
+                raise RuntimeError("boom")
+
+        cache = StratificationCache(max_entries=4)
+        db = FakeFIA(BrokenReader())
+
+        assert cache.inject(db, "nc.duckdb") is False
+        assert db.tables == {}
+
+
+@pytest.mark.parametrize("table", STRATIFICATION_TABLES)
+def test_injected_tables_are_lazy(table):
+    """Injected tables are polars LazyFrames, as pyFIA expects."""
+    cache = StratificationCache(max_entries=4)
+    db = FakeFIA(FakeReader())
+    cache.inject(db, "nc.duckdb")
+    assert isinstance(db.tables[table], pl.LazyFrame)
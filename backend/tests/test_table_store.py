@@ -0,0 +1,285 @@
+"""Tests for per-table Parquet storage."""
+
+import hashlib
+import io
+import os
+
+import duckdb
+import pytest
+
+from askfia_api.services.s3_download import RangedDownloader
+from askfia_api.services.storage import FIAStorage
+from askfia_api.services.table_store import (
+    ESTIMATOR_TABLES,
+    TableStore,
+    export_state_tables,
+    tables_for,
+)
+
+
+class FakeS3:
+    """Serves files from a local directory as S3 objects."""
+
+    def __init__(self, root):
+        self.root = root
+        self.keys: list[str] = []
+
+    def _data(self, key):
+        path = self.root / key
+        if not path.exists():
+            raise KeyError(key)
+        return path.read_bytes()
+
+    def head_object(self, Bucket, Key, PartNumber=None):  # noqa: N803
+        data = self._data(Key)
+        return {"ContentLength": len(data), "ETag": hashlib.md5(data).hexdigest()}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):  # noqa: N803
+        data = self._data(Key)
+        self.keys.append(Key)
+        if Range:
+            start, end = (int(x) for x in Range.removeprefix("bytes=").split("-"))
+            data = data[start : end + 1]
+        return {"Body": io.BytesIO(data)}
+
+
+@pytest.fixture
+def state_db(tmp_path):
+    """A small NC database with a large table estimators never read."""
+    path = tmp_path / "NC.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute("CREATE TABLE PLOT AS SELECT range::VARCHAR AS CN FROM range(50)")
+    con.execute(
+        "CREATE TABLE COND AS SELECT range::VARCHAR AS PLT_CN, 1 AS COND_STATUS_CD FROM range(50)"
+    )
+    con.execute("CREATE TABLE POP_EVAL AS SELECT 372301 AS EVALID")
+    con.execute(
+        "CREATE TABLE SEEDLING AS SELECT (range % 50)::VARCHAR AS PLT_CN, "
+        "random() AS TREECOUNT FROM range(20000)"
+    )
+    con.close()
+    return path
+
+
+@pytest.fixture
+def bucket(tmp_path, state_db):
+    """Published tables for NC under fia-duckdb/tables/NC."""
+    root = tmp_path / "bucket"
+    export_state_tables(state_db, root / "fia-duckdb" / "tables" / "NC", "nc")
+    return root
+
+
+def make_store(tmp_path, s3):
+    return TableStore(
+        tmp_path / "cache",
+        "b",
+        "fia-duckdb",
+        lambda: RangedDownloader(s3, chunk_size=1 << 20),
+    )
+
+
+class TestExport:
+    """Tests for export_state_tables."""
+
+    def test_manifest(self, tmp_path, state_db):
+        """Every table is exported and listed with its row count."""
+        manifest = export_state_tables(state_db, tmp_path / "out", "nc")
+
+        assert manifest["state"] == "NC"
+        assert manifest["evalids"] == [372301]
+        assert manifest["tables"]["SEEDLING"]["rows"] == 20000
+        assert (tmp_path / "out" / "COND.parquet").exists()
+
+
+class TestTableStore:
+    """Tests for TableStore."""
+
+    def test_fetches_only_needed_tables(self, tmp_path, bucket):
+        """Unused tables are never downloaded."""
+        s3 = FakeS3(bucket)
+        store = make_store(tmp_path, s3)
+
+        path = store.view_db("nc", ESTIMATOR_TABLES["area"])
+
+        assert store.cached_tables("NC") == {"PLOT", "COND", "POP_EVAL"}
+        assert not any("SEEDLING" in key for key in s3.keys)
+        con = duckdb.connect(str(path), read_only=True)
+        assert con.execute("SELECT COUNT(*) FROM COND").fetchone()[0] == 50
+        con.close()
+
+        published = sum(
+            p.stat().st_size for p in (bucket / "fia-duckdb/tables/NC").glob("*.parquet")
+        )
+        assert store.bytes_fetched < published / 2
+
+    def test_more_tables_new_view_file(self, tmp_path, bucket):
+        """Adding tables builds a new view file and leaves the old one usable."""
+        s3 = FakeS3(bucket)
+        store = make_store(tmp_path, s3)
+        first = store.view_db("NC", ["PLOT"])
+        con = duckdb.connect(str(first), read_only=True)
+
+        second = store.view_db("NC", ["PLOT", "SEEDLING"])
+
+        assert second != first
+        assert con.execute("SELECT COUNT(*) FROM PLOT").fetchone()[0] == 50
+        con.close()
+        assert store.view_tables(second) == {"PLOT", "SEEDLING"}
+        assert sum("PLOT.parquet" in key for key in s3.keys) == 1
+
+    def test_unpublished_state(self, tmp_path, bucket):
+        """States without published tables return None."""
+        store = make_store(tmp_path, FakeS3(bucket))
+        assert store.view_db("GA", ["PLOT"]) is None
+
+    def test_unpublished_state_rechecked(self, tmp_path, bucket, state_db):
+        """A missing manifest is looked up again once missing_ttl passes."""
+        store = make_store(tmp_path, FakeS3(bucket))
+        store.missing_ttl = 0.0
+        assert store.view_db("GA", ["PLOT"]) is None
+
+        export_state_tables(state_db, bucket / "fia-duckdb" / "tables" / "GA", "ga")
+
+        assert store.view_db("GA", ["PLOT"]) is not None
+
+    def test_republished_tables_new_version(self, tmp_path, bucket, state_db):
+        """A republished state gets a new version directory and notifies."""
+        store = make_store(tmp_path, FakeS3(bucket))
+        store.manifest_ttl = 0.0
+        changed = []
+        store.add_version_listener(changed.append)
+        first = store.view_db("NC", ["PLOT"])
+        con = duckdb.connect(str(first), read_only=True)
+
+        con_db = duckdb.connect(str(state_db))
+        con_db.execute("INSERT INTO PLOT VALUES ('new')")
+        con_db.close()
+        export_state_tables(state_db, bucket / "fia-duckdb" / "tables" / "NC", "nc")
+
+        second = store.view_db("NC", ["PLOT"])
+        assert second.parent != first.parent
+        assert changed == ["NC"]
+        assert con.execute("SELECT COUNT(*) FROM PLOT").fetchone()[0] == 50
+        con.close()
+        con = duckdb.connect(str(second), read_only=True)
+        assert con.execute("SELECT COUNT(*) FROM PLOT").fetchone()[0] == 51
+        con.close()
+
+        assert store.prune_versions("NC") == [first.parent.name]
+        assert not first.parent.exists()
+
+    def test_manifest_cached_within_ttl(self, tmp_path, bucket):
+        """A published manifest is not re-fetched before manifest_ttl passes."""
+        s3 = FakeS3(bucket)
+        store = make_store(tmp_path, s3)
+        store.manifest("NC")
+        store.manifest("NC")
+        assert sum(key.endswith("manifest.json") for key in s3.keys) == 1
+
+
+class TestStorageTables:
+    """Tests for FIAStorage with table storage enabled."""
+
+    def test_use_yields_view_db(self, tmp_path, bucket):
+        """storage.use() exposes the requested tables without the whole file."""
+        storage = FIAStorage(local_dir=tmp_path / "fia", s3_bucket="b", table_storage=True)
+        storage._s3_client = FakeS3(bucket)
+
+        with storage.use("NC", ESTIMATOR_TABLES["area"]) as path:
+            assert "views-" in path
+            assert not storage.tables_missing(path, "NC", "area")
+            # TREE is not published for this state, so nothing to fetch
+            assert not storage.tables_missing(path, "NC", "volume")
+        assert [entry["state"] for entry in storage.list_cached_states()] == ["NC-TABLES"]
+
+    def test_missing_published_table_detected(self, tmp_path, bucket):
+        """A view without a published table the estimator reads is flagged."""
+        storage = FIAStorage(local_dir=tmp_path / "fia", s3_bucket="b", table_storage=True)
+        storage._s3_client = FakeS3(bucket)
+
+        with storage.use("NC", ("PLOT",)) as path:
+            assert storage.tables_missing(path, "NC", "area")
+
+    def test_unpublished_tables(self, tmp_path, bucket):
+        """Only tables the state does not publish are missing from a view."""
+        storage = FIAStorage(local_dir=tmp_path / "fia", s3_bucket="b", table_storage=True)
+        storage._s3_client = FakeS3(bucket)
+
+        with storage.use("NC", ("PLOT",)) as path:
+            missing = storage.unpublished_tables(path, "NC", ["COND", "TREE_GRM_COMPONENT"])
+        assert missing == ["TREE_GRM_COMPONENT"]
+        assert storage.unpublished_tables("NC.duckdb", "NC", ["COND"]) is None
+
+    def test_republish_replaces_tables(self, tmp_path, bucket, state_db):
+        """Old table versions are pruned once the last query using them ends."""
+        storage = FIAStorage(local_dir=tmp_path / "fia", s3_bucket="b", table_storage=True)
+        storage._s3_client = FakeS3(bucket)
+        storage.table_store.manifest_ttl = 0.0
+        replaced = []
+        storage.add_replace_listener(replaced.append)
+        export_dir = bucket / "fia-duckdb" / "tables" / "NC"
+
+        with storage.use("NC", ("PLOT",)) as old_path:
+            export_state_tables(state_db, export_dir, "nc")
+            with storage.use("NC", ("PLOT",)) as new_path:
+                assert new_path != old_path
+            # Still read by the outer query
+            assert os.path.exists(old_path)
+        assert replaced == ["NC"]
+        assert not os.path.exists(old_path)
+        assert os.path.exists(new_path)
+
+    def test_local_version_of_tables(self, tmp_path, bucket, state_db):
+        """States served from published tables are versioned by their manifest."""
+        storage = FIAStorage(local_dir=tmp_path / "fia", s3_bucket="b", table_storage=True)
+        storage._s3_client = FakeS3(bucket)
+        storage.table_store.manifest_ttl = 0.0
+        assert storage.local_evalids("NC") is None
+
+        with storage.use("NC", ("PLOT",)):
+            pass
+        version = storage.local_version("NC")
+        assert storage.local_evalids("NC") == [372301]
+        assert version is not None
+
+        export_state_tables(state_db, bucket / "fia-duckdb" / "tables" / "NC", "nc")
+        with storage.use("NC", ("PLOT",)):
+            pass
+        assert storage.local_version("NC") not in (None, version)
+
+    def test_tables_count_toward_cache_limit(self, tmp_path, bucket):
+        """Table directories are evicted like state databases, unless in use."""
+        storage = FIAStorage(
+            local_dir=tmp_path / "fia",
+            s3_bucket="b",
+            table_storage=True,
+            max_local_gb=1e-9,
+        )
+        storage._s3_client = FakeS3(bucket)
+        state_dir = tmp_path / "fia" / "tables" / "NC"
+
+        with storage.use("NC", ("PLOT",)):
+            assert storage.manifest.evict_to_fit() == []
+            assert state_dir.exists()
+        assert storage.manifest.evict_to_fit() == ["NC-TABLES"]
+        assert not state_dir.exists()
+
+    def test_tables_found_on_restart(self, tmp_path, bucket):
+        """Cached table directories are accounted when storage starts."""
+        storage = FIAStorage(local_dir=tmp_path / "fia", s3_bucket="b", table_storage=True)
+        storage._s3_client = FakeS3(bucket)
+        with storage.use("NC", ("PLOT",)):
+            pass
+        (tmp_path / "fia" / ".cache_manifest.json").unlink()
+
+        restarted = FIAStorage(local_dir=tmp_path / "fia", table_storage=True)
+
+        assert restarted.manifest.stats()["states"] == 1
+        assert restarted.manifest.total_bytes > 0
+
+
+def test_tables_for():
+    """Estimator table sets are combined with the core tables."""
+    tables = tables_for(["area", "growth"])
+    assert "TREE_GRM_COMPONENT" in tables
+    assert "POP_STRATUM" in tables
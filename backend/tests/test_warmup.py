@@ -0,0 +1,174 @@
+"""Tests for cache warm-up from popular historical queries."""
+
+import asyncio
+import threading
+import time
+
+from askfia_api.services.usage_tracker import UsageTracker
+from askfia_api.services.warmup import (
+    CacheWarmer,
+    normalize_tool_call,
+    popular_specs,
+)
+
+
+def record(*specs):
+    return {"tool_specs": list(specs)}
+
+
+def area(*states, **args):
+    return normalize_tool_call("query_forest_area", {"states": list(states), **args})
+
+
+class FakeReplay:
+    """Records replayed specs; optionally slow or failing."""
+
+    def __init__(self, delay=0.0, fail=()):
+        self.calls = []
+        self.delay = delay
+        self.fail = set(fail)
+
+    async def __call__(self, name, args):
+        self.calls.append((name, args))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if name in self.fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+
+class TestPopularSpecs:
+    """Tests for normalize_tool_call and popular_specs."""
+
+    def test_equivalent_calls_normalize_alike(self):
+        """State order and case, and None arguments, do not split a spec."""
+        a = normalize_tool_call("query_forest_area", {"states": ["nc", "SC"], "grp_by": None})
+        b = normalize_tool_call("query_forest_area", {"states": ["SC", "NC", "nc"]})
+
+        assert a == b == {"name": "query_forest_area", "args": {"states": ["NC", "SC"]}}
+
+    def test_most_frequent_first(self):
+        """Specs are ranked by frequency, with a minimum count and tool filter."""
+        records = [
+            record(area("NC"), area("GA")),
+            record(area("GA")),
+            record(area("GA"), normalize_tool_call("lookup_species", {"name": "oak"})),
+            record(area("NC")),
+            record(area("SC")),
+            record(normalize_tool_call("lookup_species", {"name": "oak"})),
+        ]
+
+        specs = popular_specs(records, top_n=5, min_count=2, tools=["query_forest_area"])
+
+        assert specs == [area("GA"), area("NC")]
+        assert popular_specs(records, top_n=1) == [area("GA")]
+
+
+class TestCacheWarmer:
+    """Tests for CacheWarmer runs."""
+
+    def test_replays_and_reports(self):
+        """Popular specs are replayed; failures are reported, not raised."""
+        history = [record(area("NC"), area("GA"))] * 2 + [
+            record(normalize_tool_call("compare_states", {"states": ["NC"]}))
+        ] * 2
+        replay = FakeReplay(fail=["compare_states"])
+        warmer = CacheWarmer(lambda: history, replay, top_n=10)
+
+        report = warmer.run("startup")
+
+        assert [name for name, _ in replay.calls] == [
+            "query_forest_area",
+            "query_forest_area",
+            "compare_states",
+        ]
+        assert report.specs == 3
+        assert len(report.warmed) == 2
+        assert list(report.failed.values()) == ["RuntimeError: boom"]
+        assert warmer.stats()["last_report"]["reason"] == "startup"
+
+    def test_only_changed_states(self):
+        """A run for some states replays only the specs touching them."""
+        history = [record(area("NC"), area("GA"), area("GA", "SC"))] * 2
+        replay = FakeReplay()
+        warmer = CacheWarmer(lambda: history, replay, top_n=10)
+
+        report = warmer.run("evalid_change", ["sc"])
+
+        assert replay.calls == [("query_forest_area", {"states": ["GA", "SC"]})]
+        assert report.states == ["SC"]
+
+    def test_time_budget(self):
+        """Once the budget is spent, remaining specs are skipped."""
+        history = [record(area("NC"), area("GA"), area("SC"))] * 2
+        replay = FakeReplay(delay=0.05)
+        warmer = CacheWarmer(lambda: history, replay, top_n=10, time_budget=0.07)
+
+        report = warmer.run("startup")
+
+        assert len(report.warmed) == 1
+        assert report.budget_exhausted
+        assert len(report.warmed) + len(report.failed) + report.skipped == 3
+
+    def test_waits_for_live_queries(self):
+        """Replays wait until no live query is running."""
+        busy = threading.Event()
+        busy.set()
+        threading.Timer(0.05, busy.clear).start()
+        replay = FakeReplay()
+        warmer = CacheWarmer(
+            lambda: [record(area("NC"))] * 2,
+            replay,
+            is_busy=busy.is_set,
+            idle_poll=0.01,
+        )
+
+        started = time.monotonic()
+        report = warmer.run("startup")
+
+        assert time.monotonic() - started >= 0.05
+        assert len(report.warmed) == 1
+
+    def test_triggers_during_run_coalesce(self):
+        """Triggers during a run are folded into one follow-up run."""
+        release = threading.Event()
+        runs = []
+
+        class Warmer(CacheWarmer):
+            def run(self, reason, states=None):
+                runs.append((reason, states))
+                release.wait(1)
+
+        warmer = Warmer(lambda: [], FakeReplay())
+
+        assert warmer.trigger("startup")
+        assert not warmer.trigger("evalid_change", ["nc"])
+        assert not warmer.trigger("evalid_change", ["SC"])
+        release.set()
+        for _ in range(100):
+            if not warmer.stats()["running"]:
+                break
+            time.sleep(0.01)
+
+        assert runs == [("startup", None), ("evalid_change", {"NC", "SC"})]
+
+    def test_disabled(self):
+        """top_n = 0 disables triggered runs."""
+        warmer = CacheWarmer(lambda: [], FakeReplay(), top_n=0)
+
+        assert not warmer.trigger("startup")
+
+
+class TestUsageHistory:
+    """Tests for tool calls in the usage log."""
+
+    def test_records_tool_specs(self, tmp_path):
+        """Recorded tool specs are read back as history."""
+        tracker = UsageTracker(str(tmp_path))
+        asyncio.run(
+            tracker.record("claude-sonnet-4-5-20250929", 10, 5, tool_specs=[area("NC")])
+        )
+
+        records = list(tracker.iter_records(days=1))
+
+        assert [r["tool_specs"] for r in records] == [[area("NC")]]